@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ID Service - H2D Price Calculator
+============================================
+
+Meet de snelheid van de id service (src/utils/ids.py) en controleert
+uniciteit en volgorde over meerdere processen.
+
+Gemeten:
+- next_id(): losse ids per seconde
+- next_ids(n): bulk ids per seconde (aaneengesloten ranges)
+- N processen tegelijk: alle ids uniek, per proces strikt oplopend
+
+Gebruik:
+-------
+    python benchmarks/bench_ids.py
+    python benchmarks/bench_ids.py --count 5000000 --processes 8
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Project root op het pad (zoals launch_calculator.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+from src.utils.ids import IdGenerator, id_timestamp
+
+
+def _worker(state_dir: str, count: int, results) -> None:
+    generator = IdGenerator(state_dir)
+    ids = [generator.next_id() for _ in range(count // 2)] + generator.next_ids(count - count // 2)
+    results.put(ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark id service")
+    parser.add_argument('--count', type=int, default=1_000_000, help="Aantal ids per meting")
+    parser.add_argument('--processes', type=int, default=4, help="Processen voor de uniciteitstest")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        generator = IdGenerator(state_dir)
+
+        start = time.perf_counter()
+        single = [generator.next_id() for _ in range(args.count)]
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bulk = generator.next_ids(args.count)
+        bulk_time = time.perf_counter() - start
+
+        assert single == sorted(single) and bulk[0] > single[-1], "ids niet oplopend"
+        assert len(set(single) | set(bulk)) == 2 * args.count, "dubbele ids"
+
+        print(f"{'Methode':<14}{'Tijd (s)':>10}{'ids/s':>16}")
+        print("-" * 40)
+        print(f"{'next_id()':<14}{single_time:>10.3f}{args.count / single_time:>16,.0f}")
+        print(f"{'next_ids(n)':<14}{bulk_time:>10.3f}{args.count / bulk_time:>16,.0f}")
+        print(f"\nLaatste id: {bulk[-1]} ({id_timestamp(bulk[-1])}, node {generator.node})")
+
+        # Meerdere processen met een gedeelde node teller
+        per_process = min(args.count, 200_000)
+        results = multiprocessing.Queue()
+        jobs = [multiprocessing.Process(target=_worker, args=(state_dir, per_process, results))
+                for _ in range(args.processes)]
+        for job in jobs:
+            job.start()
+        batches = [results.get() for _ in jobs]
+        for job in jobs:
+            job.join()
+
+        all_ids = [i for batch in batches for i in batch]
+        assert all(batch == sorted(batch) for batch in batches), "ids per proces niet oplopend"
+        assert len(set(all_ids)) == len(all_ids), "dubbele ids tussen processen"
+        print(f"{args.processes} processen x {per_process:,} ids: allemaal uniek en oplopend ✔")
+
+
+if __name__ == "__main__":
+    main()
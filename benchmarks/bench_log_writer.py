@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Log Writer - H2D Price Calculator
+============================================
+
+Meerdere processen schrijven tegelijk berekeningen naar dezelfde
+master_calculations.csv en calculation_log.csv, zoals GUI, CLI en
+Streamlit dat in de praktijk doen.
+
+Vergeleken:
+- lokaal  LocalWriter (file lock, één fsync per verzoek)
+- daemon  LogWriterDaemon (group commit, één fsync per batch)
+
+Na elke run wordt gecontroleerd dat elk bestand precies één header en
+alle rijen bevat, elke rij het juiste aantal kolommen heeft en de rijen
+per proces in volgorde staan (geen interleaving).
+
+Gebruik:
+-------
+    python benchmarks/bench_log_writer.py                        # 8 processen x 200
+    python benchmarks/bench_log_writer.py --processes 16 --records 500
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Project root op het pad (zoals launch_calculator.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+from src.utils.log_writer import LocalWriter, LogWriterDaemon, RecordWriter, make_record
+from src.utils.schema import LOG_COLUMNS, MASTER_COLUMNS, build_master_row, format_timestamp
+
+
+def _records(base_dir: Path, worker: int, index: int):
+    """Log + master rij voor één berekening; product_id codeert worker/volgnummer."""
+    moment = datetime(2025, 1, 1) + timedelta(seconds=worker * 100_000 + index)
+    master = build_master_row({
+        'export_timestamp': format_timestamp(moment), 'weight': 50 + index % 200,
+        'material': 'PLA', 'total_cost': 2.5, 'sell_price': 5.0, 'margin_pct': 50.0,
+        'day_of_week': moment.strftime('%A'), 'hour_of_day': moment.hour,
+        'month': moment.strftime('%B'), 'year': moment.year,
+        'product_id': f"W{worker}-{index}",
+    })
+    log = [master['timestamp'], moment.strftime('%Y-%m-%d'), moment.strftime('%H:%M:%S'),
+           moment.strftime('%A'), moment.hour, master['weight'], 'PLA', 1.0,
+           0, 0, 2.5, 5.0, 50.0, 2.5, False, False, False, False, 1]
+    return [
+        make_record(base_dir / 'berekeningen' / 'calculation_log.csv', LOG_COLUMNS, log),
+        make_record(base_dir / 'producten' / 'master_calculations.csv', MASTER_COLUMNS, master),
+    ]
+
+
+def _worker(mode: str, base_dir: str, socket_path: str, worker: int, records: int, barrier) -> None:
+    base = Path(base_dir)
+    writer = LocalWriter(base) if mode == 'local' else RecordWriter(base, socket_path)
+    barrier.wait()  # alle processen tegelijk starten (opstarttijd niet meten)
+    for index in range(records):
+        writer.append(_records(base, worker, index))
+    writer.close()
+
+
+def run(mode: str, processes: int, records: int) -> float:
+    """Draai één scenario en geef de doorlooptijd in seconden."""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp) / 'exports'
+        socket_path = Path(tmp) / 'w.sock'
+        daemon = None
+        if mode == 'daemon':
+            daemon = LogWriterDaemon(base, socket_path)
+            daemon.start()
+
+        barrier = multiprocessing.Barrier(processes + 1)
+        jobs = [multiprocessing.Process(target=_worker,
+                                        args=(mode, str(base), str(socket_path), w, records, barrier))
+                for w in range(processes)]
+        for job in jobs:
+            job.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for job in jobs:
+            job.join()
+        elapsed = time.perf_counter() - start
+
+        if daemon is not None:
+            daemon.stop()
+        verify(base, processes, records)
+        return elapsed
+
+
+def verify(base: Path, processes: int, records: int) -> None:
+    """Controleer header, kolommen en volgorde per proces."""
+    master = base / 'producten' / 'master_calculations.csv'
+    log = base / 'berekeningen' / 'calculation_log.csv'
+
+    with open(log, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == LOG_COLUMNS, "log header"
+    assert all(len(r) == len(LOG_COLUMNS) for r in rows[1:]), "log kolommen"
+    assert len(rows) - 1 == processes * records, f"log rijen: {len(rows) - 1}"
+
+    with open(master, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == MASTER_COLUMNS, "master header"
+        last = {}
+        count = 0
+        for row in reader:
+            assert None not in row and all(v is not None for v in row.values()), "master kolommen"
+            worker, index = row['product_id'][1:].split('-')
+            assert int(index) == last.get(worker, -1) + 1, f"volgorde worker {worker}"
+            last[worker] = int(index)
+            count += 1
+    assert count == processes * records, f"master rijen: {count}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark log writer daemon vs lokale file lock")
+    parser.add_argument('--processes', type=int, default=8, help="Aantal gelijktijdige processen")
+    parser.add_argument('--records', type=int, default=200, help="Berekeningen per proces")
+    args = parser.parse_args()
+
+    total = args.processes * args.records
+    print(f"{args.processes} processen x {args.records} berekeningen (log + master rij)\n")
+    print(f"{'Schrijver':<12}{'Tijd (s)':>10}{'Berekeningen/s':>17}")
+    print("-" * 39)
+    for mode in ('local', 'daemon'):
+        elapsed = run(mode, args.processes, args.records)
+        print(f"{mode:<12}{elapsed:>10.2f}{total / elapsed:>17,.0f}")
+    print("\nAlle bestanden gecontroleerd: één header, volledige rijen, volgorde per proces ✔")
+
+
+if __name__ == "__main__":
+    main()
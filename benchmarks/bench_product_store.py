@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Product Store - H2D Price Calculator
+===============================================
+
+Meet de log-structured product opslag (src/products/product_store.py):
+updates en deletes als appends, replay bij het laden en compactie.
+
+Gemeten:
+- updates: N wijzigingen verdeeld over K producten (appends per seconde)
+- load vóór compactie: replay van alle N records
+- compactie: herschrijven tot één record per product
+- load na compactie: replay van ~K records (begrensd)
+
+Gebruik:
+-------
+    python benchmarks/bench_product_store.py
+    python benchmarks/bench_product_store.py --products 2000 --updates 50000
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Project root op het pad (zoals launch_calculator.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+from src.products import product_store
+from src.products.product_store import ProductLogStore
+from src.utils.log_writer import LocalWriter
+from src.utils.schema import build_master_row, format_timestamp
+
+
+def product_row(product: int, version: int) -> dict:
+    return build_master_row({
+        'export_timestamp': format_timestamp(datetime(2025, 1, 1)), 'weight': 50 + version % 200,
+        'material': 'PLA', 'total_cost': 2.5, 'sell_price': 5.0 + version, 'margin_pct': 50.0,
+        'product_name': f"Product {product}", 'product_id': f"P{product}", 'is_product': True,
+    })
+
+
+def timed(func, *args, **kwargs):
+    """(resultaat, seconden) van één aanroep."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark log-structured product store")
+    parser.add_argument('--products', type=int, default=1_000, help="Aantal verschillende producten")
+    parser.add_argument('--updates', type=int, default=20_000, help="Aantal wijzigingen")
+    args = parser.parse_args()
+
+    # Compactie hier expliciet meten i.p.v. op de achtergrond
+    product_store.COMPACTION_MIN_RECORDS = args.updates * 10
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp) / 'exports'
+        store = ProductLogStore(base / 'producten' / 'product_log', LocalWriter(base))
+
+        def apply_updates():
+            for i in range(args.updates):
+                product = i % args.products
+                if i % 50 == 49:
+                    store.delete(f"P{product}")
+                else:
+                    store.put(product_row(product, i))
+
+        _, update_time = timed(apply_updates)
+        before, load_before = timed(store.load)
+        ratio = store.garbage_ratio
+        stats, compact_time = timed(store.compact, grace=0)
+        after, load_after = timed(store.load)
+
+        assert before == after, "compactie veranderde de inhoud"
+        live = sum(1 for row in after.values() if row is not None)
+
+        print(f"{args.updates:,} wijzigingen over {args.products:,} producten "
+              f"(garbage ratio {ratio:.0%})\n")
+        print(f"{'Stap':<22}{'Tijd (s)':>10}{'Records':>10}")
+        print("-" * 42)
+        print(f"{'updates (appends)':<22}{update_time:>10.3f}{args.updates:>10,}"
+              f"   ({args.updates / update_time:,.0f}/s)")
+        print(f"{'load vóór compactie':<22}{load_before:>10.3f}{stats['records']:>10,}")
+        print(f"{'compactie':<22}{compact_time:>10.3f}{stats['kept']:>10,}")
+        print(f"{'load na compactie':<22}{load_after:>10.3f}{len(after):>10,}")
+        print(f"\nInhoud identiek voor en na compactie ✔ ({live:,} actieve producten)")
+
+
+if __name__ == "__main__":
+    main()
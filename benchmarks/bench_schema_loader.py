@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Schema Loader - H2D Price Calculator
+===============================================
+
+Vergelijkt het inlezen van master_calculations.csv op de oude manier
+(pd.read_csv + pd.to_datetime(format='mixed')) met read_master() uit
+het schema register (canonieke dtypes tijdens het parsen).
+
+Gemeten:
+- parse tijd (beste van N herhalingen)
+- geheugen van het resulterende frame (memory_usage(deep=True))
+
+Gebruik:
+-------
+    python benchmarks/bench_schema_loader.py            # 200.000 rijen synthetisch
+    python benchmarks/bench_schema_loader.py --rows 1000000
+    python benchmarks/bench_schema_loader.py --csv exports/producten/master_calculations.csv
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Project root op het pad (zoals launch_calculator.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+from src.utils.schema import MASTER_COLUMNS, format_timestamp, read_master
+
+
+MATERIALS = ['PLA', 'PETG', 'ABS', 'TPU', 'ASA', 'PLA-CF', 'PETG-CF', 'PA-CF', 'PC']
+
+
+def generate_master_csv(path: str, rows: int, seed: int = 42) -> None:
+    """Schrijf een synthetische master_calculations.csv.
+
+    De helft van de timestamps heeft de oude 'T' notatie, zodat de
+    baseline dezelfde gemengde data ziet als in productie.
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    offsets = np.sort(rng.integers(0, 365 * 24 * 3600, rows))
+    moments = [start + timedelta(seconds=int(s), microseconds=int(us))
+               for s, us in zip(offsets, rng.integers(0, 1_000_000, rows))]
+
+    weight = rng.uniform(5, 800, rows).round(1)
+    material_cost = (weight * rng.uniform(0.02, 0.08, rows)).round(2)
+    variable_cost = (weight * rng.uniform(0.01, 0.05, rows)).round(2)
+    total_cost = (material_cost + variable_cost).round(2)
+    sell_price = (total_cost * rng.uniform(1.3, 2.5, rows)).round(2)
+    is_product = rng.random(rows) < 0.3
+
+    df = pd.DataFrame({
+        'timestamp': [m.isoformat() if i % 2 else format_timestamp(m) for i, m in enumerate(moments)],
+        'weight': weight,
+        'material': rng.choice(MATERIALS, rows),
+        'material_cost': material_cost,
+        'variable_cost': variable_cost,
+        'total_cost': total_cost,
+        'sell_price': sell_price,
+        'margin_pct': ((sell_price - total_cost) / sell_price * 100).round(1),
+        'profit_amount': (sell_price - total_cost).round(2),
+        'multicolor': rng.random(rows) < 0.2,
+        'abrasive': rng.random(rows) < 0.15,
+        'rush': rng.random(rows) < 0.1,
+        'day_of_week': [m.strftime('%A') for m in moments],
+        'hour_of_day': [m.hour for m in moments],
+        'month': [m.strftime('%B') for m in moments],
+        'year': [m.year for m in moments],
+        'product_name': np.where(is_product, 'Product ' + pd.Series(rng.integers(0, 500, rows)).astype(str), ''),
+        'product_id': np.where(is_product, 'PRD-' + pd.Series(rng.integers(0, 500, rows)).astype(str), ''),
+        'is_product': is_product,
+    })
+    df[MASTER_COLUMNS].to_csv(path, index=False)
+
+
+def load_baseline(path: str) -> pd.DataFrame:
+    """Oude loader zoals BaseAnalysis.load_data en DataManager hem deden."""
+    df = pd.read_csv(path)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed')
+    return df
+
+
+def measure(loader, path: str, repeat: int):
+    """Beste tijd over `repeat` runs plus het frame van de laatste run."""
+    best = float('inf')
+    df = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = loader(path)
+        best = min(best, time.perf_counter() - start)
+    return best, df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark read_master vs pd.read_csv")
+    parser.add_argument('--rows', type=int, default=200_000, help="Aantal synthetische rijen")
+    parser.add_argument('--csv', help="Bestaande master CSV gebruiken i.p.v. synthetisch")
+    parser.add_argument('--repeat', type=int, default=3, help="Herhalingen per loader")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    if args.csv:
+        path = args.csv
+    else:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, 'master_calculations.csv')
+        print(f"Genereren van {args.rows:,} rijen...")
+        generate_master_csv(path, args.rows)
+
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"Bestand: {path} ({size_mb:.1f} MB)")
+
+    base_time, base_df = measure(load_baseline, path, args.repeat)
+    typed_time, typed_df = measure(read_master, path, args.repeat)
+
+    base_mem = base_df.memory_usage(deep=True).sum() / 1024 / 1024
+    typed_mem = typed_df.memory_usage(deep=True).sum() / 1024 / 1024
+
+    print()
+    print(f"{'Loader':<28}{'Tijd (s)':>10}{'Geheugen (MB)':>16}")
+    print("-" * 54)
+    print(f"{'pd.read_csv + mixed':<28}{base_time:>10.3f}{base_mem:>16.1f}")
+    print(f"{'read_master (schema)':<28}{typed_time:>10.3f}{typed_mem:>16.1f}")
+    print("-" * 54)
+    print(f"Snelheid: {base_time / typed_time:.2f}x   Geheugen: -{(1 - typed_mem / base_mem) * 100:.0f}%")
+
+    print("\nDtypes read_master:")
+    for column, dtype in typed_df.dtypes.items():
+        print(f"  {column:<16}{dtype}")
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
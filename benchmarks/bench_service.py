@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Pricing Service - H2D Price Calculator
+=================================================
+
+Load test van de lokale HTTP service (src/interface/service.py) met
+een eigen asyncio client over keep-alive verbindingen, volledig
+offline op 127.0.0.1.
+
+Gemeten:
+- /price  N requests over C gelijktijdige verbindingen: req/s, p50/p90/p99
+          (een deel van de offertes is identiek → cache coalescing)
+- /batch  één batch van B opdrachten (process pool bij --workers > 0)
+- /metrics  controle van de tellers en histogrammen
+
+Gebruik:
+-------
+    python benchmarks/bench_service.py
+    python benchmarks/bench_service.py --requests 50000 --connections 64 --workers 2
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+# Project root (zoals launch_calculator.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+from src.materials import list_materials
+
+REPEAT_SHARE = 0.3  # deel van de requests dat een eerdere offerte herhaalt
+
+
+class Client:
+    """Minimale HTTP/1.1 client met één keep-alive verbinding."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, body: bytes = b''):
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                          .encode() + body)
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        status = int(head.split(b' ', 2)[1])
+        length = 0
+        for line in head.split(b'\r\n'):
+            if line.lower().startswith(b'content-length:'):
+                length = int(line.split(b':', 1)[1])
+        return status, await self.reader.readexactly(length)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def make_bodies(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    materials = list(list_materials())
+    bodies = []
+    for _ in range(count):
+        if bodies and rng.random() < REPEAT_SHARE:
+            bodies.append(rng.choice(bodies))
+            continue
+        job = {'weight': round(rng.uniform(5, 500), 1), 'material': rng.choice(materials),
+               'multicolor': rng.random() < 0.2, 'spoed': rng.random() < 0.1}
+        bodies.append(json.dumps(job).encode())
+    return bodies
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def load_test(port: int, bodies: list, connections: int) -> tuple:
+    latencies = []
+    queue = iter(bodies)
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        client = Client('127.0.0.1', port)
+        await client.connect()
+        for body in queue:
+            start = time.perf_counter()
+            status, _ = await client.request('POST', '/price', body)
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+        client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(connections)))
+    return latencies, time.perf_counter() - start, errors
+
+
+async def run(args) -> None:
+    server = subprocess.Popen(
+        [sys.executable, '-W', 'ignore', '-m', 'src.interface.service', '--port', '0',
+         '--workers', str(args.workers)],
+        cwd=script_dir, stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(server.stdout.readline().strip().rsplit(':', 1)[1])
+
+        bodies = make_bodies(args.requests)
+        await load_test(port, bodies[:1_000], args.connections)  # opwarmen
+        latencies, seconds, errors = await load_test(port, bodies, args.connections)
+
+        print(f"/price  {args.requests:,} requests, {args.connections} verbindingen, "
+              f"{args.workers} pool workers")
+        print(f"  doorvoer  {args.requests / seconds:>10,.0f} req/s   ({errors} fouten)")
+        for pct in (50, 90, 99):
+            print(f"  p{pct:<8}{percentile(latencies, pct) * 1000:>10.2f} ms")
+
+        client = Client('127.0.0.1', port)
+        await client.connect()
+        jobs = [json.loads(body) for body in make_bodies(args.batch, seed=11)]
+        start = time.perf_counter()
+        status, payload = await client.request('POST', '/batch', json.dumps({'jobs': jobs}).encode())
+        batch_seconds = time.perf_counter() - start
+        results = json.loads(payload)['results']
+        assert status == 200 and len(results) == len(jobs)
+        print(f"\n/batch  {len(jobs):,} opdrachten in {batch_seconds * 1000:.0f} ms "
+              f"({len(jobs) / batch_seconds:,.0f} opdrachten/s)")
+
+        _, metrics = await client.request('GET', '/metrics')
+        client.close()
+        print("\n/metrics")
+        for line in metrics.decode().splitlines():
+            if line.startswith(('h2d_coalesced_total', 'h2d_request_duration_seconds_count',
+                                'h2d_requests_total')):
+                print(f"  {line}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test lokale pricing service")
+    parser.add_argument('--requests', type=int, default=20_000, help="Aantal /price requests")
+    parser.add_argument('--connections', type=int, default=32, help="Gelijktijdige verbindingen")
+    parser.add_argument('--batch', type=int, default=20_000, help="Opdrachten in de /batch test")
+    parser.add_argument('--workers', type=int, default=0, help="Pool workers van de service")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
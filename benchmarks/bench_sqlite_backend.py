@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQLite Backend - H2D Price Calculator
+================================================
+
+Vergelijkt de CSV opslag (read_master + pandas filter/groupby) met de
+SQLite backend (WAL, filters en aggregaties in SQL) op een synthetische
+master_calculations.csv.
+
+Gemeten:
+- import: CSV → SQLite (batch inserts in transacties)
+- append: 1.000 losse berekeningen (CSV append vs één transactie per rij)
+- query "laatste 7 dagen", "PLA-CF deze maand" en "marge per materiaal"
+
+Gebruik:
+-------
+    python benchmarks/bench_sqlite_backend.py                 # 1.000.000 rijen
+    python benchmarks/bench_sqlite_backend.py --rows 200000
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Project root op het pad (zoals launch_calculator.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+from benchmarks.bench_schema_loader import generate_master_csv
+from src.utils.schema import MASTER_COLUMNS, build_master_row, format_timestamp, read_master
+from src.utils.sqlite_store import SQLiteStore
+
+
+def timed(func, *args, **kwargs):
+    """(resultaat, seconden) van één aanroep."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def sample_row(moment: datetime) -> dict:
+    return build_master_row({
+        'export_timestamp': format_timestamp(moment), 'weight': 120.0, 'material': 'PLA',
+        'material_cost': 3.1, 'variable_cost': 2.4, 'total_cost': 5.5, 'sell_price': 11.0,
+        'margin_pct': 50.0, 'day_of_week': moment.strftime('%A'), 'hour_of_day': moment.hour,
+        'month': moment.strftime('%B'), 'year': moment.year,
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark SQLite backend vs CSV")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Aantal synthetische rijen")
+    parser.add_argument('--appends', type=int, default=1_000, help="Aantal losse appends")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'master_calculations.csv')
+        db_path = os.path.join(tmp, 'h2d_data.db')
+
+        print(f"Genereren van {args.rows:,} rijen...")
+        generate_master_csv(csv_path, args.rows)
+        print(f"CSV: {os.path.getsize(csv_path) / 1024 / 1024:.1f} MB")
+
+        store = SQLiteStore(db_path)
+        imported, import_time = timed(store.import_csv, csv_path)
+        print(f"Import: {imported:,} rijen in {import_time:.2f}s "
+              f"({imported / import_time:,.0f} rijen/s), "
+              f"DB {os.path.getsize(db_path) / 1024 / 1024:.1f} MB")
+
+        # Referentiepunt: laatste timestamp in de data
+        last = store.connection().execute("SELECT MAX(timestamp) FROM calculations").fetchone()[0]
+        now = datetime.fromisoformat(last)
+        week_start = now - timedelta(days=7)
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        results = []
+
+        # --- CSV pad: volledige file inlezen, daarna filteren in pandas ---
+        def csv_week():
+            df = read_master(csv_path)
+            return len(df[df['timestamp'] >= week_start])
+
+        def csv_material_month():
+            df = read_master(csv_path)
+            mask = (df['timestamp'] >= month_start) & (df['material'] == 'PLA-CF')
+            return len(df[mask])
+
+        def csv_margin_per_material():
+            df = read_master(csv_path)
+            return df.groupby('material', observed=True)['margin_pct'].mean()
+
+        # --- SQLite pad: filters en aggregatie in SQL ---
+        def sql_week():
+            return len(store.query_calculations(start=week_start))
+
+        def sql_material_month():
+            return len(store.query_calculations(start=month_start, materials=['PLA-CF']))
+
+        def sql_margin_per_material():
+            return store.aggregate('material', {'avg_margin': ('avg', 'margin_pct')})
+
+        for label, csv_func, sql_func in [
+            ("laatste 7 dagen", csv_week, sql_week),
+            ("PLA-CF deze maand", csv_material_month, sql_material_month),
+            ("marge per materiaal", csv_margin_per_material, sql_margin_per_material),
+        ]:
+            csv_result, csv_time = timed(csv_func)
+            sql_result, sql_time = timed(sql_func)
+            if isinstance(csv_result, int) and csv_result != sql_result:
+                print(f"⚠️ Verschil bij {label}: CSV {csv_result} vs SQLite {sql_result}")
+            results.append((label, csv_time, sql_time))
+
+        # --- Losse appends (zoals de GUI bij elke berekening) ---
+        def csv_appends():
+            for i in range(args.appends):
+                with open(csv_path, 'a', newline='', encoding='utf-8') as f:
+                    csv.DictWriter(f, fieldnames=MASTER_COLUMNS).writerow(
+                        sample_row(now + timedelta(seconds=i)))
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        def sql_appends():
+            for i in range(args.appends):
+                store.insert_calculations([sample_row(now + timedelta(seconds=i))])
+
+        _, csv_time = timed(csv_appends)
+        _, sql_time = timed(sql_appends)
+        results.append((f"{args.appends} losse appends", csv_time, sql_time))
+
+        print()
+        print(f"{'Operatie':<26}{'CSV (s)':>10}{'SQLite (s)':>12}{'Factor':>9}")
+        print("-" * 57)
+        for label, csv_time, sql_time in results:
+            print(f"{label:<26}{csv_time:>10.3f}{sql_time:>12.3f}{csv_time / sql_time:>8.1f}x")
+
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
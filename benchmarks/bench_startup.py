@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Startup Budget - H2D Price Calculator
+================================================
+
+Opstarttijd van de entry points tegen een budget in git
+(benchmarks/startup_budget.json).
+
+Per entry:
+- module    `python -X importtime -c "import <module>"`: cumulatieve
+            import tijd plus een check dat verboden modules (pandas,
+            matplotlib, analytics) niet mee geladen worden
+- command   wandkloktijd van een volledige aanroep (beste van --runs),
+            bijv. één CLI prijsberekening, min de start van een kale
+            interpreter (`python -c pass`, ook beste van --runs); het
+            budget meet zo alleen wat het project zelf kost en niet de
+            snelheid van de machine
+
+Exit code 1 als een budget overschreden wordt of een verboden module
+geladen is; een entry die hier niet kan importeren (bijv. geen
+pyperclip/tkinter) wordt overgeslagen.
+
+Gebruik:
+-------
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --top 15     # zwaarste imports tonen
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Project root (zoals launch_calculator.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(script_dir, 'benchmarks', 'startup_budget.json')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def run_importtime(module: str) -> Tuple[Dict[str, Tuple[int, int]], str]:
+    """{module: (self µs, cumulatief µs)} en eventuele foutmelding."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-W', 'ignore', '-c', f'import {module}'],
+        cwd=script_dir, capture_output=True, text=True)
+    timings = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    error = ''
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ['onbekende fout'])[-1]
+    return timings, error
+
+
+def run_command(args: List[str], runs: int) -> Tuple[float, str]:
+    """Beste wandkloktijd in ms en eventuele foutmelding."""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-W', 'ignore', *args], cwd=script_dir,
+                              capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+        if proc.returncode != 0:
+            return best * 1000, (proc.stdout + proc.stderr).strip().splitlines()[-1]
+    return best * 1000, ''
+
+
+def interpreter_baseline(runs: int) -> float:
+    """Beste wandkloktijd in ms van `python -c pass` (interpreter start)."""
+    elapsed, _ = run_command(['-c', 'pass'], runs)
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Startup tijd tegen budget")
+    parser.add_argument('--runs', type=int, default=5, help="Herhalingen per meting (beste telt)")
+    parser.add_argument('--top', type=int, default=0, help="Toon de N zwaarste imports per module")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE, 'r', encoding='utf-8') as f:
+        budget = json.load(f)
+
+    failures = []
+    baseline = interpreter_baseline(args.runs)
+    print(f"Kale interpreter start: {baseline:.1f} ms (afgetrokken van command tijden)")
+    print()
+    print(f"{'Entry':<14}{'Tijd (ms)':>11}{'Budget':>9}  Resultaat")
+    print("-" * 60)
+    for name, entry in budget.items():
+        limit = entry['budget_ms']
+        if 'module' in entry:
+            measurements = [run_importtime(entry['module']) for _ in range(args.runs)]
+            timings, error = min(measurements, key=lambda m: m[0].get(entry['module'], (0, 1 << 62))[1])
+            if error:
+                print(f"{name:<14}{'-':>11}{limit:>9}  overgeslagen ({error})")
+                continue
+            elapsed = timings[entry['module']][1] / 1000
+            loaded = [m for m in entry.get('forbidden', [])
+                      if m in timings or any(t.startswith(m + '.') for t in timings)]
+        else:
+            elapsed, error = run_command(entry['command'], args.runs)
+            elapsed = max(elapsed - baseline, 0.0)
+            if error:
+                print(f"{name:<14}{elapsed:>11.1f}{limit:>9}  fout ({error})")
+                failures.append(name)
+                continue
+            timings, loaded = {}, []
+
+        status = 'OK'
+        if elapsed > limit:
+            status = 'BOVEN BUDGET'
+        if loaded:
+            status = f"laadt {', '.join(loaded)}"
+        if status != 'OK':
+            failures.append(name)
+        print(f"{name:<14}{elapsed:>11.1f}{limit:>9}  {status}")
+
+        if args.top and timings:
+            heaviest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)
+            for module, (own, _) in heaviest[:args.top]:
+                print(f"{'':<14}{own / 1000:>11.1f}{'':>9}  {module}")
+
+    print()
+    if failures:
+        print(f"Startup budget overschreden: {', '.join(failures)}")
+        return 1
+    print("Alle entry points binnen budget ✔")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite - H2D Price Calculator
+======================================
+
+Reproduceerbare performance suite voor de rekenkernen, de opslag en de
+analyses, met JSON historie en een compare stap die regressies meldt.
+
+Cases (per grootte 1k / 100k / 1M rijen):
+- engine.calculate_costs          N berekeningen
+- engine.calculate_sell_price     N berekeningen
+- storage.log_and_export          LOG_CALLS berekeningen op een master van N rijen
+- storage.import_calculations     master van N rijen inlezen
+- products.load_from_csv          ProductManager._load_from_csv (koud, zonder snapshot)
+- products.search                 SEARCH_QUERIES over N producten
+- analysis.<Klasse>               analyze() van elke BaseAnalysis subklasse in src/analytics
+
+De synthetische data komt uit src/analytics (SyntheticCalculations, vaste
+seed) en wordt per grootte één keer in een tijdelijke exports map gezet:
+calculation_log.csv (met config_versions.csv) en master_calculations.csv. DataManager,
+ProductManager en de analyses draaien op die map, niet op de echte exports.
+
+Per case: beste en mediaan van --repeat herhalingen (bij trage cases minder,
+zie SLOW_CASE_SECONDS). Een run wordt met commit, machine en resultaten
+toegevoegd aan benchmarks/results/history.json.
+
+Gebruik:
+-------
+    python benchmarks/bench_suite.py run                       # 1k, 100k en 1M
+    python benchmarks/bench_suite.py run --sizes 1k --case 'engine.*'
+    python benchmarks/bench_suite.py compare                   # laatste vs vorige run
+    python benchmarks/bench_suite.py compare --baseline 66761d5 --threshold 15
+    python benchmarks/bench_suite.py history
+
+Exit code van compare: 1 als een case meer dan --threshold procent trager is.
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Project root op het pad (zoals launch_calculator.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+HISTORY_FILE = os.path.join(script_dir, 'benchmarks', 'results', 'history.json')
+
+DEFAULT_SIZES = ['1k', '100k', '1M']
+SIZE_SUFFIXES = {'k': 1_000, 'M': 1_000_000}
+
+LOG_CALLS = 200                # log_and_export aanroepen per herhaling
+SLOW_CASE_SECONDS = 2.0        # langzamer: maximaal MIN_REPEAT herhalingen
+MIN_REPEAT = 3
+DATA_SEED = 42
+SEARCH_QUERIES = ['product 1', 'PRODUCT', 'product 499', 'onbekend']
+
+
+# === CASES ===
+
+class Case:
+    """Eén benchmark: setup(dataset) → (timed functie, aantal operaties, reset).
+
+    De reset (optioneel) draait vóór elke herhaling buiten de meting.
+    """
+
+    def __init__(self, name: str, setup: Callable):
+        self.name = name
+        self.setup = setup
+
+
+CASES: List[Case] = []
+
+
+def case(name: str) -> Callable:
+    """Decorator: registreer een setup functie als benchmark case."""
+    def register(setup: Callable) -> Callable:
+        CASES.append(Case(name, setup))
+        return setup
+    return register
+
+
+class Dataset:
+    """Synthetische exports map met N berekeningen (SyntheticCalculations)."""
+
+    def __init__(self, size: int, root: str):
+        from src.analytics.synthetic_data import SyntheticCalculations
+
+        self.size = size
+        self.exports_dir = os.path.join(root, f'exports_{size}')
+        generator = SyntheticCalculations(seed=DATA_SEED)
+        self.frame = pd.concat(generator.iter_chunks(size), ignore_index=True)
+
+        # Compacte log (met config_versions.csv) en master, zoals de DataManager ze schrijft
+        generator.write_csv(os.path.join(self.exports_dir, 'berekeningen', 'calculation_log.csv'),
+                            size, layout='log')
+        generator.write_csv(os.path.join(self.exports_dir, 'producten', 'master_calculations.csv'),
+                            size, layout='master')
+        self.config = generator.config
+
+    def data_manager(self):
+        from src.utils.data_manager import DataManager
+        return DataManager(self.exports_dir, backend='csv')
+
+    def calc_data(self, index: int) -> dict:
+        """calc_data zoals de GUI die aan log_and_export_calculation geeft."""
+        row = self.frame.iloc[index % self.size]
+        return {
+            'weight': float(row['weight']), 'material': row['material'],
+            'print_hours': float(row['print_hours']), 'material_cost': float(row['material_cost']),
+            'variable_cost': float(row['variable_cost']), 'total_cost': float(row['total_cost']),
+            'sell_price': float(row['sell_price']), 'margin_pct': float(row['margin_pct']),
+            'auto_hours_used': bool(row['auto_hours_used']),
+            'options': {'multicolor': bool(row['multicolor']), 'abrasive': bool(row['abrasive']),
+                        'rush': bool(row['rush'])},
+            'config': dict(self.config),
+        }
+
+
+def _engine_jobs(dataset: Dataset) -> List[Tuple]:
+    frame = dataset.frame
+    hours = frame['print_hours'].where(~frame['auto_hours_used'], None)
+    return list(zip(frame['weight'].tolist(), frame['material'].tolist(), hours.tolist(),
+                    frame['multicolor'].tolist(), frame['rush'].tolist()))
+
+
+@case('engine.calculate_costs')
+def _setup_costs(dataset: Dataset):
+    from src.core import calculate_costs
+    jobs = _engine_jobs(dataset)
+
+    def run():
+        for weight, material, hours, _, _ in jobs:
+            calculate_costs(weight, material, print_hours=hours)
+    return run, len(jobs), None
+
+
+@case('engine.calculate_sell_price')
+def _setup_sell_price(dataset: Dataset):
+    from src.core import calculate_sell_price
+    jobs = _engine_jobs(dataset)
+
+    def run():
+        for weight, material, hours, multicolor, rush in jobs:
+            calculate_sell_price(weight_g=weight, material=material, print_hours=hours,
+                                 multicolor=multicolor, spoed=rush)
+    return run, len(jobs), None
+
+
+@case('storage.log_and_export')
+def _setup_log_and_export(dataset: Dataset):
+    from src.utils.data_manager import DataManager
+    # Eigen kopie van de master: de appends mogen de andere cases niet raken
+    exports_dir = dataset.exports_dir + '_log'
+    os.makedirs(os.path.join(exports_dir, 'producten'), exist_ok=True)
+    shutil.copy(os.path.join(dataset.exports_dir, 'producten', 'master_calculations.csv'),
+                os.path.join(exports_dir, 'producten', 'master_calculations.csv'))
+    manager = DataManager(exports_dir, backend='csv')
+    calls = [dataset.calc_data(i) for i in range(LOG_CALLS)]
+
+    def run():
+        for calc_data in calls:
+            manager.log_and_export_calculation(calc_data)
+    return run, len(calls), None
+
+
+@case('storage.import_calculations')
+def _setup_import(dataset: Dataset):
+    manager = dataset.data_manager()
+    return manager.import_calculations, dataset.size, None
+
+
+@case('products.load_from_csv')
+def _setup_product_load(dataset: Dataset):
+    from src.products.product_manager import ProductManager
+    from src.utils.warm_start import SNAPSHOT_DIRNAME
+    manager = ProductManager(backend='csv', exports_dir=dataset.exports_dir)
+    snapshot_dir = os.path.join(os.path.dirname(manager.csv_path), SNAPSHOT_DIRNAME)
+
+    def reset():
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        manager._cache.clear()
+    return manager._load_from_csv, dataset.size, reset
+
+
+@case('products.search')
+def _setup_product_search(dataset: Dataset):
+    from src.products.product_manager import ProductManager
+    manager = ProductManager(backend='csv', exports_dir=dataset.exports_dir)
+
+    def run():
+        for query in SEARCH_QUERIES:
+            manager.search(query)
+    return run, len(SEARCH_QUERIES), None
+
+
+def _register_analysis_cases() -> None:
+    # Zelfde discovery als de headless profiler (src/analytics/profiling.py)
+    from src.analytics.profiling import analysis_classes
+    for cls in analysis_classes():
+        def setup(dataset: Dataset, cls=cls):
+            manager = dataset.data_manager()
+            state = {}
+
+            def reset():
+                # Nieuwe instantie: geen data cache van de vorige herhaling
+                state['analysis'] = cls(manager)
+            return lambda: state['analysis'].analyze(), dataset.size, reset
+        CASES.append(Case(f'analysis.{cls.__name__}', setup))
+
+
+# === RUNNER ===
+
+def parse_size(label: str) -> int:
+    """'1k' → 1000, '1M' → 1000000, '250' → 250."""
+    suffix = label[-1:]
+    if suffix in SIZE_SUFFIXES:
+        return int(float(label[:-1]) * SIZE_SUFFIXES[suffix])
+    return int(label)
+
+
+def measure(run: Callable, reset: Optional[Callable], repeat: int) -> List[float]:
+    """Wandkloktijden van maximaal repeat herhalingen (debug output weg)."""
+    timings = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        while len(timings) < repeat:
+            if reset is not None:
+                reset()
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+            if timings[0] > SLOW_CASE_SECONDS:
+                repeat = min(repeat, MIN_REPEAT)
+    return timings
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=script_dir,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=script_dir, capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'onbekend'
+
+
+def machine_info() -> Dict[str, object]:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def load_history(path: str) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(path: str, history: List[dict]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def cmd_run(args) -> int:
+    _register_analysis_cases()
+    cases = [c for c in CASES if any(fnmatch.fnmatch(c.name, p) for p in args.case)]
+    if not cases:
+        print(f"Geen cases voor {args.case}")
+        return 1
+
+    results = {}
+    print(f"{'Case':<34}{'Grootte':>8}{'Beste (s)':>11}{'Mediaan (s)':>13}{'µs/op':>10}")
+    print("-" * 76)
+    with tempfile.TemporaryDirectory(prefix='h2d_bench_') as root:
+        for label in args.sizes:
+            size = parse_size(label)
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                dataset = Dataset(size, root)
+            for bench in cases:
+                key = f"{bench.name}[{label}]"
+                try:
+                    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                        run, ops, reset = bench.setup(dataset)
+                    timings = measure(run, reset, args.repeat)
+                except Exception as e:
+                    print(f"{bench.name:<34}{label:>8}  fout: {e}")
+                    results[key] = {'error': str(e)}
+                    continue
+                best, median = min(timings), statistics.median(timings)
+                results[key] = {'best': best, 'median': median, 'runs': len(timings), 'ops': ops}
+                print(f"{bench.name:<34}{label:>8}{best:>11.4f}{median:>13.4f}"
+                      f"{median / ops * 1e6:>10.2f}")
+            del dataset
+
+    entry = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'machine': machine_info(),
+        'results': results,
+    }
+    if args.no_save:
+        return 0
+    history = load_history(args.history)
+    history.append(entry)
+    save_history(args.history, history)
+    print(f"\nRun #{len(history) - 1} ({entry['commit']}) opgeslagen in {args.history}")
+    return 0
+
+
+def find_run(history: List[dict], ref: Optional[str], default: int) -> Tuple[int, dict]:
+    """Run op index (ook negatief) of laatste run van een commit prefix."""
+    if ref is None:
+        index = default
+    else:
+        try:
+            index = int(ref)
+        except ValueError:
+            matches = [i for i, run in enumerate(history) if run['commit'].startswith(ref)]
+            if not matches:
+                raise SystemExit(f"Geen run voor commit '{ref}' in de historie")
+            index = matches[-1]
+    if not -len(history) <= index < len(history):
+        raise SystemExit(f"Run {index} bestaat niet (historie heeft {len(history)} runs)")
+    return index % len(history), history[index]
+
+
+def cmd_compare(args) -> int:
+    history = load_history(args.history)
+    if len(history) < 2 and args.baseline is None:
+        print("Minstens twee runs nodig voor een vergelijking")
+        return 0
+    base_index, baseline = find_run(history, args.baseline, -2)
+    new_index, current = find_run(history, args.current, -1)
+
+    print(f"Baseline #{base_index} ({baseline['commit']}, {baseline['timestamp']})")
+    print(f"Huidig   #{new_index} ({current['commit']}, {current['timestamp']})")
+    if baseline['machine'] != current['machine']:
+        print("⚠️ Andere machine/Python versie: verschillen zijn niet betrouwbaar")
+    print(f"\n{'Case':<44}{'Baseline':>10}{'Huidig':>10}{'Verschil':>10}  Resultaat")
+    print("-" * 86)
+
+    regressions = []
+    for key, result in current['results'].items():
+        old = baseline['results'].get(key)
+        if 'error' in result or old is None or 'error' in old:
+            status = 'fout' if 'error' in result else 'nieuw'
+            print(f"{key:<44}{'-':>10}{'-':>10}{'-':>10}  {status}")
+            continue
+        before, after = old[args.metric], result[args.metric]
+        change = (after - before) / before * 100 if before else 0.0
+        status = 'ok'
+        if change > args.threshold and (after - before) * 1000 >= args.min_delta_ms:
+            status = 'REGRESSIE'
+            regressions.append(key)
+        elif change < -args.threshold:
+            status = 'sneller'
+        print(f"{key:<44}{before:>10.4f}{after:>10.4f}{change:>+9.1f}%  {status}")
+
+    print()
+    if regressions:
+        print(f"{len(regressions)} regressie(s) boven {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    print(f"Geen regressies boven {args.threshold:g}% ✔")
+    return 0
+
+
+def cmd_history(args) -> int:
+    history = load_history(args.history)
+    print(f"{'#':>3}  {'Tijdstip':<20}{'Commit':<16}{'Cases':>6}  Python")
+    print("-" * 56)
+    for index, run in enumerate(history):
+        print(f"{index:>3}  {run['timestamp']:<20}{run['commit']:<16}"
+              f"{len(run['results']):>6}  {run['machine']['python']}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="H2D benchmark suite met JSON historie")
+    parser.add_argument('--history', default=HISTORY_FILE, help="Historie bestand (JSON)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Draai de suite en sla de run op")
+    run.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help="Groottes, bijv. 1k 100k 1M")
+    run.add_argument('--case', nargs='+', default=['*'], help="Case patronen (fnmatch)")
+    run.add_argument('--repeat', type=int, default=5, help="Herhalingen per case")
+    run.add_argument('--no-save', action='store_true', help="Niet aan de historie toevoegen")
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser('compare', help="Vergelijk twee runs op regressies")
+    compare.add_argument('--baseline', help="Run index of commit prefix (default: voorlaatste run)")
+    compare.add_argument('--current', help="Run index of commit prefix (default: laatste run)")
+    compare.add_argument('--threshold', type=float, default=10.0, help="Regressie drempel in procent")
+    compare.add_argument('--min-delta-ms', type=float, default=0.5,
+                         help="Verschillen kleiner dan dit zijn ruis")
+    compare.add_argument('--metric', choices=['best', 'median'], default='median')
+    compare.set_defaults(func=cmd_compare)
+
+    history = commands.add_parser('history', help="Toon de opgeslagen runs")
+    history.set_defaults(func=cmd_history)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
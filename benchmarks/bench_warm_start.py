@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Warm Start - H2D Price Calculator
+============================================
+
+Koude start zonder snapshot vs warm start met snapshot (src/utils/warm_start.py)
+op een synthetische master_calculations.csv van groeiende lengte.
+
+Gemeten per historiek lengte:
+- frame   read_csv_typed vs read_csv_warm (analyse kolommen)
+- tail    warm start nadat er 500 rijen bijgeschreven zijn (staart replay)
+
+Gebruik:
+-------
+    python benchmarks/bench_warm_start.py
+    python benchmarks/bench_warm_start.py --rows 100000 1000000
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Project root op het pad (zoals launch_calculator.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, script_dir)
+
+from benchmarks.bench_schema_loader import generate_master_csv
+from src.utils.schema import read_csv_typed
+from src.utils.warm_start import read_csv_warm
+
+COLUMNS = ['timestamp', 'material', 'weight', 'abrasive', 'sell_price']
+APPEND_ROWS = 500
+
+
+def timed(func, *args, **kwargs):
+    """(resultaat, seconden) van één aanroep."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def append_rows(path: str, rows: int) -> None:
+    """Herhaal de laatste rijen van het bestand (append-only groei)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.writelines(lines[-rows:])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark warm start snapshots")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 500_000],
+                        help="Historiek lengtes")
+    args = parser.parse_args()
+
+    print(f"{'Rijen':>10}{'Koud (s)':>11}{'Warm (s)':>11}{'+staart (s)':>13}{'Factor':>9}")
+    print("-" * 54)
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'master_calculations.csv')
+            generate_master_csv(path, rows)
+
+            reference, cold = timed(read_csv_typed, path, usecols=COLUMNS)
+            read_csv_warm(path, usecols=COLUMNS)  # schrijft de snapshot
+            warm_df, warm = timed(read_csv_warm, path, usecols=COLUMNS)
+            assert warm_df.equals(reference), "snapshot wijkt af"
+
+            append_rows(path, APPEND_ROWS)
+            tail_df, tail = timed(read_csv_warm, path, usecols=COLUMNS)
+            assert tail_df.equals(read_csv_typed(path, usecols=COLUMNS)), "staart replay wijkt af"
+
+            print(f"{rows:>10,}{cold:>11.3f}{warm:>11.3f}{tail:>13.3f}{cold / warm:>8.1f}x")
+    print("\nResultaten identiek aan read_csv_typed ✔")
+
+
+if __name__ == "__main__":
+    main()
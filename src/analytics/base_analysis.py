@@ -14,18 +14,50 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import pandas as pd
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import os
 import time
 
+from ..utils.config_snapshots import load_calculation_log
+from ..utils.data_manager import CalculationQuery, execute_query
+from ..utils.instrumentation import debug, traced
+from ..utils.partitions import PartitionedStore
+from ..utils.schema import empty_master_frame
+
+# Methoden van subklassen die als span gemeten worden (categorie per methode)
+INSTRUMENTED_METHODS = {
+    'load_data': 'loading',
+    'analyze': 'analyze',
+    'create_analysis_widgets': 'render',
+    'update_analysis': 'render',
+}
+
 
 class BaseAnalysis(ABC):
     """Abstract basis klasse voor alle analyses.
     
     Elke analyse module moet deze klasse extenden en de
     abstracte methoden implementeren.
+    
+    Subklassen declareren in REQUIRED_COLUMNS welke master kolommen ze
+    gebruiken; load_data() en load_period() lezen dan alleen die kolommen
+    (None = alle kolommen).
     """
     
+    REQUIRED_COLUMNS: Optional[List[str]] = None
+    
+    def __init_subclass__(cls, **kwargs):
+        """Analyse en render methoden van elke subklasse instrumenteren.
+        
+        traced() geeft de methode ongewijzigd terug als H2D_INSTRUMENT
+        uit staat, dus zonder instrumentatie kost dit niets.
+        """
+        super().__init_subclass__(**kwargs)
+        for method, category in INSTRUMENTED_METHODS.items():
+            func = cls.__dict__.get(method)
+            if func is not None and not getattr(func, '__isabstractmethod__', False):
+                setattr(cls, method, traced(f"{category}.{cls.__name__}.{method}")(func))
+    
     def __init__(self, data_manager, parent_frame=None, colors=None):
         """Initialiseer basis analyse.
         
@@ -43,8 +75,10 @@ class BaseAnalysis(ABC):
         self.colors = colors or self._default_colors()
         self._data_cache = None
         self._complete_data_cache = None
+        self._partition_store = None
         self.cache_duration = 300  # 5 minuten cache
         self.widgets = {}
+        self.profiler = None  # developer mode, zie set_profiler()
         
     def _default_colors(self) -> Dict[str, str]:
         """Default kleurenschema als geen colors zijn meegegeven."""
@@ -82,11 +116,56 @@ class BaseAnalysis(ABC):
             return float('inf')
         return time.time() - self._complete_data_cache['timestamp']
         
+    def exports_dir(self) -> str:
+        """Exports map waar de analyse zijn CSV bestanden leest.
+        
+        De map van de DataManager (de GUI geeft <project>/exports mee);
+        zonder DataManager de exports map in de project root. Zo kan een
+        benchmark of migratie een analyse op een losse map draaien.
+        
+        Returns:
+        -------
+        str
+            Absoluut pad naar de exports map
+        """
+        base_dir = getattr(self.data_manager, 'base_dir', None)
+        if base_dir is not None:
+            return os.path.abspath(base_dir)
+        # Van src/analytics/base_analysis.py naar root is 2 niveau's omhoog
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return os.path.join(project_root, 'exports')
+        
+    def set_profiler(self, profiler) -> None:
+        """Developer mode: analyze() en render methoden via een AnalysisProfiler.
+        
+        Parameters:
+        ----------
+        profiler : AnalysisProfiler | None
+            Profiler (cProfile + tracemalloc, zie profiling.py); None zet
+            profiling voor deze instantie weer uit
+        """
+        if self.profiler is not None:
+            self.profiler.detach(self)
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.attach(self)
+        
+    def query(self) -> CalculationQuery:
+        """Query met de kolommen die deze analyse nodig heeft.
+        
+        Returns:
+        -------
+        CalculationQuery
+            select(REQUIRED_COLUMNS), uit te breiden met where(...)
+        """
+        return CalculationQuery(self.REQUIRED_COLUMNS)
+        
+    @traced('loading.load_data')
     def load_data(self) -> Optional[pd.DataFrame]:
         """Laad data uit master_calculations.csv met caching.
         
-        Dit is de primaire methode voor de meeste analyses. Laadt een subset van kolommen
-        die relevant zijn voor visualisaties.
+        Dit is de primaire methode voor de meeste analyses. Laadt alleen de
+        kolommen uit REQUIRED_COLUMNS (projectie pushdown).
         
         Returns:
         -------
@@ -97,31 +176,30 @@ class BaseAnalysis(ABC):
         if self._is_cache_valid():
             print(f"Using cached data (age: {self._get_cache_age():.1f} seconds)")
             return self._data_cache['data'].copy()
-        
-        # Bepaal pad naar master_calculations.csv
-        # Start vanaf de huidige file locatie
-        current_file = os.path.abspath(__file__)
-        
-        # Ga naar de root van het project (waar exports folder is)
-        # Van src/analytics/base_analysis.py naar root is 2 niveau's omhoog
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
-        
-        # Pad naar master_calculations.csv
-        log_path = os.path.join(project_root, 'exports', 'producten', 'master_calculations.csv')
-        
-        print(f"DEBUG: Project root: {project_root}")
-        print(f"DEBUG: Looking for master_calculations.csv at: {log_path}")
-        print(f"DEBUG: File exists: {os.path.exists(log_path)}")
-        
-        if os.path.exists(log_path):
+            
+        # SQLite backend: lees uit de database i.p.v. de master CSV
+        db = getattr(self.data_manager, 'db', None)
+        if db is not None:
+            df = execute_query(self.query(), None, db=db)
+            print(f"Loaded {len(df)} rows from {db.db_path.name}")
+            self._data_cache = {'data': df, 'timestamp': time.time()}
+            return df.copy()
+        
+        # Pad naar master_calculations.csv (exports map van de DataManager)
+        exports_dir = self.exports_dir()
+        log_path = os.path.join(exports_dir, 'producten', 'master_calculations.csv')
+        
+        exists = os.path.exists(log_path)
+        debug("Exports dir: %s", exports_dir)
+        debug("Looking for master_calculations.csv at: %s", log_path)
+        debug("File exists: %s", exists)
+        
+        if exists:
             try:
-                df = pd.read_csv(log_path)
-                print(f"Loaded {len(df)} rows from master_calculations.csv")
-                
-                # Converteer timestamp naar datetime als die bestaat
-                if 'timestamp' in df.columns:
-                    # Gebruik format='mixed' om verschillende timestamp formaten te ondersteunen
-                    df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed')
+                # Schema register: datetime, categories, bools en float32 in één keer
+                # (alleen de kolommen die deze analyse gebruikt)
+                df = execute_query(self.query(), log_path)
+                print(f"Loaded {len(df)} rows x {len(df.columns)} columns from master_calculations.csv")
                 
                 # Update cache
                 self._data_cache = {
@@ -138,22 +216,18 @@ class BaseAnalysis(ABC):
             # Probeer het bestand te creëren als het niet bestaat
             os.makedirs(os.path.dirname(log_path), exist_ok=True)
             # Maak een lege CSV met de juiste headers
-            empty_df = pd.DataFrame(columns=[
-                'timestamp', 'weight', 'material', 'material_cost', 
-                'variable_cost', 'total_cost', 'sell_price', 'margin_pct',
-                'profit_amount', 'multicolor', 'abrasive', 'rush',
-                'day_of_week', 'hour_of_day', 'month', 'year', 
-                'product_name', 'product_id', 'is_product'
-            ])
+            empty_df = empty_master_frame()
             empty_df.to_csv(log_path, index=False)
             print(f"Created empty master_calculations.csv at: {log_path}")
             return pd.DataFrame()  # Return lege DataFrame
         
+    @traced('loading.load_complete_data')
     def load_complete_data(self) -> Optional[pd.DataFrame]:
         """Laad complete data uit calculation_log.csv.
         
-        Deze methode laadt de volledige calculation_log.csv die alle 31 kolommen bevat,
-        in tegenstelling tot master_calculations.csv die een subset is.
+        Deze methode laadt de volledige calculation_log.csv die alle 32 kolommen bevat,
+        in tegenstelling tot master_calculations.csv die een subset is. De config
+        kolommen worden via config_version uit config_versions.csv teruggezet.
         
         Returns:
         -------
@@ -164,28 +238,27 @@ class BaseAnalysis(ABC):
         if self._is_complete_cache_valid():
             print(f"Using cached complete data (age: {self._get_complete_cache_age():.1f} seconds)")
             return self._complete_data_cache['data'].copy()
-        
-        # Bepaal pad naar calculation_log.csv
-        # Start vanaf de huidige file locatie
-        current_file = os.path.abspath(__file__)
-        
-        # Ga naar de root van het project (waar exports folder is)
-        # Van src/analytics/base_analysis.py naar root is 2 niveau's omhoog
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
-        
-        # Pad naar calculation_log.csv
-        log_path = os.path.join(project_root, 'exports', 'berekeningen', 'calculation_log.csv')
-        
-        print(f"DEBUG: Project root: {project_root}")
-        print(f"DEBUG: Looking for calculation_log.csv at: {log_path}")
-        print(f"DEBUG: File exists: {os.path.exists(log_path)}")
-        
-        if os.path.exists(log_path):
+            
+        # SQLite backend: join view van de log tabel
+        if getattr(self.data_manager, 'db', None) is not None:
+            df = self.data_manager.load_calculation_log()
+            self._complete_data_cache = {'data': df, 'timestamp': time.time()}
+            return df.copy()
+        
+        # Pad naar calculation_log.csv (exports map van de DataManager)
+        exports_dir = self.exports_dir()
+        log_path = os.path.join(exports_dir, 'berekeningen', 'calculation_log.csv')
+        
+        exists = os.path.exists(log_path)
+        debug("Exports dir: %s", exports_dir)
+        debug("Looking for calculation_log.csv at: %s", log_path)
+        debug("File exists: %s", exists)
+        
+        if exists:
             try:
-                df = pd.read_csv(log_path)
-                
-                # Converteer timestamp naar datetime
-                df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed')
+                # Join view: config_version → config kolommen (32-kolommen frame)
+                # (timestamp is al datetime via het schema register)
+                df = load_calculation_log(log_path)
                 
                 print(f"Loaded {len(df)} rows from calculation_log.csv with {len(df.columns)} columns")
                 
@@ -203,6 +276,58 @@ class BaseAnalysis(ABC):
             print(f"calculation_log.csv not found at: {log_path}")
             return pd.DataFrame()  # Return lege DataFrame in plaats van None
         
+    @traced('loading.load_period')
+    def load_period(self, start=None, end=None, columns=None, **filters) -> pd.DataFrame:
+        """Laad alleen berekeningen binnen een periode (partition pruning).
+        
+        Leest via de PartitionedStore alleen de dag/maand partities die
+        [start, end] overlappen, i.p.v. de volledige historie te laden en
+        daarna te filteren. Valt terug op load_data() + filter als de
+        partities niet bruikbaar zijn.
+        
+        Parameters:
+        ----------
+        start : datetime | date, optional
+            Begin van de periode (inclusief)
+        end : datetime | date, optional
+            Eind van de periode (inclusief, een datum omvat de hele dag)
+        columns : list, optional
+            Alleen deze kolommen inlezen (default: REQUIRED_COLUMNS)
+        **filters
+            Extra filters: materials, abrasive, is_product
+            
+        Returns:
+        -------
+        pd.DataFrame
+            Rijen binnen de periode
+        """
+        query = self.query().where(start=start, end=end, **filters)
+        if columns is not None:
+            query = query.select(*columns)
+            
+        # SQLite backend: periode filter in SQL (index op timestamp)
+        db = getattr(self.data_manager, 'db', None)
+        if db is not None:
+            return execute_query(query, None, db=db)
+            
+        master_path = os.path.join(self.exports_dir(), 'producten', 'master_calculations.csv')
+        
+        if not os.path.exists(master_path):
+            return pd.DataFrame()
+            
+        try:
+            if self._partition_store is None:
+                self._partition_store = PartitionedStore(master_path)
+            df = execute_query(query, master_path, partitions=self._partition_store)
+            debug("Loaded %d rows for period %s - %s (partitions)", len(df), start, end)
+            return df
+        except Exception as e:
+            print(f"Error loading partitions, fallback naar volledige data: {e}")
+            df = self.load_data()
+            if df.empty:
+                return df
+            return query.apply(df)
+        
     def create_widgets(self, parent: tk.Frame) -> None:
         """Creëer GUI widgets voor deze analyse.
         
@@ -405,6 +530,34 @@ class BaseAnalysis(ABC):
         fullscreen_window.focus_set()
         fullscreen_window.grab_set()
         
+    def embed_zoomable_figure(self, fig, parent: tk.Frame):
+        """Embed een figuur met matplotlib navigatie toolbar.
+        
+        Bedoeld voor fullscreen dialogs: met de zoom/pan knoppen
+        her-queryen LODLine/LODScatter (utils.downsampling) het
+        zichtbare bereik op hoger detail.
+        
+        Parameters:
+        ----------
+        fig : matplotlib.figure.Figure
+            Te tonen figuur
+        parent : tk.Frame
+            Content frame van de dialog
+            
+        Returns:
+        -------
+        FigureCanvasTkAgg
+            Het canvas van de figuur
+        """
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        
+        canvas = FigureCanvasTkAgg(fig, parent)
+        toolbar = NavigationToolbar2Tk(canvas, parent)
+        toolbar.update()
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True)
+        return canvas
+        
     def _export_fullscreen_chart(self, title: str):
         """Export de huidige grafiek (placeholder voor toekomstige implementatie)."""
         messagebox.showinfo(
@@ -458,4 +611,41 @@ class BaseAnalysis(ABC):
             )
             fullscreen_btn.pack(side='right')
             
-        return header_frame 
\ No newline at end of file
+        return header_frame 
+        
+    def create_info_box(self, parent: tk.Frame, title: str, items) -> tk.Frame:
+        """Creëer een info box met kaartjes (label, waarde), drie per rij.
+        
+        Parameters:
+        ----------
+        parent : tk.Frame
+            Tab frame onder de grafiek
+        title : str
+            Titel van de info box
+        items : Sequence[Tuple[str, str]]
+            (label, waarde) per kaartje
+            
+        Returns:
+        -------
+        tk.Frame
+            Info frame (destroy() om te vervangen)
+        """
+        info_frame = tk.Frame(parent, bg='#F8F9FA', relief=tk.FLAT, bd=0)
+        info_frame.pack(fill='x', padx=15, pady=(0, 15))
+        
+        info_content = tk.Frame(info_frame, bg='#F8F9FA')
+        info_content.pack(expand=True, pady=15)
+        
+        tk.Label(info_content, text=title, font=("Arial", 12, "bold"),
+                bg='#F8F9FA', fg='#2C3E50').pack(pady=(0, 10))
+        
+        grid_frame = tk.Frame(info_content, bg='#F8F9FA')
+        grid_frame.pack()
+        for i, (label, value) in enumerate(items):
+            card = tk.Frame(grid_frame, bg='white', relief=tk.RIDGE, bd=1)
+            card.grid(row=i // 3, column=i % 3, padx=5, pady=5, sticky='ew')
+            tk.Label(card, text=label, font=("Arial", 10, "bold"),
+                    bg='white', fg='#2C3E50', pady=5, padx=10).pack()
+            tk.Label(card, text=value, font=("Arial", 9),
+                    bg='white', fg='#7F8C8D', padx=10).pack()
+        return info_frame
@@ -23,11 +23,19 @@ from datetime import datetime, timedelta
 import os
 
 from ..base_analysis import BaseAnalysis
+from ...utils.downsampling import LODLine, get_point_budget
+from ...utils.instrumentation import debug, debug_enabled
+from ...utils.config_snapshots import load_calculation_log
+from ...utils.schema import read_master
 
 
 class DagelijkseActiviteit(BaseAnalysis):
     """Analyse van dagelijkse calculator activiteit."""
     
+    # Alleen deze kolommen inlezen (log én master heatmap); de rest
+    # wordt afgeleid uit de timestamp
+    REQUIRED_COLUMNS = ['timestamp', 'hour_of_day']
+    
     def __init__(self, data_manager=None, parent_frame=None, colors=None):
         """Initialiseer Wekelijkse Activiteit analyse."""
         super().__init__(data_manager, parent_frame, colors)
@@ -42,26 +50,19 @@ class DagelijkseActiviteit(BaseAnalysis):
     def load_data(self):
         """Laad calculation_log.csv voor analyses."""
         try:
-            # Start vanaf de huidige file locatie
-            current_file = os.path.abspath(__file__)
-            
-            # Ga naar de root van het project (waar exports folder is)
-            # Van src/analytics/basis/dagelijkse_activiteit.py naar root is 3 niveau's omhoog
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))
-            
-            # Pad naar calculation_log.csv (in berekeningen folder)
-            calc_log_path = os.path.join(project_root, 'exports', 'berekeningen', 'calculation_log.csv')
+            # Pad naar calculation_log.csv (exports map van de DataManager)
+            exports_dir = self.exports_dir()
+            calc_log_path = os.path.join(exports_dir, 'berekeningen', 'calculation_log.csv')
             
-            print(f"DEBUG: Project root: {project_root}")
-            print(f"DEBUG: Looking for calculation_log.csv at: {calc_log_path}")
-            print(f"DEBUG: File exists: {os.path.exists(calc_log_path)}")
+            exists = os.path.exists(calc_log_path)
+            debug("Exports dir: %s", exports_dir)
+            debug("Looking for calculation_log.csv at: %s", calc_log_path)
+            debug("File exists: %s", exists)
             
-            if os.path.exists(calc_log_path):
-                df = pd.read_csv(calc_log_path)
-                print(f"DEBUG: Loaded {len(df)} rows from calculation_log.csv")
-                
-                # Converteer timestamp naar datetime
-                df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed')
+            if exists:
+                # Getypeerd via het schema register (timestamp is al datetime)
+                df = load_calculation_log(calc_log_path, columns=self.REQUIRED_COLUMNS)
+                debug("Loaded %d rows from calculation_log.csv", len(df))
                 
                 # Voeg dag van de week toe (altijd nodig voor de visualisaties)
                 df['day_of_week'] = df['timestamp'].dt.day_name()
@@ -69,34 +70,34 @@ class DagelijkseActiviteit(BaseAnalysis):
                 # Gebruik de bestaande hour_of_day uit het CSV als die bestaat
                 # Anders bereken het uit de timestamp
                 if 'hour_of_day' not in df.columns:
-                    print("DEBUG: hour_of_day kolom niet gevonden, berekenen uit timestamp")
+                    debug("hour_of_day kolom niet gevonden, berekenen uit timestamp")
                     df['hour_of_day'] = df['timestamp'].dt.hour
                 else:
-                    print(f"DEBUG: Gebruik bestaande hour_of_day kolom uit CSV")
+                    debug("Gebruik bestaande hour_of_day kolom uit CSV")
                     # Zorg ervoor dat het integers zijn
                     df['hour_of_day'] = df['hour_of_day'].astype(int)
                 
                 # Voeg date kolom toe als die niet bestaat
                 if 'date' not in df.columns:
                     df['date'] = df['timestamp'].dt.date
-                    print(f"DEBUG: Added date column from timestamp")
+                    debug("Added date column from timestamp")
                 
                 # Voeg week informatie toe voor wekelijkse analyse
                 df['year'] = df['timestamp'].dt.year
                 df['week'] = df['timestamp'].dt.isocalendar().week
                 df['year_week'] = df['year'].astype(str) + '-W' + df['week'].astype(str).str.zfill(2)
                 
-                # Debug: print hour verdeling
-                print(f"DEBUG: Hour distribution:")
-                print(df['hour_of_day'].value_counts().sort_index().head(10))
+                # Debug: print hour verdeling (value_counts alleen als debug aan staat)
+                if debug_enabled():
+                    debug("Hour distribution:\n%s", df['hour_of_day'].value_counts().sort_index().head(10))
                 
                 return df
             else:
-                print("DEBUG: calculation_log.csv not found!")
+                debug("calculation_log.csv not found!")
                 return pd.DataFrame()
                 
         except Exception as e:
-            print(f"DEBUG: Error loading data: {e}")
+            print(f"Error loading data: {e}")
             import traceback
             traceback.print_exc()
             return pd.DataFrame()
@@ -106,20 +107,20 @@ class DagelijkseActiviteit(BaseAnalysis):
         # Haal data op
         df = self.load_data()
         
-        print(f"DEBUG create_analysis_widgets: DataFrame has {len(df)} rows")
-        print(f"DEBUG columns: {df.columns.tolist() if not df.empty else 'NO COLUMNS'}")
+        debug("create_analysis_widgets: DataFrame has %d rows", len(df))
+        if debug_enabled():
+            debug("columns: %s", df.columns.tolist() if not df.empty else 'NO COLUMNS')
         
         # TIJDELIJK: Laad hardcoded data als df empty is
         if df.empty:
             print("WARNING: DataFrame is empty, loading sample data")
             # Laad calculation_log direct
             import os
-            calc_log_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'exports', 'berekeningen', 'calculation_log.csv')
+            calc_log_path = os.path.join(self.exports_dir(), 'berekeningen', 'calculation_log.csv')
             if os.path.exists(calc_log_path):
                 print(f"Loading from: {calc_log_path}")
-                df = pd.read_csv(calc_log_path)
+                df = load_calculation_log(calc_log_path, columns=self.REQUIRED_COLUMNS)
                 if 'timestamp' in df.columns:
-                    df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed')
                     df['date'] = df['timestamp'].dt.date
                     df['day_of_week'] = df['timestamp'].dt.day_name()
                     # Alleen hour_of_day toevoegen als die niet bestaat
@@ -164,31 +165,87 @@ class DagelijkseActiviteit(BaseAnalysis):
         self.notebook.add(tab_frame, text="📈 Wekelijkse Trend")
         
         # Groepeer per week
-        weekly_counts = df.groupby('year_week').size()
+        all_weekly_counts = df.groupby('year_week').size()
         
         # Sorteer op jaar-week
-        weekly_counts = weekly_counts.sort_index()
+        all_weekly_counts = all_weekly_counts.sort_index()
         
         # Bepaal huidige week
         current_date = datetime.now()
         current_year_week = f"{current_date.year}-W{current_date.isocalendar().week:02d}"
         
         # Neem laatste 52 weken (1 jaar)
+        weekly_counts = all_weekly_counts
         if len(weekly_counts) > 52:
             weekly_counts = weekly_counts.iloc[-52:]
         
+        # Header met fullscreen: volledige historie op hoger detail
+        self.create_chart_header(
+            tab_frame, "Berekeningen per week",
+            fullscreen_callback=lambda: self.open_fullscreen_dialog(
+                "Wekelijkse Trend (volledige historie)",
+                lambda parent: self._show_weekly_trend_fullscreen(parent, all_weekly_counts, current_year_week)
+            )
+        )
+        
         # Maak figuur
         fig = Figure(figsize=(12, 6), facecolor=self.colors['bg'])
         ax = fig.add_subplot(111)
+        self._plot_weekly_trend(ax, weekly_counts, current_year_week, get_point_budget(),
+                                'Wekelijkse Calculator Activiteit (laatste 52 weken)')
+        
+        # Tight layout
+        fig.tight_layout()
+        
+        # Embed in tkinter
+        canvas = FigureCanvasTkAgg(fig, tab_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
+        
+        y_values = weekly_counts.values
+        avg = weekly_counts.mean()
+        
+        # Statistieken frame
+        stats_frame = tk.Frame(tab_frame, bg=self.colors['white'], relief=tk.RAISED, bd=1)
+        stats_frame.pack(fill='x', padx=10, pady=(0, 10))
+        
+        # Bereken extra statistieken
+        laatste_4_weken = weekly_counts.iloc[-4:].mean() if len(weekly_counts) >= 4 else 0
+        groei = ((y_values[-1] - y_values[0]) / y_values[0] * 100) if len(y_values) > 1 and y_values[0] > 0 else 0
+        
+        stats_text = f"📊 Totaal: {weekly_counts.sum()} | " \
+                    f"📅 Weken: {len(weekly_counts)} | " \
+                    f"📈 Beste week: {weekly_counts.max()} | " \
+                    f"➗ Gem/week: {avg:.1f} | " \
+                    f"🔥 Laatste 4 weken gem: {laatste_4_weken:.1f} | " \
+                    f"📊 Groei: {groei:+.0f}%"
+        
+        tk.Label(stats_frame, text=stats_text, 
+                font=("Arial", 10), bg=self.colors['white'],
+                fg=self.colors['text'], pady=5).pack()
+        
+        # Voeg week details toe
+        if current_year_week in weekly_counts:
+            current_week_count = weekly_counts[current_year_week]
+            week_text = f"🎯 Deze week ({current_year_week}): {current_week_count} berekeningen"
+            
+            tk.Label(stats_frame, text=week_text,
+                    font=("Arial", 10, "bold"), bg=self.colors['white'],
+                    fg=self.colors['accent'], pady=5).pack()
+        
+        self.figures['daily'] = fig
+        self.canvases['daily'] = canvas
         
-        # Plot lijn grafiek
-        x_values = range(len(weekly_counts))
+    def _plot_weekly_trend(self, ax, weekly_counts, current_year_week, budget, title):
+        """Teken weektrend met LTTB downsampling boven het punten-budget."""
+        x_values = np.arange(len(weekly_counts))
         y_values = weekly_counts.values
         week_labels = weekly_counts.index
         
-        # Basis lijn
-        ax.plot(x_values, y_values, 
-                marker='o', linewidth=2, markersize=6,
+        # Basis lijn (markers alleen als alle weken getekend worden)
+        show_markers = len(weekly_counts) <= budget
+        LODLine(ax, x_values, y_values, budget=budget, method='lttb',
+                marker='o' if show_markers else None, linewidth=2, markersize=6,
                 color=self.colors['primary'], label='Berekeningen per week')
         
         # Highlight huidige week als die in de data zit
@@ -210,22 +267,24 @@ class DagelijkseActiviteit(BaseAnalysis):
                    linestyle='--', alpha=0.7, 
                    label=f'Gemiddelde: {avg:.1f} per week')
         
-        # Voeg trend lijn toe (optioneel)
+        # Voeg trend lijn toe (optioneel, 2 punten volstaan)
         if len(weekly_counts) > 4:
             z = np.polyfit(x_values, y_values, 1)
             p = np.poly1d(z)
-            ax.plot(x_values, p(x_values), color='red', 
+            trend_x = np.array([x_values[0], x_values[-1]])
+            ax.plot(trend_x, p(trend_x), color='red', 
                    linestyle=':', alpha=0.7, label='Trend')
         
         # Styling
         ax.set_xlabel('Week', fontsize=12)
         ax.set_ylabel('Aantal Berekeningen', fontsize=12)
-        ax.set_title('Wekelijkse Calculator Activiteit (laatste 52 weken)', fontsize=14, pad=20)
+        ax.set_title(title, fontsize=14, pad=20)
         ax.grid(True, alpha=0.3)
         ax.legend()
         
-        # X-as labels: toon alleen elke 4e week voor leesbaarheid
-        tick_positions = list(range(0, len(week_labels), 4))
+        # X-as labels: ongeveer 13 labels (elke 4e week bij 52 weken)
+        step = max(4, len(week_labels) // 13)
+        tick_positions = list(range(0, len(week_labels), step))
         tick_labels = [week_labels[i] for i in tick_positions]
         ax.set_xticks(tick_positions)
         ax.set_xticklabels(tick_labels, rotation=45, ha='right')
@@ -233,44 +292,15 @@ class DagelijkseActiviteit(BaseAnalysis):
         # Y-as altijd vanaf 0
         ax.set_ylim(bottom=0)
         
-        # Tight layout
+    def _show_weekly_trend_fullscreen(self, parent, weekly_counts, current_year_week):
+        """Fullscreen weektrend: volledige historie, zoom her-queryt het detail."""
+        fig = Figure(figsize=(14, 8), facecolor='white')
+        ax = fig.add_subplot(111)
+        self._plot_weekly_trend(ax, weekly_counts, current_year_week,
+                                get_point_budget(fullscreen=True),
+                                f'Wekelijkse Calculator Activiteit ({len(weekly_counts)} weken)')
         fig.tight_layout()
-        
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, tab_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
-        
-        # Statistieken frame
-        stats_frame = tk.Frame(tab_frame, bg=self.colors['white'], relief=tk.RAISED, bd=1)
-        stats_frame.pack(fill='x', padx=10, pady=(0, 10))
-        
-        # Bereken extra statistieken
-        laatste_4_weken = weekly_counts.iloc[-4:].mean() if len(weekly_counts) >= 4 else 0
-        groei = ((y_values[-1] - y_values[0]) / y_values[0] * 100) if len(y_values) > 1 and y_values[0] > 0 else 0
-        
-        stats_text = f"📊 Totaal: {weekly_counts.sum()} | " \
-                    f"📅 Weken: {len(weekly_counts)} | " \
-                    f"📈 Beste week: {weekly_counts.max()} | " \
-                    f"➗ Gem/week: {avg:.1f} | " \
-                    f"🔥 Laatste 4 weken gem: {laatste_4_weken:.1f} | " \
-                    f"📊 Groei: {groei:+.0f}%"
-        
-        tk.Label(stats_frame, text=stats_text, 
-                font=("Arial", 10), bg=self.colors['white'],
-                fg=self.colors['text'], pady=5).pack()
-        
-        # Voeg week details toe
-        if current_year_week in weekly_counts:
-            current_week_count = weekly_counts[current_year_week]
-            week_text = f"🎯 Deze week ({current_year_week}): {current_week_count} berekeningen"
-            
-            tk.Label(stats_frame, text=week_text,
-                    font=("Arial", 10, "bold"), bg=self.colors['white'],
-                    fg=self.colors['accent'], pady=5).pack()
-        
-        self.figures['daily'] = fig
-        self.canvases['daily'] = canvas
+        self.embed_zoomable_figure(fig, parent)
         
     def create_weekday_tab(self, df):
         """Tab 2: Bar chart per dag van de week."""
@@ -362,14 +392,11 @@ class DagelijkseActiviteit(BaseAnalysis):
         # Laad master_calculations.csv voor de heatmap
         # Dit geeft een completer beeld van alle berekeningen
         try:
-            current_file = os.path.abspath(__file__)
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))
-            master_path = os.path.join(project_root, 'exports', 'producten', 'master_calculations.csv')
+            master_path = os.path.join(self.exports_dir(), 'producten', 'master_calculations.csv')
             
             if os.path.exists(master_path):
                 # Laad master data voor heatmap
-                master_df = pd.read_csv(master_path)
-                master_df['timestamp'] = pd.to_datetime(master_df['timestamp'], format='mixed')
+                master_df = read_master(master_path, usecols=self.REQUIRED_COLUMNS)
                 master_df['day_of_week'] = master_df['timestamp'].dt.day_name()
                 
                 # Gebruik bestaande hour_of_day of bereken het
@@ -378,13 +405,13 @@ class DagelijkseActiviteit(BaseAnalysis):
                 else:
                     master_df['hour_of_day'] = master_df['hour_of_day'].astype(int)
                     
-                print(f"DEBUG Heatmap: Loaded {len(master_df)} rows from master_calculations.csv")
+                debug("Heatmap: Loaded %d rows from master_calculations.csv", len(master_df))
                 df_for_heatmap = master_df
             else:
-                print("DEBUG Heatmap: master_calculations.csv not found, using calculation_log data")
+                debug("Heatmap: master_calculations.csv not found, using calculation_log data")
                 df_for_heatmap = df
         except Exception as e:
-            print(f"DEBUG Heatmap: Error loading master data: {e}")
+            debug("Heatmap: Error loading master data: %s", e)
             df_for_heatmap = df
         
         # Nederlandse dag namen voor weergave
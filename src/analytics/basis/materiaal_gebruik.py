@@ -19,11 +19,16 @@ import numpy as np
 import os
 
 from ..base_analysis import BaseAnalysis
+from ...utils.data_manager import execute_query
+from ...utils.instrumentation import debug
 
 
 class MateriaalGebruik(BaseAnalysis):
     """Analyse van materiaal gebruik in berekeningen."""
     
+    # Alleen deze kolommen inlezen (projectie pushdown)
+    REQUIRED_COLUMNS = ['material', 'weight', 'abrasive']
+    
     def __init__(self, data_manager=None, parent_frame=None, colors=None):
         """Initialiseer Materiaal Gebruik analyse."""
         super().__init__(data_manager, parent_frame, colors)
@@ -38,22 +43,19 @@ class MateriaalGebruik(BaseAnalysis):
     def load_data(self):
         """Laad master_calculations.csv."""
         try:
-            # Start vanaf de huidige file locatie
-            current_file = os.path.abspath(__file__)
-            
-            # Ga naar de root van het project (waar exports folder is)
-            # Van src/analytics/basis/materiaal_gebruik.py naar root is 3 niveau's omhoog
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))
-            
-            # Pad naar master_calculations.csv
-            master_path = os.path.join(project_root, 'exports', 'producten', 'master_calculations.csv')
+            # Pad naar master_calculations.csv (exports map van de DataManager)
+            exports_dir = self.exports_dir()
+            master_path = os.path.join(exports_dir, 'producten', 'master_calculations.csv')
             
-            print(f"DEBUG: Project root: {project_root}")
-            print(f"DEBUG: Looking for master_calculations.csv at: {master_path}")
-            print(f"DEBUG: File exists: {os.path.exists(master_path)}")
+            exists = os.path.exists(master_path)
+            debug("Exports dir: %s", exports_dir)
+            debug("Looking for master_calculations.csv at: %s", master_path)
+            debug("File exists: %s", exists)
             
-            if os.path.exists(master_path):
-                df = pd.read_csv(master_path)
+            db = getattr(self.data_manager, 'db', None)
+            if db is not None or exists:
+                # Alleen REQUIRED_COLUMNS (SQLite of CSV met usecols)
+                df = execute_query(self.query(), master_path, db=db)
                 print(f"Loaded {len(df)} rows from master_calculations.csv")
                 # Rename kolom voor compatibiliteit
                 if 'weight' in df.columns:
@@ -19,11 +19,16 @@ import numpy as np
 import os
 
 from ..base_analysis import BaseAnalysis
+from ...utils.instrumentation import debug, debug_enabled
+from ...utils.downsampling import LODScatter, get_point_budget
 
 
 class PrintWaardes(BaseAnalysis):
     """Analyse van print waardes (gewicht, tijd, prijs)."""
     
+    # Alleen deze kolommen inlezen (projectie pushdown)
+    REQUIRED_COLUMNS = ['weight', 'material', 'sell_price', 'margin_pct', 'profit_amount']
+    
     def __init__(self, data_manager=None, parent_frame=None, colors=None):
         """Initialiseer Print Waardes analyse."""
         super().__init__(data_manager, parent_frame, colors)
@@ -45,8 +50,9 @@ class PrintWaardes(BaseAnalysis):
             df['weight_g'] = df['weight']
             
         # Debug: print beschikbare kolommen
-        print(f"DEBUG print_waardes - Beschikbare kolommen: {df.columns.tolist() if not df.empty else 'GEEN DATA'}")
-        print(f"DEBUG print_waardes - Aantal rijen: {len(df)}")
+        if debug_enabled():
+            debug("print_waardes - Beschikbare kolommen: %s", df.columns.tolist() if not df.empty else 'GEEN DATA')
+        debug("print_waardes - Aantal rijen: %d", len(df))
             
         return df
             
@@ -180,23 +186,64 @@ class PrintWaardes(BaseAnalysis):
         df_filtered = df[(df['weight_g'] < df['weight_g'].quantile(0.99)) & 
                         (df['sell_price'] < df['sell_price'].quantile(0.99))]
         
+        df_filtered = df_filtered.copy()
+        df_filtered['category'] = df_filtered['material'].apply(self._get_material_category)
+        
+        # Header met fullscreen: hoger punten-budget en zoom her-query
+        self.create_chart_header(
+            tab_frame, "Gewicht vs Prijs",
+            fullscreen_callback=lambda: self.open_fullscreen_dialog(
+                "Gewicht vs Prijs",
+                lambda parent: self._show_scatter_fullscreen(parent, df_filtered)
+            )
+        )
+        
         # Maak figuur
         fig = Figure(figsize=(10, 8), facecolor=self.colors['bg'])
         ax = fig.add_subplot(111)
+        self._plot_weight_price(fig, ax, df_filtered, get_point_budget())
         
-        # Kleur op basis van materiaal categorie
-        def get_material_category(material):
-            if 'CF' in material or 'Carbon' in material or 'Glass' in material:
-                return 'Composiet'
-            elif 'PLA' in material:
-                return 'PLA Varianten'
-            elif material in ['PC', 'Nylon', 'ASA', 'ABS']:
-                return 'Technisch'
-            else:
-                return 'Overig'
+        fig.tight_layout()
         
-        df_filtered['category'] = df_filtered['material'].apply(get_material_category)
+        # Embed in tkinter
+        canvas = FigureCanvasTkAgg(fig, tab_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
         
+        # Prijs statistieken per categorie
+        stats_frame = tk.Frame(tab_frame, bg=self.colors['white'], relief=tk.RAISED, bd=1)
+        stats_frame.pack(fill='x', padx=10, pady=(0, 10))
+        
+        # Bereken gemiddelde prijs per gram voor verschillende categorieën
+        df_filtered['price_per_gram'] = df_filtered['sell_price'] / df_filtered['weight_g']
+        
+        price_stats = df_filtered.groupby('category')['price_per_gram'].mean()
+        
+        stats_text = "💰 Gem. Prijs per Gram: " + " | ".join(
+            [f"{cat}: €{price:.3f}/g" for cat, price in price_stats.items()]
+        )
+        
+        tk.Label(stats_frame, text=stats_text,
+                font=("Arial", 10), bg=self.colors['white'],
+                fg=self.colors['text'], pady=5).pack()
+        
+        self.figures['scatter'] = fig
+        self.canvases['scatter'] = canvas
+        
+    @staticmethod
+    def _get_material_category(material):
+        """Kleur categorie op basis van materiaal naam."""
+        if 'CF' in material or 'Carbon' in material or 'Glass' in material:
+            return 'Composiet'
+        elif 'PLA' in material:
+            return 'PLA Varianten'
+        elif material in ['PC', 'Nylon', 'ASA', 'ABS']:
+            return 'Technisch'
+        else:
+            return 'Overig'
+            
+    def _plot_weight_price(self, fig, ax, df_filtered, budget):
+        """Teken gewicht vs prijs; boven het budget als hexbin dichtheid."""
         # Kleurenmap
         color_map = {
             'PLA Varianten': self.colors['primary'],
@@ -205,11 +252,19 @@ class PrintWaardes(BaseAnalysis):
             'Overig': '#95A5A6'
         }
         
-        # Plot per categorie
-        for category, color in color_map.items():
-            category_data = df_filtered[df_filtered['category'] == category]
-            ax.scatter(category_data['weight_g'], category_data['sell_price'],
-                      alpha=0.6, s=30, c=color, label=category, edgecolors='black', linewidth=0.5)
+        if len(df_filtered) <= budget:
+            # Plot per categorie
+            for category, color in color_map.items():
+                category_data = df_filtered[df_filtered['category'] == category]
+                ax.scatter(category_data['weight_g'], category_data['sell_price'],
+                          alpha=0.6, s=30, c=color, label=category, edgecolors='black', linewidth=0.5)
+        else:
+            # Te veel punten: 2-D binning, losse punten pas na inzoomen
+            cloud = LODScatter(ax, df_filtered['weight_g'], df_filtered['sell_price'],
+                               budget=budget, cmap='Greens', alpha=0.6, s=30,
+                               color=self.colors['primary'], edgecolors='black', linewidth=0.5)
+            cbar = fig.colorbar(cloud.mappable, ax=ax)
+            cbar.set_label('Aantal prints')
         
         # Voeg trendlijn toe
         z = np.polyfit(df_filtered['weight_g'], df_filtered['sell_price'], 1)
@@ -236,32 +291,13 @@ class PrintWaardes(BaseAnalysis):
                verticalalignment='top',
                bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
         
+    def _show_scatter_fullscreen(self, parent, df_filtered):
+        """Fullscreen scatter: hoger budget, zoom toont losse punten."""
+        fig = Figure(figsize=(14, 8), facecolor='white')
+        ax = fig.add_subplot(111)
+        self._plot_weight_price(fig, ax, df_filtered, get_point_budget(fullscreen=True))
         fig.tight_layout()
-        
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, tab_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
-        
-        # Prijs statistieken per categorie
-        stats_frame = tk.Frame(tab_frame, bg=self.colors['white'], relief=tk.RAISED, bd=1)
-        stats_frame.pack(fill='x', padx=10, pady=(0, 10))
-        
-        # Bereken gemiddelde prijs per gram voor verschillende categorieën
-        df_filtered['price_per_gram'] = df_filtered['sell_price'] / df_filtered['weight_g']
-        
-        price_stats = df_filtered.groupby('category')['price_per_gram'].mean()
-        
-        stats_text = "💰 Gem. Prijs per Gram: " + " | ".join(
-            [f"{cat}: €{price:.3f}/g" for cat, price in price_stats.items()]
-        )
-        
-        tk.Label(stats_frame, text=stats_text,
-                font=("Arial", 10), bg=self.colors['white'],
-                fg=self.colors['text'], pady=5).pack()
-        
-        self.figures['scatter'] = fig
-        self.canvases['scatter'] = canvas
+        self.embed_zoomable_figure(fig, parent)
         
     def create_price_histogram_tab(self, df):
         """Tab 3: Histogram van prijs verdeling."""
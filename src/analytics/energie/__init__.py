@@ -4,8 +4,28 @@ Energie & Efficiency Module
 
 Analyses voor energieverbruik en efficiency:
 - Heatmap van print activiteit
-- Efficiency analyse (gewicht vs tijd)
-- Energie kosten berekeningen
+- Efficiency analyse (gram per kWh per materiaal)
+- Energie kosten berekeningen onder tijdsafhankelijke tarieven
+
+De rekenkern (verbruik per tijdslot, kost per tarief) zit in
+verbruik.py, de tarieven in tarieven.py.
 """
 
-__all__ = ['heatmap', 'efficiency', 'kosten'] 
\ No newline at end of file
+# Lazy imports om circulaire dependencies te voorkomen
+def get_energie_heatmap():
+    """Lazy import van EnergieHeatmap."""
+    from .heatmap import EnergieHeatmap
+    return EnergieHeatmap
+
+def get_energie_efficiency():
+    """Lazy import van EnergieEfficiency."""
+    from .efficiency import EnergieEfficiency
+    return EnergieEfficiency
+
+def get_energie_kosten():
+    """Lazy import van EnergieKosten."""
+    from .kosten import EnergieKosten
+    return EnergieKosten
+
+__all__ = ['heatmap', 'efficiency', 'kosten', 'tarieven', 'verbruik',
+           'get_energie_heatmap', 'get_energie_efficiency', 'get_energie_kosten']
@@ -0,0 +1,93 @@
+"""
+Energie Efficiency Module
+=========================
+
+Hoeveel filament zet de printer om per kWh? Bevat 2 visualisaties:
+1. Bar chart - gram per kWh per materiaal
+2. Scatter - gemiddeld vermogen vs gram per uur per materiaal
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import numpy as np
+
+from .verbruik import LOGGED, EnergieAnalyse, EnergieResultaat
+
+
+class EnergieEfficiency(EnergieAnalyse):
+    """Efficiency (g/kWh, energiekost per kg) per materiaal."""
+
+    # Materialen met minder prints geven een onbetrouwbaar gemiddelde
+    MIN_PRINTS = 3
+
+    def __init__(self, data_manager=None, parent_frame=None, colors=None):
+        """Initialiseer Energie Efficiency analyse."""
+        super().__init__(data_manager, parent_frame, colors)
+        self.name = "Energie Efficiency"
+
+    def get_title(self) -> str:
+        """Return titel voor deze analyse."""
+        return "⚡ Energie Efficiency per Materiaal"
+
+    def create_tabs(self, result: EnergieResultaat) -> None:
+        """Gram per kWh en vermogen vs doorzet."""
+        materials = result.per_material[result.per_material['prints'] >= self.MIN_PRINTS]
+        if materials.empty:
+            materials = result.per_material
+        materials = materials.dropna(subset=['g_per_kwh'])
+        self.create_efficiency_tab(materials, result)
+        self.create_throughput_tab(materials)
+
+    def create_efficiency_tab(self, materials, result: EnergieResultaat) -> None:
+        """Tab 1: gram per kWh per materiaal, gesorteerd."""
+        ranked = materials.sort_values('g_per_kwh', ascending=True).tail(15)
+        overall = result.totals['gewicht_kg'] * 1000 / result.totals['kwh'] if result.totals['kwh'] else 0.0
+
+        def draw(fig):
+            ax = fig.add_subplot(111)
+            colors = ['#2ECC71' if value >= overall else '#E74C3C' for value in ranked['g_per_kwh']]
+            ax.barh(ranked.index.astype(str), ranked['g_per_kwh'], color=colors)
+            ax.axvline(overall, color='#34495E', linestyle='--', linewidth=1.5,
+                       label=f'Gemiddeld: {overall:.0f} g/kWh')
+            ax.set_xlabel('Gram filament per kWh', fontsize=12)
+            ax.set_title('Energie Efficiency per Materiaal', fontsize=16, fontweight='bold', pad=15)
+            ax.legend(loc='lower right')
+            ax.grid(axis='x', alpha=0.3)
+
+        tab = self.chart_tab('efficiency', "⚡ Gram per kWh", "Gram Filament per kWh", draw)
+
+        if ranked.empty:
+            return
+        best, worst = ranked.index[-1], ranked.index[0]
+        cost_per_kg = (materials[LOGGED] / materials['gewicht_kg']).replace([np.inf, -np.inf], np.nan)
+        self.create_info_box(tab, "🏁 Efficiency", [
+            ("Meest efficiënt", f"{best}: {ranked.loc[best, 'g_per_kwh']:.0f} g/kWh"),
+            ("Minst efficiënt", f"{worst}: {ranked.loc[worst, 'g_per_kwh']:.0f} g/kWh"),
+            ("Energiekost per kg", f"€{cost_per_kg.median():.2f} (mediaan)" if cost_per_kg.notna().any() else "-"),
+        ])
+
+    def create_throughput_tab(self, materials) -> None:
+        """Tab 2: gemiddeld vermogen vs gram per printuur."""
+        g_per_hour = materials['gewicht_kg'] * 1000 / materials['print_uren']
+
+        def draw(fig):
+            ax = fig.add_subplot(111)
+            sizes = 40 + 400 * materials['kwh'] / materials['kwh'].max()
+            ax.scatter(materials['gem_kw'], g_per_hour, s=sizes, alpha=0.6,
+                       color='#3498DB', edgecolors='#2C3E50')
+            for material, x, y in zip(materials.index, materials['gem_kw'], g_per_hour):
+                ax.annotate(str(material), (x, y), xytext=(5, 5), textcoords='offset points', fontsize=9)
+            ax.set_xlabel('Gemiddeld vermogen (kW)', fontsize=12)
+            ax.set_ylabel('Gram per printuur', fontsize=12)
+            ax.set_title('Vermogen vs Doorzet (grootte = kWh)', fontsize=16, fontweight='bold', pad=15)
+            ax.grid(alpha=0.3)
+
+        tab = self.chart_tab('doorzet', "🚀 Doorzet", "Vermogen vs Doorzet", draw)
+
+        items = [(str(material), f"{materials.loc[material, 'kwh']:.1f} kWh, {value:.0f} g/u")
+                 for material, value in g_per_hour.sort_values(ascending=False).head(6).items()]
+        self.create_info_box(tab, "🚀 Hoogste doorzet", items)
+
+
+__all__ = ['EnergieEfficiency']
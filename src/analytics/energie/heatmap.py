@@ -0,0 +1,135 @@
+"""
+Energie Heatmap Module
+======================
+
+Wanneer wordt er geprint en wat kost dat? Bevat 3 visualisaties:
+1. Heatmap - verbruik (kWh) per weekdag × uur
+2. Heatmap - prijs per kWh per weekdag × uur per tarief
+3. Lijn grafiek - verbruik per dag
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import numpy as np
+
+from .verbruik import EnergieAnalyse, EnergieResultaat
+
+WEEKDAY_LABELS = ['Ma', 'Di', 'Wo', 'Do', 'Vr', 'Za', 'Zo']
+
+
+class EnergieHeatmap(EnergieAnalyse):
+    """Print activiteit en tarief per weekdag en uur."""
+
+    def __init__(self, data_manager=None, parent_frame=None, colors=None):
+        """Initialiseer Energie Heatmap analyse."""
+        super().__init__(data_manager, parent_frame, colors)
+        self.name = "Energie Heatmap"
+
+    def get_title(self) -> str:
+        """Return titel voor deze analyse."""
+        return "🔥 Energie Heatmap - Wanneer wordt er geprint?"
+
+    def create_tabs(self, result: EnergieResultaat) -> None:
+        """Verbruik heatmap, tarief heatmaps en dagverloop."""
+        self.create_usage_tab(result)
+        self.create_price_tab(result)
+        self.create_daily_tab(result)
+
+    @staticmethod
+    def _draw_grid(fig, ax, values, cmap, label):
+        image = ax.imshow(values, aspect='auto', cmap=cmap, interpolation='nearest')
+        ax.set_yticks(range(7))
+        ax.set_yticklabels(WEEKDAY_LABELS)
+        ax.set_xticks(range(0, 24, 2))
+        ax.set_xticklabels([f"{h:02d}" for h in range(0, 24, 2)])
+        fig.colorbar(image, ax=ax, label=label)
+
+    def create_usage_tab(self, result: EnergieResultaat) -> None:
+        """Tab 1: kWh per weekdag × uur."""
+        grid = result.heatmap()
+
+        def draw(fig):
+            ax = fig.add_subplot(111)
+            self._draw_grid(fig, ax, grid, 'YlOrRd', 'Verbruik (kWh)')
+            ax.set_xlabel('Uur van de dag', fontsize=12)
+            ax.set_title('Energieverbruik per Weekdag en Uur', fontsize=16, fontweight='bold', pad=15)
+
+        tab = self.chart_tab('verbruik', "🔥 Verbruik Heatmap", "Verbruik per Weekdag en Uur", draw)
+
+        day, hour = np.unravel_index(np.argmax(grid), grid.shape)
+        total = grid.sum()
+        night = grid[:, list(range(0, 7)) + [22, 23]].sum()
+        weekend = grid[5:].sum()
+        self.create_info_box(tab, "📌 Print Patroon", [
+            ("Drukste uur", f"{WEEKDAY_LABELS[day]} {hour:02d}:00 ({grid[day, hour]:.1f} kWh)"),
+            ("Nacht (22-07u)", f"{night / total * 100:.1f}% van het verbruik" if total else "-"),
+            ("Weekend", f"{weekend / total * 100:.1f}% van het verbruik" if total else "-"),
+        ])
+
+    def create_price_tab(self, result: EnergieResultaat) -> None:
+        """Tab 2: prijs per kWh per weekdag × uur, één paneel per tarief."""
+        tariffs = self.tariffs()
+        names = [name for name in result.bucket_cost if name in tariffs]
+        slots_per_hour = 60 // result.bucket_minutes
+        grids = {}
+        for name in names:
+            prices, _ = tariffs[name].price_grid(result.bucket_minutes)
+            grids[name] = prices.reshape(7, 24, slots_per_hour).mean(axis=2)
+
+        def draw(fig):
+            vmin = min(grid.min() for grid in grids.values())
+            vmax = max(grid.max() for grid in grids.values())
+            for i, name in enumerate(names):
+                ax = fig.add_subplot(len(names), 1, i + 1)
+                image = ax.imshow(grids[name], aspect='auto', cmap='RdYlGn_r', vmin=vmin, vmax=vmax)
+                ax.set_yticks(range(7))
+                ax.set_yticklabels(WEEKDAY_LABELS, fontsize=8)
+                ax.set_xticks(range(0, 24, 2))
+                ax.set_xticklabels([f"{h:02d}" for h in range(0, 24, 2)], fontsize=8)
+                ax.set_title(name, fontsize=12, fontweight='bold')
+                fig.colorbar(image, ax=ax, label='€/kWh')
+
+        tab = self.chart_tab('tarieven', "🏷️ Tarieven", "Prijs per kWh per Weekdag en Uur", draw,
+                             figsize=(10, 2.5 * max(len(names), 1)))
+
+        # Welk deel van het verbruik viel in de goedkoopste band?
+        items = []
+        for name in names:
+            bands = result.band_totals[name]
+            prices = dict(zip(tariffs[name].band_names(),
+                              [band.price for band in tariffs[name].bands] + [tariffs[name].default_price]))
+            cheapest = min(prices, key=prices.get)
+            share = bands.loc[cheapest, 'kwh'] / bands['kwh'].sum() if bands['kwh'].sum() else 0.0
+            items.append((name, f"{share * 100:.0f}% in '{cheapest}' (€{prices[cheapest]:.2f})"))
+        self.create_info_box(tab, "💡 Verbruik in de goedkoopste band", items)
+
+    def create_daily_tab(self, result: EnergieResultaat) -> None:
+        """Tab 3: verbruik per dag."""
+        daily = result.daily()['kwh']
+        window = min(7, len(daily))
+
+        def draw(fig):
+            ax = fig.add_subplot(111)
+            ax.fill_between(daily.index, daily.values, color='#3498DB', alpha=0.3)
+            ax.plot(daily.index, daily.values, color='#3498DB', linewidth=1, label='kWh per dag')
+            if window > 1:
+                ax.plot(daily.index, daily.rolling(window).mean().values, color='#E74C3C',
+                        linewidth=2, label=f'{window}-daags gemiddelde')
+            ax.set_ylabel('Verbruik (kWh)', fontsize=12)
+            ax.set_title('Energieverbruik per Dag', fontsize=16, fontweight='bold', pad=15)
+            ax.legend(loc='upper left')
+            ax.grid(alpha=0.3)
+            fig.autofmt_xdate()
+
+        tab = self.chart_tab('dagelijks', "📅 Per Dag", "Verbruik per Dag", draw)
+
+        active = daily[daily > 0]
+        self.create_info_box(tab, "📅 Dagverbruik", [
+            ("Actieve dagen", f"{len(active)} van {len(daily)}"),
+            ("Gemiddeld", f"{active.mean():.1f} kWh/dag" if len(active) else "-"),
+            ("Maximum", f"{daily.max():.1f} kWh ({daily.idxmax():%d-%m-%Y})" if len(daily) else "-"),
+        ])
+
+
+__all__ = ['EnergieHeatmap', 'WEEKDAY_LABELS']
@@ -0,0 +1,125 @@
+"""
+Energie Kosten Analyse Module
+=============================
+
+Vergelijkt de energiekost van de gelogde prints onder verschillende
+(tijdsafhankelijke) tarieven. Bevat 3 visualisaties:
+1. Bar chart - totale kost per tarief vs de gelogde vaste prijs
+2. Lijn grafiek - kost per uur van de dag per tarief
+3. Bar chart - energiekost per materiaal per tarief
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import numpy as np
+
+from .verbruik import CHART_COLORS, LOGGED, EnergieAnalyse, EnergieResultaat
+
+
+class EnergieKosten(EnergieAnalyse):
+    """Energiekosten per tarief, per uur en per materiaal."""
+
+    def __init__(self, data_manager=None, parent_frame=None, colors=None):
+        """Initialiseer Energie Kosten analyse."""
+        super().__init__(data_manager, parent_frame, colors)
+        self.name = "Energie Kosten Analyse"
+
+    def get_title(self) -> str:
+        """Return titel voor deze analyse."""
+        return "💡 Energie Kosten per Tarief"
+
+    def create_tabs(self, result: EnergieResultaat) -> None:
+        """Tarief vergelijking, uurprofiel en kost per materiaal."""
+        self.create_tariff_tab(result)
+        self.create_hour_profile_tab(result)
+        self.create_material_tab(result)
+
+    def create_tariff_tab(self, result: EnergieResultaat) -> None:
+        """Tab 1: totale kost per tarief."""
+        costs = result.totals['kosten']
+        names = list(costs)
+
+        def draw(fig):
+            ax = fig.add_subplot(111)
+            bars = ax.bar(names, [costs[n] for n in names], color=CHART_COLORS[:len(names)])
+            for bar in bars:
+                ax.annotate(f"€{bar.get_height():.2f}", (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                            ha='center', va='bottom', fontsize=10, fontweight='bold')
+            ax.set_ylabel('Energiekost (€)', fontsize=12)
+            ax.set_title('Totale Energiekost per Tarief', fontsize=16, fontweight='bold', pad=15)
+            ax.grid(axis='y', alpha=0.3)
+
+        tab = self.chart_tab('tarieven', "💶 Tarief Vergelijking", "Energiekost per Tarief", draw)
+
+        logged = costs[LOGGED]
+        items = []
+        for name in names[1:]:
+            delta = costs[name] - logged
+            pct = f" ({delta / logged * 100:+.1f}%)" if logged else ""
+            items.append((name, f"€{costs[name]:.2f}, {delta:+.2f}{pct}"))
+        self.create_info_box(tab, f"⚖️ Verschil met gelogde kost (€{logged:.2f})", items)
+
+    def create_hour_profile_tab(self, result: EnergieResultaat) -> None:
+        """Tab 2: kost per uur van de dag per tarief, met verbruik op de achtergrond."""
+        hours = np.arange(24)
+        kwh = result.hour_profile()
+        profiles = {name: result.hour_profile(name) for name in result.bucket_cost}
+
+        def draw(fig):
+            ax = fig.add_subplot(111)
+            ax.bar(hours, kwh, color='#BDC3C7', alpha=0.5, label='Verbruik (kWh)')
+            ax.set_xlabel('Uur van de dag', fontsize=12)
+            ax.set_ylabel('Verbruik (kWh)', fontsize=12)
+            ax.set_xticks(hours)
+
+            cost_ax = ax.twinx()
+            for i, (name, profile) in enumerate(profiles.items()):
+                cost_ax.plot(hours, profile, marker='o', linewidth=2, markersize=4,
+                             color=CHART_COLORS[(i + 1) % len(CHART_COLORS)], label=name)
+            cost_ax.set_ylabel('Kost (€)', fontsize=12)
+
+            handles = ax.get_legend_handles_labels()
+            cost_handles = cost_ax.get_legend_handles_labels()
+            cost_ax.legend(handles[0] + cost_handles[0], handles[1] + cost_handles[1], loc='upper left')
+            ax.set_title('Verbruik en Kost per Uur van de Dag', fontsize=16, fontweight='bold', pad=15)
+            ax.grid(axis='y', alpha=0.3)
+
+        tab = self.chart_tab('uurprofiel', "🕐 Kosten per Uur", "Kost per Uur van de Dag", draw)
+
+        # Gemiddelde prijs per kWh en duurste band per tarief
+        items = []
+        for name, bands in result.band_totals.items():
+            used = bands[bands['kwh'] > 0]
+            avg = bands['kosten'].sum() / bands['kwh'].sum() if bands['kwh'].sum() else 0.0
+            top = used['kosten'].idxmax() if not used.empty else '-'
+            items.append((name, f"gem. €{avg:.3f}/kWh, grootste post: {top}"))
+        self.create_info_box(tab, "📊 Gemiddelde prijs per tarief", items)
+
+    def create_material_tab(self, result: EnergieResultaat) -> None:
+        """Tab 3: energiekost per materiaal (top 10) per tarief."""
+        top = result.per_material.head(10)
+        tariff_names = [LOGGED] + list(result.bucket_cost)
+
+        def draw(fig):
+            ax = fig.add_subplot(111)
+            y = np.arange(len(top))
+            height = 0.8 / len(tariff_names)
+            for i, name in enumerate(tariff_names):
+                ax.barh(y + i * height, top[name], height, label=name, color=CHART_COLORS[i % len(CHART_COLORS)])
+            ax.set_yticks(y + height * (len(tariff_names) - 1) / 2)
+            ax.set_yticklabels(top.index)
+            ax.invert_yaxis()
+            ax.set_xlabel('Energiekost (€)', fontsize=12)
+            ax.set_title('Energiekost per Materiaal (Top 10 op kWh)', fontsize=16, fontweight='bold', pad=15)
+            ax.legend(loc='lower right')
+            ax.grid(axis='x', alpha=0.3)
+
+        tab = self.chart_tab('materialen', "🎨 Kosten per Materiaal", "Energiekost per Materiaal", draw)
+
+        items = [(material, f"{row['kwh']:.1f} kWh, €{row[LOGGED]:.2f}")
+                 for material, row in top.head(6).iterrows()]
+        self.create_info_box(tab, "🏆 Grootste Verbruikers", items)
+
+
+__all__ = ['EnergieKosten']
@@ -0,0 +1,198 @@
+"""
+Energie Tarieven - H2D Price Calculator
+=======================================
+
+Tijdsafhankelijke (time-of-use) elektriciteitstarieven.
+
+De prijsberekening rekent met één vaste energieprijs (energy_price in
+de config). Met een dag/nacht of dynamisch contract hangt de echte
+kost af van wanneer er geprint wordt; deze module beschrijft zo'n
+contract als banden op de klok:
+
+    TariffBand('dag', 7, 22, 0.36, days=(0, 1, 2, 3, 4))
+
+- start/end in uren (7.5 = 07:30), end <= start loopt over middernacht
+- days: weekdagen waarop de band geldt (0 = maandag), telkens de
+  kalenderdag van het tijdslot zelf
+- bij overlap wint de laatst genoemde band; buiten alle banden geldt
+  default_price
+
+De voorbeeldtarieven hieronder zijn indicatief. Eigen contracten
+komen uit user_settings.json:
+
+    "energy_tariffs": {
+        "Mijn contract": {
+            "default": 0.27,
+            "bands": [{"name": "dag", "start": 7, "end": 22, "price": 0.35,
+                       "days": [0, 1, 2, 3, 4]}]
+        }
+    }
+
+Gebruik:
+-------
+    >>> tariffs = load_tariffs()
+    >>> prices, bands = tariffs['Dag/Nacht'].price_grid(60)   # (7, 24) €/kWh
+    >>> prices[0, 12], prices[5, 12]                           # maandag vs zaterdag
+    (0.36, 0.25)
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from ...config.user_config import get_config_value
+except ImportError:
+    get_config_value = None
+
+MINUTES_PER_DAY = 24 * 60
+ALL_DAYS: Tuple[int, ...] = tuple(range(7))
+WEEKDAYS: Tuple[int, ...] = (0, 1, 2, 3, 4)
+
+
+@dataclass(frozen=True)
+class TariffBand:
+    """Tijdsband met een eigen prijs per kWh."""
+    name: str
+    start_hour: float
+    end_hour: float
+    price: float
+    days: Tuple[int, ...] = ALL_DAYS
+
+    def minutes(self) -> Tuple[int, int]:
+        """Start en einde in minuten na middernacht."""
+        return int(round(self.start_hour * 60)), int(round(self.end_hour * 60))
+
+
+@dataclass(frozen=True)
+class TimeOfUseTariff:
+    """Contract: standaardprijs plus tijdsbanden.
+
+    Parameters:
+    ----------
+    name : str
+        Naam in de GUI
+    default_price : float
+        €/kWh buiten alle banden
+    bands : Tuple[TariffBand, ...]
+        Banden, latere banden winnen bij overlap
+    """
+    name: str
+    default_price: float
+    bands: Tuple[TariffBand, ...] = ()
+
+    def band_names(self) -> Tuple[str, ...]:
+        """Namen per band index; de laatste is de standaardprijs."""
+        return tuple(band.name for band in self.bands) + ('standaard',)
+
+    def price_grid(self, bucket_minutes: int = 60) -> Tuple[np.ndarray, np.ndarray]:
+        """Prijs en band per (weekdag, tijdslot).
+
+        Parameters:
+        ----------
+        bucket_minutes : int
+            Slotbreedte; moet een deler van 1440 zijn en alle band
+            grenzen moeten erop vallen
+
+        Returns:
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            (7, slots) prijzen in €/kWh en (7, slots) band index
+            (len(bands) = standaardprijs)
+
+        Raises:
+        ------
+        ValueError
+            Als een bandgrens niet op een slotgrens valt
+        """
+        if MINUTES_PER_DAY % bucket_minutes:
+            raise ValueError(f"bucket_minutes {bucket_minutes} is geen deler van 1440")
+        slots = MINUTES_PER_DAY // bucket_minutes
+        slot_start = np.arange(slots) * bucket_minutes
+
+        band_index = np.full((7, slots), len(self.bands), dtype=np.int16)
+        for index, band in enumerate(self.bands):
+            start, end = band.minutes()
+            if start % bucket_minutes or end % bucket_minutes:
+                raise ValueError(f"Band '{band.name}' valt niet op {bucket_minutes}-minuten slots")
+            start, end = start % MINUTES_PER_DAY, end % MINUTES_PER_DAY
+            if end > start:
+                in_band = (slot_start >= start) & (slot_start < end)
+            else:  # over middernacht (of de hele dag bij start == end)
+                in_band = (slot_start >= start) | (slot_start < end)
+            for day in band.days:
+                band_index[day % 7, in_band] = index
+
+        prices = np.array([band.price for band in self.bands] + [self.default_price])
+        return prices[band_index], band_index
+
+
+# Indicatieve voorbeeldcontracten (€/kWh incl. netkosten)
+PRESET_TARIFFS: Tuple[TimeOfUseTariff, ...] = (
+    TimeOfUseTariff('Enkelvoudig', 0.32),
+    TimeOfUseTariff('Dag/Nacht', 0.25, (
+        TariffBand('dag', 7, 22, 0.36, WEEKDAYS),
+    )),
+    TimeOfUseTariff('Dynamisch', 0.30, (
+        TariffBand('dal', 0, 6, 0.18),
+        TariffBand('zon', 11, 16, 0.20),
+        TariffBand('piek', 17, 21, 0.45),
+    )),
+)
+
+
+def tariff_from_dict(name: str, spec: Mapping[str, Any]) -> TimeOfUseTariff:
+    """Bouw een tarief uit een config dict (zie module docstring).
+
+    Raises:
+    ------
+    ValueError
+        Bij ontbrekende of ongeldige velden
+    """
+    try:
+        bands = tuple(
+            TariffBand(
+                str(band.get('name', f'band {i + 1}')),
+                float(band['start']),
+                float(band['end']),
+                float(band['price']),
+                tuple(int(d) for d in band.get('days', ALL_DAYS)),
+            )
+            for i, band in enumerate(spec.get('bands', []))
+        )
+        return TimeOfUseTariff(name, float(spec['default']), bands)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Ongeldig tarief '{name}': {e}") from e
+
+
+def load_tariffs(extra: Sequence[TimeOfUseTariff] = ()) -> Dict[str, TimeOfUseTariff]:
+    """Voorbeeldtarieven plus eigen contracten uit de config.
+
+    Parameters:
+    ----------
+    extra : Sequence[TimeOfUseTariff]
+        Extra tarieven (overschrijven gelijknamige)
+
+    Returns:
+    -------
+    Dict[str, TimeOfUseTariff]
+        Naam → tarief, in weergave volgorde
+    """
+    tariffs = {tariff.name: tariff for tariff in PRESET_TARIFFS}
+    if get_config_value is not None:
+        try:
+            configured = get_config_value('energy_tariffs', None) or {}
+            for name, spec in configured.items():
+                tariffs[name] = tariff_from_dict(name, spec)
+        except Exception as e:
+            print(f"Energie tarieven uit config genegeerd: {e}")
+    for tariff in extra:
+        tariffs[tariff.name] = tariff
+    return tariffs
+
+
+__all__ = ['PRESET_TARIFFS', 'TariffBand', 'TimeOfUseTariff', 'load_tariffs', 'tariff_from_dict']
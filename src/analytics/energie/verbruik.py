@@ -0,0 +1,382 @@
+"""
+Energie Verbruik - H2D Price Calculator
+=======================================
+
+Gevectoriseerde berekening van energieverbruik en -kosten per
+tijdslot, per print en per materiaal, in één pass over de log.
+
+Elke print is een interval [start, start + print_hours) met een
+constant vermogen (printer_power_kw van de config versie waarmee de
+berekening gelogd is). De timestamp van de berekening geldt als start
+van de print.
+
+Verbruik per slot (difference array):
+    Een interval dat op t (in slots) begint draagt aan slot floor(t)
+    het deel (1 - frac(t)) bij en vanaf het volgende slot een vol slot;
+    aan het einde gebeurt hetzelfde met een negatief teken. Twee
+    np.bincount's en een cumsum geven zo het exacte verbruik per slot,
+    ook voor prints die over uur- en tariefgrenzen lopen: O(N + slots),
+    zonder lus over prints of slots.
+
+Kost per print (cumulatieve prijs):
+    De prijs is constant binnen een slot, dus de cumulatieve prijs P(t)
+    is stuksgewijs lineair; kost = vermogen × (P(einde) - P(start)),
+    exact via np.interp op de slotgrenzen.
+
+Gebruik:
+-------
+    >>> result = bereken_energie(df, load_tariffs(), bucket_minutes=60)
+    >>> result.totals                     # kWh, kost per tarief en gelogde kost
+    >>> result.bucket_frame()             # verbruik en kost per uur
+    >>> result.per_material               # g/kWh en kost per tarief per materiaal
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import os
+import time
+import tkinter as tk
+from abc import abstractmethod
+from dataclasses import dataclass, field
+from tkinter import ttk
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from ..base_analysis import BaseAnalysis
+from .tarieven import MINUTES_PER_DAY, TimeOfUseTariff, load_tariffs
+from ...config import CONFIG_DEFAULTS
+from ...utils.config_snapshots import load_calculation_log
+from ...utils.instrumentation import debug
+
+# Kolommen uit calculation_log.csv (config kolommen via de join met config_versions.csv)
+ENERGY_COLUMNS = ['timestamp', 'weight_g', 'material', 'print_hours', 'printer_power_kw', 'energy_price']
+
+CHART_COLORS = ['#3498DB', '#2ECC71', '#E74C3C', '#F39C12', '#9B59B6',
+                '#1ABC9C', '#34495E', '#E67E22', '#16A085', '#27AE60']
+
+DEFAULT_BUCKET_MINUTES = 60
+LOGGED = 'Gelogd (vast)'  # kost met de energieprijs die bij de berekening gold
+
+
+@dataclass
+class EnergieResultaat:
+    """Uitkomst van bereken_energie()."""
+    origin: pd.Timestamp
+    bucket_minutes: int
+    bucket_kwh: np.ndarray
+    bucket_cost: Dict[str, np.ndarray]
+    band_totals: Dict[str, pd.DataFrame]
+    per_material: pd.DataFrame
+    totals: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def slots_per_day(self) -> int:
+        return MINUTES_PER_DAY // self.bucket_minutes
+
+    def bucket_index(self) -> pd.DatetimeIndex:
+        """Begin tijdstip van elk slot."""
+        return pd.date_range(self.origin, periods=len(self.bucket_kwh),
+                             freq=f'{self.bucket_minutes}min')
+
+    def bucket_frame(self) -> pd.DataFrame:
+        """Verbruik (kWh) en kost per tarief per slot."""
+        frame = pd.DataFrame({'kwh': self.bucket_kwh, **self.bucket_cost}, index=self.bucket_index())
+        frame.index.name = 'slot'
+        return frame
+
+    def _weekday_hour(self) -> np.ndarray:
+        slots = np.arange(len(self.bucket_kwh))
+        day = slots // self.slots_per_day
+        weekday = (self.origin.weekday() + day) % 7
+        hour = (slots % self.slots_per_day) * self.bucket_minutes // 60
+        return weekday * 24 + hour
+
+    def heatmap(self, tariff: Optional[str] = None) -> np.ndarray:
+        """(7, 24) totaal per weekdag × uur: kWh, of kost onder `tariff`."""
+        values = self.bucket_kwh if tariff is None else self.bucket_cost[tariff]
+        return np.bincount(self._weekday_hour(), weights=values, minlength=7 * 24).reshape(7, 24)
+
+    def hour_profile(self, tariff: Optional[str] = None) -> np.ndarray:
+        """(24,) totaal per uur van de dag: kWh, of kost onder `tariff`."""
+        return self.heatmap(tariff).sum(axis=0)
+
+    def daily(self) -> pd.DataFrame:
+        """Verbruik en kost per tarief per dag."""
+        return self.bucket_frame().resample('D').sum()
+
+
+def _hours_since(timestamps: np.ndarray, origin: np.datetime64) -> np.ndarray:
+    return (timestamps - origin) / np.timedelta64(1, 'h')
+
+
+def _empty_result(tariffs: Mapping[str, TimeOfUseTariff], bucket_minutes: int) -> EnergieResultaat:
+    columns = ['prints', 'gewicht_kg', 'print_uren', 'kwh', 'g_per_kwh', 'gem_kw', LOGGED] + list(tariffs)
+    return EnergieResultaat(
+        pd.Timestamp.now().normalize(), bucket_minutes, np.zeros(0),
+        {name: np.zeros(0) for name in tariffs}, {}, pd.DataFrame(columns=columns),
+        {'prints': 0, 'kwh': 0.0, 'print_uren': 0.0, 'gewicht_kg': 0.0,
+         'kosten': {LOGGED: 0.0, **{name: 0.0 for name in tariffs}}},
+    )
+
+
+def bereken_energie(df: pd.DataFrame, tariffs: Mapping[str, TimeOfUseTariff],
+                    bucket_minutes: int = DEFAULT_BUCKET_MINUTES,
+                    default_power_kw: Optional[float] = None) -> EnergieResultaat:
+    """Verbruik en kosten per slot, per tarief en per materiaal in één pass.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Minstens timestamp en print_hours; printer_power_kw, energy_price,
+        weight_g en material worden gebruikt als ze er zijn
+    tariffs : Mapping[str, TimeOfUseTariff]
+        Te vergelijken contracten
+    bucket_minutes : int
+        Slotbreedte (deler van 1440, bandgrenzen moeten erop vallen)
+    default_power_kw : float, optional
+        Vermogen voor rijen zonder printer_power_kw (default: config)
+
+    Returns:
+    -------
+    EnergieResultaat
+        Lege arrays als er geen bruikbare rijen zijn
+    """
+    if default_power_kw is None:
+        default_power_kw = float(CONFIG_DEFAULTS['printer_power'])
+    default_price = float(CONFIG_DEFAULTS['energy_price'])
+
+    if df.empty:
+        return _empty_result(tariffs, bucket_minutes)
+    timestamps = pd.to_datetime(df['timestamp']).to_numpy(dtype='datetime64[ns]')
+    duration = np.nan_to_num(pd.to_numeric(df['print_hours'], errors='coerce').to_numpy(dtype=np.float64))
+    valid = ~np.isnat(timestamps) & (duration > 0)
+    if not valid.any():
+        return _empty_result(tariffs, bucket_minutes)
+
+    def column(name: str, fallback: float) -> np.ndarray:
+        if name not in df.columns:
+            return np.full(int(valid.sum()), fallback)
+        values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)[valid]
+        return np.where(np.isnan(values), fallback, values)
+
+    power = column('printer_power_kw', default_power_kw)
+    logged_price = column('energy_price', default_price)
+    weight = column('weight_g', 0.0)
+    timestamps, duration = timestamps[valid], duration[valid]
+    material = df['material'] if 'material' in df.columns else pd.Series('Onbekend', index=df.index)
+    if not isinstance(material.dtype, pd.CategoricalDtype):
+        material = material.astype('category')
+    if material.isna().any():
+        material = material.cat.add_categories(['Onbekend']).fillna('Onbekend')
+    codes = material.cat.codes.to_numpy()[valid]
+    categories = material.cat.categories
+
+    # Tijd in slots sinds middernacht van de eerste dag
+    origin = timestamps.min().astype('datetime64[D]')
+    slots_per_hour = 60 / bucket_minutes
+    start = _hours_since(timestamps, origin) * slots_per_hour
+    end = start + duration * slots_per_hour
+    n_slots = int(np.ceil(end.max())) + 1
+
+    # kWh per volledig slot en per print
+    slot_kwh = power / slots_per_hour
+    row_kwh = power * duration
+
+    # Difference array: deel-slot aan begin/einde, volle slots via cumsum
+    start_slot, end_slot = np.floor(start).astype(np.int64), np.floor(end).astype(np.int64)
+    partial = (np.bincount(start_slot, weights=slot_kwh * (1 - (start - start_slot)), minlength=n_slots + 1)
+               - np.bincount(end_slot, weights=slot_kwh * (1 - (end - end_slot)), minlength=n_slots + 1))
+    full = np.cumsum(np.bincount(start_slot + 1, weights=slot_kwh, minlength=n_slots + 1)
+                     - np.bincount(end_slot + 1, weights=slot_kwh, minlength=n_slots + 1))
+    bucket_kwh = (partial + full)[:n_slots]
+
+    # Weekdag en tijdslot per slot (voor de tariefgrids)
+    origin_ts = pd.Timestamp(origin)
+    slots = np.arange(n_slots)
+    slots_per_day = MINUTES_PER_DAY // bucket_minutes
+    weekday = (origin_ts.weekday() + slots // slots_per_day) % 7
+    slot_of_day = slots % slots_per_day
+
+    n_materials = len(categories)
+    per_material = pd.DataFrame({
+        'prints': np.bincount(codes, minlength=n_materials),
+        'gewicht_kg': np.bincount(codes, weights=weight, minlength=n_materials) / 1000,
+        'print_uren': np.bincount(codes, weights=duration, minlength=n_materials),
+        'kwh': np.bincount(codes, weights=row_kwh, minlength=n_materials),
+    }, index=pd.Index(categories, name='material'))
+    per_material['g_per_kwh'] = (per_material['gewicht_kg'] * 1000 / per_material['kwh']).where(per_material['kwh'] > 0)
+    per_material['gem_kw'] = per_material['kwh'] / per_material['print_uren']
+    per_material[LOGGED] = np.bincount(codes, weights=row_kwh * logged_price, minlength=n_materials)
+
+    bucket_cost, band_totals, cost_totals = {}, {}, {LOGGED: float(per_material[LOGGED].sum())}
+    edges = np.arange(n_slots + 1)
+    for name, tariff in tariffs.items():
+        prices, bands = tariff.price_grid(bucket_minutes)
+        slot_price = prices[weekday, slot_of_day]
+        slot_band = bands[weekday, slot_of_day]
+
+        bucket_cost[name] = bucket_kwh * slot_price
+        band_names = tariff.band_names()
+        band_totals[name] = pd.DataFrame({
+            'kwh': np.bincount(slot_band, weights=bucket_kwh, minlength=len(band_names)),
+            'kosten': np.bincount(slot_band, weights=bucket_cost[name], minlength=len(band_names)),
+        }, index=pd.Index(band_names, name='band'))
+
+        # Kost per print: vermogen per slot × (P(einde) - P(start)), P = cumulatieve prijs
+        cumulative = np.concatenate(([0.0], np.cumsum(slot_price)))
+        row_cost = slot_kwh * (np.interp(end, edges, cumulative) - np.interp(start, edges, cumulative))
+        per_material[name] = np.bincount(codes, weights=row_cost, minlength=n_materials)
+        cost_totals[name] = float(bucket_cost[name].sum())
+
+    per_material = per_material[per_material['prints'] > 0].sort_values('kwh', ascending=False)
+    totals = {
+        'prints': int(len(timestamps)),
+        'kwh': float(row_kwh.sum()),
+        'print_uren': float(duration.sum()),
+        'gewicht_kg': float(weight.sum() / 1000),
+        'kosten': cost_totals,
+    }
+    debug("Energie: %d prints, %.1f kWh over %d slots", totals['prints'], totals['kwh'], n_slots)
+    return EnergieResultaat(origin_ts, bucket_minutes, bucket_kwh, bucket_cost, band_totals,
+                            per_material, totals)
+
+
+class EnergieAnalyse(BaseAnalysis):
+    """Gedeelde basis voor de energie tabs: laden uit de log + bereken_energie().
+
+    Subclasses leveren get_title() en create_tabs(result); de tabs
+    gebruiken chart_tab() en create_info_box() voor de standaard layout.
+    """
+
+    REQUIRED_COLUMNS = ENERGY_COLUMNS
+    BUCKET_MINUTES = DEFAULT_BUCKET_MINUTES
+
+    def __init__(self, data_manager=None, parent_frame=None, colors=None):
+        super().__init__(data_manager, parent_frame, colors)
+        self.figures = {}
+        self.canvases = {}
+
+    def load_data(self) -> pd.DataFrame:
+        """Laad de energie kolommen uit calculation_log.csv (join met config versies)."""
+        if self._is_cache_valid():
+            return self._data_cache['data'].copy()
+
+        if getattr(self.data_manager, 'db', None) is not None:
+            df = self.data_manager.load_calculation_log()
+            df = df[[c for c in self.REQUIRED_COLUMNS if c in df.columns]]
+        else:
+            log_path = os.path.join(self.exports_dir(), 'berekeningen', 'calculation_log.csv')
+            if not os.path.exists(log_path):
+                print(f"calculation_log.csv not found at: {log_path}")
+                return pd.DataFrame(columns=self.REQUIRED_COLUMNS)
+            df = load_calculation_log(log_path, columns=self.REQUIRED_COLUMNS)
+        print(f"Loaded {len(df)} rows from calculation_log.csv (energie)")
+
+        self._data_cache = {'data': df, 'timestamp': time.time()}
+        return df.copy()
+
+    def tariffs(self) -> Dict[str, TimeOfUseTariff]:
+        """Te vergelijken contracten (voorbeelden + user_settings.json)."""
+        return load_tariffs()
+
+    def analyze(self) -> Dict[str, Any]:
+        """Verbruik, kosten per tarief en efficiency per materiaal."""
+        df = self.load_data()
+        if df.empty:
+            return {'resultaat': None, 'totals': {}}
+        result = bereken_energie(df, self.tariffs(), self.BUCKET_MINUTES)
+        return {'resultaat': result, 'totals': result.totals}
+
+    def create_analysis_widgets(self) -> None:
+        """Notebook met de tabs van de subclass."""
+        result = self.analyze()['resultaat']
+        if result is None or not result.totals['prints']:
+            self.show_no_data_message()
+            return
+
+        self.notebook = ttk.Notebook(self.main_frame)
+        self.notebook.pack(fill='both', expand=True, pady=10)
+        self.create_tabs(result)
+
+        totals = result.totals
+        self.status_label = tk.Label(
+            self.main_frame,
+            text=(f"⚡ {totals['prints']} prints, {totals['print_uren']:.0f} printuren, "
+                  f"{totals['kwh']:.1f} kWh"),
+            font=("Arial", 10),
+            bg=self.colors['bg'],
+            fg=self.colors['text']
+        )
+        self.status_label.pack(pady=5)
+
+    @abstractmethod
+    def create_tabs(self, result: EnergieResultaat) -> None:
+        """Voeg de tabs toe aan self.notebook (subclass)."""
+        pass
+
+    def chart_tab(self, key: str, tab_text: str, title: str,
+                  draw: Callable[[Figure], None], figsize: Tuple[float, float] = (10, 6)) -> tk.Frame:
+        """Tab met een grafiek, fullscreen knop en ruimte voor een info box.
+
+        Parameters:
+        ----------
+        key : str
+            Sleutel in self.figures / self.canvases
+        tab_text : str
+            Tekst op de notebook tab
+        title : str
+            Titel boven de grafiek
+        draw : Callable[[Figure], None]
+            Tekent de grafiek in een lege figuur (ook voor fullscreen)
+        figsize : Tuple[float, float]
+            Figuurgrootte in inch
+
+        Returns:
+        -------
+        tk.Frame
+            Het tab frame
+        """
+        tab_frame = tk.Frame(self.notebook, bg=self.colors['bg'])
+        self.notebook.add(tab_frame, text=tab_text)
+
+        chart_container = tk.Frame(tab_frame, bg='white', relief=tk.FLAT, bd=1)
+        chart_container.pack(fill='both', expand=True, padx=15, pady=15)
+
+        def fullscreen_content(parent):
+            fig = Figure(figsize=(14, 8), facecolor='white', dpi=100)
+            draw(fig)
+            fig.tight_layout(pad=2.0)
+            self.embed_zoomable_figure(fig, parent)
+
+        self.create_chart_header(chart_container, title,
+                                 lambda: self.open_fullscreen_dialog(title, fullscreen_content))
+
+        fig = Figure(figsize=figsize, facecolor='white', dpi=100)
+        draw(fig)
+        fig.tight_layout(pad=2.0)
+
+        canvas_frame = tk.Frame(chart_container, bg='white')
+        canvas_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        canvas = FigureCanvasTkAgg(fig, canvas_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        self.figures[key] = fig
+        self.canvases[key] = canvas
+        return tab_frame
+
+    def update_analysis(self) -> None:
+        """Hermaak de widgets met verse data."""
+        for widget in self.main_frame.winfo_children():
+            widget.destroy()
+        self.create_title()
+        self.create_analysis_widgets()
+        self.create_refresh_button()
+
+
+__all__ = ['CHART_COLORS', 'ENERGY_COLUMNS', 'EnergieAnalyse', 'EnergieResultaat', 'LOGGED', 'bereken_energie']
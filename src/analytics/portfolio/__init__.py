@@ -3,8 +3,22 @@ Portfolio Module
 ================
 
 Analyses voor materiaal portfolio optimalisatie:
-- Pareto analyse (80/20 regel)
-- Portfolio optimalisatie advies
+- Pareto analyse (80/20 regel) over materialen en producten
+- Portfolio optimalisatie advies: welke filamenten op voorraad
+
+Beide lezen uit de winst kubus (winstgevendheid/kubus.py), zodat een
+nieuwe selectie of config wijziging alleen een roll-up kost.
 """
 
-__all__ = ['pareto', 'optimalisatie'] 
\ No newline at end of file
+# Lazy imports om circulaire dependencies te voorkomen
+def get_pareto_analyse():
+    """Lazy import van ParetoAnalyse."""
+    from .pareto import ParetoAnalyse
+    return ParetoAnalyse
+
+def get_portfolio_optimalisatie():
+    """Lazy import van PortfolioOptimalisatie."""
+    from .optimalisatie import PortfolioOptimalisatie
+    return PortfolioOptimalisatie
+
+__all__ = ['pareto', 'optimalisatie', 'get_pareto_analyse', 'get_portfolio_optimalisatie']
@@ -0,0 +1,434 @@
+"""
+Portfolio Optimalisatie Module
+==============================
+
+Welke filamenten moeten op voorraad? Een knapsack over de materialen:
+maximaliseer de verwachte marge over de horizon binnen een voorraad
+budget en een maximum aantal materialen (bijv. AMS plaatsen).
+
+Per materiaal (gevectoriseerd over de roll-up van de winst kubus):
+- volume      kg per maand uit de historiek (filters: opties, periode)
+- marge       historische omzet min de kost volgens de HUIDIGE config:
+              materiaalprijs + printuren × variabele kost per uur +
+              printuren × nozzle slijtage per uur (MATERIAL_PROPERTIES)
+- voorraad    rollen voor dekking_maanden verbruik (minimaal min_rollen),
+              met een maandelijkse voorraadkost over het kapitaal
+- nozzle      een niet-standaard nozzle (Hardened, Ruby) kost één keer
+              de vervangingsprijs als minstens één materiaal hem nodig heeft
+
+Oplossen: exact door alle deelverzamelingen van de kandidaten als één
+bit matrix door te rekenen (tot EXACT_MAX_MATERIALS kandidaten), anders
+greedy op waarde per euro kapitaal. Omdat alles op de kubus roll-up
+draait is opnieuw optimaliseren na een config wijziging een kwestie van
+milliseconden, ook op de volledige historiek.
+
+Bevat 3 visualisaties:
+1. Bar chart - waarde per materiaal over de horizon (gekozen vs niet)
+2. Scatter - marge vs nozzle slijtage per kg (grootte = volume)
+3. Bar chart - voorraad kapitaal per gekozen materiaal vs budget
+
+Instellingen (user_settings.json, sleutel 'portfolio'):
+    "portfolio": {"max_materialen": 8, "budget": 600, "dekking_maanden": 1}
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..winstgevendheid.kubus import week_number
+from ..winstgevendheid.weergave import WinstAnalyse
+from ...core.pricing_context import PricingContext, current_context
+from ...materials import get_material
+from ...utils.instrumentation import traced
+
+try:
+    from ...materials.material_properties import MATERIAL_PROPERTIES
+except ImportError:
+    MATERIAL_PROPERTIES = {}
+
+try:
+    from ...config.user_config import get_config_value
+except ImportError:
+    get_config_value = None
+
+WEEKS_PER_MONTH = 52 / 12
+
+# Daarboven wordt 2^n te groot: greedy
+EXACT_MAX_MATERIALS = 16
+
+# Nozzle die standaard in de printer zit (geen extra kost)
+STANDARD_NOZZLE = 'Brass'
+
+
+@dataclass(frozen=True)
+class PortfolioInstellingen:
+    """Randvoorwaarden voor de voorraad optimalisatie.
+
+    Attributes:
+    ----------
+    max_materialen : int
+        Maximum aantal materialen op voorraad
+    budget : float
+        Maximum voorraad kapitaal in euro
+    dekking_maanden : float
+        Voorraad voor zoveel maanden verbruik
+    min_rollen : int
+        Minimum aantal rollen per gekozen materiaal
+    rol_kg : float
+        Gewicht van één rol in kg
+    horizon_maanden : float
+        Periode waarover marge en voorraadkost geteld worden
+    voorraadkost_pct : float
+        Kost van het voorraad kapitaal per maand (%)
+    """
+    max_materialen: int = 8
+    budget: float = 600.0
+    dekking_maanden: float = 1.0
+    min_rollen: int = 1
+    rol_kg: float = 1.0
+    horizon_maanden: float = 12.0
+    voorraadkost_pct: float = 2.0
+
+
+def load_instellingen(**overrides) -> PortfolioInstellingen:
+    """Standaard instellingen, overschreven door de config en overrides."""
+    settings = PortfolioInstellingen()
+    configured: Dict[str, Any] = {}
+    if get_config_value is not None:
+        try:
+            configured = dict(get_config_value('portfolio', None) or {})
+        except Exception as e:
+            print(f"Portfolio instellingen uit config genegeerd: {e}")
+    values = {**configured, **overrides}
+    known = {f.name: f.type for f in fields(PortfolioInstellingen)}
+    cast = {name: (int if known[name] in (int, 'int') else float)(value)
+            for name, value in values.items() if name in known}
+    return replace(settings, **cast)
+
+
+def nozzle_type(recommended: str) -> str:
+    """Nozzle familie uit de aanbeveling ('Hardened 0.4mm' → 'Hardened')."""
+    return recommended.split()[0] if recommended else STANDARD_NOZZLE
+
+
+@traced('analyze.portfolio_kenmerken')
+def materiaal_kenmerken(materials: pd.DataFrame, weeks: float,
+                        context: Optional[PricingContext] = None) -> pd.DataFrame:
+    """Maandelijkse economie per materiaal met de huidige kostprijs.
+
+    Parameters:
+    ----------
+    materials : pd.DataFrame
+        Roll-up per materiaal (WinstKubus.rollup('material'))
+    weeks : float
+        Aantal weken dat de roll-up beslaat
+    context : PricingContext, optional
+        Prijsparameters (standaard current_context())
+
+    Returns:
+    -------
+    pd.DataFrame
+        Per materiaal: kg_pm, omzet_pm, marge_pm, slijtage_pm, uren_pm,
+        prijs_per_kg, nozzle en nozzle_kost
+    """
+    context = context or current_context()
+    names = [str(m) for m in materials.index]
+    props = [MATERIAL_PROPERTIES.get(name) for name in names]
+    known = [get_material(name) for name in names]
+
+    grams = materials['gewicht'].to_numpy(dtype=np.float64)
+    revenue = materials['omzet'].to_numpy(dtype=np.float64)
+    logged_cost = materials['kosten'].to_numpy(dtype=np.float64)
+    hours_per_gram = np.array([1.0 / p.print_speed_grams_per_hour if p else context.auto_time_per_gram
+                               for p in props])
+    wear_per_hour = np.array([p.wear_cost_per_hour if p else 0.0 for p in props])
+    price_per_kg = np.array([m.price_per_kg if m else np.nan for m in known])
+    # Onbekende materiaalprijs: gelogde kost per kg als benadering
+    logged_per_kg = np.divide(logged_cost * 1000, grams, out=np.zeros_like(grams), where=grams > 0)
+    price_per_kg = np.where(np.isnan(price_per_kg), logged_per_kg, price_per_kg)
+
+    hours = grams * hours_per_gram
+    wear = hours * wear_per_hour
+    cost = grams / 1000 * price_per_kg + hours * context.variable_cost_per_hour + wear
+    per_month = WEEKS_PER_MONTH / max(weeks, 1.0)
+
+    nozzles = [nozzle_type(p.recommended_nozzle) if p else STANDARD_NOZZLE for p in props]
+    return pd.DataFrame({
+        'kg_pm': grams / 1000 * per_month,
+        'omzet_pm': revenue * per_month,
+        'marge_pm': (revenue - cost) * per_month,
+        'slijtage_pm': wear * per_month,
+        'uren_pm': hours * per_month,
+        'prijs_per_kg': price_per_kg,
+        'nozzle': nozzles,
+        'nozzle_kost': [p.nozzle_replacement_cost if p and n != STANDARD_NOZZLE else 0.0
+                        for p, n in zip(props, nozzles)],
+    }, index=pd.Index(names, name='material'))
+
+
+@dataclass
+class PortfolioAdvies:
+    """Resultaat van optimaliseer().
+
+    Attributes:
+    ----------
+    kenmerken : pd.DataFrame
+        materiaal_kenmerken() plus rollen, kapitaal, waarde en voorraad (bool)
+    waarde : float
+        Verwachte waarde van de keuze over de horizon (na nozzle kosten)
+    kapitaal : float
+        Voorraad kapitaal van de keuze
+    nozzles : List[str]
+        Extra nozzle types die aangeschaft moeten worden
+    methode : str
+        'exact' of 'greedy'
+    instellingen : PortfolioInstellingen
+        Gebruikte randvoorwaarden
+    """
+    kenmerken: pd.DataFrame
+    waarde: float
+    kapitaal: float
+    nozzles: List[str]
+    methode: str
+    instellingen: PortfolioInstellingen
+
+    @property
+    def gekozen(self) -> pd.DataFrame:
+        return self.kenmerken[self.kenmerken['voorraad']]
+
+
+def _solve_exact(value: np.ndarray, capital: np.ndarray, groups: np.ndarray, group_cost: np.ndarray,
+                 settings: PortfolioInstellingen) -> np.ndarray:
+    """Beste deelverzameling door alle 2^n keuzes als bit matrix door te rekenen."""
+    n = len(value)
+    bits = ((np.arange(2 ** n)[:, None] >> np.arange(n)) & 1).astype(np.float64)
+    onehot = np.zeros((n, len(group_cost)))
+    onehot[np.arange(n), groups] = 1.0
+    total = bits @ value - ((bits @ onehot) > 0) @ group_cost
+    feasible = (bits @ capital <= settings.budget + 1e-9) & (bits.sum(axis=1) <= settings.max_materialen)
+    best = int(np.argmax(np.where(feasible, total, -np.inf)))
+    return bits[best].astype(bool)
+
+
+def _solve_greedy(value: np.ndarray, capital: np.ndarray, groups: np.ndarray, group_cost: np.ndarray,
+                  settings: PortfolioInstellingen) -> np.ndarray:
+    """Greedy knapsack op waarde per euro kapitaal."""
+    density = value / np.maximum(capital, 1e-9)
+    chosen = np.zeros(len(value), dtype=bool)
+    used_groups = np.zeros(len(group_cost), dtype=bool)
+    spent = 0.0
+    for i in np.argsort(-density, kind='stable'):
+        if chosen.sum() >= settings.max_materialen:
+            break
+        if spent + capital[i] > settings.budget + 1e-9:
+            continue
+        extra = 0.0 if used_groups[groups[i]] else group_cost[groups[i]]
+        if value[i] - extra <= 0:
+            continue
+        chosen[i] = True
+        used_groups[groups[i]] = True
+        spent += capital[i]
+    return chosen
+
+
+@traced('analyze.portfolio_optimaliseer')
+def optimaliseer(kenmerken: pd.DataFrame,
+                 instellingen: Optional[PortfolioInstellingen] = None) -> PortfolioAdvies:
+    """Kies de materialen voor de voorraad (knapsack).
+
+    Parameters:
+    ----------
+    kenmerken : pd.DataFrame
+        Uitvoer van materiaal_kenmerken()
+    instellingen : PortfolioInstellingen, optional
+        Randvoorwaarden (standaard load_instellingen())
+
+    Returns:
+    -------
+    PortfolioAdvies
+        Keuze per materiaal met waarde, kapitaal en extra nozzles
+    """
+    settings = instellingen or load_instellingen()
+    frame = kenmerken.copy()
+    rolls = np.maximum(settings.min_rollen, np.ceil(frame['kg_pm'] * settings.dekking_maanden / settings.rol_kg))
+    frame['rollen'] = rolls.astype(int)
+    frame['kapitaal'] = rolls * settings.rol_kg * frame['prijs_per_kg']
+    holding = frame['kapitaal'] * settings.voorraadkost_pct / 100
+    frame['waarde'] = (frame['marge_pm'] - holding) * settings.horizon_maanden
+
+    # Alleen materialen die los al iets opleveren en in het budget passen
+    candidates = np.flatnonzero((frame['waarde'] > 0).to_numpy() & (frame['kapitaal'] <= settings.budget).to_numpy())
+    value = frame['waarde'].to_numpy()[candidates]
+    capital = frame['kapitaal'].to_numpy()[candidates]
+    groups, nozzle_names = pd.factorize(frame['nozzle'].to_numpy()[candidates])
+    group_cost = (pd.Series(frame['nozzle_kost'].to_numpy()[candidates]).groupby(groups).max()
+                  .reindex(range(len(nozzle_names)), fill_value=0.0).to_numpy())
+
+    if len(candidates) <= EXACT_MAX_MATERIALS:
+        method = 'exact'
+        chosen = _solve_exact(value, capital, groups, group_cost, settings) if len(candidates) else \
+            np.zeros(0, dtype=bool)
+    else:
+        method = 'greedy'
+        chosen = _solve_greedy(value, capital, groups, group_cost, settings)
+
+    frame['voorraad'] = False
+    frame.iloc[candidates[chosen], frame.columns.get_loc('voorraad')] = True
+    used = np.unique(groups[chosen])
+    nozzles = [str(nozzle_names[g]) for g in used if group_cost[g] > 0]
+    return PortfolioAdvies(
+        kenmerken=frame.sort_values('waarde', ascending=False),
+        waarde=float(value[chosen].sum() - group_cost[used].sum()),
+        kapitaal=float(capital[chosen].sum()),
+        nozzles=nozzles,
+        methode=method,
+        instellingen=settings,
+    )
+
+
+class PortfolioOptimalisatie(WinstAnalyse):
+    """Voorraad advies: welke filamenten op voorraad houden."""
+
+    # Materiaal is wat geoptimaliseerd wordt, dus geen materiaal filter
+    FILTERS = ('opties', 'periode')
+
+    def __init__(self, data_manager=None, parent_frame=None, colors=None):
+        """Initialiseer Portfolio Optimalisatie."""
+        super().__init__(data_manager, parent_frame, colors)
+        self.name = "Portfolio Optimalisatie"
+        self.advice: Optional[PortfolioAdvies] = None
+
+    def get_title(self) -> str:
+        """Return titel voor deze analyse."""
+        return "🧮 Portfolio Optimalisatie - Voorraad Advies"
+
+    def selected_weeks(self, where: Dict[str, Any]) -> int:
+        """Aantal weken in de periode selectie (voor de maandbedragen)."""
+        weeks = self.cube.n_weeks
+        if 'week' in where and self.cube.first_week is not None:
+            start = week_number([pd.Timestamp(where['week'][0]).to_datetime64()])[0]
+            weeks -= max(0, int(start) - self.cube.first_week)
+        return max(weeks, 1)
+
+    def optimise(self, where: Dict[str, Any]) -> PortfolioAdvies:
+        """Kenmerken met de actuele config en de knapsack oplossing."""
+        materials = self.cube.rollup('material', **where)
+        return optimaliseer(materiaal_kenmerken(materials, self.selected_weeks(where)))
+
+    def analyze(self) -> Dict[str, Any]:
+        """Voorraad advies voor de huidige selectie."""
+        self.load_data()
+        advice = self.optimise(self.where())
+        return {'advies': advice, 'kenmerken': advice.kenmerken, 'waarde': advice.waarde}
+
+    def create_tabs(self) -> None:
+        """Advies, marge vs slijtage en voorraad kapitaal."""
+        self.chart_tab('advies', "✅ Voorraad Advies", "Waarde per Materiaal over de Horizon",
+                       self.draw_advice, self.advice_info)
+        self.chart_tab('slijtage', "⚖️ Marge vs Slijtage", "Marge vs Nozzle Slijtage per kg",
+                       self.draw_wear, self.wear_info)
+        self.chart_tab('voorraad', "📦 Voorraad", "Voorraad Kapitaal vs Budget",
+                       self.draw_stock, self.stock_info)
+
+    def redraw(self) -> None:
+        """Optimaliseer één keer per filterwijziging, teken daarna alle tabs."""
+        self.advice = self.optimise(self.where())
+        super().redraw()
+
+    # === Tab 1: advies ===
+
+    def draw_advice(self, fig, where: Dict[str, Any]) -> None:
+        frame = self.advice.kenmerken
+        if frame.empty:
+            self.no_selection(fig)
+            return
+        ranked = frame.sort_values('waarde')
+        ax = fig.add_subplot(111)
+        colors = ['#2ECC71' if stocked else '#BDC3C7' for stocked in ranked['voorraad']]
+        ax.barh(ranked.index.astype(str), ranked['waarde'], color=colors)
+        ax.axvline(0, color='#34495E', linewidth=1)
+        ax.set_xlabel(f"Verwachte waarde over {self.advice.instellingen.horizon_maanden:g} maanden (€)", fontsize=12)
+        ax.grid(axis='x', alpha=0.3)
+        ax.set_title('Voorraad Advies (groen = op voorraad)', fontsize=16, fontweight='bold', pad=15)
+
+    def advice_info(self, where: Dict[str, Any]):
+        advice, settings = self.advice, self.advice.instellingen
+        profitable = advice.kenmerken[advice.kenmerken['waarde'] > 0]
+        if advice.gekozen.empty and not profitable.empty:
+            return "🧮 Advies", [
+                ("Budget te klein", f"€{settings.budget:,.2f} (instelling 'portfolio')"),
+                ("Goedkoopste rendabele", f"{profitable['kapitaal'].idxmin()}: "
+                                          f"€{profitable['kapitaal'].min():,.2f} voorraad"),
+            ]
+        return "🧮 Advies", [
+            ("Op voorraad", f"{len(advice.gekozen)} van max. {settings.max_materialen} materialen"),
+            ("Verwachte waarde", f"€{advice.waarde:,.2f} over {settings.horizon_maanden:g} maanden"),
+            ("Extra nozzles", ', '.join(advice.nozzles) or "geen"),
+            ("Methode", advice.methode),
+        ]
+
+    # === Tab 2: marge vs slijtage ===
+
+    def draw_wear(self, fig, where: Dict[str, Any]) -> None:
+        frame = self.advice.kenmerken[self.advice.kenmerken['kg_pm'] > 0]
+        if frame.empty:
+            self.no_selection(fig)
+            return
+        margin_per_kg = frame['marge_pm'] / frame['kg_pm']
+        wear_per_kg = frame['slijtage_pm'] / frame['kg_pm']
+        ax = fig.add_subplot(111)
+        sizes = 40 + 400 * frame['kg_pm'] / frame['kg_pm'].max()
+        colors = ['#2ECC71' if stocked else '#E74C3C' for stocked in frame['voorraad']]
+        ax.scatter(wear_per_kg, margin_per_kg, s=sizes, color=colors, alpha=0.6, edgecolors='#2C3E50')
+        for material, x, y in zip(frame.index, wear_per_kg, margin_per_kg):
+            ax.annotate(str(material), (x, y), xytext=(5, 5), textcoords='offset points', fontsize=9)
+        ax.axhline(0, color='#34495E', linewidth=1)
+        ax.set_xlabel('Nozzle slijtage per kg (€)', fontsize=12)
+        ax.set_ylabel('Marge per kg (€)', fontsize=12)
+        ax.grid(alpha=0.3)
+        ax.set_title('Marge vs Slijtage (grootte = kg per maand)', fontsize=16, fontweight='bold', pad=15)
+
+    def wear_info(self, where: Dict[str, Any]):
+        frame = self.advice.kenmerken
+        wear = frame['slijtage_pm'].sort_values(ascending=False)
+        return "🔧 Hoogste slijtage per maand", [
+            (str(material), f"€{value:.2f} ({frame.loc[material, 'nozzle']}, "
+                            f"marge €{frame.loc[material, 'marge_pm']:.2f})")
+            for material, value in wear.head(5).items() if value > 0
+        ]
+
+    # === Tab 3: voorraad kapitaal ===
+
+    def draw_stock(self, fig, where: Dict[str, Any]) -> None:
+        stocked = self.advice.gekozen.sort_values('kapitaal', ascending=False)
+        if stocked.empty:
+            self.no_selection(fig)
+            return
+        ax = fig.add_subplot(111)
+        x = np.arange(len(stocked))
+        ax.bar(x, stocked['kapitaal'], color='#3498DB')
+        ax.plot(x, stocked['kapitaal'].cumsum(), color='#34495E', marker='o', linewidth=2, label='Cumulatief')
+        ax.axhline(self.advice.instellingen.budget, color='#E74C3C', linestyle='--', linewidth=1.5,
+                   label=f"Budget: €{self.advice.instellingen.budget:,.0f}")
+        ax.set_xticks(x)
+        ax.set_xticklabels(stocked.index.astype(str), rotation=30, ha='right')
+        ax.set_ylabel('Voorraad kapitaal (€)', fontsize=12)
+        ax.legend(loc='upper left')
+        ax.grid(axis='y', alpha=0.3)
+        ax.set_title('Voorraad Kapitaal per Materiaal', fontsize=16, fontweight='bold', pad=15)
+
+    def stock_info(self, where: Dict[str, Any]):
+        stocked = self.advice.gekozen
+        items = [("Kapitaal", f"€{self.advice.kapitaal:,.2f} van €{self.advice.instellingen.budget:,.2f}")]
+        items += [(str(material), f"{int(row['rollen'])} rol(len), {row['kg_pm']:.1f} kg/maand")
+                  for material, row in stocked.head(5).iterrows()]
+        return "📦 Voorraad", items
+
+
+__all__ = ['PortfolioAdvies', 'PortfolioInstellingen', 'PortfolioOptimalisatie', 'load_instellingen',
+           'materiaal_kenmerken', 'optimaliseer']
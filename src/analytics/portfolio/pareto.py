@@ -0,0 +1,315 @@
+"""
+Pareto Analyse Module
+=====================
+
+Welke materialen en producten leveren het grootste deel van de omzet
+en winst op (80/20 regel)? Bevat 3 visualisaties (filters: materiaal,
+opties, periode):
+1. Pareto chart - omzet per materiaal met cumulatief aandeel
+2. Pareto chart - omzet per product (catalogus) met cumulatief aandeel
+3. Bar chart - ABC klassen: aandeel items vs aandeel omzet en winst
+
+De curve zelf is één argsort plus cumsum (pareto_curve). Materialen
+komen uit de winst kubus, producten uit de is_product rijen die één
+keer als numpy arrays geladen worden en per filter met een masker en
+bincount opgeteld worden.
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..winstgevendheid.kubus import OPTION_FLAGS, OPTION_LABELS, week_number
+from ..winstgevendheid.weergave import WinstAnalyse
+from ...utils.instrumentation import traced
+from ...utils.schema import to_bool_series
+
+# Cumulatieve grenzen (%) van de A en B klasse
+ABC_LIMITS = (80.0, 95.0)
+ABC_COLORS = {'A': '#2ECC71', 'B': '#F39C12', 'C': '#E74C3C'}
+
+PRODUCT_COLUMNS = ['timestamp', 'material', 'product_name', 'sell_price', 'profit_amount',
+                   'multicolor', 'abrasive', 'rush', 'is_product']
+
+
+def pareto_curve(values: pd.Series, limits: Tuple[float, float] = ABC_LIMITS) -> pd.DataFrame:
+    """Pareto curve: waarden aflopend gesorteerd met cumulatief aandeel.
+
+    Parameters:
+    ----------
+    values : pd.Series
+        Waarde per item (index = item); negatieve waarden tellen als 0
+        in de aandelen maar blijven zichtbaar in 'waarde'
+    limits : Tuple[float, float]
+        Cumulatieve grenzen (%) voor klasse A en B
+
+    Returns:
+    -------
+    pd.DataFrame
+        Per item (aflopend): waarde, aandeel_pct, cum_pct, rang,
+        item_pct (cumulatief aandeel items) en klasse (A/B/C)
+    """
+    raw = values.to_numpy(dtype=np.float64)
+    order = np.argsort(-raw, kind='stable')
+    ordered = raw[order]
+    positive = np.clip(ordered, 0.0, None)
+    total = positive.sum()
+    share = positive / total * 100 if total > 0 else np.zeros(len(positive))
+    cumulative = np.cumsum(share)
+    # Klasse op basis van het aandeel vóór het item: het item dat de
+    # 80% grens overschrijdt hoort nog bij A
+    before = cumulative - share
+    klasse = np.where(before < limits[0], 'A', np.where(before < limits[1], 'B', 'C'))
+    klasse[positive == 0] = 'C'
+    rank = np.arange(1, len(ordered) + 1)
+    return pd.DataFrame({
+        'waarde': ordered,
+        'aandeel_pct': share,
+        'cum_pct': cumulative,
+        'rang': rank,
+        'item_pct': rank / max(len(ordered), 1) * 100,
+        'klasse': klasse,
+    }, index=values.index[order])
+
+
+def pareto_point(curve: pd.DataFrame, pct: float = ABC_LIMITS[0]) -> Tuple[int, float]:
+    """Aantal items (en % van alle items) nodig voor pct van het totaal."""
+    if curve.empty:
+        return 0, 0.0
+    position = min(int(np.searchsorted(curve['cum_pct'].to_numpy(), pct - 1e-9)), len(curve) - 1)
+    return position + 1, float(curve['item_pct'].iloc[position])
+
+
+def abc_summary(curve: pd.DataFrame) -> pd.DataFrame:
+    """Aantal items en aandeel per ABC klasse."""
+    summary = curve.groupby('klasse')['aandeel_pct'].agg(['size', 'sum']).reindex(list(ABC_COLORS), fill_value=0)
+    summary.columns = ['items', 'aandeel_pct']
+    summary['items_pct'] = summary['items'] / max(len(curve), 1) * 100
+    return summary
+
+
+class ProductVerkopen:
+    """Catalogus verkopen als numpy arrays, opgeteld per filter.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Rijen met PRODUCT_COLUMNS (alleen is_product rijen tellen)
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        if 'is_product' in df.columns:
+            df = df[to_bool_series(df['is_product']).to_numpy()]
+        names = df['product_name'].fillna('').astype(str).str.strip() if 'product_name' in df.columns \
+            else pd.Series('', index=df.index)
+        timestamps = pd.to_datetime(df['timestamp'], errors='coerce').to_numpy(dtype='datetime64[ns]') \
+            if 'timestamp' in df.columns else np.full(len(df), np.datetime64('NaT'), dtype='datetime64[ns]')
+        keep = (names != '').to_numpy() & ~np.isnat(timestamps)
+
+        codes, self.products = pd.factorize(names[keep])
+        self.product_codes = codes
+        material = df['material'][keep] if 'material' in df.columns else pd.Series('Onbekend', index=df.index[keep])
+        self.material_codes, self.materials = pd.factorize(material.fillna('Onbekend').astype(str))
+        self.options = np.zeros(len(codes), dtype=np.int64)
+        for bit, flag in enumerate(OPTION_FLAGS):
+            if flag in df.columns:
+                self.options |= to_bool_series(df[flag][keep]).to_numpy().astype(np.int64) << bit
+        self.weeks = week_number(timestamps[keep])
+
+        def numeric(column: str) -> np.ndarray:
+            if column not in df.columns:
+                return np.zeros(len(codes))
+            return np.nan_to_num(pd.to_numeric(df[column][keep], errors='coerce').to_numpy(dtype=np.float64))
+
+        self.omzet = numeric('sell_price')
+        self.winst = numeric('profit_amount')
+
+    @classmethod
+    @traced('loading.product_verkopen')
+    def load(cls, data_manager=None, master_path: Optional[str] = None) -> 'ProductVerkopen':
+        """Laad de catalogus verkopen (DataManager query of master CSV)."""
+        if data_manager is not None and hasattr(data_manager, 'select'):
+            return cls(data_manager.select(*PRODUCT_COLUMNS).where(is_product=True).fetch())
+        if master_path and os.path.exists(master_path):
+            return cls(pd.read_csv(master_path, usecols=lambda c: c in PRODUCT_COLUMNS))
+        return cls(pd.DataFrame(columns=PRODUCT_COLUMNS))
+
+    @property
+    def rows(self) -> int:
+        return len(self.product_codes)
+
+    def _mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """Rijen binnen de slice/dice van de filterbalk."""
+        mask = np.ones(self.rows, dtype=bool)
+        if 'material' in where:
+            wanted = np.flatnonzero(self.materials == where['material'])
+            mask &= np.isin(self.material_codes, wanted)
+        if 'opties' in where:
+            mask &= self.options == OPTION_LABELS.index(where['opties'])
+        if 'week' in where:
+            start = where['week'][0] if isinstance(where['week'], tuple) else where['week']
+            if start is not None:
+                mask &= self.weeks >= week_number([pd.Timestamp(start).to_datetime64()])[0]
+        return mask
+
+    @traced('analyze.product_totals')
+    def totals(self, where: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Aantal, omzet en winst per product voor een selectie."""
+        mask = self._mask(where or {})
+        codes = self.product_codes[mask]
+        size = len(self.products)
+        frame = pd.DataFrame({
+            'aantal': np.bincount(codes, minlength=size),
+            'omzet': np.bincount(codes, weights=self.omzet[mask], minlength=size),
+            'winst': np.bincount(codes, weights=self.winst[mask], minlength=size),
+        }, index=pd.Index(self.products, name='product'))
+        return frame[frame['aantal'] > 0]
+
+
+class ParetoAnalyse(WinstAnalyse):
+    """Pareto (80/20) curves en ABC klassen voor materialen en producten."""
+
+    def __init__(self, data_manager=None, parent_frame=None, colors=None):
+        """Initialiseer Pareto analyse."""
+        super().__init__(data_manager, parent_frame, colors)
+        self.name = "Pareto Analyse"
+        self.sales: Optional[ProductVerkopen] = None
+
+    def get_title(self) -> str:
+        """Return titel voor deze analyse."""
+        return "📐 Pareto Analyse - 80/20 Regel"
+
+    def load_data(self):
+        """Winst kubus plus de catalogus verkopen (één keer per refresh)."""
+        cube = super().load_data()
+        if self.sales is None:
+            master_path = os.path.join(self.exports_dir(), 'producten', 'master_calculations.csv')
+            self.sales = ProductVerkopen.load(self.data_manager, master_path)
+        return cube
+
+    def material_curve(self, where: Dict[str, Any], measure: str = 'omzet') -> pd.DataFrame:
+        return pareto_curve(self.cube.rollup('material', **where)[measure])
+
+    def product_curve(self, where: Dict[str, Any], measure: str = 'omzet') -> pd.DataFrame:
+        return pareto_curve(self.sales.totals(where)[measure])
+
+    def analyze(self) -> Dict[str, Any]:
+        """Pareto curves op omzet en winst voor de huidige selectie."""
+        self.load_data()
+        where = self.where()
+        return {
+            'materialen': {m: self.material_curve(where, m) for m in ('omzet', 'winst')},
+            'producten': {m: self.product_curve(where, m) for m in ('omzet', 'winst')},
+            'totals': self.cube.totals(**where),
+        }
+
+    def create_tabs(self) -> None:
+        """Materialen, producten en ABC klassen."""
+        self.chart_tab('materialen', "🎨 Materialen", "Pareto: Omzet per Materiaal",
+                       self.draw_materials, self.material_info)
+        self.chart_tab('producten', "📦 Producten", "Pareto: Omzet per Product",
+                       self.draw_products, self.product_info)
+        self.chart_tab('abc', "🔤 ABC Klassen", "Aandeel Items vs Aandeel Omzet",
+                       self.draw_abc, self.abc_info)
+
+    # === Tab 1 en 2: pareto charts ===
+
+    @staticmethod
+    def draw_pareto(fig, curve: pd.DataFrame, title: str, max_items: int = 30) -> None:
+        """Bars per item (kleur = klasse) met de cumulatieve lijn op een tweede as."""
+        shown = curve.head(max_items)
+        x = np.arange(len(shown))
+        ax = fig.add_subplot(111)
+        ax.bar(x, shown['waarde'], color=[ABC_COLORS[k] for k in shown['klasse']])
+        ax.set_xticks(x)
+        ax.set_xticklabels(shown.index.astype(str), rotation=45, ha='right', fontsize=8 if len(shown) > 15 else 9)
+        ax.set_ylabel('€', fontsize=12)
+        ax.grid(axis='y', alpha=0.3)
+
+        cum_ax = ax.twinx()
+        cum_ax.plot(x, shown['cum_pct'], color='#34495E', marker='o', markersize=4, linewidth=2)
+        for limit in ABC_LIMITS:
+            cum_ax.axhline(limit, color='#7F8C8D', linestyle='--', linewidth=1)
+        cum_ax.set_ylim(0, 105)
+        cum_ax.set_ylabel('Cumulatief aandeel (%)', fontsize=12)
+        suffix = f" (top {max_items} van {len(curve)})" if len(curve) > max_items else ""
+        ax.set_title(title + suffix, fontsize=16, fontweight='bold', pad=15)
+
+    def draw_materials(self, fig, where: Dict[str, Any]) -> None:
+        curve = self.material_curve(where)
+        if curve.empty:
+            self.no_selection(fig)
+            return
+        self.draw_pareto(fig, curve, 'Pareto: Omzet per Materiaal')
+
+    def draw_products(self, fig, where: Dict[str, Any]) -> None:
+        curve = self.product_curve(where)
+        if curve.empty:
+            self.no_selection(fig)
+            return
+        self.draw_pareto(fig, curve, 'Pareto: Omzet per Product')
+
+    def _curve_info(self, curves: Dict[str, pd.DataFrame], noun: str):
+        revenue, profit = curves['omzet'], curves['winst']
+        if revenue.empty:
+            return "📐 80/20", []
+        items, pct = pareto_point(revenue)
+        profit_items, profit_pct = pareto_point(profit)
+        return "📐 80/20", [
+            ("80% van de omzet", f"{items} van {len(revenue)} {noun} ({pct:.0f}%)"),
+            ("80% van de winst", f"{profit_items} van {len(profit)} {noun} ({profit_pct:.0f}%)"),
+            ("Grootste", f"{revenue.index[0]}: {revenue['aandeel_pct'].iloc[0]:.1f}% van de omzet"),
+        ]
+
+    def material_info(self, where: Dict[str, Any]):
+        return self._curve_info({m: self.material_curve(where, m) for m in ('omzet', 'winst')}, 'materialen')
+
+    def product_info(self, where: Dict[str, Any]):
+        return self._curve_info({m: self.product_curve(where, m) for m in ('omzet', 'winst')}, 'producten')
+
+    # === Tab 3: ABC klassen ===
+
+    def draw_abc(self, fig, where: Dict[str, Any]) -> None:
+        groups = [('Materialen', self.material_curve(where)), ('Producten', self.product_curve(where))]
+        groups = [(name, curve) for name, curve in groups if not curve.empty]
+        if not groups:
+            self.no_selection(fig)
+            return
+        for i, (name, curve) in enumerate(groups):
+            ax = fig.add_subplot(1, len(groups), i + 1)
+            summary = abc_summary(curve)
+            x = np.arange(len(summary))
+            ax.bar(x - 0.2, summary['items_pct'], 0.4, color='#BDC3C7', label='Aandeel items')
+            ax.bar(x + 0.2, summary['aandeel_pct'], 0.4, color=[ABC_COLORS[k] for k in summary.index],
+                   label='Aandeel omzet')
+            ax.set_xticks(x)
+            ax.set_xticklabels([f"{k} ({int(n)})" for k, n in zip(summary.index, summary['items'])])
+            ax.set_ylim(0, 105)
+            ax.set_ylabel('%', fontsize=12)
+            ax.grid(axis='y', alpha=0.3)
+            ax.legend(loc='upper right', fontsize=9)
+            ax.set_title(name, fontsize=14, fontweight='bold')
+
+    def abc_info(self, where: Dict[str, Any]):
+        items = []
+        for name, curve in (('Materialen', self.material_curve(where)), ('Producten', self.product_curve(where))):
+            if curve.empty:
+                continue
+            a_items = curve.index[curve['klasse'] == 'A']
+            items.append((f"{name} A", ', '.join(map(str, a_items[:4])) + (' …' if len(a_items) > 4 else '')))
+            c_share = curve.loc[curve['klasse'] == 'C', 'aandeel_pct'].sum()
+            items.append((f"{name} C", f"{int((curve['klasse'] == 'C').sum())} items, {c_share:.1f}% van de omzet"))
+        return "🔤 ABC Klassen", items
+
+    def update_analysis(self) -> None:
+        """Laad ook de catalogus verkopen opnieuw."""
+        self.sales = None
+        super().update_analysis()
+
+
+__all__ = ['ABC_LIMITS', 'ParetoAnalyse', 'ProductVerkopen', 'abc_summary', 'pareto_curve', 'pareto_point']
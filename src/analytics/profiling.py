@@ -0,0 +1,392 @@
+"""
+Profiling - H2D Price Calculator
+================================
+
+Developer mode voor analyse tabs: cProfile en tracemalloc rond
+analyze(), create_analysis_widgets() en update_analysis().
+
+Bij een trage tab was niet te zien waar de tijd of het geheugen
+heen ging. AnalysisProfiler hangt zich aan een analyse instantie
+(BaseAnalysis.set_profiler) en legt per aanroep vast:
+
+- duur, piek geheugen en netto geheugen (tracemalloc)
+- een .prof bestand (pstats, te openen met snakeviz of `python -m pstats`)
+- een allocatie rapport: top N per module en per regel
+
+profiles/
+└── PrintWaardes/
+    ├── analyze-20261018-142501-1.prof
+    └── analyze-20261018-142501-1.alloc.txt
+
+Geneste aanroepen (analyze() binnen create_analysis_widgets()) worden
+alleen getimed; cProfile en tracemalloc lopen in de buitenste aanroep.
+
+Activeren:
+---------
+- GUI: H2D_PROFILE=1 (of AnalyticsGUI(..., dev_mode=True)); de header
+  toont per tab tijd en piek geheugen van de laatste aanroepen
+- Headless, reproduceerbaar tegen een dataset:
+
+    python -m src.analytics.profiling --exports-dir exports
+    python -m src.analytics.profiling --rows 100000 --seed 42 --analysis PrintWaardes
+
+Gebruik:
+-------
+    >>> profiler = AnalysisProfiler('profiles', top=20)
+    >>> analysis = PrintWaardes(data_manager)
+    >>> analysis.set_profiler(profiler)
+    >>> analysis.analyze()
+    >>> profiler.results['PrintWaardes']['analyze'].describe()
+    'analyze 84 ms · piek 12.4 MB'
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import cProfile
+import importlib
+import io
+import os
+import pkgutil
+import pstats
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+ENV_PROFILE = 'H2D_PROFILE'
+
+# Methoden die in developer mode geprofiled worden
+PROFILED_METHODS = ('analyze', 'create_analysis_widgets', 'update_analysis')
+
+DEFAULT_TOP = 20
+DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parents[2] / 'profiles'
+TRACEBACK_FRAMES = 1  # frames per allocatie (meer = trager, maar diepere rapporten)
+
+
+def profiling_enabled() -> bool:
+    """Staat developer mode aan via H2D_PROFILE?"""
+    value = os.environ.get(ENV_PROFILE, '')
+    return bool(value) and value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def format_bytes(size: float) -> str:
+    """Bytes leesbaar: '12.4 MB', '-3.0 KB'."""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+@dataclass
+class ProfileResult:
+    """Meting van één geprofilede aanroep."""
+    analysis: str
+    method: str
+    seconds: float
+    peak_bytes: Optional[int] = None
+    net_bytes: Optional[int] = None
+    prof_path: Optional[str] = None
+    alloc_path: Optional[str] = None
+    finished: float = field(default_factory=time.time)
+
+    def describe(self) -> str:
+        """Korte regel voor de header overlay."""
+        text = f"{self.method} {self.seconds * 1000:.0f} ms"
+        if self.peak_bytes is not None:
+            text += f" · piek {format_bytes(self.peak_bytes)}"
+        return text
+
+
+def _module_names() -> Dict[str, str]:
+    """{bestandspad: module naam} voor alle geladen modules."""
+    names = {}
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if path:
+            names[os.path.abspath(path)] = name
+    return names
+
+
+def allocation_report(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+                      title: str, top: int = DEFAULT_TOP) -> str:
+    """Tekst rapport met de grootste netto allocaties per module en per regel.
+
+    Parameters:
+    ----------
+    before, after : tracemalloc.Snapshot
+        Snapshots rond de aanroep
+    title : str
+        Kopregel van het rapport
+    top : int
+        Aantal regels per sectie
+    """
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+              tracemalloc.Filter(False, '<unknown>'))
+    before, after = before.filter_traces(ignore), after.filter_traces(ignore)
+
+    modules = _module_names()
+    per_module: Dict[str, List[int]] = {}
+    for stat in after.compare_to(before, 'filename'):
+        filename = stat.traceback[0].filename
+        name = modules.get(os.path.abspath(filename), filename)
+        totals = per_module.setdefault(name, [0, 0])
+        totals[0] += stat.size_diff
+        totals[1] += stat.count_diff
+
+    lines = [title, '', f"Per module (top {top}, netto):"]
+    ranked = sorted(per_module.items(), key=lambda item: abs(item[1][0]), reverse=True)
+    for name, (size, blocks) in ranked[:top]:
+        lines.append(f"  {format_bytes(size):>10} {blocks:>+10,} blokken  {name}")
+
+    lines += ['', f"Per regel (top {top}, netto):"]
+    for stat in after.compare_to(before, 'lineno')[:top]:
+        frame = stat.traceback[0]
+        lines.append(f"  {format_bytes(stat.size_diff):>10} {stat.count_diff:>+10,} blokken  "
+                     f"{frame.filename}:{frame.lineno}")
+    return '\n'.join(lines) + '\n'
+
+
+class AnalysisProfiler:
+    """cProfile + tracemalloc rond analyse methoden, met rapporten op schijf."""
+
+    def __init__(self, output_dir=None, top: int = DEFAULT_TOP, memory: bool = True):
+        """
+        Parameters:
+        ----------
+        output_dir : str | Path, optional
+            Map voor .prof en .alloc.txt bestanden (default: <project>/profiles)
+        top : int
+            Aantal regels per allocatie rapport
+        memory : bool
+            tracemalloc meten (kost extra tijd tijdens de aanroep)
+        """
+        self.output_dir = Path(output_dir) if output_dir else DEFAULT_OUTPUT_DIR
+        self.top = top
+        self.memory = memory
+        self.results: Dict[str, Dict[str, ProfileResult]] = {}
+        self._listeners: List[Callable[[ProfileResult], None]] = []
+        self._active = False
+        self._sequence = 0
+
+    def add_listener(self, callback: Callable[[ProfileResult], None]) -> None:
+        """Callback na elke meting (bijv. de header overlay bijwerken)."""
+        self._listeners.append(callback)
+
+    def attach(self, analysis, methods: Sequence[str] = PROFILED_METHODS) -> None:
+        """Methoden van één analyse instantie via deze profiler laten lopen.
+
+        De wrappers staan als instance attributen op de analyse; de
+        klasse zelf (en andere instanties) blijven ongemoeid.
+        """
+        name = type(analysis).__name__
+        for method in methods:
+            func = getattr(type(analysis), method, None)
+            if func is None or getattr(func, '__isabstractmethod__', False):
+                continue
+            bound = func.__get__(analysis)
+
+            def wrapper(*args, _bound=bound, _method=method, **kwargs):
+                return self.run(name, _method, _bound, *args, **kwargs)
+            setattr(analysis, method, wrapper)
+
+    def detach(self, analysis, methods: Sequence[str] = PROFILED_METHODS) -> None:
+        """Wrappers van attach() weer verwijderen."""
+        for method in methods:
+            analysis.__dict__.pop(method, None)
+
+    def run(self, analysis: str, method: str, func: Callable, *args, **kwargs):
+        """Roep func aan onder cProfile en tracemalloc en leg het resultaat vast."""
+        if self._active:
+            # Genest: de buitenste aanroep profileert al
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record(ProfileResult(analysis, method, time.perf_counter() - start))
+
+        self._active = True
+        started_tracing = self.memory and not tracemalloc.is_tracing()
+        before = None
+        if self.memory:
+            if started_tracing:
+                tracemalloc.start(TRACEBACK_FRAMES)
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profile.enable()
+        except ValueError:  # ander profiler actief (bijv. een debugger)
+            profile = None
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+            result = ProfileResult(analysis, method, time.perf_counter() - start)
+            after = None
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                result.peak_bytes, result.net_bytes = peak - base, current - base
+                after = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+            self._active = False
+            self._save(result, profile, before, after)
+            self._record(result)
+
+    def _save(self, result: ProfileResult, profile: Optional[cProfile.Profile],
+              before: Optional[tracemalloc.Snapshot], after: Optional[tracemalloc.Snapshot]) -> None:
+        self._sequence += 1
+        stamp = datetime.fromtimestamp(result.finished).strftime('%Y%m%d-%H%M%S')
+        directory = self.output_dir / result.analysis
+        stem = f"{result.method}-{stamp}-{self._sequence}"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            if profile is not None:
+                result.prof_path = str(directory / f"{stem}.prof")
+                profile.dump_stats(result.prof_path)
+            if before is not None and after is not None:
+                title = (f"Allocaties {result.analysis}.{result.method} ({stamp}): "
+                         f"{result.seconds * 1000:.1f} ms, piek {format_bytes(result.peak_bytes)}, "
+                         f"netto {format_bytes(result.net_bytes)}")
+                result.alloc_path = str(directory / f"{stem}.alloc.txt")
+                with open(result.alloc_path, 'w', encoding='utf-8') as f:
+                    f.write(allocation_report(before, after, title, self.top))
+        except OSError as e:
+            print(f"Profiel voor {result.analysis}.{result.method} niet opgeslagen: {e}")
+
+    def _record(self, result: ProfileResult) -> None:
+        self.results.setdefault(result.analysis, {})[result.method] = result
+        for callback in self._listeners:
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"Profiler listener fout: {e}")
+
+    def describe(self, analysis: str) -> str:
+        """Overlay tekst voor één analyse: laatste meting per methode."""
+        results = self.results.get(analysis)
+        if not results:
+            return "⏱ nog geen metingen"
+        ordered = [results[m] for m in PROFILED_METHODS if m in results]
+        return "⏱ " + "  |  ".join(r.describe() for r in ordered)
+
+
+# === HEADLESS ===
+
+def analysis_classes() -> List[type]:
+    """Alle concrete BaseAnalysis subklassen in src.analytics.
+
+    Importeert elke submodule zodat nieuwe analyses zonder registratie
+    gevonden worden; een module met een ontbrekende optionele
+    afhankelijkheid (bijv. seaborn) wordt overgeslagen.
+    """
+    from .base_analysis import BaseAnalysis
+    package = importlib.import_module(__package__)
+    for module in pkgutil.walk_packages(package.__path__, f'{__package__}.'):
+        try:
+            importlib.import_module(module.name)
+        except ImportError as e:
+            print(f"Overgeslagen: {module.name} ({e})")
+
+    found, pending = [], list(BaseAnalysis.__subclasses__())
+    while pending:
+        cls = pending.pop(0)
+        pending.extend(cls.__subclasses__())
+        if not getattr(cls, '__abstractmethods__', None) and cls not in found:
+            found.append(cls)
+    return sorted(found, key=lambda cls: cls.__name__)
+
+
+def print_stats(prof_path: str, limit: int, sort: str = 'cumulative') -> None:
+    """Top `limit` functies uit een .prof bestand."""
+    stream = io.StringIO()
+    pstats.Stats(prof_path, stream=stream).strip_dirs().sort_stats(sort).print_stats(limit)
+    lines = stream.getvalue().strip().splitlines()
+    start = next((i for i, line in enumerate(lines) if line.lstrip().startswith('ncalls')), 0)
+    for line in lines[start:]:
+        print(f"    {line}")
+
+
+def main() -> int:
+    """CLI: profileer analyze() van analyses headless tegen een dataset."""
+    parser = argparse.ArgumentParser(description="Profileer analyses (cProfile + tracemalloc)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--exports-dir', help="Bestaande exports map (default: <project>/exports)")
+    source.add_argument('--rows', type=int, help="Synthetische dataset van N rijen in een tijdelijke map")
+    parser.add_argument('--seed', type=int, default=42, help="Seed van de synthetische dataset")
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--analysis', action='append', default=[],
+                        help="Klassenaam (herhaalbaar, default: alle analyses)")
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT_DIR), help="Map voor de rapporten")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help="Regels per allocatie rapport")
+    parser.add_argument('--stats', type=int, default=10, help="Top functies (cumulatief) per analyse")
+    parser.add_argument('--no-memory', action='store_true', help="Zonder tracemalloc (sneller)")
+    args = parser.parse_args()
+
+    from ..utils.data_manager import DataManager
+
+    temp_dir = None
+    if args.rows:
+        from .synthetic_data import SyntheticCalculations
+        temp_dir = tempfile.mkdtemp(prefix='h2d_profile_')
+        manager = DataManager(temp_dir, backend=args.backend)
+        SyntheticCalculations(seed=args.seed).write_to_data_manager(manager, args.rows)
+        print(f"Dataset: {args.rows:,} synthetische rijen (seed {args.seed}, {args.backend})")
+    else:
+        exports_dir = args.exports_dir or str(Path(__file__).resolve().parents[2] / 'exports')
+        manager = DataManager(exports_dir, backend=args.backend)
+        print(f"Dataset: {exports_dir} ({args.backend})")
+
+    try:
+        classes = analysis_classes()
+        if args.analysis:
+            unknown = set(args.analysis) - {cls.__name__ for cls in classes}
+            if unknown:
+                print(f"Onbekende analyse(s): {', '.join(sorted(unknown))}")
+                return 1
+            classes = [cls for cls in classes if cls.__name__ in args.analysis]
+
+        profiler = AnalysisProfiler(args.output, top=args.top, memory=not args.no_memory)
+        failures = 0
+        for cls in classes:
+            analysis = cls(manager)
+            analysis.set_profiler(profiler)
+            try:
+                analysis.analyze()
+            except Exception as e:
+                print(f"❌ {cls.__name__}.analyze(): {e}")
+                failures += 1
+                continue
+            result = profiler.results[cls.__name__]['analyze']
+            print(f"\n{cls.__name__}: {result.describe()}")
+            if result.alloc_path:
+                print(f"  allocaties: {result.alloc_path}")
+            if result.prof_path:
+                print(f"  profiel:    {result.prof_path}")
+                if args.stats:
+                    print_stats(result.prof_path, args.stats)
+        return 1 if failures else 0
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+__all__ = ['AnalysisProfiler', 'ProfileResult', 'allocation_report', 'analysis_classes',
+           'profiling_enabled']
+
+
+if __name__ == "__main__":
+    sys.exit(main())
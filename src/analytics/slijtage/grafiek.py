@@ -43,6 +43,9 @@ class SlijtageGrafiek(BaseAnalysis):
     - Usage heatmaps
     """
     
+    # Alleen deze kolommen inlezen (print_hours volgt uit weight)
+    REQUIRED_COLUMNS = ['timestamp', 'material', 'weight', 'abrasive']
+    
     def get_title(self) -> str:
         """Return titel voor deze analyse."""
         return "📊 Slijtage Visualisaties"
@@ -113,7 +116,7 @@ class SlijtageGrafiek(BaseAnalysis):
         if 'print_hours' not in df.columns:
             df['print_hours'] = df['weight'] / 20.0
             
-        abrasive_hours = df[df['abrasive'] == True]['print_hours'].sum()
+        abrasive_hours = df[df['abrasive']]['print_hours'].sum()
         normal_hours = df[df['abrasive'] == False]['print_hours'].sum()
         
         # Donut chart
@@ -136,9 +139,9 @@ class SlijtageGrafiek(BaseAnalysis):
         
         # 2. Top 5 Abrasieve Materialen
         ax2 = self.dist_fig.add_subplot(gs[0, 1])
-        abrasive_df = df[df['abrasive'] == True]
+        abrasive_df = df[df['abrasive']]
         if not abrasive_df.empty:
-            material_hours = abrasive_df.groupby('material')['print_hours'].sum()
+            material_hours = abrasive_df.groupby('material', observed=True)['print_hours'].sum()
             top_materials = material_hours.nlargest(5)
             
             bars = ax2.barh(top_materials.index, top_materials.values)
@@ -184,7 +187,7 @@ class SlijtageGrafiek(BaseAnalysis):
         for group, materials in material_groups.items():
             group_df = df[df['material'].isin(materials)]
             normal = group_df[group_df['abrasive'] == False]['print_hours'].sum()
-            abrasive = group_df[group_df['abrasive'] == True]['print_hours'].sum()
+            abrasive = group_df[group_df['abrasive']]['print_hours'].sum()
             normal_hours.append(normal)
             abrasive_hours.append(abrasive)
             
@@ -474,35 +477,20 @@ class SlijtageGrafiek(BaseAnalysis):
         
     def _update_heatmap(self):
         """Update gebruik heatmap."""
-        df = self.load_data()
-        
         # Clear figure
         self.heat_fig.clear()
         
-        if df.empty:
-            ax = self.heat_fig.add_subplot(1, 1, 1)
-            ax.text(0.5, 0.5, 'Geen data beschikbaar', 
-                   ha='center', va='center', transform=ax.transAxes)
-            self.heat_canvas.draw()
-            return
-            
-        # Voeg print_hours toe als nodig
-        if 'print_hours' not in df.columns:
-            df['print_hours'] = df['weight'] / 20.0
-            
         period = self.heat_period.get()
         
-        # Filter data op periode
+        # Bepaal periode; alleen overlappende partities worden gelezen
         now = datetime.now()
         if period == "week":
             start_date = now - timedelta(days=7)
-            df_filtered = df[df['timestamp'] >= start_date]
         elif period == "month":
             start_date = now - timedelta(days=30)
-            df_filtered = df[df['timestamp'] >= start_date]
         else:  # year
             start_date = now - timedelta(days=365)
-            df_filtered = df[df['timestamp'] >= start_date]
+        df_filtered = self.load_period(start=start_date)
             
         if df_filtered.empty:
             ax = self.heat_fig.add_subplot(1, 1, 1)
@@ -511,6 +499,10 @@ class SlijtageGrafiek(BaseAnalysis):
             self.heat_canvas.draw()
             return
             
+        # Voeg print_hours toe als nodig
+        if 'print_hours' not in df_filtered.columns:
+            df_filtered['print_hours'] = df_filtered['weight'] / 20.0
+            
         # Maak pivot table voor heatmap
         df_filtered['hour'] = df_filtered['timestamp'].dt.hour
         df_filtered['weekday'] = df_filtered['timestamp'].dt.day_name()
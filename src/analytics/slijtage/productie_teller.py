@@ -41,6 +41,9 @@ class ProductieSlijtageTeller(BaseAnalysis):
     - Toont impact op prijs per stuk
     """
     
+    # Alleen deze kolommen inlezen (projectie pushdown)
+    REQUIRED_COLUMNS = ['timestamp', 'material', 'weight', 'sell_price', 'product_name', 'is_product']
+    
     def get_title(self) -> str:
         """Return titel voor deze analyse."""
         return "🏭 Productie Slijtage Calculator"
@@ -85,7 +88,7 @@ class ProductieSlijtageTeller(BaseAnalysis):
         
         # Laad unieke producten
         df = self.load_data()
-        products = df[df['is_product'] == True]['product_name'].dropna().unique()
+        products = df[df['is_product']]['product_name'].dropna().unique()
         
         self.product_var = tk.StringVar()
         self.product_combo = ttk.Combobox(
@@ -359,5 +362,5 @@ class ProductieSlijtageTeller(BaseAnalysis):
         """Update de analyse (refresh data)."""
         # Herlaad product lijst
         df = self.load_data()
-        products = df[df['is_product'] == True]['product_name'].dropna().unique()
+        products = df[df['is_product']]['product_name'].dropna().unique()
         self.product_combo['values'] = list(products) 
\ No newline at end of file
@@ -22,6 +22,7 @@ from typing import Dict, Any, Tuple
 import os
 
 from ..base_analysis import BaseAnalysis
+from ...utils.instrumentation import debug, debug_enabled
 from ...materials.material_properties import (
     get_material_properties, 
     calculate_wear_cost,
@@ -44,6 +45,9 @@ class AbrasiveTeller(BaseAnalysis):
     NOZZLE_COST = 25.00  # Kosten vervanging nozzle
     WARNING_THRESHOLD = 0.8  # Waarschuwing bij 80% slijtage
     
+    # Alleen deze kolommen inlezen (print_hours volgt uit weight)
+    REQUIRED_COLUMNS = ['timestamp', 'material', 'weight', 'abrasive']
+    
     def get_title(self) -> str:
         """Return titel voor deze analyse."""
         return "🔧 Abrasive Material Uren Teller"
@@ -318,10 +322,10 @@ class AbrasiveTeller(BaseAnalysis):
             return self._empty_results()
             
         # Debug info
-        print(f"DEBUG Teller: Geladen {len(df)} records")
-        if 'abrasive' in df.columns:
-            print(f"DEBUG Teller: Abrasive kolom gevonden, type: {df['abrasive'].dtype}")
-            print(f"DEBUG Teller: Unieke waarden: {df['abrasive'].unique()}")
+        debug("Teller: Geladen %d records", len(df))
+        if 'abrasive' in df.columns and debug_enabled():
+            debug("Teller: Abrasive kolom gevonden, type: %s", df['abrasive'].dtype)
+            debug("Teller: Unieke waarden: %s", df['abrasive'].unique())
         
         # Bereken print_hours als deze niet bestaat
         if 'print_hours' not in df.columns:
@@ -330,7 +334,7 @@ class AbrasiveTeller(BaseAnalysis):
             df['print_hours'] = df['weight'] / 20.0
             
         # Filter alleen abrasieve prints
-        abrasive_df = df[df['abrasive'] == True].copy()
+        abrasive_df = df[df['abrasive']].copy()
         
         # Bereken totalen
         total_abrasive_hours = abrasive_df['print_hours'].sum()
@@ -362,10 +366,16 @@ class AbrasiveTeller(BaseAnalysis):
         week_start = today - timedelta(days=today.weekday())
         month_start = today.replace(day=1)
         
+        # Alleen de partities van de recentste periode lezen (week kan vóór de maand starten)
+        period_df = self.load_period(min(week_start, month_start), today)
+        if not period_df.empty and 'print_hours' not in period_df.columns:
+            period_df['print_hours'] = period_df['weight'] / 20.0
+        period_abrasive_df = period_df[period_df['abrasive']] if not period_df.empty else period_df
+        
         periods = {
-            'today': self._analyze_period(abrasive_df, df, today, today),
-            'week': self._analyze_period(abrasive_df, df, week_start, today),
-            'month': self._analyze_period(abrasive_df, df, month_start, today),
+            'today': self._analyze_period(period_abrasive_df, period_df, today, today),
+            'week': self._analyze_period(period_abrasive_df, period_df, week_start, today),
+            'month': self._analyze_period(period_abrasive_df, period_df, month_start, today),
             'total': {
                 'abrasive_hours': total_abrasive_hours,
                 'total_hours': total_all_hours,
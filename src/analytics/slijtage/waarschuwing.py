@@ -60,6 +60,12 @@ class MaintenanceWarningSystem(BaseAnalysis):
         'Tungsten Carbide': 1000     # Premium optie
     }
     
+    # Sleutel in de maintenance_state tabel (SQLite backend)
+    STATE_KEY = 'nozzle_maintenance'
+    
+    # Alleen deze kolommen inlezen (print_hours volgt uit weight)
+    REQUIRED_COLUMNS = ['timestamp', 'material', 'weight', 'abrasive']
+    
     def __init__(self, data_manager, parent_frame=None, colors=None):
         super().__init__(data_manager, parent_frame, colors)
         
@@ -83,8 +89,20 @@ class MaintenanceWarningSystem(BaseAnalysis):
         
     def load_maintenance_data(self):
         """Laad maintenance history uit persistent storage."""
+        db = getattr(self.data_manager, 'db', None)
         try:
-            if os.path.exists(self.maintenance_file):
+            if db is not None:
+                self.maintenance_data = db.get_state(self.STATE_KEY)
+                if self.maintenance_data is not None:
+                    return
+                # Eerste keer: bestaande JSON overnemen in de database
+                if os.path.exists(self.maintenance_file):
+                    with open(self.maintenance_file, 'r') as f:
+                        self.maintenance_data = json.load(f)
+                else:
+                    self.maintenance_data = self._default_maintenance_data()
+                db.set_state(self.STATE_KEY, self.maintenance_data)
+            elif os.path.exists(self.maintenance_file):
                 with open(self.maintenance_file, 'r') as f:
                     self.maintenance_data = json.load(f)
             else:
@@ -103,7 +121,11 @@ class MaintenanceWarningSystem(BaseAnalysis):
             
     def save_maintenance_data(self):
         """Sla maintenance data op."""
+        db = getattr(self.data_manager, 'db', None)
         try:
+            if db is not None:
+                db.set_state(self.STATE_KEY, self.maintenance_data)
+                return
             with open(self.maintenance_file, 'w') as f:
                 json.dump(self.maintenance_data, f, indent=2)
         except Exception as e:
@@ -411,24 +433,21 @@ class MaintenanceWarningSystem(BaseAnalysis):
         
     def analyze(self) -> Dict[str, Any]:
         """Analyseer nozzle status en genereer waarschuwingen."""
-        df = self.load_data()
+        # Alleen abrasieve rijen uit de partities sinds installatie lezen
+        install_date = datetime.fromisoformat(
+            self.maintenance_data['current_nozzle']['install_date']
+        )
+        recent_df = self.load_period(start=install_date, abrasive=True)
         
         # Update accumulated hours sinds laatste reset
-        if not df.empty:
-            # Filter data sinds installatie
-            install_date = datetime.fromisoformat(
-                self.maintenance_data['current_nozzle']['install_date']
-            )
-            
-            recent_df = df[df['timestamp'] >= install_date]
-            
+        if not recent_df.empty:
             # Bereken nieuwe abrasieve uren
             if 'abrasive' in recent_df.columns:
-                abrasive_df = recent_df[recent_df['abrasive'] == True]
+                abrasive_df = recent_df[recent_df['abrasive']]
                 if 'print_hours' in abrasive_df.columns:
-                    new_hours = abrasive_df['print_hours'].sum()
+                    new_hours = float(abrasive_df['print_hours'].sum())
                 else:
-                    new_hours = abrasive_df['weight'].sum() / 20.0  # Estimate
+                    new_hours = float(abrasive_df['weight'].sum()) / 20.0  # Estimate
                     
                 # Update material history
                 for material in abrasive_df['material'].unique():
@@ -438,9 +457,9 @@ class MaintenanceWarningSystem(BaseAnalysis):
                     # Bepaal uren voor dit materiaal
                     material_df = abrasive_df[abrasive_df['material'] == material]
                     if 'print_hours' in material_df.columns:
-                        material_hours = material_df['print_hours'].sum()
+                        material_hours = float(material_df['print_hours'].sum())
                     else:
-                        material_hours = material_df['weight'].sum() / 20.0
+                        material_hours = float(material_df['weight'].sum()) / 20.0
                         
                     self.maintenance_data['current_nozzle']['material_history'][material] = material_hours
             else:
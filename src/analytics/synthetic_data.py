@@ -0,0 +1,402 @@
+"""
+Synthetic Data - H2D Price Calculator
+=====================================
+
+Gevectoriseerde, streamende generator van synthetische berekeningen
+voor load tests (tot 10M+ rijen).
+
+De oude generators (generate_test_data.py, sample_data_generator.py)
+bouwden record voor record met random.choices/random.uniform en eigen
+materiaaltabellen die uit de pas liepen met src/materials. Deze module:
+
+- trekt alle kolommen in bulk met NumPy (np.random.Generator, vaste seed)
+- gebruikt de echte tabellen: prijs per gram uit `_MATERIALS`, printsnelheid
+  en slijtage uit `MATERIAL_PROPERTIES`, abrasief via is_abrasive_material
+- rekent kosten en verkoopprijs zoals calculate_costs/calculate_sell_price
+  (PricingContext uit config.CONFIG_DEFAULTS of een eigen config)
+- verdeelt berekeningen realistisch over uren (werkuren) en weekdagen
+  (weekend rustiger); de output is oplopend in tijd
+- levert chunks van begrensde grootte: eerst worden alleen de aantallen per
+  (dag, uur) cel getrokken, daarna wordt elke chunk los opgebouwd
+
+Zelfde seed, start en aantal → identieke data.
+
+Layouts:
+- 'master'  MASTER_COLUMNS (master_calculations.csv / calculations tabel)
+- 'log'     LOG_COLUMNS met config_version (compacte calculation_log.csv)
+- 'legacy'  LEGACY_LOG_COLUMNS (oude 32-kolommen log, zoals generate_test_data)
+
+Gebruik:
+-------
+    >>> generator = SyntheticCalculations(seed=42)
+    >>> for chunk in generator.iter_chunks(10_000_000):   # DataFrames van 100k rijen
+    ...     pass
+    >>> generator.write_csv('master.csv', 1_000_000, layout='master')
+    >>> generator.write_to_data_manager(DataManager('/tmp/exports'), 10_000_000)
+
+    python -m src.analytics.synthetic_data --rows 10000000 --exports-dir /tmp/load_test
+    python -m src.analytics.synthetic_data --rows 1000000 --exports-dir /tmp/db --backend sqlite
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import os
+import time as clock
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config import CONFIG_DEFAULTS
+from ..core.pricing_context import PricingContext
+from ..materials import list_materials
+from ..materials.material_properties import MATERIAL_PROPERTIES, is_abrasive_material
+from ..utils.config_snapshots import ConfigSnapshotStore
+from ..utils.schema import (
+    CONFIG_KEY_TO_COLUMN, LEGACY_LOG_COLUMNS, LOG_COLUMNS, MASTER_COLUMNS, MONTHS, WEEKDAYS,
+)
+
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_DAYS = 30
+
+# Kans per uur van de dag (werkuren drukker) en per weekdag (ma..zo)
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 1, 2, 3, 5, 8, 8, 8, 6, 8, 8, 8, 7, 5, 3, 2, 1, 1, 1, 1]
+WEEKDAY_WEIGHTS = [1.0, 1.0, 1.0, 0.95, 0.85, 0.4, 0.3]
+
+# Gewichtsklassen (min g, max g, kans)
+WEIGHT_RANGES = [(10, 50, 0.3), (50, 150, 0.4), (150, 300, 0.2), (300, 600, 0.1)]
+
+ABRASIVE_SHARE = 0.3        # deel van de prints in CF/GF materiaal
+MANUAL_HOURS_SHARE = 0.2    # handmatige printduur (complexe prints)
+MANUAL_COMPLEXITY = (1.2, 2.5)
+MULTICOLOR_SHARE = 0.15
+RUSH_SHARE = 0.08
+PRODUCT_SHARE = 0.3         # deel dat als product opgeslagen is
+PRODUCT_NAMES = 500         # aantal verschillende productnamen
+
+# Fallbacks zoals cost_engine/material_properties zonder properties
+FALLBACK_SPEED_G_PER_HOUR = 25.0
+FALLBACK_WEAR_PER_HOUR = 0.01
+
+
+class SyntheticCalculations:
+    """Streamende NumPy generator voor berekeningen.
+
+    Parameters:
+    ----------
+    seed : int, optional
+        Seed van np.random.default_rng (None = elke keer anders)
+    start : datetime, optional
+        Begin van de periode (default: vandaag 00:00 min `days` dagen)
+    days : int
+        Lengte van de periode in dagen
+    config : Dict[str, Any], optional
+        Config waarden (GUI sleutels); default config.CONFIG_DEFAULTS
+    chunk_rows : int
+        Maximaal aantal rijen per chunk (bepaalt het geheugengebruik)
+    """
+
+    def __init__(self, seed: Optional[int] = 42, start: Optional[datetime] = None,
+                 days: int = DEFAULT_DAYS, config: Optional[Dict[str, Any]] = None,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        if days <= 0 or chunk_rows <= 0:
+            raise ValueError("days en chunk_rows moeten positief zijn")
+        self.seed = seed
+        self.days = days
+        self.start = start or datetime.combine(date.today() - timedelta(days=days), time())
+        self.chunk_rows = chunk_rows
+        self.config = {**CONFIG_DEFAULTS, **(config or {})}
+        self.context = PricingContext.from_values(self.config)
+
+        # Materiaaltabel uit src/materials (zelfde bron als de engines)
+        materials = list_materials()
+        self.materials = np.array(list(materials))
+        self.price_per_gram = np.array([m.price_per_gram for m in materials.values()])
+        props = [MATERIAL_PROPERTIES.get(name) for name in self.materials]
+        self.speed = np.array([p.print_speed_grams_per_hour if p else FALLBACK_SPEED_G_PER_HOUR
+                               for p in props])
+        self.wear_per_hour = np.array([p.wear_cost_per_hour if p else FALLBACK_WEAR_PER_HOUR
+                                       for p in props])
+        self.abrasive = np.array([is_abrasive_material(name) for name in self.materials])
+
+    # === GENEREREN ===
+
+    def _cell_probabilities(self) -> np.ndarray:
+        """Kans per (dag, uur) cel, in tijdsvolgorde."""
+        weekdays = [(self.start + timedelta(days=d)).weekday() for d in range(self.days)]
+        day_weights = np.array([WEEKDAY_WEIGHTS[w] for w in weekdays])
+        cells = np.outer(day_weights, np.array(HOUR_WEIGHTS, dtype=float)).ravel()
+        return cells / cells.sum()
+
+    def iter_chunks(self, rows: int) -> Iterator[pd.DataFrame]:
+        """Genereer `rows` berekeningen in chunks van maximaal chunk_rows.
+
+        Parameters:
+        ----------
+        rows : int
+            Totaal aantal rijen
+
+        Yields:
+        ------
+        pd.DataFrame
+            Brede chunk (zie build_chunk), oplopend in tijd
+        """
+        rng = np.random.default_rng(self.seed)
+        counts = rng.multinomial(rows, self._cell_probabilities())
+        cumulative = np.cumsum(counts)
+        for offset in range(0, rows, self.chunk_rows):
+            positions = np.arange(offset, min(offset + self.chunk_rows, rows))
+            cells = np.searchsorted(cumulative, positions, side='right')
+            # Rang binnen de cel: ook over chunk grenzen heen oplopend
+            ranks = positions - (cumulative[cells] - counts[cells])
+            yield self.build_chunk(rng, cells, ranks, counts[cells], offset)
+
+    def build_chunk(self, rng: np.random.Generator, cells: np.ndarray, ranks: np.ndarray,
+                    cell_counts: np.ndarray, offset: int) -> pd.DataFrame:
+        """Trek alle kolommen voor één chunk in bulk.
+
+        Parameters:
+        ----------
+        rng : np.random.Generator
+            Gedeelde generator (volgorde van chunks bepaalt de data)
+        cells : np.ndarray
+            (dag * 24 + uur) cel per rij, oplopend
+        ranks, cell_counts : np.ndarray
+            Rang van de rij binnen zijn cel en het aantal rijen in die cel
+        offset : int
+            Index van de eerste rij (voor unieke product ids)
+        """
+        n = len(cells)
+
+        # Tijdstip: elke rij een eigen strook van het uur plus jitter, zodat
+        # de rijen zonder sorteren (en over chunks heen) oplopend zijn
+        within = (ranks + rng.random(n)) / cell_counts * 3600
+        seconds = cells.astype(np.int64) * 3600 + within.astype(np.int64)
+        timestamps = pd.to_datetime(np.datetime64(self.start, 's') + seconds.astype('timedelta64[s]'))
+
+        # Materiaal: eerst abrasief ja/nee, dan uniform binnen de groep
+        # (zonder materialen in één van de groepen alles uit de andere)
+        groups = (np.flatnonzero(~self.abrasive), np.flatnonzero(self.abrasive))
+        if len(groups[0]) and len(groups[1]):
+            is_abrasive = rng.random(n) < ABRASIVE_SHARE
+        else:
+            is_abrasive = np.full(n, len(groups[0]) == 0)
+        material = np.empty(n, dtype=np.intp)
+        for flag, group in enumerate(groups):
+            mask = is_abrasive == bool(flag)
+            if mask.any():
+                material[mask] = group[rng.integers(0, len(group), int(mask.sum()))]
+
+        # Gewicht uit de klassen
+        ranges = np.array([(low, high) for low, high, _ in WEIGHT_RANGES], dtype=float)
+        weight_class = rng.choice(len(WEIGHT_RANGES), n, p=[p for _, _, p in WEIGHT_RANGES])
+        weight = np.round(rng.uniform(ranges[weight_class, 0], ranges[weight_class, 1]), 1)
+
+        # Printduur: automatisch per materiaal, deels handmatig (complexer)
+        auto_hours_used = rng.random(n) >= MANUAL_HOURS_SHARE
+        auto_hours = weight / self.speed[material]
+        print_hours = np.where(auto_hours_used, auto_hours,
+                               np.round(auto_hours * rng.uniform(*MANUAL_COMPLEXITY, n), 2))
+
+        # Kosten en prijs zoals calculate_costs/calculate_sell_price
+        ctx = self.context
+        material_cost = self.price_per_gram[material] * weight
+        variable_cost = (ctx.variable_cost_per_hour + self.wear_per_hour[material]) * print_hours
+        total_cost = material_cost + variable_cost
+        multicolor = rng.random(n) < MULTICOLOR_SHARE
+        rush = rng.random(n) < RUSH_SHARE
+        sell_price = material_cost * ctx.material_factor + variable_cost * ctx.variable_factor
+        sell_price = (sell_price + multicolor * ctx.setup_fee) * np.where(rush, ctx.rush_factor, 1.0)
+        margin_pct = (sell_price - total_cost) / total_cost * 100  # gewicht ≥ 10 g: kosten > 0
+
+        # Producten: vaste set namen, unieke ids per rij
+        is_product = rng.random(n) < PRODUCT_SHARE
+        product_number = rng.integers(0, PRODUCT_NAMES, n)
+
+        return pd.DataFrame({
+            'timestamp': timestamps,
+            'weight': weight,
+            'material': self.materials[material],
+            'print_hours': np.round(print_hours, 2),
+            'material_cost': np.round(material_cost, 2),
+            'variable_cost': np.round(variable_cost, 2),
+            'total_cost': np.round(total_cost, 2),
+            'sell_price': np.round(sell_price, 2),
+            'margin_pct': np.round(margin_pct, 1),
+            'profit_amount': np.round(sell_price - total_cost, 2),
+            'multicolor': multicolor,
+            'abrasive': is_abrasive,
+            'rush': rush,
+            'auto_hours_used': auto_hours_used,
+            'is_product': is_product,
+            'product_number': product_number,
+            'row_number': np.arange(offset, offset + n),
+        })
+
+    # === LAYOUTS ===
+
+    def to_layout(self, chunk: pd.DataFrame, layout: str = 'master',
+                  config_version: int = 1) -> pd.DataFrame:
+        """Zet een brede chunk om naar een CSV/opslag layout.
+
+        Parameters:
+        ----------
+        chunk : pd.DataFrame
+            Uitvoer van build_chunk/iter_chunks
+        layout : str
+            'master', 'log' of 'legacy'
+        config_version : int
+            Versie voor de 'log' layout (zie ConfigSnapshotStore)
+        """
+        ts = chunk['timestamp']
+        stamp = ts.dt.strftime('%Y-%m-%d %H:%M:%S')
+        weekday = pd.Categorical.from_codes(ts.dt.dayofweek.to_numpy(), WEEKDAYS)
+
+        if layout == 'master':
+            name = 'Product ' + chunk['product_number'].astype(str)
+            return pd.DataFrame({
+                'timestamp': stamp,
+                **{c: chunk[c] for c in MASTER_COLUMNS[1:12]},
+                'day_of_week': weekday,
+                'hour_of_day': ts.dt.hour,
+                'month': pd.Categorical.from_codes(ts.dt.month.to_numpy() - 1, MONTHS),
+                'year': ts.dt.year,
+                'product_name': name.where(chunk['is_product'], ''),
+                'product_id': 'SYN' + chunk['row_number'].astype(str),
+                'is_product': chunk['is_product'],
+            })[MASTER_COLUMNS]
+
+        if layout not in ('log', 'legacy'):
+            raise ValueError(f"Onbekende layout '{layout}' (master, log of legacy)")
+        frame = pd.DataFrame({
+            'timestamp': stamp,
+            'date': stamp.str.slice(0, 10),
+            'time': stamp.str.slice(11),
+            'day_of_week': weekday,
+            'hour_of_day': ts.dt.hour,
+            'weight_g': chunk['weight'],
+            **{c: chunk[c] for c in ('material', 'print_hours', 'material_cost', 'variable_cost',
+                                     'total_cost', 'sell_price', 'margin_pct', 'profit_amount',
+                                     'multicolor', 'abrasive', 'rush', 'auto_hours_used')},
+        })
+        if layout == 'log':
+            frame['config_version'] = config_version
+            return frame[LOG_COLUMNS]
+        for key, column in CONFIG_KEY_TO_COLUMN.items():
+            frame[column] = self.config[key]
+        return frame[LEGACY_LOG_COLUMNS]
+
+    def config_row(self) -> Dict[str, Any]:
+        """Config waarden met log kolomnamen (voor ConfigSnapshotStore)."""
+        return {column: self.config[key] for key, column in CONFIG_KEY_TO_COLUMN.items()}
+
+    def records(self, rows: int, layout: str = 'legacy') -> List[Dict[str, Any]]:
+        """Alle rijen als lijst van dicts (alleen voor kleine aantallen)."""
+        return [record for chunk in self.iter_chunks(rows)
+                for record in self.to_layout(chunk, layout).astype(object).to_dict('records')]
+
+    # === SCHRIJVEN ===
+
+    def write_csv(self, path: Union[str, Path], rows: int, layout: str = 'master',
+                  append: bool = False) -> int:
+        """Stream `rows` rijen naar een CSV bestand (begrensd geheugen).
+
+        Voor de 'log' layout wordt de config versie in config_versions.csv
+        naast het bestand vastgelegd.
+
+        Parameters:
+        ----------
+        path : Path
+            Doelbestand
+        rows : int
+            Aantal rijen
+        layout : str
+            'master', 'log' of 'legacy'
+        append : bool
+            Toevoegen aan een bestaand bestand (header alleen als het nieuw is)
+
+        Returns:
+        -------
+        int
+            Aantal geschreven rijen
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        version = 1
+        if layout == 'log':
+            version = ConfigSnapshotStore(path.parent).get_or_create_version(self.config_row())
+        header = not (append and path.exists() and path.stat().st_size > 0)
+        mode = 'a' if append else 'w'
+        written = 0
+        with open(path, mode, newline='', encoding='utf-8') as f:
+            for chunk in self.iter_chunks(rows):
+                frame = self.to_layout(chunk, layout, version)
+                frame.to_csv(f, header=header, index=False, lineterminator='\n')
+                header = False
+                written += len(frame)
+        return written
+
+    def write_to_data_manager(self, data_manager, rows: int) -> int:
+        """Stream `rows` berekeningen naar de opslag van een DataManager.
+
+        SQLite backend: master en log rijen in batches via de store. CSV
+        backend: appends aan master_calculations.csv en de compacte
+        calculation_log.csv, buiten de log writer om (bulk load: er mag
+        geen andere schrijver actief zijn).
+
+        Returns:
+        -------
+        int
+            Aantal geschreven rijen
+        """
+        snapshots = data_manager.config_snapshots
+        version = snapshots.get_or_create_version(self.config_row())
+        db = getattr(data_manager, 'db', None)
+        targets = [(data_manager.master_calc_file, 'master'), (data_manager.calc_log_file, 'log')]
+        written = 0
+        for chunk in self.iter_chunks(rows):
+            if db is not None:
+                db.insert_calculations(self.to_layout(chunk, 'master').astype(object).to_dict('records'))
+                db.insert_log_rows(self.to_layout(chunk, 'log', version).astype(object).to_dict('records'))
+            else:
+                for path, layout in targets:
+                    path = Path(path)
+                    header = not path.exists() or path.stat().st_size == 0
+                    self.to_layout(chunk, layout, version).to_csv(
+                        path, mode='a', header=header, index=False, lineterminator='\n')
+            written += len(chunk)
+        return written
+
+
+def main() -> None:
+    """CLI: schrijf een synthetische exports map (CSV of SQLite)."""
+    parser = argparse.ArgumentParser(description="Synthetische berekeningen voor load tests")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Aantal berekeningen")
+    parser.add_argument('--exports-dir', required=True, help="Doelmap (wordt een exports map)")
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help="Periode in dagen")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    from ..utils.data_manager import DataManager
+
+    os.makedirs(args.exports_dir, exist_ok=True)
+    manager = DataManager(args.exports_dir, backend=args.backend)
+    generator = SyntheticCalculations(seed=args.seed, days=args.days, chunk_rows=args.chunk_rows)
+    started = clock.perf_counter()
+    written = generator.write_to_data_manager(manager, args.rows)
+    seconds = clock.perf_counter() - started
+    print(f"✅ {written:,} berekeningen ({args.backend}) in {seconds:.1f}s "
+          f"({written / seconds:,.0f} rijen/s) → {args.exports_dir}")
+
+
+__all__ = ['SyntheticCalculations']
+
+
+if __name__ == "__main__":
+    main()
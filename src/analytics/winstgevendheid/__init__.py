@@ -5,7 +5,22 @@ Winstgevendheid Module
 Analyses voor winstgevendheid en marges:
 - Break-even curves per materiaal
 - Configuratie impact analyse
-- Risk/reward matrix
+- Risk/reward matrix (nog niet geïmplementeerd)
+
+Alle analyses lezen uit de voorberekende winst kubus (kubus.py):
+materiaal × opties × week × gewichtsklasse, incrementeel bijgewerkt.
 """
 
-__all__ = ['breakeven', 'configuratie', 'risico'] 
\ No newline at end of file
+# Lazy imports om circulaire dependencies te voorkomen
+def get_breakeven_analyse():
+    """Lazy import van BreakEvenAnalyse."""
+    from .breakeven import BreakEvenAnalyse
+    return BreakEvenAnalyse
+
+def get_configuratie_impact():
+    """Lazy import van ConfiguratieImpact."""
+    from .configuratie import ConfiguratieImpact
+    return ConfiguratieImpact
+
+__all__ = ['breakeven', 'configuratie', 'kubus', 'weergave',
+           'get_breakeven_analyse', 'get_configuratie_impact']
@@ -0,0 +1,159 @@
+"""
+Break-even Analyse Module
+=========================
+
+Waar ligt het break-even punt van de prijzen? Bevat 3 visualisaties
+op de winst kubus (filters: materiaal, opties, periode):
+1. Lijn grafiek - prijs en kost per print per gewichtsklasse, met de
+   marge als maximale korting voor verlies
+2. Lijn grafiek - cumulatieve omzet vs kosten per week
+3. Bar chart - marge buffer en break-even prijs per kg per materiaal
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+from .weergave import WinstAnalyse
+
+
+class BreakEvenAnalyse(WinstAnalyse):
+    """Break-even curves per gewichtsklasse, week en materiaal."""
+
+    def __init__(self, data_manager=None, parent_frame=None, colors=None):
+        """Initialiseer Break-even analyse."""
+        super().__init__(data_manager, parent_frame, colors)
+        self.name = "Break-even Analyse"
+
+    def get_title(self) -> str:
+        """Return titel voor deze analyse."""
+        return "📉 Break-even Analyse"
+
+    def analyze(self) -> Dict[str, Any]:
+        """Roll-ups voor de huidige selectie."""
+        cube = self.load_data()
+        where = self.where()
+        return {
+            'per_gewicht': cube.rollup('gewicht', **where),
+            'per_week': cube.rollup('week', **where),
+            'per_material': cube.rollup('material', **where),
+            'totals': cube.totals(**where),
+        }
+
+    def create_tabs(self) -> None:
+        """Gewichtsklassen, cumulatief en marge buffer."""
+        self.chart_tab('gewicht', "📉 Per Gewichtsklasse", "Prijs vs Kost per Gewichtsklasse",
+                       self.draw_weight_bands, self.weight_band_info)
+        self.chart_tab('cumulatief', "📈 Cumulatief", "Cumulatieve Omzet vs Kosten",
+                       self.draw_cumulative, self.cumulative_info)
+        self.chart_tab('materialen', "🎯 Marge Buffer", "Marge Buffer per Materiaal",
+                       self.draw_material_buffer, self.material_info)
+
+    # === Tab 1: gewichtsklassen ===
+
+    def draw_weight_bands(self, fig, where: Dict[str, Any]) -> None:
+        bands = self.cube.rollup('gewicht', **where)
+        if bands.empty:
+            self.no_selection(fig)
+            return
+        x = np.arange(len(bands))
+        cost = bands['kosten'] / bands['aantal']
+
+        ax = fig.add_subplot(111)
+        ax.plot(x, bands['omzet_per_print'], marker='o', linewidth=2.5, color='#2ECC71', label='Prijs per print')
+        ax.plot(x, cost, marker='s', linewidth=2.5, color='#E74C3C', label='Kost per print (break-even)')
+        ax.fill_between(x, cost, bands['omzet_per_print'], color='#2ECC71', alpha=0.15)
+        ax.set_xticks(x)
+        ax.set_xticklabels(bands.index)
+        ax.set_xlabel('Gewichtsklasse', fontsize=12)
+        ax.set_ylabel('€ per print', fontsize=12)
+        ax.grid(alpha=0.3)
+
+        margin_ax = ax.twinx()
+        margin_ax.bar(x, bands['marge_pct'], width=0.4, color='#3498DB', alpha=0.25, label='Marge (max. korting)')
+        margin_ax.set_ylabel('Marge (%)', fontsize=12)
+        margin_ax.set_ylim(0, max(100, bands['marge_pct'].max() * 1.1))
+        # Lijnen boven de marge balken
+        ax.set_zorder(margin_ax.get_zorder() + 1)
+        ax.patch.set_visible(False)
+
+        handles, labels = ax.get_legend_handles_labels()
+        margin_handles, margin_labels = margin_ax.get_legend_handles_labels()
+        ax.legend(handles + margin_handles, labels + margin_labels, loc='upper left')
+        ax.set_title('Prijs vs Break-even Kost per Gewichtsklasse', fontsize=16, fontweight='bold', pad=15)
+
+    def weight_band_info(self, where: Dict[str, Any]):
+        bands = self.cube.rollup('gewicht', **where)
+        if bands.empty:
+            return "⚖️ Break-even", []
+        thinnest = bands['marge_pct'].idxmin()
+        return "⚖️ Break-even", [
+            ("Kleinste buffer", f"{thinnest}: {bands.loc[thinnest, 'marge_pct']:.1f}% korting"),
+            ("Meest verkocht", f"{bands['aantal'].idxmax()} ({int(bands['aantal'].max())}x)"),
+            ("Break-even prijs/kg", f"€{bands['kosten'].sum() / bands['gewicht'].sum() * 1000:.2f}"
+             if bands['gewicht'].sum() else "-"),
+        ]
+
+    # === Tab 2: cumulatief per week ===
+
+    def draw_cumulative(self, fig, where: Dict[str, Any]) -> None:
+        weeks = self.cube.rollup('week', **where)
+        if weeks.empty:
+            self.no_selection(fig)
+            return
+        ax = fig.add_subplot(111)
+        revenue, cost = weeks['omzet'].cumsum(), weeks['kosten'].cumsum()
+        ax.plot(weeks.index, revenue, linewidth=2.5, color='#2ECC71', label='Cumulatieve omzet')
+        ax.plot(weeks.index, cost, linewidth=2.5, color='#E74C3C', label='Cumulatieve kosten')
+        ax.fill_between(weeks.index, cost, revenue, where=revenue >= cost, color='#2ECC71', alpha=0.15)
+        ax.fill_between(weeks.index, cost, revenue, where=revenue < cost, color='#E74C3C', alpha=0.15)
+        ax.set_ylabel('€', fontsize=12)
+        ax.legend(loc='upper left')
+        ax.grid(alpha=0.3)
+        ax.set_title('Cumulatieve Omzet vs Kosten per Week', fontsize=16, fontweight='bold', pad=15)
+        fig.autofmt_xdate()
+
+    def cumulative_info(self, where: Dict[str, Any]):
+        weeks = self.cube.rollup('week', **where)
+        if weeks.empty:
+            return "📅 Per week", []
+        best = weeks['winst'].idxmax()
+        return "📅 Per week", [
+            ("Gem. winst per week", f"€{weeks['winst'].mean():.2f}"),
+            ("Beste week", f"{best:%d-%m-%Y}: €{weeks.loc[best, 'winst']:.2f}"),
+            ("Weken met verlies", f"{int((weeks['winst'] < 0).sum())} van {len(weeks)}"),
+        ]
+
+    # === Tab 3: marge buffer per materiaal ===
+
+    def draw_material_buffer(self, fig, where: Dict[str, Any]) -> None:
+        materials = self.cube.rollup('material', **where).sort_values('marge_pct')
+        if materials.empty:
+            self.no_selection(fig)
+            return
+        ax = fig.add_subplot(111)
+        colors = ['#E74C3C' if m < 20 else '#F39C12' if m < 40 else '#2ECC71' for m in materials['marge_pct']]
+        bars = ax.barh(materials.index.astype(str), materials['marge_pct'], color=colors)
+        for bar, per_print in zip(bars, materials['winst_per_print']):
+            ax.annotate(f"€{per_print:.2f}/print", (bar.get_width(), bar.get_y() + bar.get_height() / 2),
+                        xytext=(5, 0), textcoords='offset points', va='center', fontsize=9)
+        ax.set_xlabel('Marge = maximale korting voor verlies (%)', fontsize=12)
+        ax.grid(axis='x', alpha=0.3)
+        ax.set_title('Marge Buffer per Materiaal', fontsize=16, fontweight='bold', pad=15)
+
+    def material_info(self, where: Dict[str, Any]):
+        materials = self.cube.rollup('material', **where)
+        materials = materials[materials['gewicht'] > 0]
+        if materials.empty:
+            return "💶 Break-even prijs per kg", []
+        per_kg = (materials['kosten'] / materials['gewicht'] * 1000).sort_values(ascending=False)
+        return "💶 Break-even prijs per kg", [
+            (str(material), f"€{value:.2f}/kg (verkocht €{materials.loc[material, 'euro_per_kg']:.2f})")
+            for material, value in per_kg.head(6).items()
+        ]
+
+
+__all__ = ['BreakEvenAnalyse']
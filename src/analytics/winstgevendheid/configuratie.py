@@ -0,0 +1,153 @@
+"""
+Configuratie Impact Module
+==========================
+
+Wat leveren de print opties op? Bevat 3 visualisaties op de winst
+kubus (filters: materiaal, opties, periode):
+1. Bar chart - winst per print per optie combinatie
+2. Bar chart - effect van elke optie (met vs zonder)
+3. Heatmap - marge per materiaal × optie combinatie
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+from .kubus import OPTION_FLAGS
+from .weergave import WinstAnalyse
+
+FLAG_LABELS = {'multicolor': 'Multicolor', 'abrasive': 'Abrasive', 'rush': 'Spoed'}
+
+
+class ConfiguratieImpact(WinstAnalyse):
+    """Impact van multicolor, abrasive en spoed op winst en marge."""
+
+    def __init__(self, data_manager=None, parent_frame=None, colors=None):
+        """Initialiseer Configuratie Impact analyse."""
+        super().__init__(data_manager, parent_frame, colors)
+        self.name = "Configuratie Impact"
+
+    def get_title(self) -> str:
+        """Return titel voor deze analyse."""
+        return "⚙️ Configuratie Impact - Opties vs Winst"
+
+    def analyze(self) -> Dict[str, Any]:
+        """Roll-ups per optie combinatie, per flag en materiaal × opties."""
+        cube = self.load_data()
+        where = self.where()
+        return {
+            'per_optie': cube.rollup('opties', **where),
+            'per_flag': {flag: cube.rollup(flag, **where) for flag in OPTION_FLAGS},
+            'matrix': cube.rollup('material', 'opties', **where),
+            'totals': cube.totals(**where),
+        }
+
+    def create_tabs(self) -> None:
+        """Combinaties, effect per optie en materiaal matrix."""
+        self.chart_tab('combinaties', "⚙️ Optie Combinaties", "Winst per Optie Combinatie",
+                       self.draw_combinations, self.combination_info)
+        self.chart_tab('flags', "🏷️ Effect per Optie", "Met vs Zonder Optie",
+                       self.draw_flags, self.flag_info)
+        self.chart_tab('matrix', "🧩 Materiaal × Opties", "Marge per Materiaal en Optie Combinatie",
+                       self.draw_matrix)
+
+    # === Tab 1: combinaties ===
+
+    def draw_combinations(self, fig, where: Dict[str, Any]) -> None:
+        options = self.cube.rollup('opties', **where)
+        if options.empty:
+            self.no_selection(fig)
+            return
+        ax = fig.add_subplot(111)
+        x = np.arange(len(options))
+        bars = ax.bar(x, options['winst_per_print'], color='#3498DB')
+        for bar, count, margin in zip(bars, options['aantal'], options['marge_pct']):
+            ax.annotate(f"{margin:.0f}%\n({int(count)}x)", (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                        ha='center', va='bottom', fontsize=9)
+        ax.set_xticks(x)
+        ax.set_xticklabels(options.index, rotation=20, ha='right')
+        ax.set_ylabel('Winst per print (€)', fontsize=12)
+        ax.grid(axis='y', alpha=0.3)
+        ax.set_title('Winst per Print per Optie Combinatie', fontsize=16, fontweight='bold', pad=15)
+
+    def combination_info(self, where: Dict[str, Any]):
+        options = self.cube.rollup('opties', **where)
+        if options.empty:
+            return "🏆 Combinaties", []
+        best = options['winst_per_print'].idxmax()
+        share = options['winst'] / options['winst'].sum() * 100 if options['winst'].sum() else options['winst'] * 0
+        return "🏆 Combinaties", [
+            ("Meest winstgevend", f"{best}: €{options.loc[best, 'winst_per_print']:.2f}/print"),
+            ("Meest gekozen", f"{options['aantal'].idxmax()} ({int(options['aantal'].max())}x)"),
+            ("Grootste winstaandeel", f"{share.idxmax()}: {share.max():.0f}%"),
+        ]
+
+    # === Tab 2: effect per flag ===
+
+    def _flag_effects(self, where: Dict[str, Any]) -> Dict[str, Dict[bool, float]]:
+        """Winst per print met/zonder per flag (None als een kant ontbreekt)."""
+        effects = {}
+        for flag in OPTION_FLAGS:
+            frame = self.cube.rollup(flag, **where)
+            effects[flag] = {value: frame.loc[value] if value in frame.index else None
+                             for value in (False, True)}
+        return effects
+
+    def draw_flags(self, fig, where: Dict[str, Any]) -> None:
+        effects = self._flag_effects(where)
+        if all(side is None for effect in effects.values() for side in effect.values()):
+            self.no_selection(fig)
+            return
+        ax = fig.add_subplot(111)
+        x = np.arange(len(OPTION_FLAGS))
+        width = 0.38
+        for offset, value, label, color in ((-width / 2, False, 'Zonder', '#95A5A6'),
+                                            (width / 2, True, 'Met', '#3498DB')):
+            heights = [effects[flag][value]['winst_per_print'] if effects[flag][value] is not None else 0
+                       for flag in OPTION_FLAGS]
+            ax.bar(x + offset, heights, width, label=label, color=color)
+        ax.set_xticks(x)
+        ax.set_xticklabels([FLAG_LABELS[flag] for flag in OPTION_FLAGS])
+        ax.set_ylabel('Winst per print (€)', fontsize=12)
+        ax.legend(loc='upper left')
+        ax.grid(axis='y', alpha=0.3)
+        ax.set_title('Winst per Print met vs zonder Optie', fontsize=16, fontweight='bold', pad=15)
+
+    def flag_info(self, where: Dict[str, Any]):
+        items = []
+        for flag, effect in self._flag_effects(where).items():
+            without, with_flag = effect[False], effect[True]
+            if without is None or with_flag is None:
+                items.append((FLAG_LABELS[flag], "geen vergelijking mogelijk"))
+                continue
+            lift = with_flag['winst_per_print'] - without['winst_per_print']
+            margin = with_flag['marge_pct'] - without['marge_pct']
+            items.append((FLAG_LABELS[flag], f"{lift:+.2f} €/print, {margin:+.1f} pp marge"))
+        return "📊 Effect van elke optie", items
+
+    # === Tab 3: materiaal × opties ===
+
+    def draw_matrix(self, fig, where: Dict[str, Any]) -> None:
+        matrix = self.cube.rollup('material', 'opties', **where)
+        if matrix.empty:
+            self.no_selection(fig)
+            return
+        margins = matrix['marge_pct'].unstack('opties')
+        ax = fig.add_subplot(111)
+        image = ax.imshow(np.ma.masked_invalid(margins.to_numpy(dtype=float)), aspect='auto', cmap='RdYlGn')
+        ax.set_xticks(range(len(margins.columns)))
+        ax.set_xticklabels(margins.columns, rotation=30, ha='right', fontsize=9)
+        ax.set_yticks(range(len(margins.index)))
+        ax.set_yticklabels(margins.index.astype(str), fontsize=9)
+        if margins.size <= 120:
+            for (row, col), value in np.ndenumerate(margins.to_numpy(dtype=float)):
+                if not np.isnan(value):
+                    ax.text(col, row, f"{value:.0f}", ha='center', va='center', fontsize=8)
+        fig.colorbar(image, ax=ax, label='Marge (%)')
+        ax.set_title('Marge per Materiaal × Optie Combinatie', fontsize=16, fontweight='bold', pad=15)
+
+
+__all__ = ['ConfiguratieImpact']
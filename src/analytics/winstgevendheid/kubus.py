@@ -0,0 +1,463 @@
+"""
+Winst Kubus - H2D Price Calculator
+==================================
+
+Voorberekende winstgevendheid kubus (OLAP) over alle berekeningen.
+
+DataManager.analyze_calculations() groepeert bij elke aanroep het
+volledige frame opnieuw. De kubus aggregeert één keer per cel en
+wordt daarna alleen nog met nieuwe rijen bijgewerkt:
+
+Dimensies:
+---------
+- material   materiaal (groeit mee met nieuwe materialen)
+- opties     combinatie van de flags multicolor / abrasive / rush (8)
+- week       kalenderweek (maandag), aaneengesloten bereik; filters
+             ronden af op hele weken, maand/jaar volgen de maandag
+- gewicht    gewichtsklasse (WEIGHT_BAND_EDGES)
+
+Maten (som per cel): aantal, omzet, kosten, winst, gewicht (gram).
+Verhoudingen (marge, winst per print) worden pas na het optellen
+berekend, zodat elke roll-up exact blijft.
+
+Queries:
+-------
+- slice      één waarde op een dimensie:     where={'material': 'PLA'}
+- dice       deelverzameling op meerdere:    where={'opties': [...], 'week': (start, end)}
+- roll-up    optellen naar minder dimensies: rollup('material') of een
+             grovere hiërarchie: week → maand → jaar, opties → één flag
+
+    >>> kubus = WinstKubus.from_frame(df)
+    >>> kubus.rollup('material', 'opties', week=('2025-01-01', None))
+    >>> kubus.rollup('maand', abrasive=True)
+
+Incrementeel onderhoud:
+----------------------
+KubusBron houdt een kubus bij voor master_calculations.csv: een warm
+start snapshot (zie utils.warm_start) plus alleen de rijen na de
+laatst verwerkte byte offset. Met de SQLite backend alleen de rijen
+na de hoogste verwerkte id (herbouw als er rijen verwijderd zijn).
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import io
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ...utils.instrumentation import debug, traced
+from ...utils.schema import apply_schema, to_bool_series
+from ...utils.warm_start import SNAPSHOT_REFRESH_ROWS, WarmStartCache, read_rows, warm_start_enabled
+
+# Kolommen uit master_calculations.csv
+CUBE_COLUMNS = ['timestamp', 'material', 'weight', 'total_cost', 'sell_price', 'profit_amount',
+                'multicolor', 'abrasive', 'rush']
+
+DIMENSIONS = ('material', 'opties', 'week', 'gewicht')
+MEASURES = ('aantal', 'omzet', 'kosten', 'winst', 'gewicht')
+
+# Flag → bit in de opties code
+OPTION_FLAGS = ('multicolor', 'abrasive', 'rush')
+OPTION_LABELS = tuple(
+    ' + '.join(flag for bit, flag in enumerate(OPTION_FLAGS) if code >> bit & 1) or 'standaard'
+    for code in range(2 ** len(OPTION_FLAGS))
+)
+
+# Ondergrenzen van de gewichtsklassen in gram (laatste klasse is open)
+WEIGHT_BAND_EDGES = (0, 25, 50, 100, 250, 500, 1000)
+WEIGHT_BAND_LABELS = tuple(
+    f"{low}-{high}g" for low, high in zip(WEIGHT_BAND_EDGES, WEIGHT_BAND_EDGES[1:])
+) + (f"{WEIGHT_BAND_EDGES[-1]}g+",)
+
+# Roll-up niveau → onderliggende dimensie
+LEVELS = {
+    'material': 'material',
+    'opties': 'opties',
+    'week': 'week',
+    'maand': 'week',
+    'jaar': 'week',
+    'gewicht': 'gewicht',
+    **{flag: 'opties' for flag in OPTION_FLAGS},
+}
+
+# Verhoog bij een wijziging in de layout van state()
+KUBUS_VERSION = 1
+
+_MONDAY = np.datetime64('1969-12-29', 'D')  # week 0
+
+
+def week_number(timestamps) -> np.ndarray:
+    """Kalenderweek (sinds maandag 29-12-1969) per timestamp."""
+    days = np.asarray(timestamps, dtype='datetime64[D]')
+    return (days - _MONDAY).astype(np.int64) // 7
+
+
+def week_start(week: Union[int, np.ndarray]) -> pd.DatetimeIndex:
+    """Maandag van een of meer weeknummers."""
+    return pd.DatetimeIndex(_MONDAY + np.atleast_1d(week).astype('timedelta64[D]') * 7)
+
+
+def _as_list(value: Any) -> List[Any]:
+    if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+        return list(value)
+    return [value]
+
+
+class WinstKubus:
+    """Dichte numpy kubus (maat, material, opties, week, gewicht).
+
+    Parameters:
+    ----------
+    materials : Sequence[str]
+        Beginwaarden van de materiaal as
+    """
+
+    def __init__(self, materials: Sequence[str] = ()):
+        self.materials: List[str] = list(materials)
+        self._material_index = {name: i for i, name in enumerate(self.materials)}
+        self.first_week: Optional[int] = None
+        self.data = np.zeros((len(MEASURES), len(self.materials), len(OPTION_LABELS), 0,
+                              len(WEIGHT_BAND_LABELS)))
+
+    # === Opbouw en onderhoud ===
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'WinstKubus':
+        """Bouw een kubus uit een frame met CUBE_COLUMNS."""
+        cube = cls()
+        cube.add(df)
+        return cube
+
+    @property
+    def n_weeks(self) -> int:
+        return self.data.shape[3]
+
+    @property
+    def rows(self) -> int:
+        """Aantal verwerkte berekeningen."""
+        return int(self.data[0].sum())
+
+    def is_empty(self) -> bool:
+        return self.n_weeks == 0
+
+    def _grow(self, materials: Sequence[str], weeks: np.ndarray) -> None:
+        """Maak ruimte voor nieuwe materialen en weken (np.pad, bestaande cellen blijven)."""
+        new = [m for m in materials if m not in self._material_index]
+        pad = [(0, 0)] * self.data.ndim
+        if new:
+            for name in new:
+                self._material_index[name] = len(self.materials)
+                self.materials.append(name)
+            pad[1] = (0, len(new))
+        if len(weeks):
+            low, high = int(weeks.min()), int(weeks.max())
+            if self.first_week is None:
+                self.first_week = low
+                pad[3] = (0, high - low + 1)
+            else:
+                before = max(0, self.first_week - low)
+                after = max(0, high - (self.first_week + self.n_weeks - 1))
+                pad[3] = (before, after)
+                self.first_week -= before
+        if any(p != (0, 0) for p in pad):
+            self.data = np.pad(self.data, pad)
+
+    @traced('analyze.kubus_add')
+    def add(self, df: pd.DataFrame) -> int:
+        """Tel berekeningen bij de kubus op (gevectoriseerd, één bincount per maat).
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Rijen met CUBE_COLUMNS; rijen zonder geldige timestamp worden overgeslagen
+
+        Returns:
+        -------
+        int
+            Aantal verwerkte rijen
+        """
+        if df.empty:
+            return 0
+        timestamps = pd.to_datetime(df['timestamp'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        valid = ~np.isnat(timestamps)
+        if not valid.any():
+            return 0
+
+        def numeric(column: str) -> np.ndarray:
+            if column not in df.columns:
+                return np.zeros(int(valid.sum()))
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)[valid]
+            return np.nan_to_num(values)
+
+        material = df['material'] if 'material' in df.columns else pd.Series('Onbekend', index=df.index)
+        if not isinstance(material.dtype, pd.CategoricalDtype):
+            material = material.astype('category')
+        if material.isna().any():
+            material = material.cat.add_categories(['Onbekend']).fillna('Onbekend')
+        material_codes = material.cat.codes.to_numpy()[valid]
+        used = np.unique(material_codes)
+        names = [str(material.cat.categories[code]) for code in used]
+        weeks = week_number(timestamps[valid])
+        self._grow(names, weeks)
+
+        # Categorie code → positie op de materiaal as
+        lookup = np.zeros(len(material.cat.categories), dtype=np.int64)
+        lookup[used] = [self._material_index[name] for name in names]
+        material_idx = lookup[material_codes]
+        options = np.zeros(len(weeks), dtype=np.int64)
+        for bit, flag in enumerate(OPTION_FLAGS):
+            if flag in df.columns:
+                options |= to_bool_series(df[flag]).to_numpy()[valid].astype(np.int64) << bit
+        weight = numeric('weight')
+        bands = np.searchsorted(WEIGHT_BAND_EDGES, weight, side='right') - 1
+        bands = np.clip(bands, 0, len(WEIGHT_BAND_LABELS) - 1)
+
+        shape = self.data.shape[1:]
+        flat = np.ravel_multi_index((material_idx, options, weeks - self.first_week, bands), shape)
+        size = int(np.prod(shape))
+        values = (None, numeric('sell_price'), numeric('total_cost'), numeric('profit_amount'), weight)
+        for m, weights in enumerate(values):
+            self.data[m] += np.bincount(flat, weights=weights, minlength=size).reshape(shape)
+
+        debug("Winst kubus: %d rijen toegevoegd, %d cellen", len(weeks), size)
+        return len(weeks)
+
+    def state(self) -> Dict[str, Any]:
+        """Picklebare toestand (warm start snapshot)."""
+        return {'version': KUBUS_VERSION, 'materials': list(self.materials),
+                'first_week': self.first_week, 'data': self.data}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> Optional['WinstKubus']:
+        """Kubus uit state(); None bij een andere versie."""
+        if not isinstance(state, dict) or state.get('version') != KUBUS_VERSION:
+            return None
+        cube = cls(state['materials'])
+        cube.first_week = state['first_week']
+        cube.data = state['data']
+        return cube
+
+    # === Queries ===
+
+    def labels(self, dimension: str) -> List[Any]:
+        """Waarden langs een dimensie (weken als maandag timestamp)."""
+        if dimension == 'material':
+            return list(self.materials)
+        if dimension == 'opties':
+            return list(OPTION_LABELS)
+        if dimension == 'week':
+            if self.first_week is None:
+                return []
+            return list(week_start(np.arange(self.first_week, self.first_week + self.n_weeks)))
+        if dimension == 'gewicht':
+            return list(WEIGHT_BAND_LABELS)
+        raise ValueError(f"Onbekende dimensie: {dimension}")
+
+    def _selection(self, **where) -> List[np.ndarray]:
+        """Indices per dimensie voor een slice/dice."""
+        selected = [np.arange(n) for n in self.data.shape[1:]]
+        for key, value in where.items():
+            if value is None:
+                continue
+            if key == 'material':
+                wanted = [self._material_index[m] for m in _as_list(value) if m in self._material_index]
+                selected[0] = np.intersect1d(selected[0], wanted)
+            elif key == 'opties':
+                codes = [OPTION_LABELS.index(v) if isinstance(v, str) else int(v) for v in _as_list(value)]
+                selected[1] = np.intersect1d(selected[1], codes)
+            elif key in OPTION_FLAGS:
+                bit = OPTION_FLAGS.index(key)
+                selected[1] = selected[1][((selected[1] >> bit) & 1) == int(bool(value))]
+            elif key == 'week':
+                # (start, end) inclusief, None = open grens
+                start, end = value if isinstance(value, tuple) else (value, value)
+                weeks = np.arange(self.n_weeks) + (self.first_week or 0)
+                keep = np.ones(len(weeks), dtype=bool)
+                if start is not None:
+                    keep &= weeks >= week_number([pd.Timestamp(start).to_datetime64()])[0]
+                if end is not None:
+                    keep &= weeks <= week_number([pd.Timestamp(end).to_datetime64()])[0]
+                selected[2] = np.intersect1d(selected[2], np.flatnonzero(keep))
+            elif key == 'gewicht':
+                bands = [WEIGHT_BAND_LABELS.index(v) if isinstance(v, str) else int(v) for v in _as_list(value)]
+                selected[3] = np.intersect1d(selected[3], bands)
+            else:
+                raise ValueError(f"Onbekende dimensie voor where: {key}")
+        return selected
+
+    def cells(self, **where) -> Tuple[np.ndarray, Dict[str, List[Any]]]:
+        """Slice/dice: deelkubus (maat, material, opties, week, gewicht) met labels.
+
+        Parameters:
+        ----------
+        **where
+            material / opties / gewicht: waarde of lijst; week: datum of
+            (start, end); multicolor / abrasive / rush: bool
+
+        Returns:
+        -------
+        Tuple[np.ndarray, Dict[str, List[Any]]]
+            Deelkubus en de labels per dimensie
+        """
+        selected = self._selection(**where)
+        cube = self.data[(slice(None),) + np.ix_(*selected)]
+        labels = {dim: [self.labels(dim)[i] for i in idx] for dim, idx in zip(DIMENSIONS, selected)}
+        return cube, labels
+
+    @traced('analyze.kubus_rollup')
+    def rollup(self, *by: str, **where) -> pd.DataFrame:
+        """Roll-up naar de niveaus in `by` (na een optionele slice/dice).
+
+        Parameters:
+        ----------
+        *by : str
+            Niveaus uit LEVELS (bijv. 'material', 'maand', 'abrasive');
+            leeg = één totaalrij
+        **where
+            Filters zoals bij cells()
+
+        Returns:
+        -------
+        pd.DataFrame
+            MEASURES plus marge_pct, winst_per_print, omzet_per_print en
+            euro_per_kg; alleen cellen met berekeningen
+        """
+        for level in by:
+            if level not in LEVELS:
+                raise ValueError(f"Onbekend niveau: {level} (kies uit {', '.join(LEVELS)})")
+        cube, labels = self.cells(**where)
+        needed = {LEVELS[level] for level in by}
+        base = [dim for dim in DIMENSIONS if dim in needed]
+        summed = cube.sum(axis=tuple(1 + i for i, dim in enumerate(DIMENSIONS) if dim not in needed))
+
+        if not base:
+            frame = pd.DataFrame([summed], columns=MEASURES, index=pd.Index(['totaal']))
+        else:
+            index = pd.MultiIndex.from_product([labels[dim] for dim in base], names=base)
+            frame = pd.DataFrame(summed.reshape(len(MEASURES), -1).T, index=index, columns=MEASURES)
+            frame = frame[frame['aantal'] > 0]
+            if list(by) != base:
+                keys = [self._level_values(level, frame.index.get_level_values(LEVELS[level]))
+                        for level in by]
+                frame = frame.groupby(keys).sum()
+                frame.index.names = list(by)
+            elif len(base) == 1:
+                frame.index = frame.index.get_level_values(0)
+        return with_ratios(frame)
+
+    @staticmethod
+    def _level_values(level: str, values: pd.Index) -> pd.Index:
+        """Waarden van een grover niveau (maand, jaar, flag) uit de basis labels."""
+        if level == 'maand':
+            return pd.DatetimeIndex(values).to_period('M').to_timestamp().rename('maand')
+        if level == 'jaar':
+            return pd.DatetimeIndex(values).year.rename('jaar')
+        if level in OPTION_FLAGS:
+            return pd.Index([level in label.split(' + ') for label in values], name=level)
+        return values.rename(level)
+
+    def totals(self, **where) -> Dict[str, float]:
+        """Maten en verhoudingen over de hele (deel)kubus."""
+        return self.rollup(**where).iloc[0].to_dict()
+
+
+def with_ratios(frame: pd.DataFrame) -> pd.DataFrame:
+    """Voeg marge, winst/omzet per print en euro per kg toe aan een roll-up."""
+    frame = frame.copy()
+    count = frame['aantal'].where(frame['aantal'] > 0)
+    frame['marge_pct'] = (frame['winst'] / frame['omzet'].where(frame['omzet'] != 0) * 100).fillna(0.0)
+    frame['winst_per_print'] = (frame['winst'] / count).fillna(0.0)
+    frame['omzet_per_print'] = (frame['omzet'] / count).fillna(0.0)
+    frame['euro_per_kg'] = (frame['omzet'] / (frame['gewicht'] / 1000).where(frame['gewicht'] > 0)).fillna(0.0)
+    return frame
+
+
+def _parse_rows(data: bytes, header: List[str]) -> pd.DataFrame:
+    """Parse ruwe master rijen (zonder header) naar CUBE_COLUMNS."""
+    usecols = [c for c in CUBE_COLUMNS if c in header]
+    if not data:
+        return pd.DataFrame(columns=usecols)
+    df = pd.read_csv(io.BytesIO(data), names=header, header=None, usecols=usecols)
+    return apply_schema(df)
+
+
+class KubusBron:
+    """Houdt een WinstKubus bij voor master_calculations.csv of de SQLite store.
+
+    Parameters:
+    ----------
+    master_path : Path
+        master_calculations.csv
+    db : SQLiteStore, optional
+        SQLite backend (vervangt de CSV)
+    """
+
+    SNAPSHOT_NAME = 'winstkubus'
+
+    def __init__(self, master_path: Union[str, Path], db=None):
+        self.master_path = Path(master_path)
+        self.db = db
+        self.cube: Optional[WinstKubus] = None
+        self.offset = 0         # CSV: verwerkte bytes
+        self.last_id = 0        # SQLite: hoogste verwerkte id
+        self.db_rows = 0        # SQLite: aantal verwerkte rijen
+        self.pending_rows = 0   # rijen sinds de laatste snapshot
+
+    @traced('loading.kubus_refresh')
+    def refresh(self) -> WinstKubus:
+        """Kubus inclusief alle berekeningen die sinds de vorige aanroep binnenkwamen."""
+        if self.db is not None:
+            return self._refresh_db()
+
+        if not self.master_path.exists():
+            self.cube, self.offset = WinstKubus(), 0
+            return self.cube
+
+        size = self.master_path.stat().st_size
+        if self.cube is not None and size == self.offset:
+            return self.cube
+        if self.cube is None or size < self.offset:
+            self._load_snapshot()
+
+        header, data, end = read_rows(self.master_path, self.offset)
+        added = self.cube.add(_parse_rows(data, header))
+        self.offset = end
+        self.pending_rows += added
+        if self.pending_rows >= SNAPSHOT_REFRESH_ROWS and warm_start_enabled():
+            WarmStartCache(self.master_path, self.SNAPSHOT_NAME).save(self.cube.state(), end, header)
+            self.pending_rows = 0
+        return self.cube
+
+    def _refresh_db(self) -> WinstKubus:
+        """SQLite: rijen met een hogere id; herbouw als er rijen verdwenen of gewijzigd zijn."""
+        if self.cube is None:
+            self.cube, self.last_id, self.db_rows = WinstKubus(), 0, 0
+        df, last_id = self.db.query_calculations_after(self.last_id, CUBE_COLUMNS)
+        if self.db.count_calculations() != self.db_rows + len(df):
+            # Verwijderde producten of een gelijktijdige insert: opnieuw vanaf nul
+            df, last_id = self.db.query_calculations_after(0, CUBE_COLUMNS)
+            self.cube, self.db_rows = WinstKubus(), 0
+        self.cube.add(df)
+        self.last_id = last_id
+        self.db_rows += len(df)
+        return self.cube
+
+    def _load_snapshot(self) -> None:
+        """Start van de warm start snapshot, anders van een lege kubus."""
+        snapshot = WarmStartCache(self.master_path, self.SNAPSHOT_NAME).load() if warm_start_enabled() else None
+        cube = WinstKubus.from_state(snapshot.payload) if snapshot is not None else None
+        if cube is not None:
+            self.cube, self.offset, self.pending_rows = cube, snapshot.offset, 0
+        else:
+            # Volledige build: daarna altijd een snapshot
+            self.cube, self.offset, self.pending_rows = WinstKubus(), 0, SNAPSHOT_REFRESH_ROWS
+
+
+__all__ = [
+    'CUBE_COLUMNS', 'DIMENSIONS', 'KubusBron', 'LEVELS', 'MEASURES', 'OPTION_FLAGS', 'OPTION_LABELS',
+    'WEIGHT_BAND_LABELS', 'WinstKubus', 'week_number', 'week_start', 'with_ratios',
+]
@@ -0,0 +1,225 @@
+"""
+Winst Weergave - H2D Price Calculator
+=====================================
+
+Gedeelde basis voor de winstgevendheid tabs.
+
+De data is de WinstKubus van de DataManager (zie kubus.py). Een
+filterbalk (materiaal, opties, periode) bepaalt de slice/dice; bij
+een andere keuze worden alleen de grafieken opnieuw getekend vanuit
+de kubus, zonder de berekeningen opnieuw te laden.
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import os
+import tkinter as tk
+from abc import abstractmethod
+from tkinter import ttk
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from ..base_analysis import BaseAnalysis
+from .kubus import CUBE_COLUMNS, OPTION_LABELS, KubusBron, WinstKubus, week_start
+from ...utils.instrumentation import span
+
+ALL = 'Alle'
+
+# Periode filter → aantal weken terug vanaf de laatste week
+PERIODS = {
+    'Alles': None,
+    'Laatste 4 weken': 4,
+    'Laatste 13 weken': 13,
+    'Laatste 52 weken': 52,
+}
+
+InfoFunc = Callable[[Dict[str, Any]], Tuple[str, Sequence[Tuple[str, str]]]]
+
+
+class WinstAnalyse(BaseAnalysis):
+    """Basis voor analyses op de winst kubus met interactieve filters.
+
+    Subclasses leveren get_title(), analyze() en create_tabs(); een tab
+    registreert zich via chart_tab(draw, info) en wordt bij elke
+    filterwijziging opnieuw getekend met de actuele where().
+    """
+
+    REQUIRED_COLUMNS = CUBE_COLUMNS
+    # Filters in de filterbalk (subset van 'material', 'opties', 'periode')
+    FILTERS = ('material', 'opties', 'periode')
+
+    def __init__(self, data_manager=None, parent_frame=None, colors=None):
+        super().__init__(data_manager, parent_frame, colors)
+        self.cube: Optional[WinstKubus] = None
+        self.charts: Dict[str, Dict[str, Any]] = {}
+        self.filter_vars: Dict[str, tk.StringVar] = {}
+
+    def load_data(self) -> WinstKubus:
+        """Winst kubus van de DataManager (incrementeel bijgewerkt)."""
+        if hasattr(self.data_manager, 'profit_cube'):
+            self.cube = self.data_manager.profit_cube()
+        else:
+            master_path = os.path.join(self.exports_dir(), 'producten', 'master_calculations.csv')
+            self.cube = KubusBron(master_path).refresh()
+        return self.cube
+
+    def where(self) -> Dict[str, Any]:
+        """Slice/dice uit de filterbalk (leeg zonder filterbalk)."""
+        where = {}
+        if not self.filter_vars or self.cube is None:
+            return where
+        material = self.filter_vars['material'].get() if 'material' in self.filter_vars else ALL
+        if material != ALL:
+            where['material'] = material
+        options = self.filter_vars['opties'].get() if 'opties' in self.filter_vars else ALL
+        if options != ALL:
+            where['opties'] = options
+        weeks = PERIODS.get(self.filter_vars['periode'].get()) if 'periode' in self.filter_vars else None
+        if weeks and self.cube.first_week is not None:
+            last_week = self.cube.first_week + self.cube.n_weeks - 1
+            where['week'] = (week_start(last_week - weeks + 1)[0], None)
+        return where
+
+    def create_analysis_widgets(self) -> None:
+        """Filterbalk, notebook met de tabs van de subclass en status."""
+        self.load_data()
+        if self.cube.rows == 0:
+            self.show_no_data_message()
+            return
+
+        self.create_filter_bar()
+        self.notebook = ttk.Notebook(self.main_frame)
+        self.notebook.pack(fill='both', expand=True, pady=10)
+        self.charts = {}
+        self.create_tabs()
+
+        self.status_label = tk.Label(
+            self.main_frame,
+            font=("Arial", 10),
+            bg=self.colors['bg'],
+            fg=self.colors['text']
+        )
+        self.status_label.pack(pady=5)
+        self.redraw()
+
+    @abstractmethod
+    def create_tabs(self) -> None:
+        """Voeg de tabs toe via chart_tab() (subclass)."""
+        pass
+
+    def create_filter_bar(self) -> None:
+        """Comboboxen voor de FILTERS (materiaal, opties, periode)."""
+        bar = tk.Frame(self.main_frame, bg=self.colors['bg'])
+        bar.pack(fill='x', padx=15, pady=(5, 0))
+
+        filters = (
+            ('material', "Materiaal", [ALL] + sorted(self.cube.materials)),
+            ('opties', "Opties", [ALL] + list(OPTION_LABELS)),
+            ('periode', "Periode", list(PERIODS)),
+        )
+        for key, label, values in filters:
+            if key not in self.FILTERS:
+                continue
+            tk.Label(bar, text=f"{label}:", font=("Arial", 10, "bold"),
+                     bg=self.colors['bg'], fg=self.colors['text']).pack(side='left', padx=(10, 5))
+            var = tk.StringVar(value=values[0])
+            box = ttk.Combobox(bar, textvariable=var, values=values, state='readonly', width=22)
+            box.pack(side='left')
+            box.bind('<<ComboboxSelected>>', lambda event: self.redraw())
+            self.filter_vars[key] = var
+
+    def chart_tab(self, key: str, tab_text: str, title: str,
+                  draw: Callable[[Figure, Dict[str, Any]], None],
+                  info: Optional[InfoFunc] = None, figsize: Tuple[float, float] = (10, 6)) -> tk.Frame:
+        """Tab met een grafiek die bij elke filterwijziging hertekend wordt.
+
+        Parameters:
+        ----------
+        key : str
+            Sleutel in self.charts
+        tab_text : str
+            Tekst op de notebook tab
+        title : str
+            Titel boven de grafiek
+        draw : Callable[[Figure, Dict], None]
+            Tekent in een lege figuur voor de gegeven where()
+        info : Callable[[Dict], Tuple[str, items]], optional
+            Titel en kaartjes voor de info box onder de grafiek
+        figsize : Tuple[float, float]
+            Figuurgrootte in inch
+
+        Returns:
+        -------
+        tk.Frame
+            Het tab frame
+        """
+        tab_frame = tk.Frame(self.notebook, bg=self.colors['bg'])
+        self.notebook.add(tab_frame, text=tab_text)
+
+        chart_container = tk.Frame(tab_frame, bg='white', relief=tk.FLAT, bd=1)
+        chart_container.pack(fill='both', expand=True, padx=15, pady=15)
+
+        def fullscreen_content(parent):
+            fig = Figure(figsize=(14, 8), facecolor='white', dpi=100)
+            draw(fig, self.where())
+            fig.tight_layout(pad=2.0)
+            self.embed_zoomable_figure(fig, parent)
+
+        self.create_chart_header(chart_container, title,
+                                 lambda: self.open_fullscreen_dialog(title, fullscreen_content))
+
+        fig = Figure(figsize=figsize, facecolor='white', dpi=100)
+        canvas_frame = tk.Frame(chart_container, bg='white')
+        canvas_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        canvas = FigureCanvasTkAgg(fig, canvas_frame)
+        canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        self.charts[key] = {'figure': fig, 'canvas': canvas, 'draw': draw,
+                            'info': info, 'tab': tab_frame, 'info_frame': None}
+        return tab_frame
+
+    def redraw(self) -> None:
+        """Hertekend alle grafieken en info boxen voor de huidige filters."""
+        where = self.where()
+        with span('render.winst_filter', analysis=type(self).__name__):
+            for chart in self.charts.values():
+                fig = chart['figure']
+                fig.clear()
+                chart['draw'](fig, where)
+                fig.tight_layout(pad=2.0)
+                chart['canvas'].draw_idle()
+
+                if chart['info'] is not None:
+                    if chart['info_frame'] is not None:
+                        chart['info_frame'].destroy()
+                    title, items = chart['info'](where)
+                    chart['info_frame'] = self.create_info_box(chart['tab'], title, items)
+
+            totals = self.cube.totals(**where)
+            self.status_label.config(
+                text=(f"💶 {int(totals['aantal'])} berekeningen, omzet €{totals['omzet']:,.2f}, "
+                      f"winst €{totals['winst']:,.2f}, marge {totals['marge_pct']:.1f}%")
+            )
+
+    @staticmethod
+    def no_selection(fig: Figure) -> None:
+        """Lege grafiek als de selectie geen berekeningen bevat."""
+        ax = fig.add_subplot(111)
+        ax.text(0.5, 0.5, "Geen berekeningen voor deze selectie", ha='center', va='center',
+                fontsize=14, color='#7F8C8D', transform=ax.transAxes)
+        ax.set_axis_off()
+
+    def update_analysis(self) -> None:
+        """Hermaak de widgets (de kubus verwerkt alleen nieuwe rijen)."""
+        for widget in self.main_frame.winfo_children():
+            widget.destroy()
+        self.filter_vars = {}
+        self.create_title()
+        self.create_analysis_widgets()
+        self.create_refresh_button()
+
+
+__all__ = ['ALL', 'PERIODS', 'WinstAnalyse']
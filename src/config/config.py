@@ -61,6 +61,47 @@ def _load_user_configuration() -> Dict[str, Any]:
     return {}
 
 
+# Standaard waarden (zelfde eenheden als user_settings.json: percentages in %)
+CONFIG_DEFAULTS: Final[Dict[str, float]] = {
+    'printer_power': 1.05,
+    'energy_price': 0.35,
+    'labour_cost': 27.80,
+    'monitoring_pct': 10,
+    'maintenance_cost': 0.0765,
+    'overhead_year': 7200,
+    'annual_hours': 1920,
+    'markup_material': 180,
+    'markup_variable': 140,
+    'spoed_surcharge': 25,
+    'abrasive_surcharge': 0.50,
+    'color_fee_min': 15,
+    'color_fee_max': 30,
+    'auto_time_per_gram': 0.04,
+}
+
+
+def load_config_values() -> Dict[str, float]:
+    """Lees de actuele configuratie opnieuw in (defaults + user_settings.json).
+    
+    In tegenstelling tot de module constanten (bevroren bij import) leest
+    deze functie het bestand bij elke aanroep, zodat een gewijzigde
+    configuratie zonder herstart of re-import gebruikt kan worden.
+    
+    Returns:
+    -------
+    Dict[str, float]
+        Alle configuratie sleutels, percentages in % (zoals opgeslagen)
+    """
+    user_config = _load_user_configuration()
+    values = {}
+    for key, default in CONFIG_DEFAULTS.items():
+        try:
+            values[key] = float(user_config.get(key, default))
+        except (ValueError, TypeError):
+            values[key] = float(default)
+    return values
+
+
 def _create_value_getters() -> tuple[Callable[[str, float], float], Callable[[str, int], int]]:
     """Maak type-safe value getter functies.
     
@@ -98,40 +139,40 @@ _get_float, _get_int = _create_value_getters()
 # Deze waarden representeren de werkelijke kosten van printer operatie
 
 # Energie verbruik en kosten
-PRINTER_POWER_KW: Final[float] = _get_float('printer_power', 1.05)
+PRINTER_POWER_KW: Final[float] = _get_float('printer_power', CONFIG_DEFAULTS['printer_power'])
 """Gemiddeld stroomverbruik van Bambu Lab X1C in kilowatt.
 Gebaseerd op: verwarmde bed (120W) + hotend (40W) + motors/fans (300W) + electronica (90W).
 Totaal ~550W actief printen + 500W idle warming = 1.05kW gemiddeld."""
 
-ENERGY_PRICE_PER_KWH: Final[float] = _get_float('energy_price', 0.35)  
+ENERGY_PRICE_PER_KWH: Final[float] = _get_float('energy_price', CONFIG_DEFAULTS['energy_price'])  
 """Energieprijs per kilowattuur in euro.
 Belgische gemiddelde 2024: €0.35/kWh inclusief belastingen en distributiekosten.
 Update deze waarde bij significante energieprijswijzigingen."""
 
 # Arbeid en monitoring kosten  
-LABOUR_COST_PER_HOUR: Final[float] = _get_float('labour_cost', 27.80)
+LABOUR_COST_PER_HOUR: Final[float] = _get_float('labour_cost', CONFIG_DEFAULTS['labour_cost'])
 """Arbeidskosten per uur voor 3D printing operator.
 Gebaseerd op: €16/uur bruto + 73% werkgeverslasten RSZ = €27.80 totaal.
 Omvat: lonen, RSZ bijdragen, vakantiegeld, eindejaarspremie, verzekeringen."""
 
-MONITORING_PERCENTAGE: Final[float] = _get_float('monitoring_pct', 10) / 100
+MONITORING_PERCENTAGE: Final[float] = _get_float('monitoring_pct', CONFIG_DEFAULTS['monitoring_pct']) / 100
 """Percentage van arbeidskosten voor print monitoring.
 10% betekent: 6 minuten actieve monitoring per print uur.
 Omvat: start setup, progress checks, problem solving, finish handling."""
 
 # Onderhoud en slijtage
-MAINTENANCE_COST_PER_HOUR: Final[float] = _get_float('maintenance_cost', 0.0765)
+MAINTENANCE_COST_PER_HOUR: Final[float] = _get_float('maintenance_cost', CONFIG_DEFAULTS['maintenance_cost'])
 """Onderhoud en slijtagekosten per print uur.
 Berekening: €153 per 2000 uur = €0.0765/uur.
 Omvat: nozzles, belts, sensors, lubricants, preventief onderhoud."""
 
 # Overhead en vaste kosten
-OVERHEAD_PER_YEAR: Final[int] = _get_int('overhead_year', 7200)
+OVERHEAD_PER_YEAR: Final[int] = _get_int('overhead_year', CONFIG_DEFAULTS['overhead_year'])
 """Jaarlijkse overhead kosten voor 3D printing operatie.
 Omvat: ruimte huur, verzekeringen, boekhouding, marketing, afschrijving printer.
 Verdeeld over ANNUAL_PRINT_HOURS voor kostprijs per uur."""
 
-ANNUAL_PRINT_HOURS: Final[int] = _get_int('annual_hours', 1920)
+ANNUAL_PRINT_HOURS: Final[int] = _get_int('annual_hours', CONFIG_DEFAULTS['annual_hours'])
 """Verwachte print uren per jaar voor overhead verdeling.
 Basis: 240 werkdagen × 8 uur = 1920 uur bij volledige bezetting.
 Realistisch voor professionele service met goede planning."""
@@ -141,37 +182,37 @@ Realistisch voor professionele service met goede planning."""
 # Deze waarden bepalen de winstgevendheid en competitiviteit
 
 # Markup factoren (als vermenigvuldigingsfactor)
-MARKUP_MATERIAL: Final[float] = _get_float('markup_material', 180) / 100
+MARKUP_MATERIAL: Final[float] = _get_float('markup_material', CONFIG_DEFAULTS['markup_material']) / 100
 """Markup factor voor materiaalkosten (180% = factor 1.8).
 Rationale: Compenseert voorraadrisico, handling, prijsfluctuaties.
 Aangepast aan Belgische marktprijzen."""
 
-MARKUP_VARIABLE: Final[float] = _get_float('markup_variable', 140) / 100  
+MARKUP_VARIABLE: Final[float] = _get_float('markup_variable', CONFIG_DEFAULTS['markup_variable']) / 100  
 """Markup factor voor variabele kosten (140% = factor 1.4).
 Rationale: Service pricing voor tijd en expertise.
 Competitief voor Belgische markt."""
 
 # Toeslag parameters
-SPOED_SURCHARGE_RATE: Final[float] = _get_float('spoed_surcharge', 25) / 100
+SPOED_SURCHARGE_RATE: Final[float] = _get_float('spoed_surcharge', CONFIG_DEFAULTS['spoed_surcharge']) / 100
 """Spoedtoeslag als percentage van finale prijs (25% = factor 0.25).
 Percentage schaalt met order grootte: €40 order → +€10, €200 order → +€50.
 Compenseert planning disruption en opportunity cost."""
 
-ABRASIVE_SURCHARGE_PER_HOUR: Final[float] = _get_float('abrasive_surcharge', 0.50)
+ABRASIVE_SURCHARGE_PER_HOUR: Final[float] = _get_float('abrasive_surcharge', CONFIG_DEFAULTS['abrasive_surcharge'])
 """Extra toeslag per uur voor abrasieve materialen (CF/GF) in euro.
 Compenseert: verhoogde nozzle slijtage, extruder onderhoud, kwaliteitscontrole.
 Gebaseerd op 10× snellere nozzle vervanging bij carbon fiber prints."""
 
-COLOR_SETUP_FEE_MIN: Final[int] = _get_int('color_fee_min', 15)
+COLOR_SETUP_FEE_MIN: Final[int] = _get_int('color_fee_min', CONFIG_DEFAULTS['color_fee_min'])
 """Minimum setup fee voor multicolor prints in euro.
 Dekt: extra filament wisseling tijd, verhoogd faalrisico, complexere QC."""
 
-COLOR_SETUP_FEE_MAX: Final[int] = _get_int('color_fee_max', 30) 
+COLOR_SETUP_FEE_MAX: Final[int] = _get_int('color_fee_max', CONFIG_DEFAULTS['color_fee_max']) 
 """Maximum setup fee voor complexe multicolor prints in euro.
 Voor prints met >3 kleuren of complexe kleur overgangen."""
 
 # Automatische tijd estimatie
-AUTO_TIME_PER_GRAM_H: Final[float] = _get_float('auto_time_per_gram', 0.04)
+AUTO_TIME_PER_GRAM_H: Final[float] = _get_float('auto_time_per_gram', CONFIG_DEFAULTS['auto_time_per_gram'])
 """Standaard print tijd ratio: uur per gram (0.04 = 25g/uur).
 Gebaseerd op gemiddelde van 0.2mm layer height, 50mm/s print speed.
 Redelijk accuraat voor 80% van standaard prints zonder veel support."""
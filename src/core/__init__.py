@@ -1,3 +1,4 @@
 # Maakt business-logica package importeerbaar
 from .cost_engine import CostBreakdown, calculate_costs
-from .pricing_engine import PriceResult, calculate_sell_price 
\ No newline at end of file
+from .pricing_engine import PriceResult, calculate_sell_price 
+from .pricing_context import PricingContext, current_context
@@ -30,7 +30,7 @@ Versie: 1.1
 """
 
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
 from ..config import (
     VARIABLE_COST_PER_HOUR_EXCL_MATERIAL, 
@@ -38,6 +38,10 @@ from ..config import (
     ABRASIVE_SURCHARGE_PER_HOUR
 )
 from ..materials.materials import get_price
+from ..utils.instrumentation import traced
+
+if TYPE_CHECKING:
+    from .pricing_context import PricingContext
 
 # Probeer material properties te importeren
 try:
@@ -112,7 +116,8 @@ class CostBreakdown:
         }
 
 
-def _calc_print_hours_auto(weight_g: float, material: Optional[str] = None) -> float:
+def _calc_print_hours_auto(weight_g: float, material: Optional[str] = None,
+                           time_per_gram: float = AUTO_TIME_PER_GRAM_H) -> float:
     """Bepaal automatische printduur gebaseerd op gewicht en materiaal.
     
     Gebruikt material properties indien beschikbaar voor realistische
@@ -125,6 +130,8 @@ def _calc_print_hours_auto(weight_g: float, material: Optional[str] = None) -> f
         Gewicht van de print in gram
     material : Optional[str]
         Materiaal naam voor specifieke printsnelheid lookup
+    time_per_gram : float
+        Fallback ratio in uur per gram (standaard uit config)
         
     Returns:
     -------
@@ -151,15 +158,17 @@ def _calc_print_hours_auto(weight_g: float, material: Optional[str] = None) -> f
         return calc_print_time_realistic(material, weight_g)
     else:
         # Fallback naar standaard ratio
-        return weight_g * AUTO_TIME_PER_GRAM_H
+        return weight_g * time_per_gram
 
 
+@traced('pricing.calculate_costs')
 def calculate_costs(
     weight_g: float,
     material: str,
     *,
     print_hours: Optional[float] = None,
     abrasive: bool = False,
+    context: Optional['PricingContext'] = None,
 ) -> CostBreakdown:
     """Bereken de volledige kostprijs voor een 3D print.
     
@@ -178,6 +187,9 @@ def calculate_costs(
     abrasive : bool, default=False
         True indien het materiaal abrasief is (CF/GF). Voegt extra
         slijtagekosten toe voor nozzle en extruder onderhoud
+    context : Optional[PricingContext], default=None
+        Voorberekende tarieven (zie pricing_context.py). Indien None
+        worden de config constanten van bij de import gebruikt
         
     Returns:
     -------
@@ -223,9 +235,19 @@ def calculate_costs(
     if weight_g <= 0:
         raise ValueError(f"Gewicht moet positief zijn, kreeg: {weight_g}")
     
+    # Tarieven: voorberekende context of bevroren config constanten
+    if context is None:
+        cost_per_hour = VARIABLE_COST_PER_HOUR_EXCL_MATERIAL
+        abrasive_per_hour = ABRASIVE_SURCHARGE_PER_HOUR
+        time_per_gram = AUTO_TIME_PER_GRAM_H
+    else:
+        cost_per_hour = context.variable_cost_per_hour
+        abrasive_per_hour = context.abrasive_surcharge_per_hour
+        time_per_gram = context.auto_time_per_gram
+
     # Bepaal printduur (auto of handmatig)
     if print_hours is None:
-        print_hours = _calc_print_hours_auto(weight_g, material)
+        print_hours = _calc_print_hours_auto(weight_g, material, time_per_gram)
     elif print_hours < 0:
         raise ValueError(f"Print uren moeten positief zijn, kreeg: {print_hours}")
 
@@ -234,7 +256,7 @@ def calculate_costs(
     material_cost = price_per_gram * weight_g
 
     # Variabele kosten (energie, onderhoud, arbeid, overhead)
-    variable_cost = VARIABLE_COST_PER_HOUR_EXCL_MATERIAL * print_hours
+    variable_cost = cost_per_hour * print_hours
 
     # Slijtage kosten berekening
     if HAS_MATERIAL_PROPERTIES:
@@ -242,7 +264,7 @@ def calculate_costs(
         surcharge_abrasive = calculate_wear_cost(material, print_hours)
     else:
         # Fallback naar oude abrasive flag methode
-        surcharge_abrasive = ABRASIVE_SURCHARGE_PER_HOUR * print_hours if abrasive else 0.0
+        surcharge_abrasive = abrasive_per_hour * print_hours if abrasive else 0.0
 
     # Totaal kostprijs
     total = material_cost + variable_cost + surcharge_abrasive
@@ -0,0 +1,160 @@
+"""
+Pricing Context - H2D Price Calculator
+======================================
+
+Onveranderlijke, voorberekende prijsparameters per configuratie versie.
+
+Bij elke berekening las de GUI alle Tk configuratie velden opnieuw in
+(get_config_values) en rekende calculate_costs_with_config de energie,
+monitoring en overhead tarieven per uur opnieuw uit. De engine gebruikte
+daarentegen module constanten die bij import bevroren worden, waardoor
+een gewijzigde configuratie pas na een herstart telde.
+
+Een PricingContext bevat alle afgeleide waardes één keer uitgerekend:
+
+- tarieven per uur: energie, onderhoud, monitoring, overhead en totaal
+- abrasieve toeslag per uur en automatische tijd per gram
+- markup factoren voor materiaal en variabele kosten
+- multicolor setup fee (gemiddelde van min en max) en spoed factor
+
+Markup conventie:
+----------------
+De engine gebruikt de markup als factor (180% → × 1.8), de GUI telt
+de markup bovenop de kostprijs (200% → × 3.0). Beide gedragingen
+blijven behouden via `additive_markup`.
+
+Een configuratie wijziging levert een nieuwe context op (zelfde
+waardes → zelfde `version`); modules hoeven niet opnieuw geïmporteerd
+te worden.
+
+Gebruik:
+-------
+    >>> context = current_context()            # user_settings.json, gecached
+    >>> result = calculate_sell_price(weight_g=100, material="PLA Basic",
+    ...                               context=context)
+    >>> gui_context = PricingContext.from_values(values, additive_markup=True)
+    >>> gui_context.variable_cost_per_hour
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+from ..config import CONFIG_DEFAULTS, load_config_values
+
+
+@dataclass(frozen=True)
+class PricingContext:
+    """Voorberekende prijsparameters voor één configuratie versie.
+
+    Attributes:
+    ----------
+    version : str
+        Korte hash over de configuratie waardes en de markup conventie
+    values : Mapping[str, float]
+        Ruwe configuratie (read-only, percentages in %) voor logging
+    variable_cost_per_hour : float
+        Energie + onderhoud + monitoring + overhead per print uur
+    material_factor, variable_factor : float
+        Vermenigvuldigingsfactoren voor materiaal- en variabele kosten
+    setup_fee : float
+        Multicolor toeslag (gemiddelde van min en max color fee)
+    rush_factor : float
+        Vermenigvuldiging bij spoed (1 + spoedtoeslag)
+    """
+
+    version: str
+    values: Mapping[str, float] = field(repr=False, compare=False)
+    energy_cost_per_hour: float
+    maintenance_cost_per_hour: float
+    monitoring_cost_per_hour: float
+    overhead_cost_per_hour: float
+    variable_cost_per_hour: float
+    abrasive_surcharge_per_hour: float
+    auto_time_per_gram: float
+    material_factor: float
+    variable_factor: float
+    setup_fee: float
+    rush_factor: float
+
+    @classmethod
+    def from_values(cls, values: Mapping[str, Any], *,
+                    additive_markup: bool = False) -> 'PricingContext':
+        """Bouw een context uit configuratie waardes.
+
+        Parameters:
+        ----------
+        values : Mapping[str, Any]
+            Configuratie sleutels zoals in user_settings.json (strings of
+            getallen, percentages in %); ontbrekende sleutels → CONFIG_DEFAULTS
+        additive_markup : bool
+            True: markup bovenop de kostprijs (GUI), False: markup als
+            factor (engine)
+
+        Raises:
+        ------
+        ValueError
+            Bij een niet-numerieke waarde
+        """
+        raw = {}
+        for key, default in CONFIG_DEFAULTS.items():
+            value = values.get(key, default)
+            try:
+                raw[key] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{key}: Ongeldige numerieke waarde '{value}'") from None
+
+        energy = raw['printer_power'] * raw['energy_price']
+        monitoring = raw['labour_cost'] * (raw['monitoring_pct'] / 100)
+        overhead = raw['overhead_year'] / raw['annual_hours']
+        variable = energy + raw['maintenance_cost'] + monitoring + overhead
+
+        markup_material = raw['markup_material'] / 100
+        markup_variable = raw['markup_variable'] / 100
+        if additive_markup:
+            markup_material, markup_variable = 1 + markup_material, 1 + markup_variable
+
+        canonical = json.dumps([sorted(raw.items()), additive_markup])
+        version = hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+        return cls(
+            version=version,
+            values=MappingProxyType(raw),
+            energy_cost_per_hour=energy,
+            maintenance_cost_per_hour=raw['maintenance_cost'],
+            monitoring_cost_per_hour=monitoring,
+            overhead_cost_per_hour=overhead,
+            variable_cost_per_hour=variable,
+            abrasive_surcharge_per_hour=raw['abrasive_surcharge'],
+            auto_time_per_gram=raw['auto_time_per_gram'],
+            material_factor=markup_material,
+            variable_factor=markup_variable,
+            setup_fee=(raw['color_fee_min'] + raw['color_fee_max']) / 2,
+            rush_factor=1 + raw['spoed_surcharge'] / 100,
+        )
+
+
+# Laatst gebouwde context per (config waardes, markup conventie)
+_current: Optional[Tuple[Tuple, PricingContext]] = None
+
+
+def current_context(additive_markup: bool = False) -> PricingContext:
+    """Context voor de actuele configuratie (user_settings.json).
+
+    Het bestand wordt bij elke aanroep gelezen; de context wordt alleen
+    opnieuw opgebouwd als de waardes veranderd zijn.
+    """
+    global _current
+    values = load_config_values()
+    key = (tuple(sorted(values.items())), additive_markup)
+    if _current is None or _current[0] != key:
+        _current = (key, PricingContext.from_values(values, additive_markup=additive_markup))
+    return _current[1]
+
+
+__all__ = ['PricingContext', 'current_context']
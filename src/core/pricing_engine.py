@@ -36,7 +36,7 @@ Versie: 1.0
 """
 
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
 from ..config import (
     MARKUP_MATERIAL,
@@ -46,6 +46,10 @@ from ..config import (
     SPOED_SURCHARGE_RATE,
 )
 from .cost_engine import calculate_costs, CostBreakdown
+from ..utils.instrumentation import traced
+
+if TYPE_CHECKING:
+    from .pricing_context import PricingContext
 
 
 @dataclass
@@ -131,6 +135,7 @@ class PriceResult:
         return self.sell_price / self.breakdown.total_cost
 
 
+@traced('pricing.calculate_sell_price')
 def calculate_sell_price(
     *,
     weight_g: float,
@@ -139,6 +144,7 @@ def calculate_sell_price(
     abrasive: bool = False,
     multicolor: bool = False,
     spoed: bool = False,
+    context: Optional['PricingContext'] = None,
 ) -> PriceResult:
     """Bereken intelligente adviesverkoopprijs voor 3D print.
     
@@ -162,6 +168,9 @@ def calculate_sell_price(
     spoed : bool, default=False
         True voor spoedopdrachten. Voegt percentage toeslag toe
         op finale prijs (standaard 25%)
+    context : Optional[PricingContext], default=None
+        Voorberekende markups, fees en tarieven (zie pricing_context.py).
+        Indien None worden de config constanten gebruikt
         
     Returns:
     -------
@@ -237,24 +246,33 @@ def calculate_sell_price(
         material=material,
         print_hours=print_hours,
         abrasive=abrasive,
+        context=context,
     )
 
+    if context is None:
+        material_factor, variable_factor = MARKUP_MATERIAL, MARKUP_VARIABLE
+        setup_fee = (COLOR_SETUP_FEE_MIN + COLOR_SETUP_FEE_MAX) / 2
+        rush_factor = 1 + SPOED_SURCHARGE_RATE
+    else:
+        material_factor, variable_factor = context.material_factor, context.variable_factor
+        setup_fee = context.setup_fee
+        rush_factor = context.rush_factor
+
     # Gesegmenteerde markup strategie
     cost_material = breakdown.material_cost
     cost_variable = breakdown.variable_cost + breakdown.surcharge_abrasive
 
     # Basis verkoopprijs met gedifferentieerde markup
-    sell_price = (cost_material * MARKUP_MATERIAL) + (cost_variable * MARKUP_VARIABLE)
+    sell_price = (cost_material * material_factor) + (cost_variable * variable_factor)
 
     # Complexiteits toeslagen
     if multicolor:
         # Vaste setup fee voor multi-kleur complexiteit
-        setup_fee = (COLOR_SETUP_FEE_MIN + COLOR_SETUP_FEE_MAX) / 2
         sell_price += setup_fee
         
     if spoed:
         # Percentage toeslag voor urgentie (schaalt met order grootte)
-        sell_price *= (1 + SPOED_SURCHARGE_RATE)
+        sell_price *= rush_factor
 
     # Winstmarge berekening
     if breakdown.total_cost > 0:
@@ -0,0 +1,388 @@
+"""
+Batch Mode - H2D Price Calculator
+=================================
+
+Streaming batch prijsberekening voor de CLI (`cli.py --batch`).
+
+De CLI rekende één opdracht per aanroep en betaalde telkens de
+opstart van de interpreter en de imports. Bij een order import gaat
+het om duizenden offerte regels; batch mode leest ze als CSV of JSONL
+(bestand of stdin) en schrijft de resultaten in hetzelfde formaat naar
+stdout, terwijl de invoer nog binnenkomt.
+
+Invoer (één opdracht per regel):
+-------------------------------
+    CSV    header verplicht; kolommen weight, material, hours, abrasive,
+           multicolor, spoed (Nederlandse namen ook toegestaan); een veld
+           tussen quotes mag regeleinden bevatten
+    JSONL  één object per regel met dezelfde sleutels
+
+    weight,material,hours,multicolor
+    100,PLA Basic,,ja
+    {"weight": 150, "material": "PETG-CF", "hours": 6, "abrasive": true}
+
+Uitvoer:
+-------
+Elke invoer regel komt terug met de extra kolommen material_cost,
+variable_cost, surcharge_abrasive, total_cost, sell_price, margin_pct
+en error. Een ongeldige regel (onbekend materiaal, gewicht ≤ 0,
+kapotte JSON) levert een fout record op in plaats van de stroom af te
+breken.
+
+Parallellisme:
+-------------
+Regels worden in blokken van `chunk_size` verdeeld over een process
+pool van `workers` processen. Hooguit MAX_PENDING_PER_WORKER blokken
+per worker staan tegelijk uit (begrensd geheugen bij een oneindige
+stdin) en de uitvoer volgt de volgorde van de invoer.
+
+Gebruik:
+-------
+    python -m src.interface.cli --batch offertes.csv > prijzen.csv
+    cat regels.jsonl | python -m src.interface.cli --batch - --workers 4
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import csv
+import io
+import json
+import time
+from collections import deque
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from ..core import calculate_sell_price, current_context
+
+
+# Regels per blok dat naar een worker gaat
+DEFAULT_CHUNK_SIZE = 2_000
+
+# Blokken per worker die tegelijk uit mogen staan
+MAX_PENDING_PER_WORKER = 4
+
+# Kolommen die aan elke regel toegevoegd worden
+RESULT_COLUMNS: List[str] = [
+    'material_cost', 'variable_cost', 'surcharge_abrasive', 'total_cost',
+    'sell_price', 'margin_pct', 'error',
+]
+RESULT_KEYS = frozenset(RESULT_COLUMNS)
+
+# Toegestane veldnamen per parameter (eerste gevonden wint)
+FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'weight': ('weight', 'weight_g', 'gewicht'),
+    'material': ('material', 'materiaal'),
+    'hours': ('hours', 'print_hours', 'uren'),
+    'abrasive': ('abrasive', 'abrasief'),
+    'multicolor': ('multicolor', 'ams'),
+    'spoed': ('spoed', 'rush'),
+}
+
+# Ja/nee waardes (kleine letters, zonder spaties)
+BOOL_VALUES: Dict[str, bool] = {
+    **dict.fromkeys(('1', 'true', 'ja', 'j', 'yes', 'y', 'x', 'waar'), True),
+    **dict.fromkeys(('', '0', 'false', 'nee', 'n', 'no', 'onwaar'), False),
+}
+
+# Context per proces (gezet door _init_worker)
+_context = None
+
+
+def _init_worker() -> None:
+    """Bouw de PricingContext één keer per (worker) proces."""
+    global _context
+    _context = current_context()
+
+
+def _to_float(value, name: str) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(value.strip().replace(',', '.'))  # "12,5"
+    except (AttributeError, ValueError):
+        raise ValueError(f"{name}: ongeldig getal '{value}'") from None
+
+
+def _to_bool(value, name: str) -> bool:
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    flag = BOOL_VALUES.get(value)
+    if flag is None:
+        flag = BOOL_VALUES.get(str(value).strip().lower())
+        if flag is None:
+            raise ValueError(f"{name}: ongeldige ja/nee waarde '{value}'")
+    return flag
+
+
+def _resolve_fields(names: Sequence[str]) -> Dict[str, str]:
+    """Parameter → veldnaam zoals die in de invoer voorkomt."""
+    present = set(names)
+    fields = {}
+    for param, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            if alias in present:
+                fields[param] = alias
+                break
+    return fields
+
+
+def parse_values(weight, material, hours=None, abrasive=None, multicolor=None,
+                 spoed=None) -> Tuple[float, str, Optional[float], bool, bool, bool]:
+    """Zet ruwe veldwaardes om naar de argumenten van calculate_sell_price.
+
+    Parameters:
+    ----------
+    weight, material, hours, abrasive, multicolor, spoed
+        Waardes zoals ze in de invoer staan (None = ontbreekt); ja/nee
+        velden volgens BOOL_VALUES, decimale komma toegestaan
+
+    Returns:
+    -------
+    Tuple
+        (weight_g, material, print_hours, abrasive, multicolor, spoed)
+
+    Raises:
+    ------
+    ValueError
+        Bij een ontbrekend of ongeldig veld
+    """
+    weight = _to_float(weight, 'weight')
+    if weight is None:
+        raise ValueError("weight: ontbreekt")
+    if not material:
+        raise ValueError("material: ontbreekt")
+    return (
+        weight,
+        material.strip() if isinstance(material, str) else str(material),
+        _to_float(hours, 'hours'),
+        _to_bool(abrasive, 'abrasive'),
+        _to_bool(multicolor, 'multicolor'),
+        _to_bool(spoed, 'spoed'),
+    )
+
+
+def parse_job(job: Dict) -> Tuple[float, str, Optional[float], bool, bool, bool]:
+    """parse_values voor een JSON object (veldnamen volgens FIELD_ALIASES)."""
+    fields = _resolve_fields(list(job))
+    return parse_values(*[job.get(fields[p]) if p in fields else None for p in FIELD_ALIASES])
+
+
+def error_message(error: Exception) -> str:
+    """Leesbare melding (KeyError van get_price zonder extra quotes)."""
+    if isinstance(error, KeyError):
+        return str(error.args[0]) if error.args else 'onbekend materiaal'
+    return str(error)
+
+
+def price_job(*values):
+    """Prijs één opdracht met ruwe veldwaardes (zie parse_values).
+
+    Returns:
+    -------
+    Tuple[Optional[PriceResult], Optional[str]]
+        (resultaat, None) of (None, foutmelding)
+    """
+    try:
+        weight, material, hours, abrasive, multicolor, spoed = parse_values(*values)
+        return calculate_sell_price(
+            weight_g=weight,
+            material=material,
+            print_hours=hours,
+            abrasive=abrasive,
+            multicolor=multicolor,
+            spoed=spoed,
+            context=_context,
+        ), None
+    except Exception as e:
+        return None, error_message(e)
+
+
+def _price_csv_chunk(header: List[str], records: List[List[str]]) -> Tuple[str, int, int]:
+    """Prijs een blok geparste CSV records → (uitvoer tekst, regels, fouten)."""
+    if _context is None:
+        _init_worker()
+    fields = _resolve_fields(header)
+    positions = [header.index(fields[p]) if p in fields else None for p in FIELD_ALIASES]
+    width = len(header)
+    empty = [''] * 6
+    out = io.StringIO()
+    writerow = csv.writer(out, lineterminator='\n').writerow
+    rows = errors = 0
+    for row in records:
+        if not row:
+            continue
+        rows += 1
+        if len(row) != width:
+            row = (row + [''] * width)[:width]
+        result, error = price_job(*[row[i] if i is not None else None for i in positions])
+        if error is not None:
+            errors += 1
+            writerow(row + empty + [error])
+            continue
+        breakdown = result.breakdown
+        writerow(row + [
+            f"{breakdown.material_cost:.2f}", f"{breakdown.variable_cost:.2f}",
+            f"{breakdown.surcharge_abrasive:.2f}", f"{breakdown.total_cost:.2f}",
+            f"{result.sell_price:.2f}", f"{result.margin_pct:.2f}", '',
+        ])
+    return out.getvalue(), rows, errors
+
+
+def _price_jsonl_chunk(first_line: int, lines: List[str]) -> Tuple[str, int, int]:
+    """Prijs een blok JSONL regels → (uitvoer tekst, regels, fouten)."""
+    if _context is None:
+        _init_worker()
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    field_cache: Dict[Tuple[str, ...], Dict[str, str]] = {}
+    out = []
+    rows = errors = 0
+    for number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        rows += 1
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError("regel is geen JSON object")
+        except ValueError as e:
+            errors += 1
+            out.append(encode({'line': number, 'error': f"ongeldige JSON: {e}"}))
+            continue
+        keys = tuple(job)
+        fields = field_cache.get(keys)
+        if fields is None:
+            fields = field_cache[keys] = _resolve_fields(keys)
+        result, error = price_job(*[job.get(fields[p]) if p in fields else None
+                                    for p in FIELD_ALIASES])
+        if error is not None:
+            errors += 1
+            job['error'] = error
+            out.append(encode(job))
+            continue
+        breakdown = result.breakdown
+        suffix = (f', "material_cost": {breakdown.material_cost:.2f}'
+                  f', "variable_cost": {breakdown.variable_cost:.2f}'
+                  f', "surcharge_abrasive": {breakdown.surcharge_abrasive:.2f}'
+                  f', "total_cost": {breakdown.total_cost:.2f}'
+                  f', "sell_price": {result.sell_price:.2f}'
+                  f', "margin_pct": {result.margin_pct:.2f}}}')
+        text = line.rstrip()
+        if text.endswith('}') and not RESULT_KEYS.intersection(keys):
+            # Invoer regel blijft ongewijzigd; alleen de resultaten erachter
+            out.append(text[:-1].rstrip() + suffix)
+        else:
+            job.update(zip(RESULT_COLUMNS, (
+                round(breakdown.material_cost, 2), round(breakdown.variable_cost, 2),
+                round(breakdown.surcharge_abrasive, 2), round(breakdown.total_cost, 2),
+                round(result.sell_price, 2), round(result.margin_pct, 2))))
+            out.append(encode(job))
+    return ('\n'.join(out) + '\n') if out else '', rows, errors
+
+
+def detect_format(path: Optional[str], first_line: str) -> str:
+    """'jsonl' of 'csv' op basis van de extensie, anders de eerste regel."""
+    if path and path != '-':
+        lowered = path.lower()
+        if lowered.endswith(('.jsonl', '.ndjson', '.json')):
+            return 'jsonl'
+        if lowered.endswith('.csv'):
+            return 'csv'
+    return 'jsonl' if first_line.lstrip().startswith('{') else 'csv'
+
+
+def _chunks(stream: Iterable, chunk_size: int) -> Iterator[List]:
+    while True:
+        chunk = list(islice(stream, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(source: TextIO, output: TextIO, *, path: Optional[str] = None,
+              fmt: Optional[str] = None, workers: int = 1,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, float]:
+    """Prijs alle regels van `source` en schrijf de resultaten naar `output`.
+
+    Parameters:
+    ----------
+    source : TextIO
+        Invoer stream (bestand of stdin)
+    output : TextIO
+        Uitvoer stream (stdout)
+    path : str, optional
+        Bestandsnaam voor formaat detectie
+    fmt : str, optional
+        'csv' of 'jsonl' (None = automatisch)
+    workers : int
+        Aantal processen (1 = in dit proces, zonder pool)
+    chunk_size : int
+        Regels per blok
+
+    Returns:
+    -------
+    Dict[str, float]
+        rows, errors, seconds en rows_per_second
+    """
+    start = time.perf_counter()
+    first = source.readline()
+    if not first:
+        return {'rows': 0, 'errors': 0, 'seconds': 0.0, 'rows_per_second': 0.0}
+    fmt = fmt or detect_format(path, first)
+
+    if fmt == 'csv':
+        # Blokken van geparste records, niet van fysieke regels: een veld
+        # tussen quotes mag een regeleinde bevatten
+        reader = csv.reader(chain([first], source))
+        header = next(reader)
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow(header + RESULT_COLUMNS)
+        tasks = ((_price_csv_chunk, (header, chunk)) for chunk in _chunks(reader, chunk_size))
+    else:
+        def jsonl_tasks():
+            number = 1
+            for chunk in _chunks(chain([first], source), chunk_size):
+                yield _price_jsonl_chunk, (number, chunk)
+                number += len(chunk)
+        tasks = jsonl_tasks()
+
+    rows = errors = 0
+    if workers <= 1:
+        _init_worker()
+        for func, args in tasks:
+            text, n, e = func(*args)
+            output.write(text)
+            rows, errors = rows + n, errors + e
+    else:
+        import multiprocessing
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            pending = deque()
+            for func, args in tasks:
+                pending.append(pool.apply_async(func, args))
+                if len(pending) >= workers * MAX_PENDING_PER_WORKER:
+                    text, n, e = pending.popleft().get()
+                    output.write(text)
+                    rows, errors = rows + n, errors + e
+            while pending:
+                text, n, e = pending.popleft().get()
+                output.write(text)
+                rows, errors = rows + n, errors + e
+    output.flush()
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'errors': errors,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else 0.0,
+    }
+
+
+__all__ = [
+    'RESULT_COLUMNS', 'detect_format', 'error_message', 'parse_job', 'parse_values',
+    'price_job', 'run_batch',
+]
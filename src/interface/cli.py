@@ -18,6 +18,7 @@ Gebruik Modi:
 1. Volledig CLI: python cli.py 100 "PLA Basic" --hours 4.0
 2. Interactief: python cli.py (vraagt om alle invoer)
 3. Hybride: python cli.py 100 (vraagt alleen ontbrekende parameters)
+4. Batch: python cli.py --batch offertes.csv (CSV/JSONL, zie batch.py)
 
 Output:
 ------
@@ -67,6 +68,8 @@ Voorbeelden:
   %(prog)s 150 "PETG-CF" --hours 6 --abrasive # Geavanceerde opties
   %(prog)s 50 "PLA Basic" --multicolor --spoed # Met toeslagen
   %(prog)s                                     # Volledig interactief
+  %(prog)s --batch offertes.csv > prijzen.csv  # Batch (CSV of JSONL)
+  cat regels.jsonl | %(prog)s --batch - --workers 4
   
 Ondersteunde materialen:
   Gebruik zonder argumenten voor volledige lijst, of bekijk
@@ -119,6 +122,36 @@ Ondersteunde materialen:
         action="store_true",
         help="Toon alle beschikbare materialen en prijzen"
     )
+    
+    # Batch mode
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="BESTAND",
+        help="Prijs alle regels uit een CSV/JSONL bestand (of '-' voor stdin) naar stdout"
+    )
+    parser.add_argument(
+        "--format",
+        choices=("csv", "jsonl"),
+        default=None,
+        help="Batch formaat (default: op basis van extensie of eerste regel)"
+    )
+    parser.add_argument(
+        "--workers", "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Aantal processen voor batch mode"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=2000,
+        metavar="REGELS",
+        help="Regels per blok dat naar een worker gaat"
+    )
     parser.add_argument(
         "--quiet", "-q",
         action="store_true",
@@ -328,6 +361,39 @@ def _format_calculation_output(result: Any, quiet: bool = False) -> None:
     print("=" * 50)
 
 
+def _run_batch_mode(args: argparse.Namespace) -> int:
+    """Voer --batch uit; samenvatting naar stderr zodat stdout puur data is.
+    
+    Parameters:
+    ----------
+    args : argparse.Namespace
+        Geparste argumenten (batch, format, workers, chunk_size, quiet)
+        
+    Returns:
+    -------
+    int
+        Exit code (0 ook bij fout records; die staan in de uitvoer)
+    """
+    from .batch import run_batch
+    
+    if args.workers < 1 or args.chunk_size < 1:
+        print("Fout: --workers en --chunk-size moeten minstens 1 zijn", file=sys.stderr)
+        return 1
+    
+    if args.batch == "-":
+        stats = run_batch(sys.stdin, sys.stdout, fmt=args.format,
+                          workers=args.workers, chunk_size=args.chunk_size)
+    else:
+        with open(args.batch, 'r', encoding='utf-8', newline='') as source:
+            stats = run_batch(source, sys.stdout, path=args.batch, fmt=args.format,
+                              workers=args.workers, chunk_size=args.chunk_size)
+    
+    if not args.quiet:
+        print(f"Batch: {stats['rows']:,} regels, {stats['errors']:,} fouten, "
+              f"{stats['rows_per_second']:,.0f} regels/s", file=sys.stderr)
+    return 0
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     """Hoofdfunctie van de CLI interface.
     
@@ -359,6 +425,9 @@ def main(argv: Optional[List[str]] = None) -> int:
             _display_materials()
             return 0
         
+        if args.batch is not None:
+            return _run_batch_mode(args)
+        
         # Collect required parameters (interactive if missing)
         weight = args.weight
         if weight is None:
@@ -124,7 +124,7 @@ Platform: Windows/macOS/Linux (cross-platform tkinter)
 
 # Standard library imports
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
 # Third-party imports
 import tkinter as tk
@@ -138,11 +138,17 @@ import subprocess
 from ..config.user_config import save_user_config, load_user_config
 from ..core.cost_engine import CostBreakdown
 from ..core.pricing_engine import PriceResult
+from ..core.pricing_context import PricingContext
 from ..materials.materials import list_materials, get_material, get_price
 from ..materials.material_properties import is_abrasive_material
 from ..utils.utils import format_euro, export_calculation_csv
-from ..utils.data_manager import DataManager
-from ..products import Product, ProductManager
+from ..utils.instrumentation import debug
+from .virtual_tree import VirtualTreeview
+
+# Products/DataManager laden pandas; bij runtime pas na het eerste venster
+if TYPE_CHECKING:
+    from ..products import Product, ProductManager
+    from ..utils.data_manager import DataManager
 
 
 class H2DCalculatorGUI:
@@ -238,15 +244,10 @@ class H2DCalculatorGUI:
         # Initialize tkinter root window
         self.root = tk.Tk()
         
-        # Initialize ProductManager voor product opslag functionaliteit
-        # Dit moet VOOR create_widgets() omdat de products tab deze nodig heeft
-        self.product_manager = ProductManager("data/h2d_products.json")
-        
-        # Initialize DataManager voor export/import en analyse functionaliteit
-        # Gebruik absoluut pad relatief aan bedrijfsleider directory
-        bedrijfsleider_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        exports_path = os.path.join(bedrijfsleider_dir, "exports")
-        self.data_manager = DataManager(exports_path)
+        # ProductManager en DataManager laden pandas/numpy; die worden pas
+        # na het eerste venster aangemaakt (_load_managers) of bij eerste gebruik
+        self._product_manager = None
+        self._data_manager = None
         
         # Build GUI components in logical order
         self.setup_window()        # Configure main window properties
@@ -255,6 +256,36 @@ class H2DCalculatorGUI:
         self.setup_layout()        # Configure layout management  
         self.bind_events()         # Connect event handlers
         
+        # Managers laden zodra het venster getekend is
+        self.root.after(0, self._load_managers)
+        
+    @property
+    def product_manager(self) -> 'ProductManager':
+        """ProductManager voor product opslag (aangemaakt bij eerste gebruik)."""
+        if self._product_manager is None:
+            from ..products import ProductManager
+            self._product_manager = ProductManager("data/h2d_products.json")
+        return self._product_manager
+        
+    @property
+    def data_manager(self) -> 'DataManager':
+        """DataManager voor export/import en analyse (aangemaakt bij eerste gebruik)."""
+        if self._data_manager is None:
+            from ..utils.data_manager import DataManager
+            # Absoluut pad relatief aan bedrijfsleider directory
+            bedrijfsleider_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            self._data_manager = DataManager(os.path.join(bedrijfsleider_dir, "exports"))
+        return self._data_manager
+        
+    def _load_managers(self) -> None:
+        """Maak de managers aan nadat het eerste venster zichtbaar is."""
+        self.status_label.configure(text="⏳ Producten laden...")
+        self.root.update_idletasks()
+        self.refresh_product_list()     # maakt de ProductManager aan
+        self.update_product_stats()
+        self.data_manager
+        self.status_label.configure(text="Klaar voor berekening...")
+        
     def setup_window(self) -> None:
         """Configureer het hoofdvenster met professional styling en branding.
         
@@ -402,6 +433,11 @@ class H2DCalculatorGUI:
             'auto_time_per_gram': tk.StringVar(value=saved_config.get('auto_time_per_gram', "0.04"))  # hours/gram
         }
         
+        # Voorberekende prijsparameters; opnieuw opgebouwd na een config wijziging
+        self._pricing_context: Optional[PricingContext] = None
+        for var in self.config_vars.values():
+            var.trace_add('write', self._invalidate_pricing_context)
+        
     def create_widgets(self) -> None:
         """Construeer de complete widget hiërarchie met professional layout.
         
@@ -1052,14 +1088,17 @@ class H2DCalculatorGUI:
         )
         list_frame.pack(fill='both', expand=True, pady=(10, 5))
         
-        # Treeview voor producten
+        # Treeview voor producten (gevirtualiseerd: alleen zichtbare rijen)
         columns = ('ID', 'Naam', 'Materiaal', 'Gewicht', 'Prijs', 'Marge', 'Orders')
-        self.product_tree = ttk.Treeview(
+        self.product_list = VirtualTreeview(
             list_frame,
             columns=columns,
+            row_formatter=self._format_product_row,
+            key_func=lambda product: product.product_id,
             show='tree headings',
             height=15
         )
+        self.product_tree = self.product_list.tree
         
         # Column configuratie
         self.product_tree.heading('#0', text='')
@@ -1081,14 +1120,6 @@ class H2DCalculatorGUI:
         self.product_tree.column('Marge', width=80, anchor='e')
         self.product_tree.column('Orders', width=80, anchor='e')
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.product_tree.yview)
-        self.product_tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack treeview
-        self.product_tree.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
-        
         # Bind double-click voor laden
         self.product_tree.bind('<Double-Button-1>', self.load_selected_product)
         
@@ -1162,16 +1193,33 @@ class H2DCalculatorGUI:
         )
         charts_btn.pack(side='left', padx=5)
         
-        # Initial load van producten
-        self.refresh_product_list()
-        self.update_product_stats()
+        # Producten worden geladen in _load_managers (na het eerste venster)
 
     def create_analysis_tab(self):
         """Maak analysis tab met nieuwe modulaire analytics GUI.
         
         Deze tab laadt de aparte AnalyticsGUI klasse die alle
         analyse modules beheert. Dit houdt de hoofdGUI clean!
+        
+        De analytics code (pandas, matplotlib, analyses) wordt pas
+        geïmporteerd als de tab voor het eerst geopend wordt, zodat het
+        hoofdvenster direct verschijnt.
         """
+        self.analytics_gui = None
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed, add='+')
+        
+    def _on_tab_changed(self, event=None) -> None:
+        """Laad de analytics GUI bij het eerste bezoek aan de analyse tab."""
+        if self.analytics_gui is not None:
+            return
+        if self.notebook.select() != str(self.analysis_frame):
+            return
+        self.status_label.configure(text="📊 Analytics module laden...")
+        self.root.update_idletasks()
+        self._load_analysis_tab()
+        
+    def _load_analysis_tab(self) -> None:
+        """Importeer en bouw de AnalyticsGUI in de analyse tab."""
         # Main container
         main_container = tk.Frame(self.analysis_frame, bg=self.colors['bg'])
         main_container.pack(fill='both', expand=True)
@@ -1195,6 +1243,7 @@ class H2DCalculatorGUI:
             
         except ImportError as e:
             # Fallback als analytics module problemen heeft
+            self.analytics_gui = False  # niet opnieuw proberen
             self._show_analytics_error(main_container, e)
             
     def _show_analytics_error(self, parent, error):
@@ -1553,12 +1602,16 @@ class H2DCalculatorGUI:
                 return
                 
             # === BUSINESS LOGIC INTEGRATION ===
+            # Eén context voor kosten, prijs en logboek (zelfde config versie)
+            context = self.get_pricing_context()
+            
             # Call cost engine met GUI configuration parameters
             costs = self.calculate_costs_with_config(
                 weight_g=weight,
                 material_name=material_name,
                 print_hours=hours,
-                abrasive=self.abrasive_var.get()  # Boolean option
+                abrasive=self.abrasive_var.get(),  # Boolean option
+                context=context
             )
             
             # Call pricing engine met alle GUI options
@@ -1568,7 +1621,8 @@ class H2DCalculatorGUI:
                 print_hours=hours,
                 abrasive=self.abrasive_var.get(),
                 multicolor=self.multicolor_var.get(),  # AMS usage
-                spoed=self.rush_var.get()              # Urgency surcharge
+                spoed=self.rush_var.get(),             # Urgency surcharge
+                context=context
             )
             
             # === RESULT PRESENTATION ===
@@ -1578,8 +1632,8 @@ class H2DCalculatorGUI:
             # === UITGEBREID LOGBOEK ===
             # Log ALLE details naar calculation_log.csv voor debugging (behalve product info)
             try:
-                # Haal huidige configuratie op
-                config = self.get_config_values()
+                # Configuratie van deze berekening (ruwe waardes, percentages in %)
+                config = context.values
                 
                 # Maak uitgebreide log data
                 log_data = {
@@ -1600,13 +1654,13 @@ class H2DCalculatorGUI:
                         'printer_power': config['printer_power'],
                         'energy_price': config['energy_price'],
                         'labour_cost': config['labour_cost'],
-                        'monitoring_pct': config['monitoring_pct'] * 100,  # Convert back to percentage
+                        'monitoring_pct': config['monitoring_pct'],
                         'maintenance_cost': config['maintenance_cost'],
                         'overhead_year': config['overhead_year'],
                         'annual_hours': config['annual_hours'],
-                        'markup_material': config['markup_material'] * 100,  # Convert to percentage
-                        'markup_variable': config['markup_variable'] * 100,  # Convert to percentage
-                        'spoed_surcharge': config['spoed_surcharge'] * 100,  # Convert to percentage
+                        'markup_material': config['markup_material'],
+                        'markup_variable': config['markup_variable'],
+                        'spoed_surcharge': config['spoed_surcharge'],
                         'abrasive_surcharge': config['abrasive_surcharge'],
                         'color_fee_min': config['color_fee_min'],
                         'color_fee_max': config['color_fee_max'],
@@ -1617,7 +1671,7 @@ class H2DCalculatorGUI:
                 
                 # Log calculation - deze schrijft nu automatisch naar beide bestanden
                 self.data_manager.log_calculation_simple(log_data)
-                print("DEBUG: Data logged to both calculation_log.csv and master_calculations.csv")
+                debug("Data logged to both calculation_log.csv and master_calculations.csv")
                 
             except Exception as e:
                 # Silent fail - logboek is niet kritisch
@@ -1793,8 +1847,30 @@ class H2DCalculatorGUI:
             'auto_time_per_gram': float(self.config_vars['auto_time_per_gram'].get())
         }
         
+    def get_pricing_context(self) -> PricingContext:
+        """Voorberekende prijsparameters voor de huidige GUI configuratie.
+        
+        De Tk velden worden alleen geparst als er sinds de vorige
+        berekening een configuratie veld gewijzigd is.
+        
+        Raises:
+        ------
+        ValueError
+            Als een configuratie veld geen geldig getal bevat
+        """
+        if self._pricing_context is None:
+            values = {key: var.get() for key, var in self.config_vars.items()}
+            # GUI telt de markup bovenop de kostprijs (200% → × 3.0)
+            self._pricing_context = PricingContext.from_values(values, additive_markup=True)
+        return self._pricing_context
+    
+    def _invalidate_pricing_context(self, *_args) -> None:
+        """Trace callback: configuratie veld gewijzigd."""
+        self._pricing_context = None
+        
     def calculate_costs_with_config(self, weight_g: float, material_name: str, 
-                                   print_hours: float, abrasive: bool) -> CostBreakdown:
+                                   print_hours: float, abrasive: bool,
+                                   context: Optional[PricingContext] = None) -> CostBreakdown:
         """Bereken kosten met GUI configuratie in plaats van hardcoded config.
         
         Deze methode gebruikt de configuratie waarden uit de GUI tabs in plaats
@@ -1810,36 +1886,25 @@ class H2DCalculatorGUI:
             Print tijd in uren
         abrasive : bool
             Of het materiaal abrasief is
+        context : PricingContext, optional
+            Voorberekende tarieven (default: get_pricing_context())
             
         Returns:
         -------
         CostBreakdown
             Kostenverdeling met GUI configuratie waarden
         """
-        # Haal configuratie waarden op
-        config = self.get_config_values()
+        context = context or self.get_pricing_context()
         
         # Bereken materiaalkosten
         price_per_gram = get_price(material_name)
         material_cost = price_per_gram * weight_g
         
-        # Bereken variabele kosten per uur met GUI config
-        energy_cost_per_hour = config['printer_power'] * config['energy_price']
-        monitoring_cost_per_hour = config['labour_cost'] * config['monitoring_pct']  # Alleen monitoring percentage!
-        overhead_cost_per_hour = config['overhead_year'] / config['annual_hours']
-        
-        # Variabele kosten per uur (zoals in de werkende backup)
-        variable_cost_per_hour = (
-            energy_cost_per_hour + 
-            config['maintenance_cost'] + 
-            monitoring_cost_per_hour + 
-            overhead_cost_per_hour
-        )
-        
-        variable_cost = variable_cost_per_hour * print_hours
+        # Variabele kosten per uur (energie + onderhoud + monitoring + overhead)
+        variable_cost = context.variable_cost_per_hour * print_hours
         
         # Abrasief toeslag
-        surcharge_abrasive = config['abrasive_surcharge'] * print_hours if abrasive else 0.0
+        surcharge_abrasive = context.abrasive_surcharge_per_hour * print_hours if abrasive else 0.0
         
         # Totaal
         total_cost = material_cost + variable_cost + surcharge_abrasive
@@ -1853,7 +1918,8 @@ class H2DCalculatorGUI:
     
     def calculate_sell_price_with_config(self, weight_g: float, material_name: str,
                                         print_hours: float, abrasive: bool,
-                                        multicolor: bool, spoed: bool) -> PriceResult:
+                                        multicolor: bool, spoed: bool,
+                                        context: Optional[PricingContext] = None) -> PriceResult:
         """Bereken verkoopprijs met GUI configuratie waarden.
         
         Deze methode past de pricing strategie toe met de configureerbare
@@ -1873,37 +1939,37 @@ class H2DCalculatorGUI:
             Multi-kleur print
         spoed : bool
             Spoedopdracht
+        context : PricingContext, optional
+            Voorberekende markups en toeslagen (default: get_pricing_context())
             
         Returns:
         -------
         PriceResult
             Pricing resultaat met marge berekening
         """
+        context = context or self.get_pricing_context()
+        
         # Bereken kosten met GUI config
         breakdown = self.calculate_costs_with_config(
-            weight_g, material_name, print_hours, abrasive
+            weight_g, material_name, print_hours, abrasive, context
         )
         
-        # Haal configuratie waarden op
-        config = self.get_config_values()
-        
-        # Basis verkoopprijs met configureerbare markup
+        # Basis verkoopprijs met configureerbare markup (bovenop de kostprijs)
         cost_material = breakdown.material_cost
         cost_variable = breakdown.variable_cost + breakdown.surcharge_abrasive
         
         sell_price = (
-            (cost_material * (1 + config['markup_material'])) + 
-            (cost_variable * (1 + config['markup_variable']))
+            (cost_material * context.material_factor) + 
+            (cost_variable * context.variable_factor)
         )
         
         # Multicolor toeslag
         if multicolor:
-            setup_fee = (config['color_fee_min'] + config['color_fee_max']) / 2
-            sell_price += setup_fee
+            sell_price += context.setup_fee
         
         # Spoedtoeslag
         if spoed:
-            sell_price *= (1 + config['spoed_surcharge'])
+            sell_price *= context.rush_factor
         
         # Marge berekening
         if breakdown.total_cost > 0:
@@ -2110,6 +2176,7 @@ Winst bedrag: {format_euro(self.result_data['profit_amount'])}
         
         try:
             # Maak Product object van huidige berekening
+            from ..products import Product
             product = Product(
                 name=name,
                 description=description,
@@ -2196,9 +2263,8 @@ Winst bedrag: {format_euro(self.result_data['profit_amount'])}
             messagebox.showwarning("Geen selectie", "Selecteer eerst een product om te laden.")
             return
             
-        # Haal product ID uit treeview
-        item = self.product_tree.item(selection[0])
-        product_id = item['values'][0]
+        # Haal product ID uit treeview (iid = product_id, blijft string)
+        product_id = selection[0]
         
         # Laad product via manager
         product = self.product_manager.get_by_id(product_id)
@@ -2234,10 +2300,9 @@ Winst bedrag: {format_euro(self.result_data['profit_amount'])}
         if not messagebox.askyesno("Bevestig verwijdering", "Weet je zeker dat je dit product wilt verwijderen?"):
             return
             
-        # Haal product ID uit treeview
-        item = self.product_tree.item(selection[0])
-        product_id = item['values'][0]
-        product_name = item['values'][1]
+        # Haal product ID uit treeview (iid = product_id, blijft string)
+        product_id = selection[0]
+        product_name = self.product_tree.item(product_id)['values'][1]
         
         # Verwijder via manager
         if self.product_manager.delete(product_id):
@@ -2249,9 +2314,9 @@ Winst bedrag: {format_euro(self.result_data['profit_amount'])}
             messagebox.showerror("Verwijder Fout", "Kon product niet verwijderen.")
             
     def refresh_product_list(self) -> None:
-        """Vernieuw de product lijst in treeview."""
+        """Vernieuw de product lijst in treeview (scrollpositie blijft)."""
         products = self.product_manager.list_all()
-        self._update_product_tree(products)
+        self._update_product_tree(products, keep_position=True)
         
     def export_all_products(self) -> None:
         """Exporteer alle producten naar CSV."""
@@ -2292,23 +2357,26 @@ Totale orders: {stats['total_orders']}"""
             # Silent fail voor stats update
             print(f"Waarschuwing: Kon statistieken niet updaten: {e}")
         
-    def _update_product_tree(self, products: List[Product]) -> None:
-        """Helper om product treeview te updaten."""
-        # Clear huidige items
-        for item in self.product_tree.get_children():
-            self.product_tree.delete(item)
-            
-        # Voeg producten toe
-        for product in products:
-            self.product_tree.insert('', 'end', values=(
-                product.product_id,
-                product.name,
-                product.material,
-                f"{product.weight_g:.1f}",
-                format_euro(product.sell_price),
-                f"{product.margin_pct:.1f}%",
-                product.actual_orders
-            ))
+    def _update_product_tree(self, products: List['Product'], keep_position: bool = False) -> None:
+        """Helper om product treeview te updaten.
+        
+        De VirtualTreeview diffed alleen het zichtbare venster, dus
+        zoeken/filteren/refresh kosten O(zichtbare rijen) Tk operaties.
+        """
+        self.product_list.set_items(products, keep_position=keep_position)
+        
+    @staticmethod
+    def _format_product_row(product: 'Product') -> tuple:
+        """Kolomwaarden voor één product rij (alleen voor zichtbare rijen)."""
+        return (
+            product.product_id,
+            product.name,
+            product.material,
+            f"{product.weight_g:.1f}",
+            format_euro(product.sell_price),
+            f"{product.margin_pct:.1f}%",
+            product.actual_orders
+        )
     
     def show_product_charts(self) -> None:
         """Open nieuw venster met scrollbare product grafieken.
@@ -6,6 +6,10 @@ Deze module beheert de analytics interface en laadt
 alle analyse modules dynamisch.
 
 REDESIGNED: Professionele dashboard layout met sidebar navigatie
+
+Developer mode (H2D_PROFILE=1 of dev_mode=True): elke analyse tab loopt
+via een AnalysisProfiler (cProfile + tracemalloc, rapporten in
+profiles/) en de header toont tijd en piek geheugen van de actieve tab.
 """
 
 import tkinter as tk
@@ -17,8 +21,14 @@ import sys
 class AnalyticsGUI(tk.Frame):
     """Hoofd analytics GUI controller met moderne dashboard layout."""
     
-    def __init__(self, parent, data_manager, colors):
-        """Initialiseer Analytics GUI."""
+    def __init__(self, parent, data_manager, colors, dev_mode=None):
+        """Initialiseer Analytics GUI.
+        
+        Parameters:
+        ----------
+        dev_mode : bool, optional
+            Profiling van analyse tabs (default: H2D_PROFILE omgevingsvariabele)
+        """
         super().__init__(parent, bg=colors['bg'])
         self.data_manager = data_manager
         self.colors = colors
@@ -26,6 +36,16 @@ class AnalyticsGUI(tk.Frame):
         self.current_frame = None
         self.sidebar_buttons = {}
         
+        # Developer mode: profiler per dashboard, analyse per tab frame
+        from ..analytics.profiling import AnalysisProfiler, profiling_enabled
+        if dev_mode is None:
+            dev_mode = profiling_enabled()
+        self.profiler = AnalysisProfiler() if dev_mode else None
+        self.tab_analyses = {}
+        self.current_notebook = None
+        if self.profiler is not None:
+            self.profiler.add_listener(lambda result: self.update_profile_overlay())
+        
         # Update kleuren voor professionele look
         self.dashboard_colors = {
             'sidebar_bg': '#2C3E50',  # Donker blauw-grijs
@@ -44,18 +64,18 @@ class AnalyticsGUI(tk.Frame):
         self.create_professional_layout()
         
     def _check_analytics_module(self):
-        """Check of analytics module correct is geïnstalleerd."""
-        try:
-            import pandas
-            import matplotlib
-            import numpy
-        except ImportError as e:
-            missing = str(e).split("'")[1]
+        """Check of analytics module correct is geïnstalleerd (zonder te laden)."""
+        from ..utils.lazy_imports import is_available
+        
+        for missing in ('pandas', 'matplotlib', 'numpy'):
+            if is_available(missing):
+                continue
             messagebox.showwarning(
                 "Module Vereist",
                 f"De analytics module vereist {missing}.\n\n"
                 f"Installeer met: pip install {missing}"
             )
+            break
     
     def create_professional_layout(self):
         """Creëer moderne dashboard layout met sidebar."""
@@ -210,6 +230,20 @@ class AnalyticsGUI(tk.Frame):
         )
         self.header_title.pack(side='left')
         
+        # Developer mode overlay: tijd en geheugen van de actieve tab
+        self.profile_label = None
+        if self.profiler is not None:
+            self.profile_label = tk.Label(
+                header_content,
+                text="⏱ nog geen metingen",
+                font=("Consolas", 9),
+                bg='#FDF6E3',
+                fg='#586E75',
+                padx=8,
+                pady=4
+            )
+            self.profile_label.pack(side='right', padx=(10, 0))
+        
         # Refresh button
         refresh_btn = tk.Button(
             header_content,
@@ -233,6 +267,8 @@ class AnalyticsGUI(tk.Frame):
         """Clear huidige content frame."""
         if self.current_frame:
             self.current_frame.destroy()
+        self.tab_analyses = {}
+        self.current_notebook = None
         self.current_frame = tk.Frame(self.content_frame, bg=self.dashboard_colors['content_bg'])
         self.current_frame.pack(fill='both', expand=True)
     
@@ -298,11 +334,24 @@ class AnalyticsGUI(tk.Frame):
         self.set_active_button("💰 Kosten Analyse")
         self.header_title.config(text="Kosten Analyse - Winstgevendheid")
         
-        self._show_coming_soon(self.current_frame, "Kosten Analyse", [
-            "📈 Marge trends over tijd",
-            "💸 Kosten breakdown per product",
-            "🏷️ Pricing optimalisatie"
-        ])
+        try:
+            # Laad winstgevendheid en energie modules
+            from src.analytics.winstgevendheid.breakeven import BreakEvenAnalyse
+            from src.analytics.winstgevendheid.configuratie import ConfiguratieImpact
+            from src.analytics.energie.kosten import EnergieKosten
+            from src.analytics.energie.heatmap import EnergieHeatmap
+            from src.analytics.energie.efficiency import EnergieEfficiency
+            
+            # Creëer sub-tabs
+            self._create_analysis_tabs(self.current_frame, [
+                ("📉 Break-even", BreakEvenAnalyse),
+                ("⚙️ Configuratie Impact", ConfiguratieImpact),
+                ("💡 Energie Kosten", EnergieKosten),
+                ("🔥 Energie Heatmap", EnergieHeatmap),
+                ("⚡ Energie Efficiency", EnergieEfficiency)
+            ])
+        except ImportError as e:
+            self._show_module_error(self.current_frame, "Kosten Analyse", str(e))
     
     def show_business(self):
         """Toon business insights."""
@@ -310,11 +359,18 @@ class AnalyticsGUI(tk.Frame):
         self.set_active_button("🎯 Business Insights")
         self.header_title.config(text="Business Insights - Strategisch Overzicht")
         
-        self._show_coming_soon(self.current_frame, "Business Insights", [
-            "🔥 Populaire product configuraties",
-            "⚡ Rush vs normale orders",
-            "📏 Size impact analyse"
-        ])
+        try:
+            # Laad portfolio modules
+            from src.analytics.portfolio.pareto import ParetoAnalyse
+            from src.analytics.portfolio.optimalisatie import PortfolioOptimalisatie
+            
+            # Creëer sub-tabs
+            self._create_analysis_tabs(self.current_frame, [
+                ("📐 Pareto 80/20", ParetoAnalyse),
+                ("🧮 Voorraad Advies", PortfolioOptimalisatie)
+            ])
+        except ImportError as e:
+            self._show_module_error(self.current_frame, "Business Insights", str(e))
     
     def _create_analysis_tabs(self, parent, modules):
         """Creëer tabs voor analyse modules met moderne styling."""
@@ -328,6 +384,9 @@ class AnalyticsGUI(tk.Frame):
         
         notebook = ttk.Notebook(parent, style='Modern.TNotebook')
         notebook.pack(fill='both', expand=True)
+        self.current_notebook = notebook
+        if self.profiler is not None:
+            notebook.bind('<<NotebookTabChanged>>', lambda event: self.update_profile_overlay())
         
         for name, module_class in modules:
             tab_frame = tk.Frame(notebook, bg=self.dashboard_colors['content_bg'])
@@ -339,10 +398,26 @@ class AnalyticsGUI(tk.Frame):
                     parent_frame=tab_frame,
                     colors=self.colors
                 )
+                self.tab_analyses[str(tab_frame)] = module
+                if self.profiler is not None:
+                    module.set_profiler(self.profiler)
                 module.create_widgets(tab_frame)
             except Exception as e:
                 self._show_module_error(tab_frame, name, str(e))
     
+    def update_profile_overlay(self):
+        """Toon de laatste metingen van de actieve tab in de header."""
+        if self.profile_label is None or self.current_notebook is None:
+            return
+        try:
+            selected = self.current_notebook.select()
+        except tk.TclError:  # notebook al opgeruimd
+            return
+        module = self.tab_analyses.get(selected)
+        if module is None:
+            return
+        self.profile_label.config(text=self.profiler.describe(type(module).__name__))
+    
     def _show_coming_soon(self, parent, title, features):
         """Toon coming soon bericht met moderne styling."""
         # Container
@@ -0,0 +1,479 @@
+"""
+Pricing Service - H2D Price Calculator
+======================================
+
+Lokale asyncio HTTP service boven calculate_sell_price/calculate_costs.
+
+De webshop riep de calculator aan door per offerte de CLI te starten.
+Deze service draait permanent (alleen op localhost, volledig offline,
+alleen standaard bibliotheek) en spreekt HTTP/1.1 met keep-alive.
+
+Endpoints:
+---------
+    POST /price     {"weight": 100, "material": "PLA Basic", "spoed": true}
+    POST /costs     zelfde velden → alleen de kostprijs
+    POST /batch     {"jobs": [...], "kind": "price"|"costs"} → {"results": [...]}
+    GET  /metrics   Prometheus tekstformaat (tellers + latency histogrammen)
+    GET  /health
+
+Velden en fout records zoals in batch.py (weight, material, hours,
+abrasive, multicolor, spoed; Nederlandse namen toegestaan).
+
+Coalescing:
+----------
+Identieke offertes (zelfde velden én zelfde configuratie versie) worden
+één keer berekend: losse requests delen een LRU cache van recente
+offertes, binnen een batch wordt elke unieke opdracht één keer
+gerekend. Een losse berekening duurt microseconden en loopt direct in
+de event loop, dus een in-flight wachtrij levert niets extra op.
+Treffers tellen mee in h2d_coalesced_total.
+
+Process pool:
+------------
+Batches vanaf POOL_MIN_JOBS opdrachten gaan in blokken van POOL_CHUNK
+naar een ProcessPoolExecutor (--workers), zodat de event loop vrij
+blijft voor losse offertes. Kleinere batches worden direct berekend.
+Elk blok krijgt de configuratie waardes van de actuele PricingContext
+mee; een worker bouwt daaruit (per versie gecached) dezelfde context.
+
+Configuratie:
+------------
+De PricingContext wordt hooguit elke CONTEXT_REFRESH_SECONDS opnieuw
+opgevraagd (current_context); een gewijzigde user_settings.json telt
+dus zonder herstart.
+
+Gebruik:
+-------
+    python -m src.interface.service --port 8765 --workers 4
+    curl -s localhost:8765/price -d '{"weight": 100, "material": "PLA Basic"}'
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core import calculate_costs, calculate_sell_price, current_context
+from ..core.pricing_context import PricingContext
+from ..utils.instrumentation import Histogram
+from .batch import error_message, parse_job
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Verbinding sluiten na zoveel seconden zonder request
+KEEPALIVE_TIMEOUT = 15.0
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+# Batches vanaf zoveel opdrachten naar de process pool, in blokken
+POOL_MIN_JOBS = 500
+POOL_CHUNK = 1_000
+
+# Recente offertes (per configuratie versie)
+QUOTE_CACHE_SIZE = 4_096
+
+CONTEXT_REFRESH_SECONDS = 1.0
+
+# Histogram grenzen in seconden (Prometheus 'le' buckets)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error'}
+
+
+# === BEREKENING (ook in pool workers) ===
+
+# Contexten in een pool worker, per configuratie versie
+_worker_contexts: Dict[str, PricingContext] = {}
+
+
+def compute_quote(kind: str, params: Tuple, context) -> Dict[str, Any]:
+    """Eén offerte als JSON record ('price' of 'costs').
+
+    Parameters:
+    ----------
+    kind : str
+        'price' (verkoopprijs) of 'costs' (alleen kostprijs)
+    params : Tuple
+        Resultaat van batch.parse_job
+    context : PricingContext
+        Tarieven en markups
+
+    Raises:
+    ------
+    KeyError, ValueError
+        Onbekend materiaal of ongeldige waardes
+    """
+    weight, material, hours, abrasive, multicolor, spoed = params
+    if kind == 'costs':
+        return calculate_costs(weight, material, print_hours=hours, abrasive=abrasive,
+                               context=context).to_dict()
+    result = calculate_sell_price(weight_g=weight, material=material, print_hours=hours,
+                                  abrasive=abrasive, multicolor=multicolor, spoed=spoed,
+                                  context=context)
+    record = result.breakdown.to_dict()
+    record['sell_price'] = round(result.sell_price, 2)
+    record['margin_pct'] = round(result.margin_pct, 2)
+    return record
+
+
+def _quote_many(kind: str, jobs: List[Any], context) -> Tuple[List[Dict[str, Any]], int]:
+    """Blok opdrachten → (records, samengevoegd).
+
+    Fouten worden een record met 'error'; identieke opdrachten binnen
+    het blok worden één keer berekend.
+    """
+    seen: Dict[Tuple, Dict[str, Any]] = {}
+    results = []
+    for job in jobs:
+        try:
+            if not isinstance(job, dict):
+                raise ValueError("opdracht is geen JSON object")
+            params = parse_job(job)
+            record = seen.get(params)
+            if record is None:
+                record = seen[params] = compute_quote(kind, params, context)
+            results.append(record)
+        except Exception as e:
+            results.append({'error': error_message(e)})
+    return results, len(results) - len(seen)
+
+
+def _quote_chunk(kind: str, jobs: List[Any], version: str,
+                 values: Dict[str, float]) -> Tuple[List[Dict[str, Any]], int]:
+    """Pool worker: _quote_many met de context van de service.
+
+    PricingContext zelf is niet picklebaar (read-only values), dus de
+    configuratie waardes gaan mee en de worker bouwt de context opnieuw.
+    """
+    context = _worker_contexts.get(version)
+    if context is None:
+        context = _worker_contexts[version] = PricingContext.from_values(values)
+    return _quote_many(kind, jobs, context)
+
+
+# === METRICS ===
+
+class ServiceMetrics:
+    """Tellers, gauges en histogrammen voor /metrics."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests: Dict[Tuple[str, int], int] = {}
+        self.latency: Dict[str, Histogram] = {}
+        self.coalesced: Dict[str, int] = {'cache': 0, 'batch': 0}
+        self.batch_jobs = 0
+        self.connections = 0
+        self.inflight = 0
+
+    def observe(self, endpoint: str, status: int, seconds: float) -> None:
+        key = (endpoint, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get(endpoint)
+        if histogram is None:
+            histogram = self.latency[endpoint] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def render(self) -> str:
+        lines = [
+            '# HELP h2d_requests_total HTTP requests per endpoint en status',
+            '# TYPE h2d_requests_total counter',
+        ]
+        for (endpoint, status), value in sorted(self.requests.items()):
+            lines.append(f'h2d_requests_total{{endpoint="{endpoint}",status="{status}"}} {value}')
+
+        lines += ['# HELP h2d_request_duration_seconds Verwerkingstijd per request',
+                  '# TYPE h2d_request_duration_seconds histogram']
+        for endpoint, histogram in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append(f'h2d_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'h2d_request_duration_seconds_sum{{endpoint="{endpoint}"}} {histogram.total:.6f}')
+            lines.append(f'h2d_request_duration_seconds_count{{endpoint="{endpoint}"}} {histogram.count}')
+
+        lines += ['# HELP h2d_coalesced_total Offertes beantwoord zonder eigen berekening',
+                  '# TYPE h2d_coalesced_total counter']
+        for source, value in sorted(self.coalesced.items()):
+            lines.append(f'h2d_coalesced_total{{source="{source}"}} {value}')
+
+        lines += [
+            '# HELP h2d_batch_jobs_total Opdrachten verwerkt via /batch',
+            '# TYPE h2d_batch_jobs_total counter',
+            f'h2d_batch_jobs_total {self.batch_jobs}',
+            '# HELP h2d_open_connections Open keep-alive verbindingen',
+            '# TYPE h2d_open_connections gauge',
+            f'h2d_open_connections {self.connections}',
+            '# HELP h2d_inflight_requests Requests in behandeling',
+            '# TYPE h2d_inflight_requests gauge',
+            f'h2d_inflight_requests {self.inflight}',
+            '# HELP h2d_uptime_seconds Seconden sinds de start',
+            '# TYPE h2d_uptime_seconds gauge',
+            f'h2d_uptime_seconds {time.time() - self.started:.1f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+# === SERVICE ===
+
+class HTTPError(Exception):
+    """Fout die als HTTP status teruggaat."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class PricingService:
+    """asyncio HTTP/1.1 server met keep-alive, coalescing en process pool.
+
+    Parameters:
+    ----------
+    host : str
+        Bind adres (standaard alleen localhost)
+    port : int
+        Poort (0 = vrije poort kiezen)
+    workers : int
+        Processen voor grote batches (0 = alles in de event loop)
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = 0):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.metrics = ServiceMetrics()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._cache: 'OrderedDict[Tuple, Dict[str, Any]]' = OrderedDict()
+        self._context = None
+        self._context_checked = 0.0
+
+    # --- lifecycle ---
+
+    async def start(self) -> None:
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(self.workers)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"H2D pricing service luistert op http://{self.host}:{self.port}", flush=True)
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # --- pricing ---
+
+    def context(self):
+        """PricingContext, hooguit elke CONTEXT_REFRESH_SECONDS opnieuw opgevraagd."""
+        now = time.monotonic()
+        if self._context is None or now - self._context_checked >= CONTEXT_REFRESH_SECONDS:
+            self._context = current_context()
+            self._context_checked = now
+        return self._context
+
+    async def quote(self, kind: str, job: Any) -> Dict[str, Any]:
+        """Eén offerte; identieke offertes komen uit de LRU cache."""
+        if not isinstance(job, dict):
+            raise HTTPError(400, "body moet een JSON object zijn")
+        try:
+            params = parse_job(job)
+        except ValueError as e:
+            raise HTTPError(422, error_message(e))
+
+        context = self.context()
+        key = (kind, context.version) + params
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.metrics.coalesced['cache'] += 1
+            return cached
+
+        try:
+            record = compute_quote(kind, params, context)
+        except Exception as e:
+            raise HTTPError(422, error_message(e))
+        self._cache[key] = record
+        if len(self._cache) > QUOTE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return record
+
+    async def quote_batch(self, kind: str, jobs: List[Any]) -> List[Dict[str, Any]]:
+        """Batch: grote batches in blokken naar de process pool."""
+        self.metrics.batch_jobs += len(jobs)
+        context = self.context()
+        if self._pool is None or len(jobs) < POOL_MIN_JOBS:
+            parts = [_quote_many(kind, jobs, context)]
+        else:
+            loop = asyncio.get_running_loop()
+            values = dict(context.values)
+            chunks = [jobs[i:i + POOL_CHUNK] for i in range(0, len(jobs), POOL_CHUNK)]
+            parts = await asyncio.gather(*(loop.run_in_executor(self._pool, _quote_chunk, kind, chunk,
+                                                                context.version, values)
+                                           for chunk in chunks))
+        self.metrics.coalesced['batch'] += sum(merged for _, merged in parts)
+        return [record for records, _ in parts for record in records]
+
+    # --- HTTP ---
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, str, bytes]:
+        """(status, content type, body) voor één request."""
+        if path == '/metrics':
+            if method != 'GET':
+                raise HTTPError(405, "gebruik GET")
+            return 200, 'text/plain; version=0.0.4', self.metrics.render().encode()
+        if path == '/health':
+            return 200, 'application/json', b'{"status": "ok"}'
+        if path not in ('/price', '/costs', '/batch'):
+            raise HTTPError(404, f"onbekend endpoint {path}")
+        if method != 'POST':
+            raise HTTPError(405, "gebruik POST")
+
+        try:
+            payload = json.loads(body or b'null')
+        except ValueError as e:
+            raise HTTPError(400, f"ongeldige JSON: {e}")
+
+        if path == '/batch':
+            if isinstance(payload, dict):
+                kind = payload.get('kind', 'price')
+                jobs = payload.get('jobs')
+            else:
+                kind, jobs = 'price', payload
+            if kind not in ('price', 'costs') or not isinstance(jobs, list):
+                raise HTTPError(400, "verwacht {\"jobs\": [...], \"kind\": \"price\"|\"costs\"}")
+            result = {'results': await self.quote_batch(kind, jobs)}
+        else:
+            result = await self.quote(path[1:], payload)
+        return 200, 'application/json', json.dumps(result).encode()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """(method, path, version, headers, body) of None bij een gesloten verbinding."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "headers te groot")
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, path, version = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "ongeldige request regel")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "ongeldige Content-Length")
+        if length < 0:
+            raise HTTPError(400, "ongeldige Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"body groter dan {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), path.split('?', 1)[0], version, headers, body
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        self.metrics.connections += 1
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, version, headers, body = request
+                    connection = headers.get('connection', '').lower()
+                    keep_alive = (connection != 'close' if version == 'HTTP/1.1'
+                                  else connection == 'keep-alive')
+                except HTTPError as e:
+                    await self._respond(writer, e.status, 'application/json',
+                                        json.dumps({'error': str(e)}).encode(), False)
+                    break
+                except asyncio.IncompleteReadError:
+                    break
+
+                start = time.perf_counter()
+                self.metrics.inflight += 1
+                try:
+                    status, content_type, payload = await self._route(method, path, body)
+                except HTTPError as e:
+                    status, content_type = e.status, 'application/json'
+                    payload = json.dumps({'error': str(e)}).encode()
+                except Exception as e:
+                    print(f"Pricing service fout op {path}: {e}", file=sys.stderr)
+                    status, content_type = 500, 'application/json'
+                    payload = json.dumps({'error': str(e)}).encode()
+                finally:
+                    self.metrics.inflight -= 1
+                endpoint = path if status != 404 else 'unknown'
+                self.metrics.observe(endpoint, status, time.perf_counter() - start)
+
+                await self._respond(writer, status, content_type, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.metrics.connections -= 1
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, content_type: str,
+                       payload: bytes, keep_alive: bool) -> None:
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Start de service (Ctrl+C om te stoppen)."""
+    parser = argparse.ArgumentParser(description="H2D lokale pricing HTTP service")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Bind adres")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Poort (0 = vrij kiezen)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Processen voor grote batches (0 = geen pool)")
+    args = parser.parse_args(argv)
+
+    service = PricingService(args.host, args.port, args.workers)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        print("\nPricing service gestopt.")
+    return 0
+
+
+__all__ = ['PricingService', 'ServiceMetrics', 'compute_quote', 'main']
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,226 @@
+"""
+Virtual Treeview - H2D Price Calculator
+=======================================
+
+Gevirtualiseerde ttk.Treeview voor grote lijsten (100k+ producten).
+
+Een gewone Treeview maakt voor elke rij een Tk item aan; opbouwen en
+scrollen wordt dan traag. Deze widget houdt de volledige lijst in
+Python en materialiseert alleen de zichtbare rijen plus een kleine
+buffer:
+
+- Scrollpositie → index venster [offset, offset + zichtbaar + buffer)
+- Eigen scrollbar en muiswiel; de Treeview zelf blijft bovenaan staan
+- Keyed diff per venster: alleen rijen die verdwijnen worden verwijderd,
+  gewijzigde rijen worden ge-update en nieuwe rijen ingevoegd
+
+Een refresh kost daardoor O(zichtbare rijen) Tk operaties, ongeacht
+de totale lijstgrootte. Item iids zijn de keys (bijv. product_id),
+zodat selectie via tree.selection() direct de key oplevert.
+
+Gebruik:
+-------
+    >>> vtree = VirtualTreeview(frame, columns, row_formatter=format_row,
+    ...                         key_func=lambda p: p.product_id)
+    >>> vtree.tree.heading('ID', text='Product ID')
+    >>> vtree.set_items(products)
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class VirtualTreeview:
+    """Treeview die alleen het zichtbare venster materialiseert.
+
+    Parameters:
+    ----------
+    parent : tk.Widget
+        Parent frame; tree en scrollbar worden hierin gepackt
+    columns : Sequence[str]
+        Kolom identifiers (zoals bij ttk.Treeview)
+    row_formatter : Callable[[Any], Tuple]
+        Zet een item om naar de kolomwaarden (alleen voor zichtbare rijen)
+    key_func : Callable[[Any], Any]
+        Unieke key per item, wordt de Treeview iid
+    height : int
+        Aantal zichtbare rijen voordat de widget geresized is
+    buffer_rows : int
+        Extra rijen onder het zichtbare deel (soepel toetsenbord scrollen)
+    """
+
+    # Geschatte hoogte van de kolomkoppen in pixels
+    HEADER_HEIGHT = 25
+
+    def __init__(self, parent: tk.Widget, columns: Sequence[str],
+                 row_formatter: Callable[[Any], Tuple],
+                 key_func: Callable[[Any], Any],
+                 height: int = 15, buffer_rows: int = 10, **tree_kwargs):
+        self.row_formatter = row_formatter
+        self.key_func = key_func
+        self.buffer_rows = buffer_rows
+        self.visible_rows = height
+
+        self._items: List[Any] = []
+        self._keys: List[str] = []
+        self._positions: Dict[str, int] = {}   # key → index in _items (O(1) get_item)
+        self._offset = 0
+        self._rendered: Dict[str, Tuple] = {}
+        self._selected: set = set()
+
+        self.tree = ttk.Treeview(parent, columns=columns, height=height, **tree_kwargs)
+        self.scrollbar = ttk.Scrollbar(parent, orient='vertical', command=self._on_scrollbar)
+
+        # De Treeview meldt eigen scrolls (bijv. pijltjestoetsen) hier
+        self.tree.configure(yscrollcommand=self._on_tree_yview)
+
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda e: self._scroll_by(3))
+
+    # === DATA ===
+
+    def set_items(self, items: Sequence[Any], keep_position: bool = False) -> None:
+        """Vervang de lijst; alleen het zichtbare venster wordt gediffed.
+
+        Parameters:
+        ----------
+        items : Sequence[Any]
+            Nieuwe volledige lijst (volgorde = weergavevolgorde)
+        keep_position : bool
+            True om de scrollpositie te behouden (refresh), anders bovenaan
+        """
+        self._items = list(items)
+        self._keys = [str(self.key_func(item)) for item in self._items]
+        self._positions = {key: index for index, key in enumerate(self._keys)}
+        if not keep_position:
+            self._offset = 0
+        self._render()
+
+    def refresh(self) -> None:
+        """Her-render het huidige venster (bijv. na wijziging van items)."""
+        self._render()
+
+    def get_item(self, key: Any) -> Optional[Any]:
+        """Zoek item op key binnen de huidige lijst (O(1) via de key index)."""
+        index = self._positions.get(str(key))
+        return self._items[index] if index is not None else None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    # === VENSTER ===
+
+    @property
+    def window(self) -> Tuple[int, int]:
+        """Huidig geïndexeerd venster (start, eind) in de volledige lijst."""
+        end = min(self._offset + self.visible_rows + self.buffer_rows, len(self._items))
+        return self._offset, end
+
+    def _max_offset(self) -> int:
+        return max(0, len(self._items) - self.visible_rows)
+
+    def _scroll_to(self, offset: int) -> None:
+        offset = max(0, min(int(offset), self._max_offset()))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def _scroll_by(self, rows: int) -> str:
+        self._scroll_to(self._offset + rows)
+        return 'break'
+
+    def _render(self) -> None:
+        """Keyed diff van het zichtbare venster naar de Treeview."""
+        current = list(self.tree.get_children())
+
+        # Selectie: binnen het venster is de Treeview leidend
+        self._selected = (self._selected - set(current)) | set(self.tree.selection())
+
+        start, end = self.window
+        window_keys = self._keys[start:end]
+        wanted = set(window_keys)
+
+        # Delete: rijen die uit het venster vallen
+        stale = [iid for iid in current if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                self._rendered.pop(iid, None)
+
+        # Insert/update/move in weergavevolgorde
+        for index, (key, item) in enumerate(zip(window_keys, self._items[start:end])):
+            values = tuple(self.row_formatter(item))
+            if key in self._rendered:
+                if self._rendered[key] != values:
+                    self.tree.item(key, values=values)
+                    self._rendered[key] = values
+                if self.tree.index(key) != index:
+                    self.tree.move(key, '', index)
+            else:
+                self.tree.insert('', index, iid=key, values=values)
+                self._rendered[key] = values
+
+        selection = [key for key in window_keys if key in self._selected]
+        self.tree.selection_set(selection)
+
+        self.tree.yview_moveto(0)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self) -> None:
+        total = len(self._items)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = self._offset / total
+        last = min(1.0, (self._offset + self.visible_rows) / total)
+        self.scrollbar.set(first, last)
+
+    # === EVENTS ===
+
+    def _on_scrollbar(self, *args) -> None:
+        """Scrollbar command: 'moveto fractie' of 'scroll n units/pages'."""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self._scroll_to(float(args[1]) * len(self._items))
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if len(args) > 2 and args[2] == 'pages':
+                amount *= self.visible_rows
+            self._scroll_by(amount)
+
+    def _on_tree_yview(self, first: str, last: str) -> None:
+        """Treeview scrolde zelf (focus op bufferrij): schuif venster op."""
+        shifted = int(round(float(first) * len(self.tree.get_children())))
+        if shifted > 0:
+            # Niet binnen de Tk redraw callback zelf de tree aanpassen
+            self.tree.after_idle(self._scroll_to, self._offset + shifted)
+
+    def _on_mousewheel(self, event) -> str:
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_configure(self, event) -> None:
+        """Herbereken aantal zichtbare rijen na resize."""
+        try:
+            row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        except (tk.TclError, ValueError):
+            row_height = 20
+        visible = max(1, (event.height - self.HEADER_HEIGHT) // row_height)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self._offset = min(self._offset, self._max_offset())
+            self._render()
+
+
+__all__ = ['VirtualTreeview']
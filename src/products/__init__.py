@@ -11,6 +11,9 @@ Componenten:
 -----------
 - Product: Domain model voor 3D print producten
 - ProductManager: Business logic en CSV integratie
+- ProductLogStore: Wijzigingslog voor update/delete met compactie
+- RunningStatistics: Lopende aggregaten voor get_statistics
+- PopularityIndex: Vervallende populariteit met top-K (get_popular)
 - ProductCharts: Visualisaties met scrollbare grafieken
 
 Gebruik:
@@ -38,13 +41,18 @@ from typing import TYPE_CHECKING
 from .product_model import Product
 from .product_manager import ProductManager
 
-# Probeer charts te importeren (vereist matplotlib)
-try:
+# Charts (vereist matplotlib) pas laden bij gebruik; ImportError komt dan
+# bij `from products import ProductCharts` als matplotlib ontbreekt
+from ..utils.lazy_imports import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ProductCharts': '.product_charts',
+})
+
+if TYPE_CHECKING:
     from .product_charts import ProductCharts
-    __all__ = ['Product', 'ProductManager', 'ProductCharts']
-except ImportError:
-    # Als matplotlib niet geïnstalleerd is
-    __all__ = ['Product', 'ProductManager']
+
+__all__ = ['Product', 'ProductManager', 'ProductCharts']
 
 # Versie info
 __version__ = '2.1.0' 
\ No newline at end of file
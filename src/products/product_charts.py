@@ -22,6 +22,12 @@ Laat zien hoe data visualisatie inzicht geeft in:
 - Hoe prijzen zich verhouden tot gewicht
 - Trends in productie over tijd
 
+Level-of-detail:
+---------------
+Marge trends, gewicht/prijs en tijdlijn gebruiken utils.downsampling
+zodat grote datasets binnen een punten-budget getekend worden.
+Het fullscreen venster gebruikt een hoger budget en her-queryt bij zoom.
+
 Vereisten:
 ---------
 - matplotlib voor grafieken
@@ -31,8 +37,9 @@ Vereisten:
 import tkinter as tk
 from tkinter import ttk
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
+import matplotlib.dates as mdates
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
@@ -40,6 +47,7 @@ import numpy as np
 
 from .product_model import Product
 from .product_manager import ProductManager
+from ..utils.downsampling import LODLine, LODScatter, get_point_budget
 
 
 class ProductCharts:
@@ -229,11 +237,22 @@ class ProductCharts:
         
     def create_margin_trends(self, products: List[Product]) -> None:
         """Chart 3: Marge trends over tijd."""
-        frame = self._create_chart_frame("📈 Marge Trends")
+        frame = self._create_chart_frame(
+            "📈 Marge Trends",
+            fullscreen_callback=lambda: self._open_fullscreen(
+                "Marge Trends", self._plot_margin_trends, products)
+        )
         
         fig = Figure(figsize=(8, 4), dpi=100)
         ax = fig.add_subplot(111)
+        self._plot_margin_trends(fig, ax, products, get_point_budget())
+        
+        canvas = FigureCanvasTkAgg(fig, frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True)
         
+    def _plot_margin_trends(self, fig: Figure, ax, products: List[Product], budget: int) -> None:
+        """Teken dagelijkse gemiddelde marge met LTTB downsampling."""
         # Sorteer op datum
         sorted_products = sorted(products, key=lambda p: p.created_at)
         
@@ -246,62 +265,79 @@ class ProductCharts:
             if p.margin_pct > 0:
                 daily_margins[date_key].append(p.margin_pct)
                 
-        # Bereken gemiddelde per dag
-        if daily_margins:
-            dates = sorted(daily_margins.keys())
-            avg_margins = [np.mean(daily_margins[d]) for d in dates]
-            
-            ax.plot(dates, avg_margins, marker='o', linewidth=2, 
-                   markersize=6, color=self.colors['secondary'])
-            ax.fill_between(dates, avg_margins, alpha=0.3, color=self.colors['secondary'])
-            
-            ax.set_xlabel('Datum')
-            ax.set_ylabel('Gemiddelde Marge (%)')
-            ax.set_title('Marge Ontwikkeling Over Tijd')
-            ax.grid(True, alpha=0.3)
-            
-            # Roteer x-labels
-            fig.autofmt_xdate()
+        # Bereken gemiddelde per dag (dagen zonder marge overslaan)
+        dates = [d for d in sorted(daily_margins.keys()) if daily_margins[d]]
+        if not dates:
+            return
+        avg_margins = [np.mean(daily_margins[d]) for d in dates]
+        x_values = mdates.date2num(dates)
+        
+        # Markers alleen als alle punten getekend worden
+        show_markers = len(dates) <= budget
+        lod = LODLine(ax, x_values, avg_margins, budget=budget, method='lttb',
+                      marker='o' if show_markers else None, linewidth=2,
+                      markersize=6, color=self.colors['secondary'])
+        if not lod.is_downsampled:
+            # Vulling volgt de zoom her-query niet, dus alleen bij volledige data
+            ax.fill_between(x_values, avg_margins, alpha=0.3, color=self.colors['secondary'])
+        ax.xaxis_date()
+        
+        ax.set_xlabel('Datum')
+        ax.set_ylabel('Gemiddelde Marge (%)')
+        ax.set_title('Marge Ontwikkeling Over Tijd')
+        ax.grid(True, alpha=0.3)
         
-        canvas = FigureCanvasTkAgg(fig, frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+        # Roteer x-labels
+        fig.autofmt_xdate()
         
     def create_weight_price_scatter(self, products: List[Product]) -> None:
         """Chart 4: Scatter plot gewicht vs prijs."""
-        frame = self._create_chart_frame("⚖️ Gewicht vs Prijs Analyse")
+        frame = self._create_chart_frame(
+            "⚖️ Gewicht vs Prijs Analyse",
+            fullscreen_callback=lambda: self._open_fullscreen(
+                "Gewicht vs Prijs", self._plot_weight_price_scatter, products)
+        )
         
         fig = Figure(figsize=(8, 4), dpi=100)
         ax = fig.add_subplot(111)
+        self._plot_weight_price_scatter(fig, ax, products, get_point_budget())
         
+        canvas = FigureCanvasTkAgg(fig, frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True)
+        
+    def _plot_weight_price_scatter(self, fig: Figure, ax, products: List[Product], budget: int) -> None:
+        """Teken gewicht vs prijs; boven het budget als hexbin."""
         # Data
-        weights = [p.weight_g for p in products if p.weight_g > 0 and p.sell_price > 0]
-        prices = [p.sell_price for p in products if p.weight_g > 0 and p.sell_price > 0]
+        weights = np.array([p.weight_g for p in products if p.weight_g > 0 and p.sell_price > 0])
+        prices = np.array([p.sell_price for p in products if p.weight_g > 0 and p.sell_price > 0])
         
-        if weights and prices:
-            # Scatter plot
-            scatter = ax.scatter(weights, prices, alpha=0.6, s=50, 
-                               c=prices, cmap='viridis')
-            
-            # Trendlijn
-            z = np.polyfit(weights, prices, 1)
-            p = np.poly1d(z)
-            ax.plot(weights, p(weights), "r--", alpha=0.8, 
-                   label=f'Trend: €{z[0]:.3f}/gram')
-            
-            ax.set_xlabel('Gewicht (gram)')
-            ax.set_ylabel('Verkoopprijs (€)')
-            ax.set_title('Correlatie Gewicht en Prijs')
-            ax.grid(True, alpha=0.3)
-            ax.legend()
+        if len(weights) == 0:
+            return
             
-            # Colorbar
-            cbar = plt.colorbar(scatter, ax=ax)
-            cbar.set_label('Prijs (€)')
+        # Scatter plot (hexbin met gemiddelde prijs bij te veel punten)
+        cloud = LODScatter(ax, weights, prices, budget=budget, c=prices,
+                           cmap='viridis', alpha=0.6, s=50)
+        
+        # Trendlijn (100 punten volstaan voor een rechte lijn)
+        z = np.polyfit(weights, prices, 1)
+        p = np.poly1d(z)
+        x_trend = np.linspace(weights.min(), weights.max(), 100)
+        ax.plot(x_trend, p(x_trend), "r--", alpha=0.8, 
+               label=f'Trend: €{z[0]:.3f}/gram')
+        
+        ax.set_xlabel('Gewicht (gram)')
+        ax.set_ylabel('Verkoopprijs (€)')
+        title = 'Correlatie Gewicht en Prijs'
+        if cloud.is_binned:
+            title += f' (n={len(weights)}, gebind)'
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+        ax.legend()
         
-        canvas = FigureCanvasTkAgg(fig, frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+        # Colorbar
+        cbar = fig.colorbar(cloud.mappable, ax=ax)
+        cbar.set_label('Gem. prijs (€)' if cloud.is_binned else 'Prijs (€)')
         
     def create_top_products_bar(self, products: List[Product]) -> None:
         """Chart 5: Top 10 meest winstgevende producten."""
@@ -337,11 +373,22 @@ class ProductCharts:
         
     def create_production_timeline(self, products: List[Product]) -> None:
         """Chart 6: Productie volume over tijd."""
-        frame = self._create_chart_frame("📅 Productie Tijdlijn")
+        frame = self._create_chart_frame(
+            "📅 Productie Tijdlijn",
+            fullscreen_callback=lambda: self._open_fullscreen(
+                "Productie Tijdlijn", self._plot_production_timeline, products)
+        )
         
         fig = Figure(figsize=(8, 4), dpi=100)
         ax = fig.add_subplot(111)
+        self._plot_production_timeline(fig, ax, products, get_point_budget())
+        
+        canvas = FigureCanvasTkAgg(fig, frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True)
         
+    def _plot_production_timeline(self, fig: Figure, ax, products: List[Product], budget: int) -> None:
+        """Teken weekvolume; boven het budget als min-max trap-lijn."""
         # Groepeer per week
         weekly_counts = {}
         for p in products:
@@ -349,27 +396,55 @@ class ProductCharts:
             week_start = p.created_at.date() - timedelta(days=p.created_at.weekday())
             weekly_counts[week_start] = weekly_counts.get(week_start, 0) + 1
             
-        if weekly_counts:
-            weeks = sorted(weekly_counts.keys())
-            counts = [weekly_counts[w] for w in weeks]
+        if not weekly_counts:
+            return
             
+        weeks = sorted(weekly_counts.keys())
+        counts = [weekly_counts[w] for w in weeks]
+        
+        if len(weeks) <= budget:
             # Bar chart
             ax.bar(weeks, counts, width=6, color=self.colors['primary'], alpha=0.7)
-            
-            ax.set_xlabel('Week')
-            ax.set_ylabel('Aantal Producten')
-            ax.set_title('Productie Volume per Week')
-            ax.grid(True, axis='y', alpha=0.3)
-            
-            # Roteer labels
-            fig.autofmt_xdate()
+        else:
+            # Te veel bars: min-max behoudt piekweken
+            LODLine(ax, mdates.date2num(weeks), counts, budget=budget, method='minmax',
+                    drawstyle='steps-mid', linewidth=1, color=self.colors['primary'])
+            ax.xaxis_date()
+            ax.set_ylim(bottom=0)
+        
+        ax.set_xlabel('Week')
+        ax.set_ylabel('Aantal Producten')
+        ax.set_title('Productie Volume per Week')
+        ax.grid(True, axis='y', alpha=0.3)
         
-        canvas = FigureCanvasTkAgg(fig, frame)
+        # Roteer labels
+        fig.autofmt_xdate()
+        
+    def _open_fullscreen(self, title: str, plot_func, products: List[Product]) -> None:
+        """Open chart in groot venster met zoom toolbar en hoger budget.
+        
+        Bij inzoomen her-queryen LODLine/LODScatter het zichtbare bereik,
+        waardoor meer detail zichtbaar wordt dan in het overzicht.
+        """
+        window = tk.Toplevel(self.parent)
+        window.title(f"{title} - Volledig Scherm")
+        window.geometry("1400x900")
+        window.configure(bg='white')
+        
+        fig = Figure(figsize=(14, 8), dpi=100)
+        ax = fig.add_subplot(111)
+        plot_func(fig, ax, products, get_point_budget(fullscreen=True))
+        
+        canvas = FigureCanvasTkAgg(fig, window)
+        toolbar = NavigationToolbar2Tk(canvas, window)
+        toolbar.update()
         canvas.draw()
         canvas.get_tk_widget().pack(fill='both', expand=True)
         
-    def _create_chart_frame(self, title: str) -> tk.Frame:
-        """Maak frame voor individuele chart."""
+        window.focus_set()
+        
+    def _create_chart_frame(self, title: str, fullscreen_callback=None) -> tk.Frame:
+        """Maak frame voor individuele chart (optioneel met fullscreen knop)."""
         # Container
         container = tk.LabelFrame(
             self.scrollable_frame,
@@ -382,6 +457,20 @@ class ProductCharts:
         )
         container.pack(fill='both', expand=True, padx=10, pady=10)
         
+        # Fullscreen knop (zoomen herlaadt op hoger detail)
+        if fullscreen_callback:
+            tk.Button(
+                container,
+                text="⛶ Volledig Scherm",
+                font=("Arial", 9),
+                bg=self.colors['primary'],
+                fg='white',
+                bd=0,
+                padx=10,
+                cursor='hand2',
+                command=fullscreen_callback
+            ).pack(anchor='ne', padx=5, pady=(2, 0))
+        
         # Chart frame
         chart_frame = tk.Frame(container, bg='white')
         chart_frame.pack(fill='both', expand=True, padx=5, pady=5)
@@ -4,14 +4,28 @@ Product Manager - H2D Price Calculator
 
 VEREENVOUDIGD: Leest direct uit master_calculations.csv
 Geen aparte JSON files meer - less is more!
+
+Updates en deletes komen als append in producten/product_log/ (zie
+product_store.py); bij het laden wint per product_id de laatste versie.
 """
 
 from typing import Dict, List, Optional, Set
 from datetime import datetime
 import csv
+import heapq
+import io
 import os
+import weakref
 
-from .product_model import Product
+from .product_model import Product, add_event_listener, remove_event_listener
+from .product_popularity import POPULARITY_FILENAME, PopularityIndex
+from .product_stats import RunningStatistics
+from .product_store import ProductLogStore
+from ..utils.schema import MASTER_COLUMNS, build_master_row, format_timestamp, parse_bool, parse_timestamp
+from ..utils.instrumentation import traced
+from ..utils.log_writer import get_record_writer, make_record
+from ..utils.sqlite_store import get_storage_backend, open_default_store
+from ..utils.warm_start import SNAPSHOT_REFRESH_ROWS, WarmStartCache, read_rows, warm_start_enabled
 
 
 class ProductManager:
@@ -20,81 +34,191 @@ class ProductManager:
     Geen aparte JSON meer - alles komt uit één centrale CSV file!
     """
     
-    def __init__(self, storage_path: Optional[str] = None, auto_save: bool = True):
-        """Initialiseer met pad naar master_calculations.csv"""
+    def __init__(self, storage_path: Optional[str] = None, auto_save: bool = True,
+                 backend: Optional[str] = None, exports_dir: Optional[str] = None):
+        """Initialiseer met pad naar master_calculations.csv
+        
+        backend: 'csv' of 'sqlite' (default: instelling 'storage_backend')
+        exports_dir: exports map (default: <project>/exports, zoals DataManager in de GUI)
+        """
         # Zoek het bedrijfsleider directory
         bedrijfsleider_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        exports_dir = exports_dir or os.path.join(bedrijfsleider_dir, "exports")
         
         # Nu altijd het juiste pad naar master_calculations.csv in nieuwe structuur
-        self.csv_path = os.path.join(bedrijfsleider_dir, "exports", "producten", "master_calculations.csv")
+        self.csv_path = os.path.join(exports_dir, "producten", "master_calculations.csv")
         
         # Maak directory aan als die niet bestaat
         os.makedirs(os.path.dirname(self.csv_path), exist_ok=True)
         
         self._cache: Dict[str, Product] = {}
         
+        # Optionele SQLite backend (zelfde database als DataManager)
+        self.backend = backend or get_storage_backend()
+        self.db = None
+        if self.backend == 'sqlite':
+            self.db = open_default_store(exports_dir)
+            
+        # CSV appends via de single-writer (zelfde lock/daemon als DataManager)
+        self.writer = get_record_writer(exports_dir) if self.db is None else None
+        
+        # Wijzigingslog voor update/delete (master blijft append-only)
+        self.store = None
+        if self.db is None:
+            self.store = ProductLogStore(os.path.join(os.path.dirname(self.csv_path), "product_log"),
+                                         self.writer)
+        
         print(f"📁 Zoek CSV in: {self.csv_path}")
         
         # Laad producten uit CSV
         self._load_from_csv()
         
+        # Lopende aggregaten voor get_statistics (O(1) lezen)
+        self._stats = RunningStatistics()
+        self._stats.rebuild(self._cache.values())
+        
+        # Vervallende populariteit uit de Product events (blijft bewaard over herstarts)
+        popularity_path = None if self.db is not None else os.path.join(
+            os.path.dirname(self.csv_path), POPULARITY_FILENAME)
+        self.popularity = PopularityIndex(popularity_path, db=self.db)
+        add_event_listener(self._on_product_event)
+        # Populariteit wegschrijven bij close(), opruimen of afsluiten;
+        # de finalizer houdt alleen de index vast, niet de manager zelf
+        self._finalizer = weakref.finalize(self, self.popularity.save)
+        
+    def close(self) -> None:
+        """Stop met events volgen en schrijf de populariteit weg (idempotent)"""
+        remove_event_listener(self._on_product_event)
+        self._finalizer()
+        
+    @traced('loading.products')
     def _load_from_csv(self) -> None:
         """Laad alle producten direct uit master_calculations.csv"""
+        if self.db is not None:
+            self._load_from_db()
+            return
+            
         if not os.path.exists(self.csv_path):
             print(f"⚠️ CSV bestand niet gevonden: {self.csv_path}")
             return
             
         try:
-            with open(self.csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
+            # Warm start: snapshot van de geparste producten + alleen de nieuwe staart
+            snapshot_cache = WarmStartCache(self.csv_path, 'products') if warm_start_enabled() else None
+            snapshot = snapshot_cache.load() if snapshot_cache is not None else None
+            if snapshot is not None:
+                self._cache.update(snapshot.payload)
                 
-                for row in reader:
-                    # LAAD ALLE PRODUCTEN - geen filter meer!
-                    # Elke berekening is waardevol data
-                        
-                    # Converteer CSV row naar Product
-                    product = Product(
-                        name=row['product_name'],
-                        description=f"3D geprint {row['product_name']}",
-                        weight_g=float(row['weight']),
-                        material=row['material'],
-                        print_hours=float(row.get('print_hours', float(row['weight']) * 0.04)),
-                        multicolor=row['multicolor'] == 'True',
-                        abrasive=row['abrasive'] == 'True', 
-                        rush=row['rush'] == 'True'
-                    )
-                    
-                    # GEBRUIK GEWOON HET ID UIT DE CSV - geen overbodige formatting!
-                    product.product_id = row['product_id']
-                    
-                    # Zet de juiste waardes
-                    product.material_cost = float(row['material_cost'])
-                    product.variable_cost = float(row['variable_cost'])
-                    product.total_cost = float(row['total_cost'])
-                    product.sell_price = float(row['sell_price'])
-                    product.margin_pct = float(row['margin_pct'])
-                    product.created_at = datetime.fromisoformat(row['timestamp'].replace('T', ' ').split('.')[0])
-                    
-                    # Voeg toe of het een test/echt product is
-                    product.tags = []
-                    if row.get('is_product', 'False') == 'False':
-                        product.tags.append("test")
-                        product.description += " (Test berekening)"
-                    else:
-                        product.tags.append("product")
-                    
-                    # Gebruik het product's eigen ID als cache key
-                    self._cache[product.product_id] = product
+            header, data, end = read_rows(self.csv_path, snapshot.offset if snapshot else 0)
+            reader = csv.DictReader(io.StringIO(data.decode('utf-8')), fieldnames=header)
+            
+            parsed = 0
+            skipped = 0
+            for row in reader:
+                # LAAD ALLE PRODUCTEN - geen filter meer!
+                # Elke berekening is waardevol data
+                try:
+                    product = self._row_to_product(row)
+                except (ValueError, TypeError, KeyError):
+                    # Rij zonder geldige productgegevens (bijv. geen naam)
+                    skipped += 1
+                    continue
                     
-            print(f"✅ {len(self._cache)} producten/berekeningen geladen uit {self.csv_path}")
+                # Gebruik het product's eigen ID als cache key
+                self._cache[product.product_id] = product
+                parsed += 1
+                
+            if snapshot_cache is not None and (snapshot is None or parsed + skipped >= SNAPSHOT_REFRESH_ROWS):
+                snapshot_cache.save(dict(self._cache), end, header)
+                
+            source = f"snapshot + {parsed} nieuwe rijen" if snapshot is not None else self.csv_path
+            print(f"✅ {len(self._cache)} producten/berekeningen geladen uit {source}")
+            if skipped:
+                print(f"⚠️ {skipped} rijen overgeslagen (geen geldig product)")
                     
         except Exception as e:
             print(f"❌ Fout bij laden CSV: {e}")
             
+        self._apply_changes()
+        
+    def _apply_changes(self) -> None:
+        """Speel de wijzigingslog af: laatste versie wint, tombstone verwijdert"""
+        try:
+            if self.db is not None:
+                changes, source = self.db.load_product_changes(), self.db.db_path
+            else:
+                changes, source = self.store.load(), self.store.log_dir
+            for product_id, row in changes.items():
+                if row is None:
+                    self._cache.pop(product_id, None)
+                else:
+                    self._cache[product_id] = self._row_to_product(row)
+                    
+            if changes:
+                print(f"✅ {len(changes)} productwijzigingen toegepast uit {source}")
+                
+        except Exception as e:
+            print(f"❌ Fout bij laden productwijzigingen: {e}")
+            
+    def _load_from_db(self) -> None:
+        """Laad alle producten uit de SQLite calculations tabel."""
+        try:
+            skipped = 0
+            for row in self.db.iter_calculations():
+                try:
+                    product = self._row_to_product(dict(row))
+                except (ValueError, TypeError, KeyError):
+                    # Rij zonder geldige productgegevens, zoals bij de CSV backend
+                    skipped += 1
+                    continue
+                self._cache[product.product_id] = product
+                
+            print(f"✅ {len(self._cache)} producten/berekeningen geladen uit {self.db.db_path}")
+            if skipped:
+                print(f"⚠️ {skipped} rijen overgeslagen (geen geldig product)")
+            
+        except Exception as e:
+            print(f"❌ Fout bij laden database: {e}")
+            
+        self._apply_changes()
+            
+    @staticmethod
+    def _row_to_product(row: Dict[str, any]) -> Product:
+        """Converteer een master rij (CSV of database) naar een Product."""
+        product = Product(
+            name=row['product_name'],
+            product_id=row['product_id'],
+            description=f"3D geprint {row['product_name']}",
+            weight_g=float(row['weight']),
+            material=row['material'],
+            print_hours=float(row.get('print_hours', float(row['weight']) * 0.04)),
+            multicolor=parse_bool(row['multicolor']),
+            abrasive=parse_bool(row['abrasive']),
+            rush=parse_bool(row['rush'])
+        )
+        
+        # Zet de juiste waardes
+        product.material_cost = float(row['material_cost'])
+        product.variable_cost = float(row['variable_cost'])
+        product.total_cost = float(row['total_cost'])
+        product.sell_price = float(row['sell_price'])
+        product.margin_pct = float(row['margin_pct'])
+        product.created_at = parse_timestamp(row['timestamp']).replace(microsecond=0)
+        
+        # Voeg toe of het een test/echt product is
+        product.tags = []
+        if not parse_bool(row.get('is_product')):
+            product.tags.append("test")
+            product.description += " (Test berekening)"
+        else:
+            product.tags.append("product")
+        return product
+            
     def create(self, product: Product) -> Product:
         """Voeg nieuw product toe aan CSV"""
         # Voeg toe aan cache
         self._cache[product.product_id] = product
+        self._stats.add(product)
         
         # Append aan CSV
         self._append_to_csv(product)
@@ -102,73 +226,88 @@ class ProductManager:
         return product
         
     def _append_to_csv(self, product: Product) -> None:
-        """Voeg product toe aan master_calculations.csv"""
+        """Voeg product toe aan master_calculations.csv (of de SQLite database)"""
         try:
-            # Check of bestand bestaat en heeft headers
-            file_exists = os.path.exists(self.csv_path)
+            row = self._product_row(product)
             
-            with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
-                fieldnames = [
-                    'timestamp', 'weight', 'material', 'material_cost', 'variable_cost',
-                    'total_cost', 'sell_price', 'margin_pct', 'profit_amount',
-                    'multicolor', 'abrasive', 'rush', 'day_of_week', 'hour_of_day',
-                    'month', 'year', 'product_name', 'product_id', 'is_product'
-                ]
-                
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+            if self.db is not None:
+                self.db.insert_calculations([row])
+                return
                 
-                # Schrijf headers als nieuw bestand
-                if not file_exists:
-                    writer.writeheader()
-                
-                # Schrijf product data
-                now = datetime.now()
-                writer.writerow({
-                    'timestamp': product.created_at.isoformat(),
-                    'weight': product.weight_g,
-                    'material': product.material,
-                    'material_cost': product.material_cost,
-                    'variable_cost': product.variable_cost,
-                    'total_cost': product.total_cost,
-                    'sell_price': product.sell_price,
-                    'margin_pct': product.margin_pct,
-                    'profit_amount': product.sell_price - product.total_cost,
-                    'multicolor': product.multicolor,
-                    'abrasive': product.abrasive,
-                    'rush': product.rush,
-                    'day_of_week': now.strftime('%A'),
-                    'hour_of_day': now.hour,
-                    'month': now.strftime('%B'),
-                    'year': now.year,
-                    'product_name': product.name,
-                    'product_id': product.product_id,
-                    'is_product': True
-                })
+            # Single-writer: header bij een nieuw bestand, geen interleaving
+            # met andere processen, terug na fsync
+            self.writer.append([make_record(self.csv_path, MASTER_COLUMNS, row)])
                 
         except Exception as e:
             print(f"❌ Fout bij schrijven naar CSV: {e}")
+            
+    @staticmethod
+    def _product_row(product: Product) -> Dict[str, any]:
+        """Master rij (MASTER_COLUMNS) voor een product."""
+        now = datetime.now()
+        return build_master_row({
+            'export_timestamp': format_timestamp(product.created_at),
+            'weight': product.weight_g,
+            'material': product.material,
+            'material_cost': product.material_cost,
+            'variable_cost': product.variable_cost,
+            'total_cost': product.total_cost,
+            'sell_price': product.sell_price,
+            'margin_pct': product.margin_pct,
+            'multicolor': product.multicolor,
+            'abrasive': product.abrasive,
+            'rush': product.rush,
+            'day_of_week': now.strftime('%A'),
+            'hour_of_day': now.hour,
+            'month': now.strftime('%B'),
+            'year': now.year,
+            'product_name': product.name,
+            'product_id': product.product_id,
+            'is_product': "test" not in product.tags
+        })
         
     def get_by_id(self, product_id: str) -> Optional[Product]:
         """Haal product op via ID"""
         return self._cache.get(product_id)
         
     def update(self, product: Product) -> Product:
-        """Update = gewoon opnieuw laden van CSV (simpel!)"""
-        # In deze vereenvoudigde versie doen we geen updates
-        # Alles komt uit de CSV, punt uit
+        """Sla een nieuwe versie van een product op (één append, O(1))"""
+        self._cache[product.product_id] = product
+        self._stats.add(product)
+        
+        try:
+            row = self._product_row(product)
+            if self.db is not None:
+                self.db.update_product(row)
+            else:
+                self.store.put(row)
+        except Exception as e:
+            print(f"❌ Fout bij opslaan wijziging: {e}")
+            
         return product
         
     def delete(self, product_id: str) -> bool:
-        """Verwijder uit cache (niet uit CSV)"""
-        if product_id in self._cache:
-            del self._cache[product_id]
-            return True
-        return False
+        """Verwijder een product (tombstone in de wijzigingslog)"""
+        if product_id not in self._cache:
+            return False
+            
+        del self._cache[product_id]
+        self._stats.remove(product_id)
+        self.popularity.remove(product_id)
+        try:
+            if self.db is not None:
+                self.db.delete_product(product_id)
+            else:
+                self.store.delete(product_id)
+        except Exception as e:
+            print(f"❌ Fout bij verwijderen: {e}")
+        return True
         
     def list_all(self) -> List[Product]:
         """Lijst alle producten uit cache"""
         return sorted(self._cache.values(), key=lambda p: p.created_at, reverse=True)
         
+    @traced('loading.product_search')
     def search(self, query: str) -> List[Product]:
         """Zoek producten op naam"""
         query_lower = query.lower()
@@ -184,49 +323,38 @@ class ProductManager:
         """Filter producten op materiaal"""
         return [p for p in self._cache.values() if p.material == material]
         
+    def _on_product_event(self, product: Product, event: str, quantity: float) -> None:
+        """Product event (geladen, berekend, geëxporteerd, besteld) → populariteit"""
+        # Alleen producten van deze manager; andere managers tellen zelf
+        if product.product_id not in self._cache:
+            return
+        self.popularity.record(product.product_id, event, quantity)
+        
     def get_popular(self, limit: int = 10) -> List[Product]:
-        """Top producten op basis van marge"""
-        products = list(self._cache.values())
-        products.sort(key=lambda p: p.margin_pct, reverse=True)
-        return products[:limit]
+        """Top producten op recente populariteit (vervallende score, O(k log n))
+        
+        Zolang er te weinig producten met events zijn, wordt aangevuld
+        met de hoogste marges (het vroegere gedrag).
+        """
+        popular = []
+        for product_id in self.popularity.iter_ranked():
+            if len(popular) >= limit:
+                return popular
+            product = self._cache.get(product_id)
+            if product is not None:
+                popular.append(product)
+                
+        chosen = {p.product_id for p in popular}
+        rest = (p for p in self._cache.values() if p.product_id not in chosen)
+        return popular + heapq.nlargest(limit - len(popular), rest, key=lambda p: p.margin_pct)
         
     def get_statistics(self) -> Dict[str, any]:
-        """Genereer statistieken over producten"""
-        if not self._cache:
-            return {
-                'total_products': 0,
-                'materials': {},
-                'avg_weight': 0,
-                'avg_price': 0,
-                'avg_margin': 0,
-                'total_orders': 0,
-                'most_popular_product': None
-            }
-            
-        products = list(self._cache.values())
+        """Statistieken over producten (lopende aggregaten, O(1))"""
+        return self._stats.statistics()
         
-        # Materiaal verdeling
-        materials: Dict[str, int] = {}
-        for p in products:
-            materials[p.material] = materials.get(p.material, 0) + 1
-            
-        # Gemiddelden
-        weights = [p.weight_g for p in products if p.weight_g > 0]
-        prices = [p.sell_price for p in products if p.sell_price > 0]
-        margins = [p.margin_pct for p in products if p.margin_pct > 0]
-        
-        # Meest winstgevend product
-        most_profitable = max(products, key=lambda p: p.margin_pct) if products else None
-        
-        return {
-            'total_products': len(products),
-            'materials': materials,
-            'avg_weight': sum(weights) / len(weights) if weights else 0,
-            'avg_price': sum(prices) / len(prices) if prices else 0,
-            'avg_margin': sum(margins) / len(margins) if margins else 0,
-            'total_orders': len(products),  # Elke entry is een order
-            'most_popular_product': most_profitable.name if most_profitable else None
-        }
+    def verify_statistics(self) -> bool:
+        """Controleer de lopende aggregaten tegen een volledige herberekening"""
+        return self._stats.verify(self._cache.values())
         
     def export_csv(self, filepath: str) -> None:
         """Export = kopieer master_calculations.csv"""
@@ -238,14 +366,30 @@ class ProductManager:
         """Herlaad alles uit CSV"""
         self._cache.clear()
         self._load_from_csv()
+        self._stats.rebuild(self._cache.values())
         
     # Verwijder alle JSON-gerelateerde methods
     def save_all(self) -> None:
-        """Niet nodig - alles staat in CSV"""
-        pass
+        """Producten staan al in CSV; alleen de populariteit wegschrijven"""
+        self.popularity.save()
         
     def bulk_create(self, products: List[Product]) -> List[Product]:
         """Voeg meerdere producten toe"""
+        if self.db is not None:
+            # Eén batch insert i.p.v. een transactie per product
+            for product in products:
+                self._cache[product.product_id] = product
+                self._stats.add(product)
+            self.db.insert_calculations(self._product_row(p) for p in products)
+            return products
+            
+        # CSV: alle rijen in één group commit
         for product in products:
-            self.create(product)
+            self._cache[product.product_id] = product
+            self._stats.add(product)
+        try:
+            self.writer.append([make_record(self.csv_path, MASTER_COLUMNS, self._product_row(p))
+                                for p in products])
+        except Exception as e:
+            print(f"❌ Fout bij schrijven naar CSV: {e}")
         return products 
\ No newline at end of file
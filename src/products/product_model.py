@@ -24,7 +24,7 @@ Gebruik:
     ...     print_hours=2.5
     ... )
     >>> print(product.product_id)
-    202501280001
+    0370316669124833280
 
 Auteur: H2D Systems
 Versie: 1.0
@@ -32,8 +32,51 @@ Versie: 1.0
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List
 import json
+import weakref
+
+from ..utils.ids import format_id, new_id
+from ..utils.instrumentation import debug
+
+
+# Luisteraars voor analytics events: listener(product, event, quantity)
+# (bijv. de PopularityIndex van ProductManager). Bound methods worden via
+# een WeakMethod bewaard zodat de registratie de eigenaar niet in leven houdt.
+_event_listeners: List[Callable[[], Optional[Callable[['Product', str, float], None]]]] = []
+
+
+def _listener_ref(listener: Callable[['Product', str, float], None]):
+    if hasattr(listener, '__self__') and hasattr(listener, '__func__'):
+        return weakref.WeakMethod(listener)
+    return lambda: listener
+
+
+def _live_listeners() -> List[Callable[['Product', str, float], None]]:
+    """Levende listeners; referenties naar opgeruimde eigenaars vallen weg."""
+    live = []
+    for ref in list(_event_listeners):
+        listener = ref()
+        if listener is None:
+            if ref in _event_listeners:
+                _event_listeners.remove(ref)
+        else:
+            live.append(listener)
+    return live
+
+
+def add_event_listener(listener: Callable[['Product', str, float], None]) -> None:
+    """Registreer een listener voor accessed/calculated/exported/order events."""
+    if listener not in _live_listeners():
+        _event_listeners.append(_listener_ref(listener))
+
+
+def remove_event_listener(listener: Callable[['Product', str, float], None]) -> None:
+    """Verwijder een eerder geregistreerde listener."""
+    _live_listeners()
+    for ref in list(_event_listeners):
+        if ref() == listener:
+            _event_listeners.remove(ref)
 
 
 @dataclass
@@ -47,7 +90,8 @@ class Product:
     ----------
     # Identificatie
     product_id : str
-        Uniek ID in formaat YYYYMMDDXXXX (auto-generated, puur numeriek)
+        Uniek ID van 19 cijfers (format_id(new_id()), sorteerbaar op aanmaaktijd);
+        auto-generated als niet meegegeven, alleen als keyword argument
     name : str
         Product naam (verplicht, max 100 karakters)
     description : str
@@ -122,7 +166,7 @@ class Product:
     # === IDENTIFICATIE ===
     name: str
     description: str = ""
-    product_id: str = field(default="", init=False)
+    product_id: str = field(default="", kw_only=True)
     
     # === CALCULATIE PARAMETERS ===
     weight_g: float = 0.0
@@ -157,13 +201,10 @@ class Product:
     tags: list[str] = field(default_factory=list)
     custom_fields: Dict[str, Any] = field(default_factory=dict)
     
-    # Klasse variabele voor ID generatie
-    _id_counter: int = field(default=0, init=False, repr=False)
-    
     def __post_init__(self) -> None:
         """Validatie en auto-generatie na initialisatie.
         
-        - Genereert uniek product ID
+        - Genereert uniek product ID (alleen als er geen meegegeven is)
         - Valideert input waarden
         - Zet default timestamps
         """
@@ -181,14 +222,13 @@ class Product:
     def _generate_product_id(self) -> str:
         """Genereer uniek product ID.
         
-        Format: YYYYMMDDXXXX (puur numeriek)
-        Bijvoorbeeld: 202501280001
+        Format: 19 cijfers (puur numeriek, sorteerbaar op aanmaaktijd)
+        Bijvoorbeeld: 0370316669124833280
+        
+        Via de gedeelde id service: uniek over processen en herstarts.
+        Oude ids (YYYYMMDDXXXX) blijven geldig.
         """
-        date_part = datetime.now().strftime("%Y%m%d")
-        # In productie: haal counter uit database/file
-        Product._id_counter += 1
-        counter_part = f"{Product._id_counter:04d}"
-        return f"{date_part}{counter_part}"
+        return format_id(new_id())
     
     def _validate_inputs(self) -> None:
         """Valideer alle input waarden.
@@ -251,22 +291,34 @@ class Product:
         """Update last_accessed timestamp en increment load counter."""
         self.last_accessed = datetime.now()
         self.times_loaded += 1
+        self._emit('accessed')
     
     def update_calculated(self) -> None:
         """Update voor nieuwe berekening."""
         self.times_calculated += 1
         self.updated_at = datetime.now()
         self.last_accessed = datetime.now()
+        self._emit('calculated')
     
     def update_exported(self) -> None:
         """Update voor export actie."""
         self.times_exported += 1
         self.last_accessed = datetime.now()
+        self._emit('exported')
     
     def add_order(self, quantity: int = 1) -> None:
         """Registreer een bestelling."""
         self.actual_orders += quantity
         self.last_accessed = datetime.now()
+        self._emit('order', quantity)
+    
+    def _emit(self, event: str, quantity: float = 1) -> None:
+        """Meld een analytics event aan de geregistreerde listeners."""
+        for listener in _live_listeners():
+            try:
+                listener(self, event, quantity)
+            except Exception as e:
+                debug("Event listener fout (%s): %s", event, e)
     
     def to_dict(self) -> Dict[str, Any]:
         """Converteer Product naar dictionary voor opslag.
@@ -343,18 +395,11 @@ class Product:
             data['last_accessed'] = datetime.fromisoformat(data['last_accessed'])
         
         # Verwijder velden die niet in constructor kunnen
-        product_id = data.pop('product_id', None)
         data.pop('popularity_score', None)
-        data.pop('_id_counter', None)  # Private field
-        
-        # Maak instance
-        product = cls(**data)
-        
-        # Zet product_id expliciet na creatie
-        if product_id:
-            product.product_id = product_id
+        data.pop('_id_counter', None)  # Oud private veld (vroegere id teller)
         
-        return product
+        # Maak instance (bestaand product_id wordt overgenomen)
+        return cls(**data)
     
     def __str__(self) -> str:
         """String representatie voor gebruiker."""
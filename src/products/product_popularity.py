@@ -0,0 +1,369 @@
+"""
+Product Popularity - H2D Price Calculator
+=========================================
+
+Populariteit met exponentieel vervallende scores en top-K in O(k log n).
+
+Product.calculate_popularity rekende per product een score opnieuw uit
+(met datetime.now()) en get_popular sorteerde eigenlijk op marge. Deze
+index houdt per product een vervallende score bij op basis van de
+events van het Product model:
+
+    score(t) = Σ gewicht_i · exp(-λ · (t - t_i))       λ = ln 2 / halfwaardetijd
+
+Log-space truc:
+--------------
+Opgeslagen wordt niet de score maar
+
+    L = log Σ gewicht_i · exp(λ · (t_i - t0))          (t0 = vaste epoch)
+
+Een nieuw event is één logaddexp. De actuele score is
+exp(L - λ · (t - t0)); die verschuiving is voor alle producten gelijk,
+dus de rangorde volgt direct uit L en er is nooit een globale
+herschaling nodig (geen overflow, ook niet na jaren).
+
+Event gewichten (zoals calculate_popularity):
+    geladen 1 · berekend 2 · geëxporteerd 3 · bestelling 10 per stuk
+
+Opslag: producten/popularity.json (of maintenance_state in SQLite),
+atomair en hooguit elke SAVE_INTERVAL_SECONDS (plus bij afsluiten).
+Meerdere processen (GUI, CLI, Streamlit) delen het bestand: save()
+herleest onder een lock de opgeslagen scores en telt alleen de eigen
+events sinds de vorige save erbij (logaddexp), zodat niemand de events
+van een ander proces overschrijft.
+
+Gebruik:
+-------
+    >>> index = PopularityIndex(half_life_days=30)
+    >>> index.record(product_id, 'order', quantity=2)
+    >>> index.top(10)                  # [(product_id, score), ...]
+    >>> index.score(product_id)
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import heapq
+import json
+import math
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from ..utils.instrumentation import debug
+
+try:
+    import fcntl
+except ImportError:  # Windows: geen lock tussen processen
+    fcntl = None
+
+
+# Gewicht per event soort
+EVENT_WEIGHTS: Dict[str, float] = {
+    'accessed': 1.0,
+    'calculated': 2.0,
+    'exported': 3.0,
+    'order': 10.0,
+}
+
+DEFAULT_HALF_LIFE_DAYS = 30.0
+
+# Vaste referentie voor de log-scores (zelfde epoch als de id service)
+POPULARITY_EPOCH = datetime(2024, 1, 1).timestamp()
+
+# Hooguit zo vaak naar schijf (events komen in bursts)
+SAVE_INTERVAL_SECONDS = 30.0
+
+STATE_KEY = 'product_popularity'
+POPULARITY_FILENAME = 'popularity.json'
+
+
+def _logaddexp(a: float, b: float) -> float:
+    """log(exp(a) + exp(b)) zonder overflow."""
+    if a == -math.inf:
+        return b
+    if b == -math.inf:
+        return a
+    high, low = (a, b) if a > b else (b, a)
+    return high + math.log1p(math.exp(low - high))
+
+
+class IndexedMaxHeap:
+    """Max-heap met positie index: update en remove in O(log n)."""
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._keys: Dict[str, float] = {}
+        self._pos: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._pos
+
+    def key(self, item_id: str) -> float:
+        return self._keys.get(item_id, -math.inf)
+
+    def items(self) -> Iterator[Tuple[str, float]]:
+        return iter(self._keys.items())
+
+    def set(self, item_id: str, key: float) -> None:
+        """Zet (of wijzig) de key van een item."""
+        if item_id in self._pos:
+            old = self._keys[item_id]
+            self._keys[item_id] = key
+            index = self._pos[item_id]
+            if key > old:
+                self._sift_up(index)
+            else:
+                self._sift_down(index)
+            return
+        self._ids.append(item_id)
+        self._keys[item_id] = key
+        self._pos[item_id] = len(self._ids) - 1
+        self._sift_up(len(self._ids) - 1)
+
+    def remove(self, item_id: str) -> None:
+        index = self._pos.pop(item_id, None)
+        if index is None:
+            return
+        del self._keys[item_id]
+        last = self._ids.pop()
+        if index < len(self._ids):
+            self._ids[index] = last
+            self._pos[last] = index
+            self._sift_up(index)
+            self._sift_down(self._pos[last])
+
+    def top(self) -> Iterator[str]:
+        """Items in aflopende volgorde; de eerste k kosten O(k log k).
+
+        Verkent de heap boom vanaf de wortel met een hulp-heap van
+        kandidaten, zonder de heap zelf te wijzigen.
+        """
+        if not self._ids:
+            return
+        candidates = [(-self._keys[self._ids[0]], 0)]
+        while candidates:
+            _, index = heapq.heappop(candidates)
+            yield self._ids[index]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self._ids):
+                    heapq.heappush(candidates, (-self._keys[self._ids[child]], child))
+
+    def _swap(self, i: int, j: int) -> None:
+        ids = self._ids
+        ids[i], ids[j] = ids[j], ids[i]
+        self._pos[ids[i]] = i
+        self._pos[ids[j]] = j
+
+    def _sift_up(self, index: int) -> None:
+        keys, ids = self._keys, self._ids
+        while index > 0:
+            parent = (index - 1) // 2
+            if keys[ids[index]] <= keys[ids[parent]]:
+                break
+            self._swap(index, parent)
+            index = parent
+
+    def _sift_down(self, index: int) -> None:
+        keys, ids = self._keys, self._ids
+        size = len(ids)
+        while True:
+            largest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and keys[ids[child]] > keys[ids[largest]]:
+                    largest = child
+            if largest == index:
+                break
+            self._swap(index, largest)
+            index = largest
+
+
+class PopularityIndex:
+    """Vervallende populariteit per product met top-K en persistentie.
+
+    Parameters:
+    ----------
+    path : Path, optional
+        JSON bestand voor de scores (None = alleen in geheugen)
+    db : SQLiteStore, optional
+        SQLite backend; scores dan in maintenance_state
+    half_life_days : float
+        Na zoveel dagen telt een event nog voor de helft
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, db=None,
+                 half_life_days: float = DEFAULT_HALF_LIFE_DAYS):
+        self.path = Path(path) if path else None
+        self.db = db
+        self.half_life_days = half_life_days
+        self._decay = math.log(2) / (half_life_days * 86400)
+        self._heap = IndexedMaxHeap()
+        # Eigen wijzigingen sinds de vorige save (worden bij save gemerged)
+        self._pending: Dict[str, float] = {}
+        self._removed: Set[str] = set()
+        self._dirty = False
+        self._last_save = 0.0
+        self.load()
+
+    # === EVENTS ===
+
+    def record(self, product_id: str, event: str, quantity: float = 1,
+               timestamp: Optional[float] = None) -> None:
+        """Verwerk één event (O(log n)).
+
+        Parameters:
+        ----------
+        product_id : str
+            Het product
+        event : str
+            'accessed', 'calculated', 'exported' of 'order'
+        quantity : float
+            Aantal (bijv. stuks bij een bestelling)
+        timestamp : float, optional
+            Unix tijd van het event (default: nu)
+        """
+        weight = EVENT_WEIGHTS[event] * quantity
+        if weight <= 0:
+            return
+        moment = time.time() if timestamp is None else timestamp
+        contribution = math.log(weight) + self._decay * (moment - POPULARITY_EPOCH)
+        self._heap.set(product_id, _logaddexp(self._heap.key(product_id), contribution))
+        self._pending[product_id] = _logaddexp(self._pending.get(product_id, -math.inf), contribution)
+        self._dirty = True
+        if time.monotonic() - self._last_save >= SAVE_INTERVAL_SECONDS:
+            self.save()
+
+    def remove(self, product_id: str) -> None:
+        """Vergeet een (verwijderd) product."""
+        if product_id in self._heap:
+            self._heap.remove(product_id)
+            self._dirty = True
+        self._pending.pop(product_id, None)
+        self._removed.add(product_id)
+
+    # === LEZEN ===
+
+    def score(self, product_id: str, now: Optional[float] = None) -> float:
+        """Actuele vervallen score (0 zonder events)."""
+        log_score = self._heap.key(product_id)
+        if log_score == -math.inf:
+            return 0.0
+        moment = time.time() if now is None else now
+        return math.exp(log_score - self._decay * (moment - POPULARITY_EPOCH))
+
+    def iter_ranked(self) -> Iterator[str]:
+        """Product ids van populair naar minder populair (lazy)."""
+        return self._heap.top()
+
+    def top(self, k: int, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """De k populairste producten met hun actuele score, O(k log n)."""
+        result = []
+        for product_id in self.iter_ranked():
+            if len(result) >= k:
+                break
+            result.append((product_id, self.score(product_id, now)))
+        return result
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    # === PERSISTENTIE ===
+
+    @property
+    def lock_path(self) -> Optional[Path]:
+        """Lock bestand naast het JSON bestand (dotfile: blijft buiten de export cleanup)."""
+        return self.path.with_name(f".{self.path.name}.lock") if self.path is not None else None
+
+    def _scores_from_state(self, state: Optional[Dict[str, Any]]) -> Dict[str, float]:
+        """Log-scores uit een opgeslagen state, omgerekend naar deze epoch en halfwaardetijd."""
+        if not state:
+            return {}
+        scores = {pid: float(value) for pid, value in state.get('scores', {}).items()}
+        epoch = state.get('epoch', POPULARITY_EPOCH)
+        half_life_days = state.get('half_life_days', self.half_life_days)
+        if epoch != POPULARITY_EPOCH or half_life_days != self.half_life_days:
+            # Andere parameters: omrekenen zodat de actuele scores gelijk blijven
+            old_decay = math.log(2) / (half_life_days * 86400)
+            now = time.time()
+            scores = {pid: value - old_decay * (now - epoch) + self._decay * (now - POPULARITY_EPOCH)
+                      for pid, value in scores.items()}
+        return scores
+
+    def _read_file_state(self) -> Optional[Dict[str, Any]]:
+        if self.path is None or not self.path.exists():
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _set_scores(self, scores: Dict[str, float]) -> None:
+        heap = IndexedMaxHeap()
+        for product_id, log_score in scores.items():
+            heap.set(product_id, log_score)
+        self._heap = heap
+
+    def load(self) -> None:
+        """Laad de log-scores (epoch en halfwaardetijd moeten overeenkomen)."""
+        state = None
+        try:
+            if self.db is not None:
+                state = self.db.get_state(STATE_KEY)
+            else:
+                state = self._read_file_state()
+        except Exception as e:
+            debug("Populariteit niet geladen: %s", e)
+        if state:
+            self._set_scores(self._scores_from_state(state))
+
+    def _merge_state(self, stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Opgeslagen scores + eigen events sinds de vorige save → nieuwe state."""
+        scores = self._scores_from_state(stored)
+        for product_id in self._removed:
+            scores.pop(product_id, None)
+        for product_id, contribution in self._pending.items():
+            scores[product_id] = _logaddexp(scores.get(product_id, -math.inf), contribution)
+        return {
+            'epoch': POPULARITY_EPOCH,
+            'half_life_days': self.half_life_days,
+            'scores': scores,
+        }
+
+    def save(self, force: bool = False) -> None:
+        """Merge de eigen events met de opgeslagen scores en schrijf weg.
+
+        Alleen als er iets veranderd is (of force). Na afloop bevat de
+        index ook de events die andere processen intussen opsloegen.
+        """
+        if not (self._dirty or force) or (self.path is None and self.db is None):
+            return
+        try:
+            if self.db is not None:
+                state = self.db.update_state(STATE_KEY, self._merge_state)
+            else:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                handle = None
+                if fcntl is not None:
+                    handle = open(self.lock_path, 'a')
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+                try:
+                    state = self._merge_state(self._read_file_state())
+                    tmp_path = self.path.with_suffix('.tmp')
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(state, f)
+                    os.replace(tmp_path, self.path)
+                finally:
+                    if handle is not None:
+                        handle.close()  # sluiten geeft de flock vrij
+            self._set_scores(state['scores'])
+            self._pending.clear()
+            self._removed.clear()
+            self._dirty = False
+            self._last_save = time.monotonic()
+        except Exception as e:
+            debug("Populariteit niet opgeslagen: %s", e)
+
+__all__ = ['EVENT_WEIGHTS', 'IndexedMaxHeap', 'PopularityIndex']
@@ -0,0 +1,211 @@
+"""
+Product Statistics - H2D Price Calculator
+=========================================
+
+Lopende aggregaten voor ProductManager.get_statistics.
+
+get_statistics liep bij elke aanroep (elke update van de producten tab)
+over alle producten. De aggregaten worden nu bijgehouden bij create,
+update, delete en reload, zodat lezen O(1) is:
+
+- aantal per materiaal (dict met tellers)
+- gemiddelde en variantie van gewicht, prijs en marge (Welford, met
+  omgekeerde stap bij verwijderen); zoals voorheen tellen alleen
+  waardes > 0 mee
+- product met de hoogste marge: max-heap met lazy deletion. Verouderde
+  heap entries (product verwijderd of gewijzigd) worden pas opgeruimd
+  als ze bovenaan komen te liggen
+
+Per product wordt de bijdrage bewaard, zodat een update of delete de
+oude waardes kan terugdraaien, ook als het Product object al in place
+aangepast is.
+
+Gebruik:
+-------
+    >>> stats = RunningStatistics()
+    >>> stats.rebuild(products)
+    >>> stats.add(product)
+    >>> stats.remove(product_id)
+    >>> stats.statistics()['avg_margin']
+    >>> stats.verify(products)     # vergelijk met volledige herberekening
+    True
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import heapq
+import itertools
+import math
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.instrumentation import debug
+
+# Relatieve tolerantie voor verify() (afrondingsdrift van Welford)
+VERIFY_TOLERANCE = 1e-6
+
+# Verouderde heap entries die getolereerd worden voor een rebuild
+HEAP_SLACK = 64
+
+# Bijdrage van één product aan de aggregaten
+_Contribution = namedtuple('_Contribution', 'seq material weight price margin name')
+
+
+class RunningMoments:
+    """Welford: lopend gemiddelde en variantie, ook met verwijderen."""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        previous_mean = (self.count * self.mean - value) / (self.count - 1)
+        self.m2 = max(0.0, self.m2 - (value - self.mean) * (value - previous_mean))
+        self.mean = previous_mean
+        self.count -= 1
+
+    @property
+    def variance(self) -> float:
+        """Populatie variantie (0 bij minder dan twee waardes)."""
+        return self.m2 / self.count if self.count > 1 else 0.0
+
+
+class RunningStatistics:
+    """Incrementele product statistieken (zelfde sleutels als get_statistics)."""
+
+    def __init__(self):
+        self._seq = itertools.count()
+        self.rebuild([])
+
+    def rebuild(self, products: Iterable[Any]) -> None:
+        """Herbereken alles (bij laden en reload)."""
+        self._contributions: Dict[str, _Contribution] = {}
+        self.materials: Dict[str, int] = {}
+        self.weight = RunningMoments()
+        self.price = RunningMoments()
+        self.margin = RunningMoments()
+        self._heap: List[Tuple[float, int, str]] = []
+        for product in products:
+            self.add(product)
+
+    def add(self, product) -> None:
+        """Nieuw of gewijzigd product (oude bijdrage wordt eerst teruggedraaid)."""
+        product_id = product.product_id
+        if product_id in self._contributions:
+            self.remove(product_id)
+
+        entry = _Contribution(next(self._seq), product.material, float(product.weight_g),
+                              float(product.sell_price), float(product.margin_pct), product.name)
+        self._contributions[product_id] = entry
+
+        self.materials[entry.material] = self.materials.get(entry.material, 0) + 1
+        if entry.weight > 0:
+            self.weight.add(entry.weight)
+        if entry.price > 0:
+            self.price.add(entry.price)
+        if entry.margin > 0:
+            self.margin.add(entry.margin)
+        heapq.heappush(self._heap, (-entry.margin, entry.seq, product_id))
+        if len(self._heap) > 2 * len(self._contributions) + HEAP_SLACK:
+            # Te veel verouderde entries (veel updates): heap opnieuw opbouwen
+            self._heap = [(-e.margin, e.seq, pid) for pid, e in self._contributions.items()]
+            heapq.heapify(self._heap)
+
+    def remove(self, product_id: str) -> None:
+        """Draai de bijdrage van een product terug (heap entry blijft tot hij bovenaan ligt)."""
+        entry = self._contributions.pop(product_id, None)
+        if entry is None:
+            return
+
+        count = self.materials.get(entry.material, 0) - 1
+        if count > 0:
+            self.materials[entry.material] = count
+        else:
+            self.materials.pop(entry.material, None)
+        if entry.weight > 0:
+            self.weight.remove(entry.weight)
+        if entry.price > 0:
+            self.price.remove(entry.price)
+        if entry.margin > 0:
+            self.margin.remove(entry.margin)
+
+    def _best(self) -> Optional[_Contribution]:
+        """Product met de hoogste marge; ruimt verouderde heap entries op."""
+        while self._heap:
+            _, seq, product_id = self._heap[0]
+            entry = self._contributions.get(product_id)
+            if entry is not None and entry.seq == seq:
+                return entry
+            heapq.heappop(self._heap)
+        return None
+
+    def statistics(self) -> Dict[str, Any]:
+        """Statistieken in het formaat van ProductManager.get_statistics."""
+        total = len(self._contributions)
+        best = self._best()
+        return {
+            'total_products': total,
+            'materials': dict(self.materials),
+            'avg_weight': self.weight.mean if self.weight.count else 0,
+            'avg_price': self.price.mean if self.price.count else 0,
+            'avg_margin': self.margin.mean if self.margin.count else 0,
+            'std_weight': math.sqrt(self.weight.variance),
+            'std_price': math.sqrt(self.price.variance),
+            'std_margin': math.sqrt(self.margin.variance),
+            'total_orders': total,  # Elke entry is een order
+            'most_popular_product': best.name if best else None
+        }
+
+    def verify(self, products: Iterable[Any]) -> bool:
+        """Vergelijk de lopende aggregaten met een volledige herberekening."""
+        products = list(products)
+        actual = self.statistics()
+
+        materials: Dict[str, int] = {}
+        for p in products:
+            materials[p.material] = materials.get(p.material, 0) + 1
+
+        def moments(values: List[float]) -> Tuple[float, float]:
+            if not values:
+                return 0, 0.0
+            mean = sum(values) / len(values)
+            return mean, math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+
+        mismatches = []
+        if actual['total_products'] != len(products):
+            mismatches.append('total_products')
+        if actual['materials'] != materials:
+            mismatches.append('materials')
+        for name, attribute in (('weight', 'weight_g'), ('price', 'sell_price'), ('margin', 'margin_pct')):
+            mean, std = moments([float(getattr(p, attribute)) for p in products
+                                 if getattr(p, attribute) > 0])
+            for key, expected in ((f'avg_{name}', mean), (f'std_{name}', std)):
+                if not math.isclose(actual[key], expected, rel_tol=VERIFY_TOLERANCE,
+                                    abs_tol=VERIFY_TOLERANCE):
+                    mismatches.append(key)
+
+        # Bij gelijke marges mag een ander product winnen: vergelijk de marge
+        best = self._best()
+        expected_best = max((float(p.margin_pct) for p in products), default=None)
+        if (best.margin if best else None) != expected_best:
+            mismatches.append('most_popular_product')
+
+        if mismatches:
+            debug("Product statistieken wijken af: %s", ', '.join(mismatches))
+        return not mismatches
+
+
+__all__ = ['RunningMoments', 'RunningStatistics']
@@ -0,0 +1,296 @@
+"""
+Product Store - H2D Price Calculator
+====================================
+
+Log-structured opslag voor product wijzigingen (CSV backend).
+
+master_calculations.csv blijft append-only: het is ook de historiek
+waar de analyses uit lezen. Updates en deletes van producten komen als
+records in een wijzigingslog naast de master:
+
+exports/producten/
+├── master_calculations.csv      # Basis: één rij per berekening/product
+└── product_log/
+    ├── segment_000001.csv       # Gesloten segment (kandidaat voor compactie)
+    └── segment_000002.csv       # Actief segment (hoogste nummer)
+
+Record Formaat:
+--------------
+- op: 'put' (volledige master rij) of 'del' (tombstone, alleen product_id)
+- seq: id uit de id service; sorteert over processen heen, dus bij het
+  afspelen wint per product_id het record met de hoogste seq, ook als
+  twee processen tegelijk naar verschillende segmenten schreven
+- daarna de MASTER_COLUMNS
+
+Opzet:
+-----
+- update/delete: één append via de single-writer (log_writer.py) → O(1)
+- laden: master inlezen, daarna de segmenten afspelen (laatste versie
+  wint, tombstone verwijdert)
+- compactie: boven COMPACTION_RATIO verouderde records worden de
+  gesloten segmenten in een achtergrondthread herschreven tot één
+  segment met één record per product_id. De replay blijft daardoor
+  begrensd tot ongeveer het aantal gewijzigde producten
+- compactie is crash-safe: het samengevoegde segment vervangt het
+  nieuwste gesloten segment atomair (tmp + replace), pas daarna worden
+  de oudere segmenten verwijderd
+
+Gebruik:
+-------
+    >>> store = ProductLogStore(Path("exports/producten/product_log"), writer)
+    >>> store.put(row)                    # update (master rij)
+    >>> store.delete("0370316669124833280")
+    >>> changes = store.load()            # {product_id: rij of None}
+    >>> store.compact()
+    {'segments': 3, 'records': 4200, 'kept': 310}
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import csv
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from ..utils.ids import new_id
+from ..utils.instrumentation import debug
+from ..utils.log_writer import make_record
+from ..utils.schema import MASTER_COLUMNS
+
+try:
+    import fcntl
+except ImportError:  # Windows: alleen thread lock
+    fcntl = None
+
+
+# Kolommen van een wijzigingsrecord
+CHANGE_COLUMNS = ['op', 'seq'] + MASTER_COLUMNS
+
+OP_PUT = 'put'
+OP_DELETE = 'del'
+
+SEGMENT_PATTERN = re.compile(r'^segment_(\d{6})\.csv$')
+
+# Nieuw segment zodra het actieve segment deze grootte haalt
+SEGMENT_MAX_BYTES = 4 * 1024 * 1024
+
+# Compacteer als minstens deze fractie van de records verouderd is ...
+COMPACTION_RATIO = 0.5
+# ... en er genoeg records zijn om de moeite waard te zijn
+COMPACTION_MIN_RECORDS = 1_000
+
+# Wachttijd na het afsluiten van de segmenten voor het herschrijven (een
+# ander proces kan nog een append naar het oude segment onderweg hebben)
+COMPACTION_GRACE_SECONDS = 2.0
+
+COMPACT_LOCK_FILENAME = ".compact.lock"
+
+
+def _segment_name(number: int) -> str:
+    return f"segment_{number:06d}.csv"
+
+
+class ProductLogStore:
+    """Append-only wijzigingslog voor producten met achtergrond compactie.
+
+    Parameters:
+    ----------
+    log_dir : Path
+        Map met de segmenten (exports/producten/product_log)
+    writer : RecordWriter
+        Single-writer voor de appends (zie log_writer.get_record_writer)
+    """
+
+    def __init__(self, log_dir: Union[str, Path], writer):
+        self.log_dir = Path(log_dir)
+        self.writer = writer
+        self._lock = threading.Lock()
+        self._compacting = threading.Lock()
+        self._compact_thread: Optional[threading.Thread] = None
+        # Tellers voor de garbage ratio (bijgewerkt door load/put/delete)
+        self._seen: Set[str] = set()
+        self._records = 0
+
+    # === SEGMENTEN ===
+
+    def segments(self) -> List[Path]:
+        """Alle segmenten, oudste eerst."""
+        if not self.log_dir.exists():
+            return []
+        return sorted(p for p in self.log_dir.iterdir() if SEGMENT_PATTERN.match(p.name))
+
+    def _active_segment(self) -> Path:
+        """Segment voor de volgende append (nieuw als het actieve vol is)."""
+        segments = self.segments()
+        if not segments:
+            return self.log_dir / _segment_name(1)
+        last = segments[-1]
+        if last.stat().st_size >= SEGMENT_MAX_BYTES:
+            number = int(SEGMENT_PATTERN.match(last.name).group(1))
+            return self.log_dir / _segment_name(number + 1)
+        return last
+
+    # === SCHRIJVEN ===
+
+    def put(self, row: Dict[str, Any]) -> None:
+        """Nieuwe versie van een product (master rij met product_id)."""
+        self._append({**row, 'op': OP_PUT})
+
+    def delete(self, product_id: str) -> None:
+        """Tombstone: product verdwijnt bij het laden."""
+        self._append({'op': OP_DELETE, 'product_id': product_id})
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        record['seq'] = new_id()
+        with self._lock:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            self.writer.append([make_record(self._active_segment(), CHANGE_COLUMNS, record)])
+            self._count(str(record['product_id']))
+        self.maybe_compact()
+
+    def _count(self, product_id: str) -> None:
+        self._records += 1
+        self._seen.add(product_id)
+
+    # === LEZEN ===
+
+    @staticmethod
+    def _read_segment(path: Path) -> Iterator[Dict[str, str]]:
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+
+    def _latest(self, segments: List[Path]) -> Tuple[Dict[str, Dict[str, str]], int]:
+        """Laatste record per product_id (hoogste seq) en het aantal records."""
+        latest: Dict[str, Dict[str, str]] = {}
+        records = 0
+        for path in segments:
+            for record in self._read_segment(path):
+                records += 1
+                product_id = record['product_id']
+                current = latest.get(product_id)
+                if current is None or int(record['seq']) > int(current['seq']):
+                    latest[product_id] = record
+        return latest, records
+
+    def load(self) -> Dict[str, Optional[Dict[str, str]]]:
+        """Speel alle segmenten af.
+
+        Returns:
+        -------
+        Dict[str, Optional[Dict[str, str]]]
+            product_id → laatste master rij, of None als het product
+            verwijderd is
+        """
+        with self._lock:
+            latest, records = self._latest(self.segments())
+            self._records = records
+            self._seen = set(latest)
+        self.maybe_compact()
+        return {product_id: (record if record['op'] == OP_PUT else None)
+                for product_id, record in latest.items()}
+
+    # === COMPACTIE ===
+
+    @property
+    def garbage_ratio(self) -> float:
+        """Fractie van de records die door een nieuwere versie overschreven is."""
+        if not self._records:
+            return 0.0
+        return 1 - len(self._seen) / self._records
+
+    def maybe_compact(self) -> bool:
+        """Start compactie op de achtergrond als de garbage ratio te hoog is."""
+        if self._records < COMPACTION_MIN_RECORDS or self.garbage_ratio < COMPACTION_RATIO:
+            return False
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return False
+        self._compact_thread = threading.Thread(target=self.compact, daemon=True,
+                                                name="product-log-compaction")
+        self._compact_thread.start()
+        return True
+
+    def compact(self, grace: Optional[float] = None) -> Dict[str, int]:
+        """Herschrijf alle gesloten segmenten tot één segment.
+
+        Eerst wordt een vers actief segment gestart; na `grace` seconden
+        (appends van andere processen die nog onderweg waren) zijn alle
+        oudere segmenten gesloten. Het resultaat vervangt het nieuwste
+        gesloten segment, zodat de volgorde behouden blijft.
+
+        Parameters:
+        ----------
+        grace : float, optional
+            Wachttijd tussen afsluiten en herschrijven (default:
+            COMPACTION_GRACE_SECONDS; 0 = direct, alleen veilig als geen
+            ander proces schrijft)
+
+        Returns:
+        -------
+        Dict[str, int]
+            Aantal samengevoegde segmenten, gelezen en behouden records
+        """
+        result = {'segments': 0, 'records': 0, 'kept': 0}
+        if not self._compacting.acquire(blocking=False):
+            return result
+        lock_file = None
+        try:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            if fcntl is not None:
+                # Eén compactie tegelijk over processen heen; bezet = overslaan
+                lock_file = open(self.log_dir / COMPACT_LOCK_FILENAME, 'a')
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return result
+
+            with self._lock:
+                # Vers actief segment: alles tot nu toe wordt gesloten
+                segments = self.segments()
+                if not segments:
+                    return result
+                number = int(SEGMENT_PATTERN.match(segments[-1].name).group(1))
+                with open(self.log_dir / _segment_name(number + 1), 'a', newline='',
+                          encoding='utf-8') as f:
+                    if f.tell() == 0:
+                        csv.writer(f).writerow(CHANGE_COLUMNS)
+            grace = COMPACTION_GRACE_SECONDS if grace is None else grace
+            if grace > 0:
+                time.sleep(grace)
+
+            sealed = segments
+            latest, records = self._latest(sealed)
+            target = sealed[-1]
+            tmp_path = target.with_suffix('.tmp')
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=CHANGE_COLUMNS)
+                writer.writeheader()
+                writer.writerows(latest.values())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, target)
+            for path in sealed[:-1]:
+                path.unlink()
+
+            with self._lock:
+                self._records = max(self._records - (records - len(latest)), len(self._seen))
+
+            result = {'segments': len(sealed), 'records': records, 'kept': len(latest)}
+            debug("Product log gecompacteerd: %d → %d records (%d segmenten)",
+                  records, len(latest), len(sealed))
+            return result
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # sluiten geeft de flock vrij
+            self._compacting.release()
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        """Wacht tot een lopende achtergrond compactie klaar is."""
+        if self._compact_thread is not None:
+            self._compact_thread.join(timeout)
+
+
+__all__ = ['ProductLogStore', 'CHANGE_COLUMNS', 'OP_PUT', 'OP_DELETE']
@@ -1,3 +1,8 @@
 # Package init for utils
 from .utils import round_currency, format_euro, export_csv, export_calculation_csv, validate_positive_number
-from .data_manager import DataManager 
\ No newline at end of file
+from .lazy_imports import lazy_exports
+
+# DataManager (pandas) pas laden bij gebruik, zie lazy_imports.py
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'DataManager': '.data_manager',
+})
@@ -0,0 +1,433 @@
+"""
+Calculation Archive - H2D Price Calculator
+==========================================
+
+Compacteert losse calc_YYYYMMDD_HHMMSS[_<id>].csv bestanden tot segmenten.
+
+Elke berekening schrijft een eigen klein CSV bestand. Bij honderd-
+duizenden berekeningen wordt elke glob, stat en read_csv over de map
+een bottleneck. Dit module pakt ze samen per dag of per maand:
+
+exports/berekeningen/
+└── archief/
+    ├── calc_segment_20250114.csv        # Alle rijen van die dag
+    └── calc_segment_20250114.idx.json   # {"20250114_093012": [offset, lengte], ...}
+
+Segment Formaat:
+---------------
+- Eén CSV header bovenaan, daarna één rij per originele berekening
+- Extra kolom 'calc_key' met de originele bestandsnaam tijdstempel
+  (nieuwe bestanden: tijdstempel + '_' + id uit de id service, zodat
+  meerdere berekeningen per seconde elk een eigen key hebben)
+- Index: byte offset en lengte per calc_key, zodat één berekening
+  direct gelezen kan worden (seek) zonder het segment te parsen
+- Brengen nieuwe bestanden extra kolommen mee, dan wordt het segment
+  herschreven met een bredere header (en de index herbouwd)
+
+Gebruik:
+-------
+    >>> archive = CalculationArchive(Path("exports/berekeningen"))
+    >>> archive.compact(granularity='day')
+    {'segments': 3, 'records': 1250, 'removed_files': 1250}
+    >>> archive.get_record("20250114_093012")
+    {'timestamp': '2025-01-14T09:30:12', 'weight': '125.0', ...}
+    >>> df = archive.load_all()
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import csv
+import io
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .instrumentation import debug
+from .schema import apply_schema, read_csv_typed
+
+
+# Naam patroon van losse berekening bestanden
+CALC_FILE_PATTERN = re.compile(r'^calc_(\d{8})_(\d{6})(?:_(\d+))?\.csv$')
+
+# Calc key: tijdstempel, optioneel gevolgd door het id
+CALC_KEY_PATTERN = re.compile(r'\d{8}_\d{6}(?:_\d+)?')
+
+# Key kolom die in elk segment wordt toegevoegd
+KEY_COLUMN = 'calc_key'
+
+# Toegestane segment granulariteit → lengte van de datum prefix
+GRANULARITY_PREFIX = {
+    'day': 8,     # YYYYMMDD
+    'month': 6,   # YYYYMM
+}
+
+
+class CalculationArchive:
+    """Segment archief voor individuele berekening CSV's.
+
+    Parameters:
+    ----------
+    calc_dir : Path
+        Map met losse calc_*.csv bestanden (exports/berekeningen)
+    """
+
+    def __init__(self, calc_dir: Union[str, Path]):
+        self.calc_dir = Path(calc_dir)
+        self.archive_dir = self.calc_dir / "archief"
+
+    # === HULPFUNCTIES ===
+
+    @staticmethod
+    def to_key(timestamp: Union[str, datetime]) -> str:
+        """Normaliseer een tijdstip naar calc key 'YYYYmmdd_HHMMSS'.
+
+        Accepteert een datetime, een calc key (ook met id) of een ISO
+        timestamp string.
+        """
+        if isinstance(timestamp, datetime):
+            return timestamp.strftime('%Y%m%d_%H%M%S')
+        text = str(timestamp).strip()
+        if CALC_KEY_PATTERN.fullmatch(text):
+            return text
+        parsed = datetime.fromisoformat(text.replace('T', ' ').split('.')[0])
+        return parsed.strftime('%Y%m%d_%H%M%S')
+
+    def _segment_paths(self, segment_id: str) -> Tuple[Path, Path]:
+        """Pad naar segment CSV en bijbehorende index."""
+        base = self.archive_dir / f"calc_segment_{segment_id}"
+        return base.with_suffix('.csv'), base.with_suffix('.idx.json')
+
+    def loose_files(self) -> List[Path]:
+        """Alle nog niet gecompacteerde calc_*.csv bestanden."""
+        return sorted(
+            path for path in self.calc_dir.glob("calc_*.csv")
+            if CALC_FILE_PATTERN.match(path.name)
+        )
+
+    def segments(self) -> List[Path]:
+        """Alle segment CSV bestanden, chronologisch."""
+        if not self.archive_dir.exists():
+            return []
+        return sorted(self.archive_dir.glob("calc_segment_*.csv"))
+
+    def _load_index(self, index_path: Path) -> Dict[str, List[int]]:
+        if not index_path.exists():
+            return {}
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_index(self, index_path: Path, index: Dict[str, List[int]]) -> None:
+        """Schrijf index atomair (tmp + replace)."""
+        tmp_path = index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, index_path)
+
+    @staticmethod
+    def _read_header(segment_path: Path) -> List[str]:
+        with open(segment_path, 'r', newline='', encoding='utf-8') as f:
+            return next(csv.reader(f))
+
+    # === COMPACTIE ===
+
+    def compact(self, granularity: str = 'day', include_current: bool = False,
+                remove_sources: bool = True) -> Dict[str, int]:
+        """Pak losse calc_*.csv bestanden samen in segmenten.
+
+        Parameters:
+        ----------
+        granularity : str
+            'day' of 'month' - één segment per dag of per maand
+        include_current : bool
+            Ook de lopende dag/maand compacteren. Standaard niet, omdat
+            daar nog nieuwe bestanden bij kunnen komen.
+        remove_sources : bool
+            Losse bestanden verwijderen na succesvolle compactie
+
+        Returns:
+        -------
+        Dict[str, int]
+            Aantal bijgewerkte segmenten, records en verwijderde bestanden
+        """
+        if granularity not in GRANULARITY_PREFIX:
+            raise ValueError(f"Ongeldige granulariteit: {granularity} (kies 'day' of 'month')")
+
+        prefix_len = GRANULARITY_PREFIX[granularity]
+        current_id = datetime.now().strftime('%Y%m%d')[:prefix_len]
+
+        # Groepeer bestanden per segment
+        groups: Dict[str, List[Path]] = defaultdict(list)
+        for path in self.loose_files():
+            date_part = CALC_FILE_PATTERN.match(path.name).group(1)
+            segment_id = date_part[:prefix_len]
+            if segment_id == current_id and not include_current:
+                continue
+            groups[segment_id].append(path)
+
+        result = {'segments': 0, 'records': 0, 'removed_files': 0}
+        if not groups:
+            return result
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        for segment_id, paths in sorted(groups.items()):
+            written = self._append_to_segment(segment_id, paths)
+            result['segments'] += 1
+            result['records'] += written
+
+            if remove_sources:
+                for path in paths:
+                    path.unlink()
+                    result['removed_files'] += 1
+
+        debug("Compacted %d calculations into %d segments", result['records'], result['segments'])
+        return result
+
+    def _append_to_segment(self, segment_id: str, paths: Iterable[Path]) -> int:
+        """Voeg bestanden toe aan één segment en werk de index bij.
+
+        De CSV wordt eerst volledig geschreven en ge-fsynct; pas daarna
+        wordt de index vervangen. Een crash halverwege laat hooguit
+        ongeïndexeerde rijen achter, nooit een index naar ontbrekende data.
+        """
+        segment_path, index_path = self._segment_paths(segment_id)
+        index = self._load_index(index_path)
+
+        # Lees alle rijen eerst in (bron bestanden zijn klein)
+        rows: List[Tuple[str, Dict[str, str]]] = []
+        source_headers: List[str] = []
+        for path in paths:
+            key = path.stem[len('calc_'):]
+            with open(path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                for column in reader.fieldnames or []:
+                    if column not in source_headers:
+                        source_headers.append(column)
+                for row in reader:
+                    rows.append((key, row))
+
+        if segment_path.exists():
+            header = self._read_header(segment_path)
+            extra = [column for column in source_headers if column not in header]
+            if extra:
+                # Nieuwe kolommen (bijv. oude calc_*.csv met calc_data sleutels
+                # in een MASTER_COLUMNS segment): header verbreden, nooit laten vallen
+                header = header + extra
+                self._rewrite_segment(segment_path, header)
+                index = self._reindex(segment_path, index_path)
+        else:
+            header = [KEY_COLUMN] + source_headers
+
+        written = 0
+        with open(segment_path, 'ab') as f:
+            if f.tell() == 0:
+                f.write(self._encode_row(header))
+
+            for key, row in rows:
+                if key in index:
+                    # Zelfde seconde al gearchiveerd (bestand was overschreven)
+                    continue
+                row[KEY_COLUMN] = key
+                data = self._encode_row([row.get(column, '') for column in header])
+                index[key] = [f.tell(), len(data)]
+                f.write(data)
+                written += 1
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._write_index(index_path, index)
+        return written
+
+    def _rewrite_segment(self, segment_path: Path, header: List[str]) -> None:
+        """Herschrijf een segment met een bredere header (tmp + replace).
+
+        Bestaande rijen krijgen een lege waarde in de nieuwe kolommen. De
+        index klopt daarna niet meer (andere offsets): roep _reindex aan.
+        """
+        tmp_path = segment_path.with_suffix('.tmp')
+        with open(segment_path, 'r', newline='', encoding='utf-8') as source, \
+                open(tmp_path, 'wb') as target:
+            target.write(self._encode_row(header))
+            for row in csv.DictReader(source, restval=''):
+                target.write(self._encode_row([row.get(column, '') for column in header]))
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(tmp_path, segment_path)
+
+    def _reindex(self, segment_path: Path, index_path: Path) -> Dict[str, List[int]]:
+        """Bouw de index opnieuw op uit het segment zelf en schrijf hem weg.
+
+        De rijen zijn met _encode_row geschreven, dus opnieuw encoderen
+        geeft exact dezelfde bytes (en daarmee de offsets).
+        """
+        index: Dict[str, List[int]] = {}
+        with open(segment_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            key_position = header.index(KEY_COLUMN)
+            offset = len(self._encode_row(header))
+            for values in reader:
+                length = len(self._encode_row(values))
+                # Eerste rij per key wint, zoals bij het toevoegen
+                index.setdefault(values[key_position], [offset, length])
+                offset += length
+        self._write_index(index_path, index)
+        return index
+
+    @staticmethod
+    def _encode_row(values: List[Any]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        return buffer.getvalue().encode('utf-8')
+
+    # === LEZEN ===
+
+    def get_record(self, timestamp: Union[str, datetime]) -> Optional[Dict[str, str]]:
+        """Haal één berekening op via zijn tijdstip.
+
+        Kijkt eerst naar een nog los bestand, daarna via de index in het
+        dag- of maandsegment (één seek + read, geen volledige parse).
+
+        Parameters:
+        ----------
+        timestamp : str of datetime
+            Calc key 'YYYYmmdd_HHMMSS[_id]', ISO timestamp of datetime
+
+        Returns:
+        -------
+        Optional[Dict[str, str]]
+            De rij als dictionary, of None als niet gevonden
+        """
+        key = self.to_key(timestamp)
+
+        # Alleen een tijdstempel: eerste berekening van die seconde
+        loose_path = self.calc_dir / f"calc_{key}.csv"
+        if not loose_path.exists() and len(key) == 15:
+            matches = sorted(self.calc_dir.glob(f"calc_{key}_*.csv"))
+            loose_path = matches[0] if matches else loose_path
+        if loose_path.exists():
+            with open(loose_path, 'r', newline='', encoding='utf-8') as f:
+                return next(csv.DictReader(f), None)
+
+        for prefix_len in GRANULARITY_PREFIX.values():
+            segment_path, index_path = self._segment_paths(key[:prefix_len])
+            if not segment_path.exists():
+                continue
+            index = self._load_index(index_path)
+            for _ in range(2):
+                found = key if key in index else None
+                if found is None and len(key) == 15:
+                    prefixed = sorted(k for k in index if k.startswith(key + '_'))
+                    found = prefixed[0] if prefixed else None
+                if found is None:
+                    break
+
+                offset, length = index[found]
+                with open(segment_path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read(length).decode('utf-8', errors='replace')
+                values = next(csv.reader(io.StringIO(data)), [])
+                record = dict(zip(self._read_header(segment_path), values))
+                if record.get(KEY_COLUMN) == found:
+                    return record
+                # Index achter op het segment (crash na verbreden): herbouwen
+                index = self._reindex(segment_path, index_path)
+
+        return None
+
+    def load_all(self) -> pd.DataFrame:
+        """Laad alle berekeningen: segmenten in bulk plus losse bestanden."""
+        frames = []
+
+        for segment_path in self.segments():
+            try:
+                frames.append(read_csv_typed(segment_path))
+            except Exception as e:
+                print(f"Waarschuwing: Kon segment {segment_path} niet laden: {e}")
+
+        for csv_file in self.loose_files():
+            try:
+                df = pd.read_csv(csv_file)
+                df[KEY_COLUMN] = csv_file.stem[len('calc_'):]
+                frames.append(df)
+            except Exception as e:
+                print(f"Waarschuwing: Kon {csv_file} niet laden: {e}")
+
+        if not frames:
+            return pd.DataFrame()
+        # Concat van categories met verschillende waarden wordt object: opnieuw typeren
+        combined = apply_schema(pd.concat(frames, ignore_index=True))
+        # Onderbroken compactie kan ongeïndexeerde duplicaten achterlaten
+        return combined.drop_duplicates(subset=KEY_COLUMN, keep='last')
+
+    def count_records(self) -> int:
+        """Aantal berekeningen (index lengtes + losse bestanden)."""
+        total = len(self.loose_files())
+        for segment_path in self.segments():
+            index_path = segment_path.with_suffix('.idx.json')
+            total += len(self._load_index(index_path))
+        return total
+
+    def remove_segments_before(self, cutoff: datetime) -> int:
+        """Verwijder segmenten waarvan de periode volledig voor cutoff ligt.
+
+        Returns:
+        -------
+        int
+            Aantal verwijderde records
+        """
+        removed = 0
+        cutoff_day = cutoff.strftime('%Y%m%d')
+        for segment_path in self.segments():
+            segment_id = segment_path.stem[len('calc_segment_'):]
+            # Maand segment valt pas weg als de hele maand voorbij is
+            if len(segment_id) == GRANULARITY_PREFIX['month']:
+                is_old = segment_id < cutoff_day[:6]
+            else:
+                is_old = segment_id < cutoff_day
+            if not is_old:
+                continue
+
+            index_path = segment_path.with_suffix('.idx.json')
+            removed += len(self._load_index(index_path))
+            segment_path.unlink()
+            if index_path.exists():
+                index_path.unlink()
+        return removed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line compactie job."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compacteer calc_*.csv bestanden tot segmenten")
+    parser.add_argument("calc_dir", nargs='?', default=str(Path("exports") / "berekeningen"),
+                        help="Map met calc_*.csv bestanden")
+    parser.add_argument("--granularity", choices=sorted(GRANULARITY_PREFIX), default='day',
+                        help="Eén segment per dag of per maand")
+    parser.add_argument("--include-current", action='store_true',
+                        help="Ook de lopende dag/maand compacteren")
+    args = parser.parse_args(argv)
+
+    archive = CalculationArchive(args.calc_dir)
+    result = archive.compact(granularity=args.granularity, include_current=args.include_current)
+    print(f"✅ {result['records']} berekeningen in {result['segments']} segmenten, "
+          f"{result['removed_files']} losse bestanden verwijderd")
+    return 0
+
+
+__all__ = ['CalculationArchive', 'CALC_FILE_PATTERN', 'KEY_COLUMN']
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,307 @@
+"""
+Config Snapshots - H2D Price Calculator
+=======================================
+
+Deduplicatie van configuratie kolommen in calculation_log.csv.
+
+Vroeger schreef elke log rij alle 14 configuratie waarden mee
+(printer_power_kw t/m auto_time_per_gram), terwijl de configuratie
+zelden wijzigt. Nu wordt elke unieke configuratie één keer opgeslagen
+in een versietabel, en draagt elke log rij alleen een config_version:
+
+exports/berekeningen/
+├── calculation_log.csv     # 19 kolommen: berekening + config_version
+└── config_versions.csv     # config_version, config_hash, created_at + 14 config kolommen
+
+De config_hash (SHA-1 over de genormaliseerde waarden) zorgt dat
+dezelfde configuratie altijd dezelfde versie krijgt. Een nieuwe versie
+wordt toegekend onder een exclusieve file lock op de versietabel, na
+het opnieuw inlezen ervan, zodat meerdere processen (GUI, CLI,
+Streamlit) nooit hetzelfde nummer aan verschillende configuraties geven.
+
+Join View:
+---------
+load_calculation_log() leest de log en voegt de config kolommen weer
+toe, zodat analyses exact het oude 32-kolommen frame krijgen. Oude
+(legacy) logs met alle 32 kolommen worden ongewijzigd teruggegeven.
+
+Migratie:
+--------
+migrate_calculation_log() zet een legacy log om (streaming, met backup).
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import csv
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: alleen binnen één proces veilig
+    fcntl = None
+
+# Kolom layouts staan centraal in het schema register
+from .schema import (
+    CONFIG_COLUMNS, CONFIG_KEY_TO_COLUMN, LEGACY_LOG_COLUMNS, LOG_COLUMNS,
+    read_csv_typed,
+)
+from .instrumentation import debug, traced
+from .warm_start import read_csv_warm, warm_start_enabled
+
+
+CONFIG_TABLE_COLUMNS = ['config_version', 'config_hash', 'created_at'] + CONFIG_COLUMNS
+
+
+def _normalise(value: Any) -> str:
+    """Canonieke string voor hashing: 87, '87' en '87.0' zijn gelijk."""
+    if value is None or value == '':
+        return ''
+    try:
+        return repr(float(value))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def config_hash(values: Dict[str, Any]) -> str:
+    """SHA-1 hash over de 14 config kolommen (kolomnamen als keys)."""
+    canonical = json.dumps([_normalise(values.get(c, '')) for c in CONFIG_COLUMNS])
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class ConfigSnapshotStore:
+    """Versietabel voor configuratie snapshots.
+
+    Parameters:
+    ----------
+    calc_dir : Path
+        Map van calculation_log.csv (exports/berekeningen)
+    """
+
+    def __init__(self, calc_dir: Union[str, Path]):
+        self.calc_dir = Path(calc_dir)
+        self.table_path = self.calc_dir / "config_versions.csv"
+        self._versions: Optional[Dict[str, int]] = None
+
+    def _load_versions(self) -> Dict[str, int]:
+        """Lees hash → versie mapping (eenmalig, daarna in geheugen)."""
+        if self._versions is None:
+            self._versions = {}
+            if self.table_path.exists():
+                with open(self.table_path, 'r', newline='', encoding='utf-8') as f:
+                    self._versions = self._read_versions(f)
+        return self._versions
+
+    @staticmethod
+    def _read_versions(f) -> Dict[str, int]:
+        """hash → versie uit een open versietabel (eerste versie per hash wint)."""
+        versions: Dict[str, int] = {}
+        for row in csv.DictReader(f):
+            versions.setdefault(row['config_hash'], int(row['config_version']))
+        return versions
+
+    def get_or_create_version(self, values: Dict[str, Any]) -> int:
+        """Geef de versie voor deze configuratie, maak hem aan indien nieuw.
+
+        Parameters:
+        ----------
+        values : Dict[str, Any]
+            Config waarden met log kolomnamen als keys (printer_power_kw, ...)
+
+        Returns:
+        -------
+        int
+            config_version
+        """
+        versions = self._load_versions()
+        digest = config_hash(values)
+        if digest in versions:
+            return versions[digest]
+
+        self.calc_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.table_path, 'a+', newline='', encoding='utf-8') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                # Opnieuw inlezen onder de lock: een ander proces kan deze
+                # configuratie of hogere versies al toegevoegd hebben
+                f.seek(0)
+                versions = self._read_versions(f)
+                self._versions = versions
+                if digest in versions:
+                    return versions[digest]
+
+                version = max(versions.values(), default=0) + 1
+                writer = csv.writer(f)  # 'a+' schrijft altijd aan het einde
+                if f.tell() == 0:
+                    writer.writerow(CONFIG_TABLE_COLUMNS)
+                writer.writerow(
+                    [version, digest, datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
+                    + [values.get(c, '') for c in CONFIG_COLUMNS]
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+        versions[digest] = version
+        return version
+
+    def version_for_config(self, config: Dict[str, Any]) -> int:
+        """Zelfde als get_or_create_version, maar met GUI config sleutels."""
+        return self.get_or_create_version(
+            {column: config.get(key, '') for key, column in CONFIG_KEY_TO_COLUMN.items()}
+        )
+
+    def load_table(self) -> pd.DataFrame:
+        """Laad de versietabel als DataFrame."""
+        if not self.table_path.exists():
+            return pd.DataFrame(columns=CONFIG_TABLE_COLUMNS)
+        return pd.read_csv(self.table_path)
+
+    def join(self, df: pd.DataFrame, keep_version: bool = False) -> pd.DataFrame:
+        """Voeg config kolommen toe aan een compacte log (join view).
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Log met config_version kolom
+        keep_version : bool
+            config_version kolom behouden achter de 32 kolommen
+
+        Returns:
+        -------
+        pd.DataFrame
+            Frame in de oude 32-kolommen layout
+        """
+        if 'config_version' not in df.columns:
+            return df
+
+        table = self.load_table()
+        conflicts = table.loc[table['config_version'].duplicated(keep=False), 'config_version'].unique()
+        if len(conflicts):
+            # Versie met meerdere hashes (tabel van vóór de file lock): houd
+            # de eerste, anders vermenigvuldigt de join de log rijen
+            print(f"Waarschuwing: config_versions.csv bevat dubbele versies {sorted(int(v) for v in conflicts)}; "
+                  f"de eerste configuratie per versie wordt gebruikt")
+            table = table.drop_duplicates('config_version', keep='first')
+        table = table[['config_version'] + CONFIG_COLUMNS]
+        joined = df.merge(table, on='config_version', how='left', validate='many_to_one')
+
+        columns = [c for c in LEGACY_LOG_COLUMNS if c in joined.columns]
+        extra = [c for c in joined.columns if c not in LEGACY_LOG_COLUMNS and c != 'config_version']
+        if keep_version:
+            extra.append('config_version')
+        return joined[columns + extra]
+
+
+def is_legacy_log(log_path: Union[str, Path]) -> bool:
+    """True als de log nog de 32-kolommen layout met config waarden heeft."""
+    log_path = Path(log_path)
+    if not log_path.exists():
+        return False
+    with open(log_path, 'r', newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    return 'config_version' not in header and any(c in header for c in CONFIG_COLUMNS)
+
+
+def migrate_calculation_log(log_path: Union[str, Path],
+                            store: Optional[ConfigSnapshotStore] = None) -> Dict[str, Any]:
+    """Zet een legacy calculation_log.csv om naar de compacte layout.
+
+    Leest rij voor rij (streaming), kent per unieke configuratie een
+    versie toe en vervangt de log atomair. Het origineel blijft bewaard
+    als calculation_log_legacy_YYYYmmdd_HHMMSS.csv.
+
+    Parameters:
+    ----------
+    log_path : Path
+        Pad naar calculation_log.csv
+    store : ConfigSnapshotStore, optional
+        Versietabel (default: naast de log)
+
+    Returns:
+    -------
+    Dict[str, Any]
+        rows, versions en backup pad
+    """
+    log_path = Path(log_path)
+    if not is_legacy_log(log_path):
+        return {'rows': 0, 'versions': 0, 'backup': None}
+
+    store = store or ConfigSnapshotStore(log_path.parent)
+    tmp_path = log_path.with_suffix('.migrating')
+    backup_path = log_path.with_name(
+        f"calculation_log_legacy_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    )
+
+    rows = 0
+    seen_versions = set()
+    with open(log_path, 'r', newline='', encoding='utf-8') as src, \
+         open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+        reader = csv.DictReader(src)
+        writer = csv.writer(dst)
+        writer.writerow(LOG_COLUMNS)
+
+        for row in reader:
+            version = store.get_or_create_version(row)
+            seen_versions.add(version)
+            row['config_version'] = version
+            writer.writerow([row.get(c, '') for c in LOG_COLUMNS])
+            rows += 1
+
+        dst.flush()
+        os.fsync(dst.fileno())
+
+    shutil.copy2(log_path, backup_path)
+    os.replace(tmp_path, log_path)
+
+    debug("Migrated %d log rows to %d config versions", rows, len(seen_versions))
+    return {'rows': rows, 'versions': len(seen_versions), 'backup': str(backup_path)}
+
+
+@traced('loading.calculation_log')
+def load_calculation_log(log_path: Union[str, Path], keep_version: bool = False,
+                         columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Join view: lees calculation_log.csv in de 32-kolommen layout.
+
+    Werkt voor zowel compacte als legacy logs. Met columns worden alleen
+    die kolommen gelezen; de join met config_versions.csv gebeurt dan
+    alleen als er config kolommen gevraagd zijn.
+    """
+    log_path = Path(log_path)
+    usecols = None
+    if columns is not None:
+        with open(log_path, 'r', encoding='utf-8') as f:
+            header = f.readline().strip().split(',')
+        wanted = set(columns)
+        if wanted & set(CONFIG_COLUMNS) or keep_version:
+            wanted.add('config_version')
+        usecols = [c for c in header if c in wanted]
+
+    if warm_start_enabled():
+        df = read_csv_warm(log_path, usecols=usecols)
+    else:
+        df = read_csv_typed(log_path, usecols=usecols)
+    if 'config_version' in df.columns:
+        df = ConfigSnapshotStore(log_path.parent).join(df, keep_version=keep_version)
+    if columns is not None:
+        keep = set(columns) | ({'config_version'} if keep_version else set())
+        df = df[[c for c in df.columns if c in keep]]
+    return df
+
+
+__all__ = [
+    'CONFIG_COLUMNS', 'CONFIG_KEY_TO_COLUMN', 'LEGACY_LOG_COLUMNS', 'LOG_COLUMNS',
+    'ConfigSnapshotStore', 'config_hash', 'is_legacy_log',
+    'migrate_calculation_log', 'load_calculation_log',
+]
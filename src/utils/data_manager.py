@@ -13,7 +13,10 @@ Folder Structuur:
 ----------------
 exports/
 ├── berekeningen/       # Individuele berekeningen
-│   └── calc_YYYYMMDD_HHMMSS.csv
+│   ├── calc_YYYYMMDD_HHMMSS.csv
+│   ├── calculation_log.csv   # Log met config_version per rij
+│   ├── config_versions.csv   # Unieke config snapshots
+│   └── archief/        # Gecompacteerde dag/maand segmenten + index
 ├── producten/          # Product exports
 │   └── products_YYYYMMDD_HHMMSS.csv
 └── analyses/           # Analyse resultaten
@@ -31,6 +34,196 @@ from collections import defaultdict
 import threading
 import time
 
+from .calc_archive import CalculationArchive
+from .ids import format_id, new_id
+from .log_writer import get_record_writer, make_record
+from .partitions import PartitionedStore
+from .sqlite_store import get_storage_backend, open_default_store
+from .config_snapshots import (
+    ConfigSnapshotStore, LOG_COLUMNS, is_legacy_log,
+    load_calculation_log, migrate_calculation_log
+)
+from .schema import (
+    MASTER_COLUMNS, WEEKDAYS, build_master_row, empty_master_frame, format_timestamp,
+    read_csv_filtered, read_csv_typed, read_master
+)
+from .warm_start import read_csv_warm, warm_start_enabled
+from .instrumentation import count, debug, traced
+
+
+# Rijen per chunk voor de CSV fallback van CalculationQuery
+QUERY_CHUNK_ROWS = 100_000
+
+
+class CalculationQuery:
+    """Select/where query op de berekeningen (projectie en predicate pushdown).
+    
+    Analyses declareren welke kolommen en rijen ze nodig hebben; de
+    backend leest dan zo weinig mogelijk:
+    
+    - SQLite: SELECT <kolommen> ... WHERE in SQL (via de indexen)
+    - partities: alleen overlappende dag/maand partities en alleen de kolommen
+    - CSV: usecols en filteren per chunk, nooit de volledige file in geheugen
+    
+    Een query is onveranderlijk: select() en where() geven een nieuwe terug.
+    
+    Voorbeeld:
+    ---------
+        >>> df = (data_manager.select('timestamp', 'material', 'weight')
+        ...       .where(start=week_start, abrasive=True)
+        ...       .fetch())
+    """
+    
+    FILTERS = ('start', 'end', 'materials', 'abrasive', 'is_product')
+    
+    def __init__(self, columns: Optional[List[str]] = None, runner=None, **filters):
+        """Initialiseer een query.
+        
+        Parameters:
+        ----------
+        columns : List[str], optional
+            Kolommen in het resultaat (None = alle MASTER_COLUMNS)
+        runner : callable, optional
+            Voert de query uit bij fetch() (DataManager.run_query)
+        **filters
+            start, end, materials, abrasive, is_product
+        """
+        unknown = [key for key in filters if key not in self.FILTERS]
+        if unknown:
+            raise ValueError(f"Onbekende filters: {unknown}")
+        if columns is not None:
+            columns = list(dict.fromkeys(columns))
+            unknown = [c for c in columns if c not in MASTER_COLUMNS]
+            if unknown:
+                raise ValueError(f"Onbekende kolommen: {unknown}")
+                
+        self.columns = columns
+        self.filters = {key: value for key, value in filters.items() if value is not None}
+        if isinstance(self.filters.get('materials'), str):
+            self.filters['materials'] = [self.filters['materials']]
+        elif 'materials' in self.filters:
+            self.filters['materials'] = list(self.filters['materials'])
+        self._runner = runner
+        
+    def select(self, *columns: str) -> 'CalculationQuery':
+        """Nieuwe query met alleen deze kolommen (geen kolommen = alle)."""
+        return CalculationQuery(list(columns) or None, self._runner, **self.filters)
+        
+    def where(self, **filters) -> 'CalculationQuery':
+        """Nieuwe query met extra/vervangende filters (None wist een filter).
+        
+        Parameters:
+        ----------
+        start, end : datetime | date, optional
+            Periode (inclusief; een datum als eind omvat de hele dag)
+        materials : Sequence[str] | str, optional
+            Alleen deze materialen
+        abrasive, is_product : bool, optional
+            Filter op flag
+        """
+        return CalculationQuery(self.columns, self._runner, **{**self.filters, **filters})
+        
+    @property
+    def has_time_range(self) -> bool:
+        return 'start' in self.filters or 'end' in self.filters
+        
+    def predicate_columns(self) -> List[str]:
+        """Kolommen die alleen voor de filters gelezen moeten worden."""
+        columns = ['timestamp'] if self.has_time_range else []
+        if 'materials' in self.filters:
+            columns.append('material')
+        columns.extend(flag for flag in ('abrasive', 'is_product') if flag in self.filters)
+        return columns
+        
+    def read_columns(self) -> Optional[List[str]]:
+        """Kolommen om in te lezen: projectie plus filterkolommen."""
+        if self.columns is None:
+            return None
+        return list(dict.fromkeys(self.columns + self.predicate_columns()))
+        
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Filter en projecteer een getypeerd frame in pandas."""
+        mask = pd.Series(True, index=df.index)
+        start = self.filters.get('start')
+        end = self.filters.get('end')
+        if start is not None:
+            mask &= df['timestamp'] >= pd.Timestamp(start)
+        if end is not None:
+            end_ts = pd.Timestamp(end)
+            if not isinstance(end, datetime):
+                end_ts += pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+            mask &= df['timestamp'] <= end_ts
+        if 'materials' in self.filters:
+            mask &= df['material'].isin(self.filters['materials'])
+        for flag in ('abrasive', 'is_product'):
+            if flag in self.filters:
+                mask &= df[flag] == bool(self.filters[flag])
+                
+        if not mask.all():
+            df = df[mask]
+        if self.columns is not None:
+            df = df[[c for c in self.columns if c in df.columns]]
+        return df.reset_index(drop=True)
+        
+    def read_csv(self, path, chunksize: int = QUERY_CHUNK_ROWS) -> pd.DataFrame:
+        """Voer de query uit op een master CSV (usecols + chunked filter)."""
+        if not self.filters:
+            # Alleen projectie: één getypeerde read met usecols volstaat
+            usecols = self.read_columns()
+            if usecols is not None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    header = f.readline().strip().split(',')
+                usecols = [c for c in usecols if c in header]
+            if warm_start_enabled():
+                # Snapshot + alleen de nieuwe staart parsen
+                return read_csv_warm(path, usecols=usecols)
+            return read_csv_typed(path, usecols=usecols)
+        return read_csv_filtered(path, self.apply, usecols=self.read_columns(), chunksize=chunksize)
+        
+    def fetch(self) -> pd.DataFrame:
+        """Voer de query uit via de gekoppelde DataManager."""
+        if self._runner is None:
+            raise RuntimeError("Query is niet gekoppeld aan een DataManager (gebruik DataManager.select)")
+        return self._runner(self)
+        
+    def __repr__(self) -> str:
+        return f"CalculationQuery(columns={self.columns}, filters={self.filters})"
+
+
+def execute_query(query: CalculationQuery, master_path, db=None,
+                  partitions: Optional[PartitionedStore] = None) -> pd.DataFrame:
+    """Voer een CalculationQuery uit op de beste beschikbare backend.
+    
+    Parameters:
+    ----------
+    query : CalculationQuery
+        Projectie en filters
+    master_path : Path
+        master_calculations.csv (CSV fallback)
+    db : SQLiteStore, optional
+        SQLite backend; filters en projectie gaan dan naar SQL
+    partitions : PartitionedStore, optional
+        Partities voor queries met een periode
+        
+    Returns:
+    -------
+    pd.DataFrame
+        Getypeerd frame met alleen de gevraagde kolommen
+    """
+    if db is not None:
+        return db.query_calculations(columns=query.columns, **query.filters)
+        
+    if partitions is not None and query.has_time_range:
+        df = partitions.query(query.filters.get('start'), query.filters.get('end'),
+                              columns=query.read_columns(),
+                              materials=query.filters.get('materials'))
+        return query.apply(df)
+        
+    if not Path(master_path).exists():
+        return query.apply(empty_master_frame())
+    return query.read_csv(master_path)
+
+
 class DataManager:
     """Centrale manager voor alle data operaties.
     
@@ -41,13 +234,15 @@ class DataManager:
     - Rapport generatie
     """
     
-    def __init__(self, base_dir: str = "exports"):
+    def __init__(self, base_dir: str = "exports", backend: Optional[str] = None):
         """Initialiseer DataManager met folder structuur.
         
         Parameters:
         ----------
         base_dir : str
             Basis directory voor alle exports (default: "exports")
+        backend : str, optional
+            'csv' of 'sqlite' (default: instelling 'storage_backend')
         """
         self.base_dir = Path(base_dir)
         
@@ -63,10 +258,32 @@ class DataManager:
         # Paden naar de CSV bestanden
         self.master_calc_file = self.base_dir / "producten" / "master_calculations.csv"
         
+        # Dag-partities van de master voor periode queries
+        self.partitions = PartitionedStore(self.master_calc_file)
+        
+        # Segment archief voor gecompacteerde calc_*.csv bestanden
+        self.archive = CalculationArchive(self.calc_dir)
+        
+        # Versietabel voor config snapshots in calculation_log.csv
+        self.config_snapshots = ConfigSnapshotStore(self.calc_dir)
+        self.calc_log_file = self.calc_dir / "calculation_log.csv"
+        
+        # Optionele SQLite backend ('storage_backend' in user_settings.json)
+        self.backend = backend or get_storage_backend()
+        self.db = open_default_store(self.base_dir) if self.backend == 'sqlite' else None
+        
+        # CSV appends via de single-writer (log writer daemon of lokaal met
+        # file lock), zodat GUI, CLI en Streamlit geen rijen door elkaar schrijven
+        self.writer = get_record_writer(self.base_dir) if self.db is None else None
+        
+        # Winstgevendheid kubus, pas opgebouwd bij de eerste profit_cube()
+        self._profit_cube = None
+        
         # Threading lock voor file operations
         self._file_lock = threading.Lock()
-        print("DEBUG: DataManager initialized with thread-safe file locking")
+        debug("DataManager initialized with thread-safe file locking")
         
+    @traced('logging.export_calculation')
     def export_calculation(self, calc_data: Dict[str, Any]) -> str:
         """Export een enkele berekening naar CSV.
         
@@ -89,14 +306,14 @@ class DataManager:
         str
             Pad naar opgeslagen CSV bestand
         """
-        # Timestamp voor bestandsnaam
+        # Timestamp + uniek id voor bestandsnaam (meerdere per seconde mogelijk)
         timestamp = datetime.now()
-        filename = f"calc_{timestamp.strftime('%Y%m%d_%H%M%S')}.csv"
+        filename = f"calc_{timestamp.strftime('%Y%m%d_%H%M%S')}_{format_id(new_id())}.csv"
         filepath = self.calc_dir / filename
         
         # Voeg extra metadata toe
         enhanced_data = calc_data.copy()
-        enhanced_data['export_timestamp'] = timestamp.isoformat()
+        enhanced_data['export_timestamp'] = format_timestamp(timestamp)
         enhanced_data['day_of_week'] = timestamp.strftime('%A')
         enhanced_data['hour_of_day'] = timestamp.hour
         enhanced_data['month'] = timestamp.strftime('%B')
@@ -108,44 +325,18 @@ class DataManager:
         enhanced_data['abrasive'] = options.get('abrasive', False)
         enhanced_data['rush'] = options.get('rush', False)
         
-        # Schrijf individuele CSV
-        headers = [
-            'timestamp', 'weight', 'material', 'material_cost', 'variable_cost',
-            'total_cost', 'sell_price', 'margin_pct', 'profit_amount',
-            'multicolor', 'abrasive', 'rush', 'day_of_week', 'hour_of_day',
-            'month', 'year', 'product_name', 'product_id', 'is_product'
-        ]
-        
+        # Schrijf individuele CSV (layout uit het schema register)
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
+            writer = csv.DictWriter(f, fieldnames=MASTER_COLUMNS)
             writer.writeheader()
-            writer.writerow({
-                'timestamp': enhanced_data.get('export_timestamp', ''),
-                'weight': enhanced_data.get('weight', 0),
-                'material': enhanced_data.get('material', ''),
-                'material_cost': round(enhanced_data.get('material_cost', 0), 2),
-                'variable_cost': round(enhanced_data.get('variable_cost', 0), 2),
-                'total_cost': round(enhanced_data.get('total_cost', 0), 2),
-                'sell_price': round(enhanced_data.get('sell_price', 0), 2),
-                'margin_pct': round(enhanced_data.get('margin_pct', 0), 1),
-                'profit_amount': round(enhanced_data.get('sell_price', 0) - enhanced_data.get('total_cost', 0), 2),
-                'multicolor': enhanced_data.get('multicolor', False),
-                'abrasive': enhanced_data.get('abrasive', False),
-                'rush': enhanced_data.get('rush', False),
-                'day_of_week': enhanced_data.get('day_of_week', ''),
-                'hour_of_day': enhanced_data.get('hour_of_day', 0),
-                'month': enhanced_data.get('month', ''),
-                'year': enhanced_data.get('year', 0),
-                'product_name': enhanced_data.get('product_name', ''),
-                'product_id': enhanced_data.get('product_id', ''),
-                'is_product': enhanced_data.get('is_product', False)
-            })
+            writer.writerow(build_master_row(enhanced_data))
             
         # Voeg ook toe aan master file
         self._append_to_master(enhanced_data)
         
         return str(filepath)
         
+    @traced('logging.log_and_export')
     def log_and_export_calculation(self, calc_data: Dict[str, Any]) -> str:
         """Gecombineerde functie die zowel naar calculation_log.csv als master_calculations.csv schrijft.
         
@@ -161,14 +352,15 @@ class DataManager:
         str
             Pad naar individuele calculation CSV
         """
-        # Maak eerst individuele CSV (geen concurrency issues)
+        # Maak eerst individuele CSV (geen concurrency issues: uniek id in de naam)
         timestamp = datetime.now()
-        filename = f"calc_{timestamp.strftime('%Y%m%d_%H%M%S')}.csv"
+        calc_id = new_id()
+        filename = f"calc_{timestamp.strftime('%Y%m%d_%H%M%S')}_{format_id(calc_id)}.csv"
         filepath = self.calc_dir / filename
         
         # Enhanced data voor beide bestanden
         enhanced_data = calc_data.copy()
-        enhanced_data['export_timestamp'] = timestamp.isoformat()
+        enhanced_data['export_timestamp'] = format_timestamp(timestamp)
         enhanced_data['day_of_week'] = timestamp.strftime('%A')
         enhanced_data['hour_of_day'] = timestamp.hour
         enhanced_data['month'] = timestamp.strftime('%B')
@@ -181,140 +373,74 @@ class DataManager:
         enhanced_data['rush'] = options.get('rush', False)
         
         # Schrijf individuele CSV (geen locking nodig, unieke file)
-        headers = [
-            'timestamp', 'weight', 'material', 'material_cost', 'variable_cost',
-            'total_cost', 'sell_price', 'margin_pct', 'profit_amount',
-            'multicolor', 'abrasive', 'rush', 'day_of_week', 'hour_of_day',
-            'month', 'year', 'product_name', 'product_id', 'is_product'
-        ]
-        
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
+            writer = csv.DictWriter(f, fieldnames=MASTER_COLUMNS)
             writer.writeheader()
-            writer.writerow({
-                'timestamp': enhanced_data.get('export_timestamp', ''),
-                'weight': enhanced_data.get('weight', 0),
-                'material': enhanced_data.get('material', ''),
-                'material_cost': round(enhanced_data.get('material_cost', 0), 2),
-                'variable_cost': round(enhanced_data.get('variable_cost', 0), 2),
-                'total_cost': round(enhanced_data.get('total_cost', 0), 2),
-                'sell_price': round(enhanced_data.get('sell_price', 0), 2),
-                'margin_pct': round(enhanced_data.get('margin_pct', 0), 1),
-                'profit_amount': round(enhanced_data.get('sell_price', 0) - enhanced_data.get('total_cost', 0), 2),
-                'multicolor': enhanced_data.get('multicolor', False),
-                'abrasive': enhanced_data.get('abrasive', False),
-                'rush': enhanced_data.get('rush', False),
-                'day_of_week': enhanced_data.get('day_of_week', ''),
-                'hour_of_day': enhanced_data.get('hour_of_day', 0),
-                'month': enhanced_data.get('month', ''),
-                'year': enhanced_data.get('year', 0),
-                'product_name': enhanced_data.get('product_name', ''),
-                'product_id': enhanced_data.get('product_id', ''),
-                'is_product': enhanced_data.get('is_product', False)
-            })
+            writer.writerow(build_master_row(enhanced_data))
         
         # Nu atomic write naar beide log bestanden met locking
         with self._file_lock:
-            # 1. Schrijf naar calculation_log.csv (uitgebreide versie)
-            log_file = self.base_dir / "berekeningen" / "calculation_log.csv"
-            log_exists = log_file.exists()
+            # Config wordt één keer opgeslagen, rij krijgt alleen de versie
+            config = calc_data.get('config', {})
+            config_version = self.config_snapshots.version_for_config(config)
             
-            with open(log_file, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                
-                # Headers voor log file
-                if not log_exists:
-                    log_headers = [
-                        'timestamp', 'date', 'time', 'day_of_week', 'hour_of_day',
-                        'weight_g', 'material', 'print_hours',
-                        'material_cost', 'variable_cost', 'total_cost', 'sell_price', 
-                        'margin_pct', 'profit_amount',
-                        'multicolor', 'abrasive', 'rush',
-                        'printer_power_kw', 'energy_price', 'labour_cost', 'monitoring_pct',
-                        'maintenance_cost', 'overhead_year', 'annual_hours',
-                        'markup_material', 'markup_variable', 'spoed_surcharge',
-                        'abrasive_surcharge', 'color_fee_min', 'color_fee_max',
-                        'auto_time_per_gram', 'auto_hours_used'
-                    ]
-                    writer.writerow(log_headers)
-                
-                # Extract config
-                config = calc_data.get('config', {})
-                
-                # Schrijf log entry
-                writer.writerow([
-                    timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                    timestamp.strftime('%Y-%m-%d'),
-                    timestamp.strftime('%H:%M:%S'),
-                    timestamp.strftime('%A'),
-                    timestamp.hour,
-                    round(calc_data.get('weight', 0), 1),
-                    calc_data.get('material', ''),
-                    round(calc_data.get('print_hours', 0), 2),
-                    round(calc_data.get('material_cost', 0), 2),
-                    round(calc_data.get('variable_cost', 0), 2),
-                    round(calc_data.get('total_cost', 0), 2),
-                    round(calc_data.get('sell_price', 0), 2),
-                    round(calc_data.get('margin_pct', 0), 1),
-                    round(calc_data.get('sell_price', 0) - calc_data.get('total_cost', 0), 2),
-                    options.get('multicolor', False),
-                    options.get('abrasive', False),
-                    options.get('rush', False),
-                    config.get('printer_power', ''),
-                    config.get('energy_price', ''),
-                    config.get('labour_cost', ''),
-                    config.get('monitoring_pct', ''),
-                    config.get('maintenance_cost', ''),
-                    config.get('overhead_year', ''),
-                    config.get('annual_hours', ''),
-                    config.get('markup_material', ''),
-                    config.get('markup_variable', ''),
-                    config.get('spoed_surcharge', ''),
-                    config.get('abrasive_surcharge', ''),
-                    config.get('color_fee_min', ''),
-                    config.get('color_fee_max', ''),
-                    config.get('auto_time_per_gram', ''),
-                    calc_data.get('auto_hours_used', False)
-                ])
-                f.flush()
-                os.fsync(f.fileno())
-            
-            # 2. Schrijf naar master_calculations.csv
-            master_exists = self.master_calc_file.exists()
-            
-            with open(self.master_calc_file, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=headers)
-                
-                if not master_exists:
-                    writer.writeheader()
-                    
-                writer.writerow({
-                    'timestamp': enhanced_data.get('export_timestamp', ''),
-                    'weight': enhanced_data.get('weight', 0),
-                    'material': enhanced_data.get('material', ''),
-                    'material_cost': round(enhanced_data.get('material_cost', 0), 2),
-                    'variable_cost': round(enhanced_data.get('variable_cost', 0), 2),
-                    'total_cost': round(enhanced_data.get('total_cost', 0), 2),
-                    'sell_price': round(enhanced_data.get('sell_price', 0), 2),
-                    'margin_pct': round(enhanced_data.get('margin_pct', 0), 1),
-                    'profit_amount': round(enhanced_data.get('sell_price', 0) - enhanced_data.get('total_cost', 0), 2),
-                    'multicolor': enhanced_data.get('multicolor', False),
-                    'abrasive': enhanced_data.get('abrasive', False),
-                    'rush': enhanced_data.get('rush', False),
-                    'day_of_week': enhanced_data.get('day_of_week', ''),
-                    'hour_of_day': enhanced_data.get('hour_of_day', 0),
-                    'month': enhanced_data.get('month', ''),
-                    'year': enhanced_data.get('year', 0),
-                    'product_name': enhanced_data.get('product_name', ''),
-                    'product_id': enhanced_data.get('product_id', ''),
-                    'is_product': enhanced_data.get('is_product', False)
-                })
-                f.flush()
-                os.fsync(f.fileno())
-        
-        print(f"DEBUG: Successfully logged calculation to both files")
+            log_values = [
+                timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                timestamp.strftime('%Y-%m-%d'),
+                timestamp.strftime('%H:%M:%S'),
+                timestamp.strftime('%A'),
+                timestamp.hour,
+                round(calc_data.get('weight', 0), 1),
+                calc_data.get('material', ''),
+                round(calc_data.get('print_hours', 0), 2),
+                round(calc_data.get('material_cost', 0), 2),
+                round(calc_data.get('variable_cost', 0), 2),
+                round(calc_data.get('total_cost', 0), 2),
+                round(calc_data.get('sell_price', 0), 2),
+                round(calc_data.get('margin_pct', 0), 1),
+                round(calc_data.get('sell_price', 0) - calc_data.get('total_cost', 0), 2),
+                options.get('multicolor', False),
+                options.get('abrasive', False),
+                options.get('rush', False),
+                calc_data.get('auto_hours_used', False),
+                config_version
+            ]
+            
+            # SQLite backend: log en master rij in één transactie
+            if self.db is not None:
+                self.db.insert_calculation_with_log(
+                    build_master_row(enhanced_data), dict(zip(LOG_COLUMNS, log_values)),
+                    row_id=calc_id
+                )
+                debug("Successfully logged calculation to %s", self.db.db_path.name)
+                return str(filepath)
+            
+            # Oude 32-kolommen log eerst eenmalig omzetten
+            if is_legacy_log(self.calc_log_file):
+                migrate_calculation_log(self.calc_log_file, self.config_snapshots)
+            
+            # Log en master rij in één verzoek: dezelfde group commit, na fsync terug
+            self.writer.append([
+                make_record(self.calc_log_file, LOG_COLUMNS, log_values),
+                make_record(self.master_calc_file, MASTER_COLUMNS, build_master_row(enhanced_data)),
+            ])
+        
+        debug("Successfully logged calculation to both files")
         return str(filepath)
         
+    def load_calculation_log(self) -> pd.DataFrame:
+        """Laad calculation_log.csv als 32-kolommen frame (join met config versies)."""
+        if self.db is not None:
+            return self.config_snapshots.join(self.db.load_log())
+        if not self.calc_log_file.exists():
+            return pd.DataFrame()
+        return load_calculation_log(self.calc_log_file)
+        
+    def migrate_calculation_log(self) -> Dict[str, Any]:
+        """Zet een legacy calculation_log.csv om naar config versies."""
+        with self._file_lock:
+            return migrate_calculation_log(self.calc_log_file, self.config_snapshots)
+            
     def log_calculation_simple(self, calc_data: Dict[str, Any]) -> None:
         """Legacy wrapper voor backward compatibility.
         
@@ -355,76 +481,46 @@ class DataManager:
         # Gebruik de bestaande export functie
         self.export_calculation(calc_data)
         
+    @traced('logging.append_master')
     def _append_to_master(self, calc_data: Dict[str, Any]) -> None:
         """Voeg berekening toe aan master CSV bestand.
         
         Dit bestand bevat ALLE berekeningen voor makkelijke analyse.
-        Thread-safe implementatie met file locking.
+        Multi-process safe via de log writer (daemon of file lock).
         """
-        headers = [
-            'timestamp', 'weight', 'material', 'material_cost', 'variable_cost',
-            'total_cost', 'sell_price', 'margin_pct', 'profit_amount',
-            'multicolor', 'abrasive', 'rush', 'day_of_week', 'hour_of_day',
-            'month', 'year', 'product_name', 'product_id', 'is_product'
-        ]
-        
-        # Gebruik thread lock voor file operaties
+        if self.db is not None:
+            self.db.insert_calculations([build_master_row(calc_data)])
+            return
+            
+        # Retry alleen als het verzoek niet verstuurd is (ConnectionError,
+        # bijv. daemon herstart). Een IOError na het versturen wordt niet
+        # herhaald: de daemon kan al gecommit hebben (dubbele rijen)
         max_retries = 3
         retry_delay = 0.1  # 100ms
         
         for attempt in range(max_retries):
             try:
                 with self._file_lock:
-                    # Check of file bestaat
-                    file_exists = self.master_calc_file.exists()
-                    
-                    # Open met exclusive write mode
-                    with open(self.master_calc_file, 'a', newline='', encoding='utf-8') as f:
-                        writer = csv.DictWriter(f, fieldnames=headers)
-                        
-                        # Schrijf header alleen bij nieuwe file
-                        if not file_exists:
-                            writer.writeheader()
-                            
-                        writer.writerow({
-                            'timestamp': calc_data.get('export_timestamp', ''),
-                            'weight': calc_data.get('weight', 0),
-                            'material': calc_data.get('material', ''),
-                            'material_cost': round(calc_data.get('material_cost', 0), 2),
-                            'variable_cost': round(calc_data.get('variable_cost', 0), 2),
-                            'total_cost': round(calc_data.get('total_cost', 0), 2),
-                            'sell_price': round(calc_data.get('sell_price', 0), 2),
-                            'margin_pct': round(calc_data.get('margin_pct', 0), 1),
-                            'profit_amount': round(calc_data.get('sell_price', 0) - calc_data.get('total_cost', 0), 2),
-                            'multicolor': calc_data.get('multicolor', False),
-                            'abrasive': calc_data.get('abrasive', False),
-                            'rush': calc_data.get('rush', False),
-                            'day_of_week': calc_data.get('day_of_week', ''),
-                            'hour_of_day': calc_data.get('hour_of_day', 0),
-                            'month': calc_data.get('month', ''),
-                            'year': calc_data.get('year', 0),
-                            'product_name': calc_data.get('product_name', ''),
-                            'product_id': calc_data.get('product_id', ''),
-                            'is_product': calc_data.get('is_product', False)
-                        })
-                        
-                        # Ensure data is written to disk
-                        f.flush()
-                        os.fsync(f.fileno())
+                    # Single-writer: geen interleaving met andere processen, na fsync terug
+                    self.writer.append([
+                        make_record(self.master_calc_file, MASTER_COLUMNS, build_master_row(calc_data))
+                    ])
                     
                     # Success - break uit retry loop
                     if attempt > 0:
-                        print(f"DEBUG: Successfully wrote to master_calculations.csv after {attempt + 1} attempts")
+                        debug("Successfully wrote to master_calculations.csv after %d attempts", attempt + 1)
                     break
                     
-            except Exception as e:
+            except ConnectionError as e:
                 if attempt < max_retries - 1:
-                    print(f"DEBUG: Retry {attempt + 1}/{max_retries} for master_calculations.csv: {e}")
+                    count('logging.master_retries')
+                    debug("Retry %d/%d for master_calculations.csv: %s", attempt + 1, max_retries, e)
                     time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
                 else:
                     print(f"ERROR: Failed to write to master_calculations.csv after {max_retries} attempts: {e}")
                     raise
         
+    @traced('loading.import_calculations')
     def import_calculations(self, from_master: bool = True) -> pd.DataFrame:
         """Importeer alle berekeningen voor analyse.
         
@@ -439,38 +535,114 @@ class DataManager:
         pd.DataFrame
             DataFrame met alle berekeningen
         """
+        if from_master and self.db is not None:
+            return self.db.query_calculations()
         if from_master and self.master_calc_file.exists():
-            df = pd.read_csv(self.master_calc_file)
-            # Convert timestamp to datetime with mixed format support
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed')
-            return df
+            # Getypeerd inlezen: datetime, categories, bools en float32
+            return read_master(self.master_calc_file)
         else:
-            # Combineer alle individuele CSV files
-            all_data = []
-            
-            for csv_file in self.calc_dir.glob("calc_*.csv"):
-                try:
-                    df = pd.read_csv(csv_file)
-                    all_data.append(df)
-                except Exception as e:
-                    print(f"Waarschuwing: Kon {csv_file} niet laden: {e}")
-                    
-            if all_data:
-                combined_df = pd.concat(all_data, ignore_index=True)
+            # Segmenten in bulk + nog niet gecompacteerde losse bestanden
+            combined_df = self.archive.load_all()
+            
+            if not combined_df.empty:
+                combined_df = combined_df.drop(columns=['calc_key'], errors='ignore')
                 # Sorteer op timestamp
-                combined_df['timestamp'] = pd.to_datetime(combined_df['timestamp'], format='mixed')
                 combined_df.sort_values('timestamp', inplace=True)
                 return combined_df
             else:
                 # Return lege DataFrame met juiste kolommen
-                return pd.DataFrame(columns=[
-                    'timestamp', 'weight', 'material', 'material_cost', 
-                    'variable_cost', 'total_cost', 'sell_price', 'margin_pct',
-                    'profit_amount', 'multicolor', 'abrasive', 'rush',
-                    'day_of_week', 'hour_of_day', 'month', 'year', 'product_name', 'product_id', 'is_product'
-                ])
+                return empty_master_frame()
                 
+    @traced('loading.query_calculations')
+    def query_calculations(self, start=None, end=None, columns=None) -> pd.DataFrame:
+        """Laad alleen berekeningen binnen [start, end] via partition pruning.
+        
+        Parameters:
+        ----------
+        start : datetime | date, optional
+            Begin (inclusief)
+        end : datetime | date, optional
+            Eind (inclusief, een datum omvat de hele dag)
+        columns : list, optional
+            Alleen deze kolommen inlezen
+            
+        Returns:
+        -------
+        pd.DataFrame
+            Getypeerd frame met de berekeningen in de periode
+        """
+        if self.db is not None:
+            return self.db.query_calculations(start, end, columns=columns)
+        return self.partitions.query(start, end, columns=columns)
+        
+    def select(self, *columns: str) -> CalculationQuery:
+        """Start een query op de berekeningen: select(...).where(...).fetch().
+        
+        Parameters:
+        ----------
+        *columns : str
+            Kolommen in het resultaat (geen kolommen = alle MASTER_COLUMNS)
+            
+        Returns:
+        -------
+        CalculationQuery
+            Query gekoppeld aan deze DataManager
+        """
+        return CalculationQuery(runner=self.run_query).select(*columns)
+        
+    def run_query(self, query: CalculationQuery) -> pd.DataFrame:
+        """Voer een query uit: SQLite, partities (periode) of chunked CSV."""
+        return execute_query(query, self.master_calc_file, db=self.db, partitions=self.partitions)
+        
+    def profit_cube(self):
+        """Winstgevendheid kubus, bijgewerkt met alle nieuwe berekeningen.
+        
+        De eerste aanroep start van de warm start snapshot; daarna worden
+        alleen de rijen verwerkt die sinds de vorige aanroep aan de master
+        zijn toegevoegd (ook door andere processen).
+        
+        Returns:
+        -------
+        WinstKubus
+            Zie src/analytics/winstgevendheid/kubus.py
+        """
+        with self._file_lock:
+            if self._profit_cube is None:
+                # Lazy import: analytics alleen laden als de kubus gevraagd wordt
+                from ..analytics.winstgevendheid.kubus import KubusBron
+                self._profit_cube = KubusBron(self.master_calc_file, db=self.db)
+            return self._profit_cube.refresh()
+            
+    def compact_calculations(self, granularity: str = 'day', include_current: bool = False) -> Dict[str, int]:
+        """Compacteer losse calc_*.csv bestanden tot dag- of maandsegmenten.
+        
+        Parameters:
+        ----------
+        granularity : str
+            'day' of 'month'
+        include_current : bool
+            Ook de lopende periode compacteren
+            
+        Returns:
+        -------
+        Dict[str, int]
+            Aantal segmenten, records en verwijderde bestanden
+        """
+        with self._file_lock:
+            return self.archive.compact(granularity=granularity, include_current=include_current)
+            
+    def get_calculation(self, timestamp) -> Optional[Dict[str, str]]:
+        """Haal één individuele berekening op via zijn tijdstip.
+        
+        Werkt voor losse bestanden en gecompacteerde segmenten.
+        
+        Parameters:
+        ----------
+        timestamp : str of datetime
+            Calc key 'YYYYmmdd_HHMMSS', ISO timestamp of datetime
+        """
+        return self.archive.get_record(timestamp)
+        
     def analyze_calculations(self) -> Dict[str, Any]:
         """Voer uitgebreide analyse uit op alle berekeningen.
         
@@ -489,14 +661,34 @@ class DataManager:
         Dict[str, Any]
             Dictionary met alle analyse resultaten
         """
-        df = self.import_calculations()
-        
-        if df.empty:
+        # SQLite: alles als aggregaties in de database, geen volledige import
+        if self.db is not None:
+            analysis = self._analyze_in_db()
+        else:
+            analysis = self._analyze_frame(self.import_calculations())
+            
+        if analysis is None:
             return {
                 'error': 'Geen data beschikbaar voor analyse',
                 'total_calculations': 0
             }
             
+        # Sla analyse resultaten op
+        self._save_analysis_report(analysis)
+        
+        return analysis
+        
+    def _analyze_frame(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Analyse van analyze_calculations op een ingelezen frame (CSV backend).
+        
+        Returns:
+        -------
+        Optional[Dict[str, Any]]
+            Analyse resultaten, None zonder data
+        """
+        if df.empty:
+            return None
+            
         # Basis statistieken
         analysis = {
             'total_calculations': len(df),
@@ -516,8 +708,8 @@ class DataManager:
         
         # Splits data in producten en losse berekeningen
         if 'is_product' in df.columns:
-            products_df = df[df['is_product'] == True]
-            calculations_df = df[df['is_product'] != True]
+            products_df = df[df['is_product']]
+            calculations_df = df[~df['is_product']]
             
             analysis['product_stats'] = {
                 'total_products': len(products_df),
@@ -541,13 +733,12 @@ class DataManager:
                 analysis['top_products'] = top_products.to_dict('index')
         
         # Materiaal analyse
-        material_stats = df.groupby('material').agg({
+        material_stats = df.groupby('material', observed=True).agg({
             'material': 'count',
             'margin_pct': 'mean',
             'profit_amount': 'sum',
             'weight': 'mean'
         }).round(2)
-        
         material_stats.columns = ['count', 'avg_margin', 'total_profit', 'avg_weight']
         analysis['material_analysis'] = material_stats.to_dict('index')
         
@@ -566,7 +757,7 @@ class DataManager:
             analysis['hourly_pattern'] = df.groupby('hour_of_day').size().to_dict()
             
         if 'day_of_week' in df:
-            analysis['daily_pattern'] = df.groupby('day_of_week').size().to_dict()
+            analysis['daily_pattern'] = df.groupby('day_of_week', observed=True).size().to_dict()
             
         # Beste en slechtste marges
         analysis['best_margins'] = df.nlargest(5, 'margin_pct')[
@@ -586,9 +777,119 @@ class DataManager:
                 'avg_price_recent': round(recent_df['sell_price'].mean(), 2)
             }
             
-        # Sla analyse resultaten op
-        self._save_analysis_report(analysis)
+        return analysis
+        
+    def _analyze_in_db(self) -> Optional[Dict[str, Any]]:
+        """Analyse van analyze_calculations met GROUP BY/LIMIT queries (SQLite).
+        
+        Levert dezelfde sleutels als _analyze_frame; alleen geaggregeerde
+        resultaten en een paar losse rijen komen uit de database.
+        
+        Returns:
+        -------
+        Optional[Dict[str, Any]]
+            Analyse resultaten, None zonder data
+        """
+        totals = self.db.aggregate(None, {
+            'count': ('count', '*'),
+            'first': ('min', 'timestamp'),
+            'last': ('max', 'timestamp'),
+            'avg_weight': ('avg', 'weight'),
+            'avg_cost': ('avg', 'total_cost'),
+            'avg_price': ('avg', 'sell_price'),
+            'avg_margin': ('avg', 'margin_pct'),
+            'total_revenue': ('sum', 'sell_price'),
+            'total_profit': ('sum', 'profit_amount'),
+            'multicolor': ('sum', 'multicolor'),
+            'abrasive': ('sum', 'abrasive'),
+            'rush': ('sum', 'rush')
+        }).iloc[0]
+        if not totals['count']:
+            return None
+            
+        analysis = {
+            'total_calculations': int(totals['count']),
+            'date_range': {
+                'first': pd.to_datetime(totals['first']),
+                'last': pd.to_datetime(totals['last'])
+            },
+            'summary_stats': {
+                'avg_weight': round(totals['avg_weight'], 1),
+                'avg_cost': round(totals['avg_cost'], 2),
+                'avg_price': round(totals['avg_price'], 2),
+                'avg_margin': round(totals['avg_margin'], 1),
+                'total_revenue': round(totals['total_revenue'], 2),
+                'total_profit': round(totals['total_profit'], 2)
+            }
+        }
+        
+        # Producten tegenover losse berekeningen
+        split = self.db.aggregate('is_product', {
+            'count': ('count', '*'),
+            'unique_products': ('nunique', 'product_id'),
+            'revenue': ('sum', 'sell_price'),
+            'avg_price': ('avg', 'sell_price')
+        })
+        products = split.loc[1] if 1 in split.index else None
+        calculations = split.loc[0] if 0 in split.index else None
+        analysis['product_stats'] = {
+            'total_products': int(products['count']) if products is not None else 0,
+            'unique_products': int(products['unique_products']) if products is not None else 0,
+            'product_revenue': round(products['revenue'], 2) if products is not None else 0,
+            'avg_product_price': round(products['avg_price'], 2) if products is not None else 0
+        }
+        analysis['calculation_stats'] = {
+            'total_calculations': int(calculations['count']) if calculations is not None else 0,
+            'calculation_revenue': round(calculations['revenue'], 2) if calculations is not None else 0
+        }
+        if products is not None:
+            top_products = self.db.aggregate('product_name', {
+                'revenue': ('sum', 'sell_price'),
+                'count': ('count', '*')
+            }, is_product=True)
+            top_products = top_products.sort_values('revenue', ascending=False).head(5)
+            analysis['top_products'] = top_products.to_dict('index')
+            
+        # Materiaal analyse
+        material_stats = self.db.aggregate('material', {
+            'count': ('count', '*'),
+            'avg_margin': ('avg', 'margin_pct'),
+            'total_profit': ('sum', 'profit_amount'),
+            'avg_weight': ('avg', 'weight')
+        }).round(2)
+        analysis['material_analysis'] = material_stats.to_dict('index')
+        analysis['top_materials'] = material_stats['count'].sort_values(
+            ascending=False, kind='stable').head(5).to_dict()
+        
+        analysis['options_usage'] = {
+            'multicolor': int(totals['multicolor'] or 0),
+            'abrasive': int(totals['abrasive'] or 0),
+            'rush': int(totals['rush'] or 0)
+        }
+        
+        # Tijd patronen (weekdagen in kalendervolgorde, zoals de category)
+        analysis['hourly_pattern'] = self.db.aggregate(
+            'hour_of_day', {'count': ('count', '*')})['count'].to_dict()
+        daily = self.db.aggregate('day_of_week', {'count': ('count', '*')})['count']
+        analysis['daily_pattern'] = {day: int(daily[day]) for day in WEEKDAYS if day in daily.index}
         
+        # Beste en slechtste marges
+        margin_columns = ['material', 'weight', 'margin_pct', 'sell_price']
+        analysis['best_margins'] = self.db.head_calculations(
+            'margin_pct', 5, columns=margin_columns, descending=True).to_dict('records')
+        analysis['worst_margins'] = self.db.head_calculations(
+            'margin_pct', 5, columns=margin_columns).to_dict('records')
+        
+        # Trend analyse (laatste 30 berekeningen)
+        recent_df = self.db.head_calculations(
+            'timestamp', 30, columns=['margin_pct', 'sell_price'], descending=True).iloc[::-1]
+        if len(recent_df) > 1:
+            analysis['recent_trend'] = {
+                'margin_trend': 'stijgend' if recent_df['margin_pct'].iloc[-1] > recent_df['margin_pct'].iloc[0] else 'dalend',
+                'avg_margin_recent': round(recent_df['margin_pct'].mean(), 1),
+                'avg_price_recent': round(recent_df['sell_price'].mean(), 2)
+            }
+            
         return analysis
         
     def _save_analysis_report(self, analysis: Dict[str, Any]) -> str:
@@ -714,14 +1015,22 @@ class DataManager:
             Statistieken over export bestanden
         """
         stats = {
-            'total_calculations': len(list(self.calc_dir.glob("calc_*.csv"))),
+            'total_calculations': self.archive.count_records(),
             'total_products': len(list(self.product_dir.glob("products_*.csv"))),
             'total_analyses': len(list(self.analysis_dir.glob("analysis_*.json"))),
             'master_file_exists': self.master_calc_file.exists(),
             'total_size_mb': 0
         }
         
-        # Bereken totale grootte
+        stats['total_segments'] = len(self.archive.segments())
+        stats['storage_backend'] = self.backend
+        if self.db is not None:
+            stats['db_calculations'] = self.db.count_calculations()
+            stats['db_size_mb'] = round(self.db.db_path.stat().st_size / (1024 * 1024), 2)
+        else:
+            stats['log_writer'] = self.writer.mode
+        
+        # Bereken totale grootte (segmenten zitten in archief/, dus rglob)
         total_size = 0
         for directory in [self.calc_dir, self.product_dir, self.analysis_dir]:
             for file in directory.rglob("*"):
@@ -750,14 +1059,23 @@ class DataManager:
         
         for directory in [self.calc_dir, self.product_dir, self.analysis_dir]:
             for file in directory.glob("*"):
+                # Dotfiles zijn locks/state (bijv. .partitions.lock, .write.lock):
+                # een flock bestand wordt nooit beschreven en lijkt dus altijd
+                # oud, maar verwijderen laat een tweede proces een nieuw inode locken
+                if file.name.startswith('.'):
+                    continue
                 if file.is_file() and file.stat().st_mtime < cutoff:
-                    # Bewaar master file altijd
-                    if file != self.master_calc_file:
+                    # Bewaar master file, log en config versietabel altijd
+                    if file not in (self.master_calc_file, self.calc_log_file,
+                                    self.config_snapshots.table_path):
                         file.unlink()
                         count += 1
                         
+        # Gecompacteerde segmenten: op periode i.p.v. per bestand
+        count += self.archive.remove_segments_before(datetime.fromtimestamp(cutoff))
+                        
         return count
 
 
 # Voor makkelijke imports
-__all__ = ['DataManager'] 
\ No newline at end of file
+__all__ = ['DataManager', 'CalculationQuery', 'execute_query'] 
\ No newline at end of file
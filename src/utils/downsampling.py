@@ -0,0 +1,380 @@
+"""
+Downsampling Module - H2D Price Calculator
+==========================================
+
+Level-of-detail (LOD) laag voor grafieken met veel datapunten.
+
+Bij honderdduizenden berekeningen kost het tekenen van elk punt
+meer tijd dan de analyse zelf. Deze module reduceert wat matplotlib
+moet tekenen tot een configureerbaar punten-budget:
+
+- Lijnen: LTTB (Largest-Triangle-Three-Buckets) of min-max per bucket.
+  Beide behouden de visuele vorm (pieken en dalen) van de reeks.
+- Scatters: boven het budget een 2-D binning (hexbin) in plaats van
+  losse punten; de kleur toont het aantal of het gemiddelde per cel.
+
+Zoom Her-query:
+--------------
+LODLine en LODScatter bewaren de volledige data. Bij een zoom of pan
+(xlim/ylim wijziging) wordt alleen het zichtbare deel opnieuw gesampled,
+zodat inzoomen in het fullscreen venster meer detail toont. Het object
+leeft zo lang als de axes; de aanroeper hoeft het niet te bewaren.
+
+Configuratie:
+------------
+Het budget komt uit user_settings.json (sleutel 'lod_point_budget').
+Fullscreen gebruikt FULLSCREEN_BUDGET_FACTOR keer dit budget.
+
+Gebruik:
+-------
+    >>> x_ds, y_ds = lttb(x, y, 500)
+    >>> line = LODLine(ax, x, y, budget=get_point_budget(), color='blue')
+    >>> cloud = LODScatter(ax, weights, prices, budget=2000, c=prices)
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from ..config.user_config import get_config_value
+except ImportError:
+    get_config_value = None
+
+
+# Standaard aantal punten dat een grafiek maximaal tekent
+DEFAULT_POINT_BUDGET = 2000
+
+# Fullscreen venster heeft meer pixels, dus meer detail
+FULLSCREEN_BUDGET_FACTOR = 4
+
+# Aantal hexagons over de x-as bij binning
+DEFAULT_GRIDSIZE = 60
+
+
+def get_point_budget(fullscreen: bool = False) -> int:
+    """Haal het punten-budget op uit de gebruikersconfiguratie.
+
+    Parameters:
+    ----------
+    fullscreen : bool
+        True voor het (grotere) fullscreen budget
+
+    Returns:
+    -------
+    int
+        Maximaal aantal te tekenen punten per reeks
+    """
+    budget = DEFAULT_POINT_BUDGET
+    if get_config_value is not None:
+        try:
+            budget = int(float(get_config_value('lod_point_budget', DEFAULT_POINT_BUDGET)))
+        except (TypeError, ValueError, OSError):
+            budget = DEFAULT_POINT_BUDGET
+    budget = max(budget, 10)
+    if fullscreen:
+        budget *= FULLSCREEN_BUDGET_FACTOR
+    return budget
+
+
+def _as_arrays(x, y) -> Tuple[np.ndarray, np.ndarray]:
+    """Converteer input naar float arrays van gelijke lengte."""
+    x_arr = np.asarray(x, dtype=float)
+    y_arr = np.asarray(y, dtype=float)
+    if x_arr.shape != y_arr.shape:
+        raise ValueError(f"x en y moeten even lang zijn ({len(x_arr)} != {len(y_arr)})")
+    return x_arr, y_arr
+
+
+def lttb(x, y, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Verdeelt de reeks in n_out - 2 buckets en kiest per bucket het punt
+    dat de grootste driehoek vormt met het vorige gekozen punt en het
+    gemiddelde van de volgende bucket. Eerste en laatste punt blijven.
+
+    Parameters:
+    ----------
+    x, y : array-like
+        Reeks gesorteerd op x
+    n_out : int
+        Gewenst aantal punten (minimaal 3)
+
+    Returns:
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Gedownsamplede x en y
+    """
+    x_arr, y_arr = _as_arrays(x, y)
+    n = len(x_arr)
+    if n_out >= n or n_out < 3:
+        return x_arr, y_arr
+
+    # Bucket grenzen voor de middelste punten (eerste/laatste apart)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if end <= start:
+            end = start + 1
+
+        # Gemiddelde van de volgende bucket (of laatste punt)
+        if i + 2 < len(edges):
+            nxt_start, nxt_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x = x_arr[nxt_start:nxt_end].mean()
+            avg_y = y_arr[nxt_start:nxt_end].mean()
+        else:
+            avg_x, avg_y = x_arr[-1], y_arr[-1]
+
+        # Oppervlakte driehoek (factor 0.5 weggelaten, alleen vergelijken)
+        area = np.abs(
+            (x_arr[prev] - avg_x) * (y_arr[start:end] - y_arr[prev])
+            - (x_arr[prev] - x_arr[start:end]) * (avg_y - y_arr[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+
+    return x_arr[selected], y_arr[selected]
+
+
+def minmax_downsample(x, y, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Min-max downsampling: per bucket het minimum en maximum.
+
+    Sneller dan LTTB en garandeert dat elke piek zichtbaar blijft.
+    Geschikt voor volume/telling reeksen (bijv. productie per week).
+
+    Parameters:
+    ----------
+    x, y : array-like
+        Reeks gesorteerd op x
+    n_out : int
+        Gewenst aantal punten (2 per bucket)
+
+    Returns:
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Gedownsamplede x en y, in originele volgorde
+    """
+    x_arr, y_arr = _as_arrays(x, y)
+    n = len(x_arr)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return x_arr, y_arr
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    indices = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        bucket = y_arr[start:end]
+        lo = start + int(np.argmin(bucket))
+        hi = start + int(np.argmax(bucket))
+        # Volgorde behouden zodat de lijn niet terugspringt
+        indices.extend(sorted({lo, hi}))
+
+    idx = np.asarray(indices, dtype=np.int64)
+    return x_arr[idx], y_arr[idx]
+
+
+def downsample_line(x, y, budget: int, method: str = 'lttb') -> Tuple[np.ndarray, np.ndarray]:
+    """Reduceer een lijnreeks tot maximaal budget punten.
+
+    Parameters:
+    ----------
+    x, y : array-like
+        Reeks gesorteerd op x
+    budget : int
+        Maximaal aantal punten
+    method : str
+        'lttb' (vorm) of 'minmax' (pieken)
+
+    Returns:
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Reeks met len <= budget
+    """
+    if method == 'minmax':
+        return minmax_downsample(x, y, budget)
+    if method == 'lttb':
+        return lttb(x, y, budget)
+    raise ValueError(f"Onbekende downsample methode: {method}")
+
+
+class LODLine:
+    """Lijn met level-of-detail die bij zoomen opnieuw sampled.
+
+    Parameters:
+    ----------
+    ax : matplotlib.axes.Axes
+        Doel axes
+    x, y : array-like
+        Volledige reeks (x numeriek, bijv. via mdates.date2num)
+    budget : int
+        Maximaal aantal getekende punten
+    method : str
+        'lttb' of 'minmax'
+    **plot_kwargs
+        Doorgegeven aan ax.plot
+    """
+
+    def __init__(self, ax, x, y, budget: int = DEFAULT_POINT_BUDGET,
+                 method: str = 'lttb', **plot_kwargs):
+        x_arr, y_arr = _as_arrays(x, y)
+        order = np.argsort(x_arr, kind='stable')
+        self.ax = ax
+        self.x = x_arr[order]
+        self.y = y_arr[order]
+        self.budget = budget
+        self.method = method
+        self.is_downsampled = len(self.x) > budget
+
+        x_ds, y_ds = downsample_line(self.x, self.y, budget, method)
+        (self.line,) = ax.plot(x_ds, y_ds, **plot_kwargs)
+        self._drawn_all = True
+        self._last_xlim = None
+        # Closure i.p.v. bound method: matplotlib houdt bound methods zwak
+        # vast, en de aanroepers bewaren dit object niet. Zo leeft het zo
+        # lang als de axes (ax.clear() maakt een nieuw callback register).
+        ax.callbacks.connect('xlim_changed', lambda ax: self._on_xlim_changed(ax))
+
+    def visible_data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Geef de getekende (gedownsamplede) data terug."""
+        return self.line.get_xdata(), self.line.get_ydata()
+
+    def _on_xlim_changed(self, ax) -> None:
+        """Her-query het zichtbare x-bereik op volledig budget."""
+        if not self.is_downsampled:
+            return
+        xlim = tuple(ax.get_xlim())
+        if xlim == self._last_xlim:
+            return
+        self._last_xlim = xlim
+
+        # Eén extra punt links/rechts zodat de lijn tot de rand loopt
+        lo = max(np.searchsorted(self.x, xlim[0], side='left') - 1, 0)
+        hi = min(np.searchsorted(self.x, xlim[1], side='right') + 1, len(self.x))
+        full_range = lo == 0 and hi == len(self.x)
+        if full_range and self._drawn_all:
+            return
+        self._drawn_all = full_range
+        x_ds, y_ds = downsample_line(self.x[lo:hi], self.y[lo:hi], self.budget, self.method)
+        self.line.set_data(x_ds, y_ds)
+        ax.figure.canvas.draw_idle()
+
+
+class LODScatter:
+    """Scatter die boven het budget overschakelt op hexbin.
+
+    Bij zoomen wordt alleen het zichtbare deel opnieuw gebind; valt het
+    aantal zichtbare punten onder het budget dan worden losse punten
+    getekend.
+
+    Parameters:
+    ----------
+    ax : matplotlib.axes.Axes
+        Doel axes
+    x, y : array-like
+        Volledige puntenwolk
+    budget : int
+        Maximaal aantal losse punten
+    c : array-like, optional
+        Kleurwaarde per punt; hexbin toont dan het gemiddelde per cel
+    gridsize : int
+        Aantal hexagons over de x-as
+    cmap : str
+        Colormap voor hexbin en gekleurde scatter
+    **scatter_kwargs
+        Doorgegeven aan ax.scatter wanneer losse punten getekend worden
+    """
+
+    def __init__(self, ax, x, y, budget: int = DEFAULT_POINT_BUDGET,
+                 c=None, gridsize: int = DEFAULT_GRIDSIZE, cmap: str = 'viridis',
+                 **scatter_kwargs):
+        self.ax = ax
+        self.x, self.y = _as_arrays(x, y)
+        self.c = None if c is None else np.asarray(c, dtype=float)
+        self.budget = budget
+        self.gridsize = gridsize
+        self.cmap = cmap
+        self.scatter_kwargs = scatter_kwargs
+        self.is_binned = len(self.x) > budget
+        self.norm = None
+        self.artist = None
+        self._drawn_all = True
+        self._last_limits = None
+
+        self._draw(np.ones(len(self.x), dtype=bool), extent=None)
+        # Vaste norm zodat een colorbar geldig blijft na her-query
+        self.norm = self.artist.norm if self.artist is not None else None
+
+        # Closure: zie LODLine (bound methods houdt matplotlib zwak vast)
+        ax.callbacks.connect('xlim_changed', lambda ax: self._on_limits_changed(ax))
+        ax.callbacks.connect('ylim_changed', lambda ax: self._on_limits_changed(ax))
+
+    @property
+    def mappable(self):
+        """Artist voor een colorbar."""
+        return self.artist
+
+    def _draw(self, mask: np.ndarray, extent) -> None:
+        """Teken de punten binnen mask als scatter of hexbin."""
+        if self.artist is not None:
+            self.artist.remove()
+            self.artist = None
+
+        x, y = self.x[mask], self.y[mask]
+        c = self.c[mask] if self.c is not None else None
+        if len(x) == 0:
+            return
+
+        if len(x) > self.budget:
+            hex_kwargs = dict(gridsize=self.gridsize, cmap=self.cmap, mincnt=1)
+            if c is not None:
+                hex_kwargs.update(C=c, reduce_C_function=np.mean)
+            if extent is not None:
+                hex_kwargs['extent'] = extent
+            if self.norm is not None:
+                hex_kwargs['norm'] = self.norm
+            self.artist = self.ax.hexbin(x, y, **hex_kwargs)
+        else:
+            kwargs = dict(self.scatter_kwargs)
+            if c is not None:
+                kwargs.update(c=c, cmap=self.cmap)
+                if self.norm is not None:
+                    kwargs['norm'] = self.norm
+            self.artist = self.ax.scatter(x, y, **kwargs)
+
+    def _on_limits_changed(self, ax) -> None:
+        """Her-query alleen het zichtbare gebied."""
+        if not self.is_binned:
+            return
+        xlim, ylim = tuple(ax.get_xlim()), tuple(ax.get_ylim())
+        if (xlim, ylim) == self._last_limits:
+            return
+        self._last_limits = (xlim, ylim)
+
+        mask = ((self.x >= min(xlim)) & (self.x <= max(xlim)) &
+                (self.y >= min(ylim)) & (self.y <= max(ylim)))
+        full_range = bool(mask.all())
+        if full_range and self._drawn_all:
+            return
+        self._drawn_all = full_range
+
+        # Her-tekenen mag de gezette limieten niet laten autoscalen
+        ax.set_autoscale_on(False)
+        extent = (min(xlim), max(xlim), min(ylim), max(ylim))
+        self._draw(mask, extent)
+        ax.figure.canvas.draw_idle()
+
+
+__all__ = [
+    'DEFAULT_POINT_BUDGET', 'FULLSCREEN_BUDGET_FACTOR', 'get_point_budget',
+    'lttb', 'minmax_downsample', 'downsample_line', 'LODLine', 'LODScatter',
+]
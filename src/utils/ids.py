@@ -0,0 +1,230 @@
+"""
+ID Service - H2D Price Calculator
+=================================
+
+Sorteerbare 63-bit ids voor berekeningen, producten en de SQLite
+primary key.
+
+Voorheen kregen calc_*.csv bestanden een naam op seconde-resolutie
+(twee berekeningen in dezelfde seconde overschreven elkaar) en telde
+Product._generate_product_id met een klasse-teller die per proces
+opnieuw bij 1 begon (dubbele ids na een herstart).
+
+Opbouw (63 bits, past in een signed SQLite INTEGER):
+---------------------------------------------------
+    | 41 bits ms sinds 2024-01-01 | 10 bits node | 12 bits volgnummer |
+
+- tijd: ~69 jaar bereik, ids sorteren chronologisch
+- node: per proces uniek via een gedeelde teller onder file lock
+  (exports/.id_node); zonder fcntl (Windows) een willekeurige node
+- volgnummer: 4096 ids per ms per proces. Is het op, of loopt de klok
+  terug, dan schuift de generator door naar de volgende ms (logische
+  klok), dus ids blijven strikt oplopend binnen een proces
+
+Als tekst (bestandsnamen, product ids) worden ids met format_id()
+als 19 cijfers geschreven: puur numeriek en lexicografisch sorteerbaar.
+
+Gebruik:
+-------
+    >>> calc_id = new_id()
+    >>> format_id(calc_id)
+    '0370316669124833280'
+    >>> id_timestamp(calc_id)
+    datetime.datetime(2026, 10, 18, 21, 6, 14, 70000)
+    >>> ids = new_ids(10_000)          # bulk: aaneengesloten ranges
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: willekeurige node
+    fcntl = None
+
+
+# Begin van de tijdas van de ids
+ID_EPOCH = datetime(2024, 1, 1)
+_EPOCH_SECONDS = ID_EPOCH.timestamp()
+_EPOCH_NS = int(_EPOCH_SECONDS) * 1_000_000_000
+
+TIME_BITS = 41
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+_NODE_SHIFT = SEQUENCE_BITS
+_TIME_SHIFT = NODE_BITS + SEQUENCE_BITS
+
+# Gedeelde node teller in de exports map
+NODE_FILENAME = ".id_node"
+
+# Tekstvorm: vaste breedte zodat strings net als de ints sorteren
+ID_WIDTH = 19
+
+
+def _default_state_dir() -> Path:
+    """exports/ in de project root (zoals ProductManager)."""
+    project_root = Path(__file__).resolve().parent.parent.parent
+    return project_root / "exports"
+
+
+def _allocate_node(state_dir: Path) -> int:
+    """Neem de volgende node uit de gedeelde teller (onder file lock)."""
+    if fcntl is None:
+        return random.randint(0, MAX_NODE)
+    try:
+        state_dir.mkdir(parents=True, exist_ok=True)
+        with open(state_dir / NODE_FILENAME, 'a+', encoding='utf-8') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                text = f.read().strip()
+                counter = int(text) if text.isdigit() else random.randint(0, MAX_NODE)
+                f.seek(0)
+                f.truncate()
+                f.write(str((counter + 1) % (MAX_NODE + 1)))
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return counter % (MAX_NODE + 1)
+    except OSError:
+        return random.randint(0, MAX_NODE)
+
+
+class IdGenerator:
+    """Monotone 63-bit id generator (tijd | node | volgnummer).
+
+    Parameters:
+    ----------
+    state_dir : Path, optional
+        Map met de gedeelde node teller (default: exports/ in de project root)
+    node : int, optional
+        Vaste node (0-1023), bijvoorbeeld in tests of benchmarks
+    """
+
+    def __init__(self, state_dir: Optional[Union[str, Path]] = None, node: Optional[int] = None):
+        self.state_dir = Path(state_dir) if state_dir else _default_state_dir()
+        self._fixed_node = node
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        """Nieuwe node en lege klok (ook in een child na fork)."""
+        if self._fixed_node is not None:
+            if not 0 <= self._fixed_node <= MAX_NODE:
+                raise ValueError(f"Node moet tussen 0 en {MAX_NODE} liggen")
+            self.node = self._fixed_node
+        else:
+            self.node = _allocate_node(self.state_dir)
+        self._node_bits = self.node << _NODE_SHIFT
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _after_fork(self) -> None:
+        # Child erft de state van de parent: eigen node nemen, anders dubbele ids
+        self._lock = threading.Lock()
+        self._reset()
+
+    def next_id(self) -> int:
+        """Eén nieuw id, strikt groter dan het vorige van deze generator."""
+        now = (time.time_ns() - _EPOCH_NS) // 1_000_000
+        with self._lock:
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = 0
+            else:
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    # Volgnummer op (of klok terug): door naar de volgende ms
+                    self._last_ms += 1
+                    self._sequence = 0
+            return (self._last_ms << _TIME_SHIFT) | self._node_bits | self._sequence
+
+    def next_ids(self, count: int) -> List[int]:
+        """Reserveer `count` ids in één keer (aaneengesloten ranges per ms).
+
+        Goedkoop voor bulk inserts: per ms één range() i.p.v. count
+        losse aanroepen.
+        """
+        if count <= 0:
+            return []
+        now = (time.time_ns() - _EPOCH_NS) // 1_000_000
+        ids: List[int] = []
+        with self._lock:
+            if now > self._last_ms:
+                self._last_ms = now
+                sequence = 0
+            else:
+                sequence = self._sequence + 1
+            remaining = count
+            while remaining:
+                if sequence > MAX_SEQUENCE:
+                    self._last_ms += 1
+                    sequence = 0
+                take = min(remaining, MAX_SEQUENCE + 1 - sequence)
+                base = (self._last_ms << _TIME_SHIFT) | self._node_bits
+                ids.extend(range(base + sequence, base + sequence + take))
+                sequence += take
+                remaining -= take
+            self._sequence = sequence - 1
+        return ids
+
+
+_generator: Optional[IdGenerator] = None
+_generator_lock = threading.Lock()
+
+
+def get_generator() -> IdGenerator:
+    """De gedeelde generator van dit proces (lazy, fork-safe)."""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                generator = IdGenerator()
+                if hasattr(os, 'register_at_fork'):
+                    os.register_at_fork(after_in_child=generator._after_fork)
+                _generator = generator
+    return _generator
+
+
+def new_id() -> int:
+    """Nieuw uniek, sorteerbaar 63-bit id."""
+    return get_generator().next_id()
+
+
+def new_ids(count: int) -> List[int]:
+    """`count` nieuwe ids (bulk)."""
+    return get_generator().next_ids(count)
+
+
+def format_id(value: int) -> str:
+    """Id als tekst van vaste breedte (19 cijfers, sorteert als het getal)."""
+    return f"{value:0{ID_WIDTH}d}"
+
+
+def parse_id(text: Union[str, int]) -> int:
+    """Tekst (of int) terug naar het id."""
+    return int(text)
+
+
+def id_timestamp(value: Union[str, int]) -> datetime:
+    """Tijdstip (ms precisie, lokale tijd) waarop een id gemaakt is."""
+    ms = parse_id(value) >> _TIME_SHIFT
+    return datetime.fromtimestamp(_EPOCH_SECONDS) + timedelta(milliseconds=ms)
+
+
+__all__ = [
+    'IdGenerator', 'ID_EPOCH', 'get_generator', 'new_id', 'new_ids',
+    'format_id', 'parse_id', 'id_timestamp',
+]
@@ -0,0 +1,423 @@
+"""
+Instrumentation - H2D Price Calculator
+======================================
+
+Spans, tellers en latency histogrammen per operatie, standaard uit.
+
+`utils.timer_decorator` printte alleen een verstreken tijd en de hot
+paths (DataManager writes, BaseAnalysis.load_data, analyses) zaten vol
+`print(f"DEBUG: ...")` regels die bij elke aanroep hun string
+formatteerden. Deze module vervangt beide:
+
+- span(name)      context manager die de duur meet (perf_counter_ns)
+- traced(name)    decorator; bij uitgeschakelde instrumentatie wordt de
+                  originele functie teruggegeven (nul overhead)
+- count(name)     teller verhogen
+- debug(msg, *a)  "DEBUG: ..." regel, %-formattering pas als H2D_DEBUG
+                  aan staat
+
+Operaties heten '<categorie>.<naam>'; categorieën in gebruik:
+pricing, logging, loading, analyze, render.
+
+Activeren (omgevingsvariabelen, gelezen bij import):
+---------------------------------------------------
+    H2D_INSTRUMENT=1                         samenvatting naar stderr bij afsluiten
+    H2D_INSTRUMENT=trace.json                JSON trace bij afsluiten
+    H2D_INSTRUMENT=chrome:t.json,prometheus:h2d.prom
+                                             meerdere exports (json/chrome/prometheus)
+    H2D_DEBUG=1                              debug() regels tonen
+
+Exports:
+-------
+- JSON trace      histogrammen, tellers en de laatste MAX_TRACE_EVENTS spans
+- Chrome trace    trace-event formaat (chrome://tracing, Perfetto)
+- Prometheus      text exposition formaat (node_exporter textfile collector)
+
+Gebruik:
+-------
+    >>> from src.utils.instrumentation import span, traced, debug
+    >>> with span('loading.master', rows=1000):
+    ...     df = read_master(path)
+    >>> @traced('pricing.calculate_costs')
+    ... def calculate_costs(...): ...
+    >>> debug("Loaded %d rows from %s", len(df), path)
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import atexit
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+ENV_INSTRUMENT = 'H2D_INSTRUMENT'
+ENV_DEBUG = 'H2D_DEBUG'
+
+# Histogram grenzen in seconden (van µs pricing tot seconden lange analyses)
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01,
+                   0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+MAX_TRACE_EVENTS = 100_000  # ringbuffer voor de trace exports
+
+EXPORT_FORMATS = ('json', 'chrome', 'prometheus')
+
+
+def _env_flag(value: Optional[str]) -> bool:
+    return bool(value) and value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+_instrument_setting = os.environ.get(ENV_INSTRUMENT, '')
+_enabled = _env_flag(_instrument_setting)
+_debug = _env_flag(os.environ.get(ENV_DEBUG))
+
+
+class Histogram:
+    """Cumulatief latency histogram in Prometheus stijl."""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Schatting (bovengrens van de bucket) van kwantiel q."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'sum': round(self.total, 9),
+                'buckets': list(self.buckets), 'counts': list(self.counts)}
+
+
+# === REGISTRY ===
+
+_lock = threading.Lock()
+_histograms: Dict[str, Histogram] = {}
+_counters: Dict[str, float] = {}
+_events: deque = deque(maxlen=MAX_TRACE_EVENTS)
+_origin_ns = time.perf_counter_ns()
+_origin_epoch = time.time()
+
+
+def enabled() -> bool:
+    """Staat instrumentatie aan?"""
+    return _enabled
+
+
+def debug_enabled() -> bool:
+    """Worden debug() regels getoond?"""
+    return _debug
+
+
+def enable(on: bool = True, debug_output: Optional[bool] = None) -> None:
+    """Instrumentatie (en optioneel debug output) aan- of uitzetten.
+
+    `traced` functies die bij import al uitgeschakeld waren blijven
+    ongemeten; spans en tellers volgen deze schakelaar direct.
+    """
+    global _enabled, _debug
+    _enabled = on
+    if debug_output is not None:
+        _debug = debug_output
+
+
+def reset() -> None:
+    """Alle histogrammen, tellers en trace events wissen."""
+    global _origin_ns, _origin_epoch
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _events.clear()
+        _origin_ns = time.perf_counter_ns()
+        _origin_epoch = time.time()
+
+
+def _record(name: str, start_ns: int, end_ns: int, attrs: Optional[dict]) -> None:
+    seconds = (end_ns - start_ns) / 1e9
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+        _events.append((name, start_ns, end_ns, threading.get_ident(), attrs))
+
+
+def observe(name: str, seconds: float) -> None:
+    """Een elders gemeten duur in het histogram van `name` zetten."""
+    if not _enabled:
+        return
+    end_ns = time.perf_counter_ns()
+    _record(name, end_ns - int(seconds * 1e9), end_ns, None)
+
+
+def count(name: str, value: float = 1) -> None:
+    """Teller `name` verhogen (no-op als instrumentatie uit staat)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+# === SPANS ===
+
+class _NoopSpan:
+    """Gedeelde span voor uitgeschakelde instrumentatie."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'attrs', 'start')
+
+    def __init__(self, name: str, attrs: Optional[dict]):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.set(error=exc_type.__name__)
+        _record(self.name, self.start, end, self.attrs)
+        return False
+
+    def set(self, **attrs) -> None:
+        """Attributen toevoegen die pas binnen de span bekend zijn (bijv. rows)."""
+        if self.attrs is None:
+            self.attrs = attrs
+        else:
+            self.attrs.update(attrs)
+
+
+def span(name: str, **attrs):
+    """Context manager die de duur van het blok onder `name` registreert.
+
+    Parameters:
+    ----------
+    name : str
+        Operatie naam, '<categorie>.<naam>' (bijv. 'loading.master')
+    **attrs
+        Extra velden voor de trace (bijv. rows=1000)
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name, attrs or None)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator die elke aanroep als span registreert.
+
+    De keuze valt bij het decoreren: staat instrumentatie dan uit, dan
+    komt de originele functie terug en kost het niets.
+
+    Parameters:
+    ----------
+    name : str, optional
+        Operatie naam (default: module.functie)
+    """
+    def decorator(func):
+        if not _enabled:
+            return func
+        op = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(op, start, time.perf_counter_ns(), None)
+        return wrapper
+    return decorator
+
+
+def debug(msg: str, *args) -> None:
+    """Debug regel; formatteren gebeurt alleen als H2D_DEBUG aan staat.
+
+    Parameters:
+    ----------
+    msg : str
+        Bericht, eventueel met %-placeholders
+    *args
+        Waarden voor de placeholders (lui geformatteerd)
+    """
+    if not _debug:
+        return
+    print("DEBUG: " + (msg % args if args else msg))
+
+
+# === EXPORT ===
+
+def snapshot() -> Dict[str, Any]:
+    """Kopie van histogrammen en tellers (plus aantal trace events)."""
+    with _lock:
+        return {
+            'histograms': {name: h.to_dict() for name, h in _histograms.items()},
+            'counters': dict(_counters),
+            'events': len(_events),
+        }
+
+
+def _category(name: str) -> str:
+    return name.split('.', 1)[0]
+
+
+def _atomic_write(path: str, text: str) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _trace_events() -> List[tuple]:
+    with _lock:
+        return list(_events)
+
+
+def export_json(path: str) -> None:
+    """Histogrammen, tellers en spans als JSON trace."""
+    data = snapshot()
+    data['started'] = _origin_epoch
+    data['spans'] = [
+        {'name': name, 'start_us': (start - _origin_ns) / 1000,
+         'duration_us': (end - start) / 1000, 'thread': thread, **(attrs or {})}
+        for name, start, end, thread, attrs in _trace_events()
+    ]
+    _atomic_write(path, json.dumps(data, indent=1, default=str))
+
+
+def export_chrome_trace(path: str) -> None:
+    """Spans in Chrome trace-event formaat (complete 'X' events en 'C' tellers)."""
+    pid = os.getpid()
+    events = []
+    for name, start, end, thread, attrs in _trace_events():
+        event = {'name': name, 'cat': _category(name), 'ph': 'X', 'pid': pid, 'tid': thread,
+                 'ts': (start - _origin_ns) / 1000, 'dur': (end - start) / 1000}
+        if attrs:
+            event['args'] = attrs
+        events.append(event)
+    now = (time.perf_counter_ns() - _origin_ns) / 1000
+    with _lock:
+        counters = dict(_counters)
+    for name, value in sorted(counters.items()):
+        events.append({'name': name, 'cat': _category(name), 'ph': 'C', 'pid': pid,
+                       'ts': now, 'args': {'value': value}})
+    _atomic_write(path, json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, default=str))
+
+
+def render_prometheus() -> str:
+    """Histogrammen en tellers als Prometheus text exposition."""
+    data = snapshot()
+    lines = ['# HELP h2d_operation_duration_seconds Duur per operatie',
+             '# TYPE h2d_operation_duration_seconds histogram']
+    for name, h in sorted(data['histograms'].items()):
+        labels = f'operation="{name}",category="{_category(name)}"'
+        cumulative = 0
+        for bound, value in zip(list(h['buckets']) + ['+Inf'], h['counts']):
+            cumulative += value
+            lines.append(f'h2d_operation_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'h2d_operation_duration_seconds_sum{{{labels}}} {h["sum"]:.9f}')
+        lines.append(f'h2d_operation_duration_seconds_count{{{labels}}} {h["count"]}')
+    lines += ['# HELP h2d_events_total Tellers per gebeurtenis',
+              '# TYPE h2d_events_total counter']
+    for name, value in sorted(data['counters'].items()):
+        lines.append(f'h2d_events_total{{event="{name}",category="{_category(name)}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def export_prometheus(path: str) -> None:
+    """Prometheus textfile (atomair, geschikt voor de textfile collector)."""
+    _atomic_write(path, render_prometheus())
+
+
+EXPORTERS = {
+    'json': export_json,
+    'chrome': export_chrome_trace,
+    'prometheus': export_prometheus,
+}
+
+
+def summary() -> str:
+    """Leesbare tabel per operatie: aantal, totaal, gemiddeld, p50/p99."""
+    data = snapshot()
+    lines = [f"{'Operatie':<44}{'Aantal':>9}{'Totaal (s)':>12}{'Gem. (ms)':>11}"
+             f"{'p50 (ms)':>10}{'p99 (ms)':>10}", "-" * 96]
+    for name, h in sorted(data['histograms'].items()):
+        histogram = Histogram(h['buckets'])
+        histogram.counts, histogram.count = h['counts'], h['count']
+        lines.append(f"{name:<44}{h['count']:>9,}{h['sum']:>12.3f}{h['sum'] / h['count'] * 1000:>11.3f}"
+                     f"{histogram.quantile(0.5) * 1000:>10.3f}{histogram.quantile(0.99) * 1000:>10.3f}")
+    for name, value in sorted(data['counters'].items()):
+        lines.append(f"{name:<44}{value:>9,}")
+    return '\n'.join(lines)
+
+
+def parse_targets(setting: str) -> List[tuple]:
+    """'chrome:t.json,prometheus:h2d.prom' → [('chrome', 't.json'), ...]."""
+    targets = []
+    for item in setting.split(','):
+        item = item.strip()
+        if not item or not _env_flag(item):
+            continue
+        fmt, sep, path = item.partition(':')
+        if sep and fmt in EXPORT_FORMATS:
+            targets.append((fmt, path))
+        elif item != '1' and item.lower() not in ('true', 'yes', 'on'):
+            targets.append(('json', item))
+    return targets
+
+
+def export_all(targets: Sequence[tuple]) -> None:
+    """Alle (formaat, pad) doelen schrijven; zonder doelen een samenvatting op stderr."""
+    if not targets:
+        if _histograms or _counters:
+            print(summary(), file=sys.stderr)
+        return
+    for fmt, path in targets:
+        try:
+            EXPORTERS[fmt](path)
+        except OSError as e:
+            print(f"Instrumentatie export naar {path} mislukt: {e}", file=sys.stderr)
+
+
+if _enabled:
+    atexit.register(export_all, parse_targets(_instrument_setting))
@@ -0,0 +1,109 @@
+"""
+Lazy Imports - H2D Price Calculator
+===================================
+
+Zware afhankelijkheden (pandas, matplotlib, analytics) pas laden bij
+het eerste gebruik.
+
+Een eenmalige CLI prijsberekening importeerde via `src.utils` de
+DataManager en daarmee pandas en numpy; de GUI laadde via
+`src.products` matplotlib en via de analyse tab alle analytics code,
+nog voor het eerste venster zichtbaar was. Twee bouwstenen:
+
+- lazy_module(name): module object dat pas bij de eerste attribuut
+  toegang echt geïmporteerd wordt (importlib LazyLoader)
+- lazy_exports(package, exports): module `__getattr__`/`__dir__`
+  (PEP 562) voor package `__init__` bestanden; `from package import X`
+  blijft werken, maar de submodule laadt pas bij het opvragen van X
+
+Een ontbrekende afhankelijkheid (bijv. matplotlib) geeft pas bij
+gebruik een ImportError, op dezelfde plek als voorheen de try/except
+rond de import stond.
+
+Gebruik:
+-------
+    >>> # in een package __init__.py
+    >>> __getattr__, __dir__ = lazy_exports(__name__, {
+    ...     'DataManager': '.data_manager',
+    ... })
+
+    >>> pd = lazy_module('pandas')     # nog niet geladen
+    >>> pd.DataFrame()                 # nu wel
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_module(name: str) -> ModuleType:
+    """Module die pas bij de eerste attribuut toegang geladen wordt.
+
+    Parameters:
+    ----------
+    name : str
+        Absolute module naam (bijv. 'pandas')
+
+    Raises:
+    ------
+    ImportError
+        Als de module niet gevonden wordt (wel direct: find_spec is goedkoop)
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """PEP 562 `__getattr__` en `__dir__` voor uitgestelde re-exports.
+
+    Parameters:
+    ----------
+    package : str
+        `__name__` van het package
+    exports : Dict[str, str]
+        Naam → (relatieve) submodule waarin de naam gedefinieerd is
+
+    Returns:
+    -------
+    Tuple[Callable, Callable]
+        (__getattr__, __dir__) om in het package toe te kennen
+    """
+    module_globals = sys.modules[package].__dict__
+
+    def __getattr__(name: str):
+        target = exports.get(name)
+        if target is None:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(target, package), name)
+        module_globals[name] = value  # volgende keer geen __getattr__ meer
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(module_globals) | set(exports))
+
+    return __getattr__, __dir__
+
+
+def is_available(name: str) -> bool:
+    """Of een (optionele) module geïnstalleerd is, zonder hem te laden."""
+    try:
+        return name in sys.modules or importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+__all__ = ['is_available', 'lazy_exports', 'lazy_module']
@@ -0,0 +1,590 @@
+"""
+Log Writer - H2D Price Calculator
+=================================
+
+Eén schrijver voor alle CSV appends, ook over processen heen.
+
+De GUI, de CLI en de Streamlit app kunnen tegelijk berekeningen en
+producten wegschrijven naar master_calculations.csv en
+calculation_log.csv. Een threading.Lock beschermt maar één proces, dus
+rijen van verschillende processen konden door elkaar lopen. Dit module
+biedt twee schrijvers met dezelfde interface:
+
+- LogWriterDaemon   lokale service op een Unix domain socket. Ontvangt
+                    records van elk proces, zet ze in aankomstvolgorde
+                    in een queue en schrijft ze in batches weg (group
+                    commit: per bestand één write + één fsync per batch).
+                    Pas na de fsync krijgt de client een bevestiging.
+- LocalWriter       in-process fallback als de daemon niet draait:
+                    zelfde commit code, beschermd door een thread lock
+                    en een exclusieve file lock (fcntl.flock) op
+                    exports/.write.lock, zodat ook meerdere processen
+                    zonder daemon geen rijen door elkaar schrijven.
+
+get_record_writer() kiest automatisch: daemon als de socket bereikbaar
+is, anders de LocalWriter.
+
+Protocol:
+--------
+Eén JSON object per regel (newline-delimited), per verbinding in volgorde:
+
+    → {"id": 1, "records": [{"path": "...", "header": [...], "row": [...]}]}
+    ← {"id": 1, "ok": true, "rows": 1}
+
+Alle records van één verzoek worden in dezelfde batch gecommit
+(bijvoorbeeld log + master rij van één berekening). Paden moeten binnen
+de exports map van de daemon liggen.
+
+Gebruik:
+-------
+    $ python -m src.utils.log_writer --base-dir exports      # daemon starten
+
+    >>> writer = get_record_writer(Path("exports"))
+    >>> writer.append([make_record(master_path, MASTER_COLUMNS, row)])
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .instrumentation import debug, traced
+
+try:
+    import fcntl
+except ImportError:  # Windows: alleen de thread lock
+    fcntl = None
+
+try:
+    from ..config.user_config import get_config_value
+except ImportError:
+    get_config_value = None
+
+
+# Socket bestand in de exports map
+SOCKET_FILENAME = ".h2d_writer.sock"
+
+# Lock bestand voor de LocalWriter (en de daemon zelf)
+LOCK_FILENAME = ".write.lock"
+
+# Group commit: maximaal aantal records per batch en hoe lang de
+# schrijver na het eerste record wacht op meer records. 0 = alleen
+# meenemen wat al klaarstaat (wat binnenkwam tijdens de vorige fsync)
+MAX_BATCH_RECORDS = 5_000
+BATCH_LINGER_SECONDS = 0.0
+
+# Timeout voor een bevestiging van de daemon
+CLIENT_TIMEOUT_SECONDS = 10.0
+
+# Maximale lengte van een Unix socket pad (sun_path) met marge
+_MAX_SOCKET_PATH = 100
+
+
+def make_record(path: Union[str, Path], header: Sequence[str],
+                row: Union[Sequence[Any], Dict[str, Any]]) -> Dict[str, Any]:
+    """Bouw een schrijf-record voor één CSV rij.
+
+    Parameters:
+    ----------
+    path : Path
+        Doelbestand (header wordt geschreven als het nog niet bestaat)
+    header : Sequence[str]
+        Kolommen van het bestand
+    row : list | dict
+        Waarden in header volgorde, of een dict per kolom
+
+    Returns:
+    -------
+    Dict[str, Any]
+        JSON-serialiseerbaar record
+    """
+    if isinstance(row, dict):
+        row = [row.get(column, '') for column in header]
+    return {'path': str(Path(path).resolve()), 'header': list(header), 'row': list(row)}
+
+
+def commit_records(records: Sequence[Dict[str, Any]]) -> int:
+    """Schrijf records gegroepeerd per bestand: één write en één fsync per bestand.
+
+    De volgorde binnen een bestand is de volgorde van de records.
+
+    Returns:
+    -------
+    int
+        Aantal geschreven rijen
+    """
+    grouped: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    for record in records:
+        entry = grouped.setdefault(record['path'], {'header': record['header'], 'rows': []})
+        entry['rows'].append(record['row'])
+
+    for path, entry in grouped.items():
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        new_file = not target.exists() or target.stat().st_size == 0
+        with open(target, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(entry['header'])
+            writer.writerows(entry['rows'])
+            f.flush()
+            os.fsync(f.fileno())
+    return len(records)
+
+
+def default_socket_path(base_dir: Union[str, Path]) -> Path:
+    """Socket pad voor een exports map (instelling 'log_writer_socket' wint).
+
+    Te lange paden (limiet van sun_path) wijken uit naar de temp map.
+    """
+    if get_config_value is not None:
+        try:
+            configured = get_config_value('log_writer_socket', None)
+        except (OSError, ValueError):
+            configured = None
+        if configured:
+            return Path(configured)
+
+    base_dir = Path(base_dir).resolve()
+    path = base_dir / SOCKET_FILENAME
+    if len(str(path)) > _MAX_SOCKET_PATH:
+        digest = hashlib.sha1(str(base_dir).encode('utf-8')).hexdigest()[:12]
+        path = Path(tempfile.gettempdir()) / f"h2d_writer_{digest}.sock"
+    return path
+
+
+class _FileLock:
+    """Exclusieve lock over processen heen (fcntl.flock) plus thread lock."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._handle = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path, 'a')
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._handle is not None:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+            self._handle.close()
+            self._handle = None
+        self._thread_lock.release()
+        return False
+
+
+class LocalWriter:
+    """In-process fallback: commit onder een exclusieve file lock.
+
+    Parameters:
+    ----------
+    base_dir : Path
+        De exports map (bevat het lock bestand)
+    """
+
+    mode = 'local'
+
+    def __init__(self, base_dir: Union[str, Path]):
+        self.base_dir = Path(base_dir)
+        self._lock = _FileLock(self.base_dir / LOCK_FILENAME)
+
+    def append(self, records: Sequence[Dict[str, Any]]) -> int:
+        """Schrijf records duurzaam weg (na fsync terug)."""
+        if not records:
+            return 0
+        with self._lock:
+            return commit_records(records)
+
+    def close(self) -> None:
+        pass
+
+
+class DaemonClient:
+    """Client voor de LogWriterDaemon; thread-safe, één verbinding.
+
+    Parameters:
+    ----------
+    socket_path : Path
+        Pad naar de Unix socket van de daemon
+
+    Raises:
+    ------
+    ConnectionError
+        Als de daemon niet bereikbaar is
+    """
+
+    mode = 'daemon'
+
+    def __init__(self, socket_path: Union[str, Path], timeout: float = CLIENT_TIMEOUT_SECONDS):
+        self.socket_path = Path(socket_path)
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._next_id = 0
+        try:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(str(self.socket_path))
+        except (OSError, AttributeError) as e:
+            raise ConnectionError(f"Log writer daemon niet bereikbaar op {self.socket_path}: {e}")
+        self._file = self._sock.makefile('rwb')
+
+    def is_alive(self) -> bool:
+        """False als de daemon de (idle) verbinding gesloten heeft."""
+        self._sock.setblocking(False)
+        try:
+            return self._sock.recv(1, socket.MSG_PEEK) != b''
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            self._sock.settimeout(self._timeout)
+
+    def append(self, records: Sequence[Dict[str, Any]]) -> int:
+        """Stuur records en wacht op de bevestiging na de duurzame commit.
+
+        Raises:
+        ------
+        ConnectionError
+            Als het verzoek niet volledig verstuurd kon worden (de daemon
+            heeft geen complete regel ontvangen, opnieuw proberen is veilig)
+        IOError
+            Bij een fout van de daemon of een verbroken verbinding na het
+            versturen (de daemon kan al gecommit hebben)
+        """
+        if not records:
+            return 0
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            message = json.dumps({'id': request_id, 'records': list(records)}, default=str)
+            try:
+                # De newline gaat als laatste mee: zonder volledige flush
+                # heeft de daemon het verzoek niet kunnen verwerken
+                self._file.write(message.encode('utf-8') + b'\n')
+                self._file.flush()
+            except OSError as e:
+                raise ConnectionError(f"Verzoek niet verstuurd naar log writer daemon: {e}")
+            try:
+                line = self._file.readline()
+            except OSError as e:
+                raise IOError(f"Verbinding met log writer daemon verbroken: {e}")
+            if not line:
+                raise IOError("Log writer daemon sloot de verbinding")
+
+        reply = json.loads(line)
+        if reply.get('id') != request_id or not reply.get('ok'):
+            raise IOError(f"Log writer daemon fout: {reply.get('error', reply)}")
+        return reply.get('rows', 0)
+
+    def close(self) -> None:
+        try:
+            self._file.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RecordWriter:
+    """Daemon als die draait, anders de LocalWriter.
+
+    Er wordt alleen teruggevallen als verbinden mislukt. Een
+    ConnectionError (verzoek niet verstuurd) mag de aanroeper opnieuw
+    proberen; een IOError na het versturen niet, de daemon kan dan al
+    gecommit hebben.
+    """
+
+    def __init__(self, base_dir: Union[str, Path], socket_path: Optional[Union[str, Path]] = None):
+        self.base_dir = Path(base_dir)
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path(self.base_dir)
+        self.local = LocalWriter(self.base_dir)
+        self._client: Optional[DaemonClient] = None
+
+    @property
+    def mode(self) -> str:
+        return 'daemon' if self._client is not None else 'local'
+
+    def _connect(self) -> Optional[DaemonClient]:
+        if self._client is not None and not self._client.is_alive():
+            # Daemon gestopt of herstart: er is nog niets verstuurd, dus
+            # opnieuw verbinden of lokaal schrijven is veilig
+            self._client.close()
+            self._client = None
+        if self._client is None and self.socket_path.exists():
+            try:
+                self._client = DaemonClient(self.socket_path)
+                debug("Log writer daemon verbonden via %s", self.socket_path)
+            except ConnectionError:
+                self._client = None
+        return self._client
+
+    @traced('logging.writer_append')
+    def append(self, records: Sequence[Dict[str, Any]]) -> int:
+        """Schrijf records duurzaam weg via de daemon of lokaal."""
+        client = self._connect()
+        if client is None:
+            return self.local.append(records)
+        try:
+            return client.append(records)
+        except IOError:
+            # Volgende aanroep opnieuw verbinden (of lokaal schrijven)
+            client.close()
+            self._client = None
+            raise
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+def get_record_writer(base_dir: Union[str, Path]) -> RecordWriter:
+    """Schrijver voor een exports map (daemon met lokale fallback)."""
+    return RecordWriter(base_dir)
+
+
+class _Pending:
+    """Eén verzoek in de queue van de daemon."""
+
+    __slots__ = ('records', 'reply', 'request_id')
+
+    def __init__(self, records, reply, request_id):
+        self.records = records
+        self.reply = reply
+        self.request_id = request_id
+
+
+class LogWriterDaemon:
+    """Single-writer service op een Unix domain socket met group commit.
+
+    Parameters:
+    ----------
+    base_dir : Path
+        De exports map; alleen bestanden hierin mogen beschreven worden
+    socket_path : Path, optional
+        Socket pad (default: default_socket_path(base_dir))
+    """
+
+    def __init__(self, base_dir: Union[str, Path], socket_path: Optional[Union[str, Path]] = None):
+        self.base_dir = Path(base_dir).resolve()
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path(self.base_dir)
+        self._queue: "queue.Queue[Optional[_Pending]]" = queue.Queue()
+        self._lock = _FileLock(self.base_dir / LOCK_FILENAME)
+        self._server: Optional[socket.socket] = None
+        self._threads: List[threading.Thread] = []
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+        self._running = threading.Event()
+        self.stats = {'batches': 0, 'records': 0, 'requests': 0, 'errors': 0}
+
+    # === LIFECYCLE ===
+
+    def start(self) -> None:
+        """Bind de socket en start de accept- en schrijfthread."""
+        if self.socket_path.exists():
+            # Draait er al een daemon? Zo niet: oude socket opruimen
+            try:
+                DaemonClient(self.socket_path, timeout=1.0).close()
+                raise RuntimeError(f"Er draait al een log writer daemon op {self.socket_path}")
+            except ConnectionError:
+                self.socket_path.unlink()
+
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        self._server.listen(64)
+        self._server.settimeout(0.5)
+        self._running.set()
+
+        for target in (self._accept_loop, self._writer_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        debug("Log writer daemon luistert op %s", self.socket_path)
+
+    def stop(self) -> None:
+        """Stop na het wegschrijven van alles wat al in de queue staat."""
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        try:
+            self._server.close()
+        except OSError:
+            pass
+        self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        # Open verbindingen sluiten: clients schakelen dan over
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        debug("Log writer daemon gestopt (%s)", self.stats)
+
+    def serve_forever(self) -> None:
+        """Start en blokkeer tot Ctrl+C."""
+        self.start()
+        try:
+            while self._running.is_set():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    # === NETWERK ===
+
+    def _accept_loop(self) -> None:
+        while self._running.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue  # periodiek het stop signaal controleren
+            except OSError:
+                break
+            conn.settimeout(None)
+            thread = threading.Thread(target=self._handle_connection, args=(conn,), daemon=True)
+            thread.start()
+
+    def _handle_connection(self, conn: socket.socket) -> None:
+        with self._connections_lock:
+            self._connections.add(conn)
+        stream = conn.makefile('rwb')
+        send_lock = threading.Lock()
+
+        def reply(message: Dict[str, Any]) -> None:
+            with send_lock:
+                try:
+                    stream.write(json.dumps(message).encode('utf-8') + b'\n')
+                    stream.flush()
+                except OSError:
+                    pass
+
+        try:
+            for line in stream:
+                try:
+                    request = json.loads(line)
+                    records = [self._validate(record) for record in request['records']]
+                except (ValueError, KeyError, TypeError) as e:
+                    self.stats['errors'] += 1
+                    reply({'id': None, 'ok': False, 'error': str(e)})
+                    continue
+                if not self._running.is_set():
+                    reply({'id': request.get('id'), 'ok': False, 'error': "daemon stopt, niets geschreven"})
+                    break
+                self._queue.put(_Pending(records, reply, request.get('id')))
+        except OSError:
+            pass
+        finally:
+            with self._connections_lock:
+                self._connections.discard(conn)
+            try:
+                stream.close()
+                conn.close()
+            except OSError:
+                pass
+
+    def _validate(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Alleen CSV bestanden binnen de exports map."""
+        path = Path(record['path']).resolve()
+        if self.base_dir not in path.parents or path.suffix != '.csv':
+            raise ValueError(f"Pad buiten {self.base_dir} of geen CSV: {path}")
+        if not isinstance(record['header'], list) or not isinstance(record['row'], list):
+            raise ValueError("header en row moeten lijsten zijn")
+        return {'path': str(path), 'header': record['header'], 'row': record['row']}
+
+    # === GROUP COMMIT ===
+
+    def _next_batch(self) -> List[_Pending]:
+        """Blokkeer op het eerste verzoek, verzamel daarna kort alles wat binnenkomt."""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        count = len(first.records)
+        deadline = time.monotonic() + BATCH_LINGER_SECONDS
+        while count < MAX_BATCH_RECORDS:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # stop signaal na deze batch
+                break
+            batch.append(item)
+            count += len(item.records)
+        return batch
+
+    def _writer_loop(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                # Stop: resterende verzoeken nog wegschrijven
+                if self._queue.empty():
+                    break
+                continue
+
+            records = [record for pending in batch for record in pending.records]
+            try:
+                with self._lock:
+                    commit_records(records)
+                error = None
+            except Exception as e:
+                # Elke fout (ook ValueError, csv.Error, UnicodeEncodeError)
+                # gaat naar de hele batch; de schrijfthread blijft draaien
+                error = f"{type(e).__name__}: {e}"
+                self.stats['errors'] += 1
+                debug("Log writer batch mislukt (%d records): %s", len(records), error)
+
+            self.stats['batches'] += 1
+            self.stats['records'] += len(records)
+            self.stats['requests'] += len(batch)
+            for pending in batch:
+                if error is None:
+                    pending.reply({'id': pending.request_id, 'ok': True, 'rows': len(pending.records)})
+                else:
+                    pending.reply({'id': pending.request_id, 'ok': False, 'error': error})
+
+
+def main() -> None:
+    """CLI: start de daemon voor een exports map."""
+    parser = argparse.ArgumentParser(description="H2D single-writer log daemon")
+    parser.add_argument('--base-dir', default='exports', help="Exports map (default: exports)")
+    parser.add_argument('--socket', help="Socket pad (default: <base-dir>/.h2d_writer.sock)")
+    args = parser.parse_args()
+
+    LogWriterDaemon(args.base_dir, args.socket).serve_forever()
+
+
+__all__ = [
+    'LogWriterDaemon', 'LocalWriter', 'DaemonClient', 'RecordWriter',
+    'get_record_writer', 'make_record', 'commit_records', 'default_socket_path',
+]
+
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,486 @@
+"""
+Partitioned Store - H2D Price Calculator
+========================================
+
+Tijd-gepartitioneerde kopie van master_calculations.csv voor periode queries.
+
+Analyses zoals "vandaag", "deze week" of "sinds nozzle installatie"
+lazen altijd de volledige historie en filterden daarna op timestamp.
+Dit module verdeelt de rijen over partities per dag (of maand) en
+houdt per partitie metadata bij, zodat een query alleen de partities
+leest die de gevraagde periode overlappen:
+
+exports/producten/
+├── master_calculations.csv      # Blijft de bron (append-only)
+└── partities/
+    ├── partitions.json          # Metadata per partitie + sync positie
+    ├── part_20250113.csv
+    └── part_20250114.csv
+
+Metadata per partitie:
+---------------------
+- min_ts / max_ts   eerste en laatste timestamp in de partitie
+- rows              aantal rijen
+- materials         aantal rijen per materiaal
+
+Synchronisatie:
+--------------
+De store is afgeleid van de master: bij elke query worden alleen de
+bytes gelezen die sinds de vorige sync aan de master zijn toegevoegd.
+Writers (DataManager, ProductManager) hoeven dus niets extra te doen.
+Wordt de master korter of krijgt hij een andere header, dan worden de
+partities volledig opnieuw opgebouwd.
+
+Een sync loopt onder een exclusieve file lock (exports/producten/
+.partitions.lock), ook over processen heen. De metadata bewaart naast
+source_offset de bytelengte van elke partitie na de laatste sync. Een
+sync die halverwege crashte heeft al rijen aan partities toegevoegd
+maar source_offset nog niet opgeslagen: de volgende sync kapt de
+partities terug tot de opgeslagen lengte en verwerkt de staart opnieuw,
+zonder dubbele rijen.
+
+Gebruik:
+-------
+    >>> store = PartitionedStore(Path("exports/producten/master_calculations.csv"))
+    >>> df = store.query(start=date.today())            # alleen partitie van vandaag
+    >>> store.partitions_for(week_start, date.today())
+    ['20250113', '20250114']
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .instrumentation import debug, traced
+from .schema import apply_schema, empty_master_frame, format_timestamp, parse_timestamp, read_csv_typed
+
+try:
+    import fcntl
+except ImportError:  # Windows: alleen de thread lock
+    fcntl = None
+
+
+# Toegestane granulariteit → strftime patroon van de partitie naam
+GRANULARITY_FORMATS = {
+    'day': '%Y%m%d',
+    'month': '%Y%m',
+}
+
+METADATA_VERSION = 1
+
+# Rijen per batch bij (her)opbouw, begrenst geheugengebruik
+SYNC_BATCH_ROWS = 50_000
+
+# Lock bestand naast de master (overleeft een rebuild van partities/)
+LOCK_FILENAME = ".partitions.lock"
+
+_sync_lock = threading.Lock()
+
+TimeBound = Optional[Union[datetime, date, str]]
+
+
+def _to_bound(value: TimeBound, end: bool = False) -> Optional[datetime]:
+    """Normaliseer een query grens; een datum als eind omvat de hele dag."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.max if end else time.min)
+    return parse_timestamp(value)
+
+
+class PartitionedStore:
+    """Partities per dag/maand van master_calculations.csv met pruning.
+
+    Parameters:
+    ----------
+    master_path : Path
+        Pad naar master_calculations.csv (de bron)
+    granularity : str
+        'day' of 'month'; alleen gebruikt bij een nieuwe of herbouwde store
+    """
+
+    def __init__(self, master_path: Union[str, Path], granularity: str = 'day'):
+        if granularity not in GRANULARITY_FORMATS:
+            raise ValueError(f"Onbekende granulariteit: {granularity}")
+        self.master_path = Path(master_path)
+        self.partition_dir = self.master_path.parent / "partities"
+        self.metadata_path = self.partition_dir / "partitions.json"
+        self.lock_path = self.master_path.parent / LOCK_FILENAME
+        self.granularity = granularity
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._metadata_loaded: Optional[Tuple[int, int]] = None
+
+    # === METADATA ===
+
+    def _empty_metadata(self) -> Dict[str, Any]:
+        return {
+            'version': METADATA_VERSION,
+            'granularity': self.granularity,
+            'header': [],
+            'source_offset': 0,
+            'skipped_rows': 0,
+            'partitions': {},
+        }
+
+    def _metadata_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.metadata_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_metadata(self) -> Dict[str, Any]:
+        # Andere instanties (DataManager, analyses) kunnen intussen gesynct hebben
+        stamp = self._metadata_stamp()
+        if self._metadata is not None and stamp != self._metadata_loaded:
+            self._metadata = None
+        if self._metadata is None:
+            self._metadata_loaded = stamp
+            metadata = None
+            if stamp is not None:
+                try:
+                    with open(self.metadata_path, 'r', encoding='utf-8') as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Waarschuwing: Partitie metadata onleesbaar, herbouwen: {e}")
+            if not metadata or metadata.get('version') != METADATA_VERSION:
+                metadata = self._empty_metadata()
+            self.granularity = metadata['granularity']
+            self._metadata = metadata
+        return self._metadata
+
+    def _write_metadata(self) -> None:
+        """Schrijf metadata atomair (tmp + replace)."""
+        self.partition_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.metadata_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._metadata, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.metadata_path)
+        self._metadata_loaded = self._metadata_stamp()
+
+    @property
+    def partitions(self) -> Dict[str, Dict[str, Any]]:
+        """Metadata per partitie (na sync met de master)."""
+        self.sync()
+        return self._load_metadata()['partitions']
+
+    def _partition_path(self, name: str) -> Path:
+        return self.partition_dir / f"part_{name}.csv"
+
+    # === SYNCHRONISATIE ===
+
+    def _master_header(self) -> Tuple[List[str], int]:
+        """Header van de master en de byte offset van de eerste datarij."""
+        with open(self.master_path, 'rb') as f:
+            line = f.readline()
+        header = next(csv.reader([line.decode('utf-8').lstrip('\ufeff')]), [])
+        return header, len(line)
+
+    @contextmanager
+    def _locked(self):
+        """Thread lock plus exclusieve file lock over processen heen."""
+        with _sync_lock:
+            handle = None
+            if fcntl is not None:
+                self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+                handle = open(self.lock_path, 'a')
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if handle is not None:
+                    handle.close()  # sluiten geeft de flock vrij
+
+    def sync(self) -> int:
+        """Verwerk rijen die sinds de vorige sync aan de master zijn toegevoegd.
+
+        Returns:
+        -------
+        int
+            Aantal nieuw gepartitioneerde rijen
+        """
+        with self._locked():
+            return self._sync_locked()
+
+    def _sync_locked(self) -> int:
+        # Onder de lock altijd vers inlezen: een ander proces kan gesynct hebben
+        self._metadata = None
+        metadata = self._load_metadata()
+        if not self.master_path.exists():
+            return 0
+
+        size = self.master_path.stat().st_size
+        header, data_offset = self._master_header()
+
+        # Master herschreven of ingekort: opnieuw opbouwen
+        if (metadata['header'] and metadata['header'] != header) or size < metadata['source_offset']:
+            debug("Master gewijzigd, partities worden opnieuw opgebouwd")
+            metadata = self._reset(header, data_offset)
+        elif not metadata['header']:
+            metadata = self._reset(header, data_offset)
+        elif not self._recover():
+            debug("Partities wijken af van de metadata, worden opnieuw opgebouwd")
+            metadata = self._reset(header, data_offset)
+
+        if size <= metadata['source_offset']:
+            return 0
+
+        with open(self.master_path, 'rb') as f:
+            f.seek(metadata['source_offset'])
+            tail = f.read(size - metadata['source_offset'])
+
+        # Alleen volledige regels; een half geschreven rij volgt de volgende keer
+        complete = tail.rfind(b'\n') + 1
+        if complete == 0:
+            return 0
+
+        try:
+            reader = csv.reader(io.StringIO(tail[:complete].decode('utf-8'), newline=''))
+            added = 0
+            batch: List[List[str]] = []
+            for row in reader:
+                if not row:
+                    continue
+                batch.append(row)
+                if len(batch) >= SYNC_BATCH_ROWS:
+                    added += self._distribute(batch)
+                    batch = []
+            if batch:
+                added += self._distribute(batch)
+        except Exception:
+            # Metadata in geheugen is half bijgewerkt: de volgende sync
+            # herstelt vanaf de opgeslagen metadata
+            self._metadata = None
+            raise
+
+        metadata['source_offset'] += complete
+        self._write_metadata()
+        return added
+
+    def _recover(self) -> bool:
+        """Kap partities terug tot hun lengte bij de laatste sync.
+
+        Returns:
+        -------
+        bool
+            False als een partitie korter is dan opgeslagen of ontbreekt
+            (dan is alleen een volledige herbouw betrouwbaar)
+        """
+        partitions = self._metadata['partitions']
+        found = set()
+        if self.partition_dir.exists():
+            for path in self.partition_dir.glob("part_*.csv"):
+                name = path.stem[len("part_"):]
+                info = partitions.get(name)
+                if info is None:
+                    # Aangemaakt door een onderbroken sync
+                    path.unlink()
+                    continue
+                found.add(name)
+                recorded = info.get('bytes')
+                size = path.stat().st_size
+                if recorded is None:
+                    info['bytes'] = size  # metadata van vóór de byte lengtes
+                elif size > recorded:
+                    debug("Partitie %s teruggezet van %d naar %d bytes", name, size, recorded)
+                    with open(path, 'r+b') as f:
+                        f.truncate(recorded)
+                elif size < recorded:
+                    return False
+        return found == set(partitions)
+
+    def _reset(self, header: List[str], data_offset: int) -> Dict[str, Any]:
+        """Verwijder alle partities en begin opnieuw vanaf de eerste datarij."""
+        if self.partition_dir.exists():
+            for path in self.partition_dir.glob("part_*.csv"):
+                path.unlink()
+        self._metadata = self._empty_metadata()
+        self._metadata['header'] = header
+        self._metadata['source_offset'] = data_offset
+        # Direct vastleggen: oude bytelengtes gelden niet meer voor de nieuwe bestanden
+        self._write_metadata()
+        return self._metadata
+
+    def _distribute(self, rows: List[List[str]]) -> int:
+        """Schrijf rijen naar hun partitie en werk de metadata bij."""
+        metadata = self._metadata
+        header = metadata['header']
+        ts_index = header.index('timestamp')
+        material_index = header.index('material') if 'material' in header else None
+        name_format = GRANULARITY_FORMATS[metadata['granularity']]
+
+        grouped: Dict[str, List[List[str]]] = {}
+        for row in rows:
+            try:
+                moment = parse_timestamp(row[ts_index])
+            except (ValueError, IndexError):
+                metadata['skipped_rows'] += 1
+                continue
+
+            name = moment.strftime(name_format)
+            grouped.setdefault(name, []).append(row)
+
+            info = metadata['partitions'].setdefault(
+                name, {'min_ts': None, 'max_ts': None, 'rows': 0, 'materials': {}}
+            )
+            stamp = format_timestamp(moment)
+            if info['min_ts'] is None or stamp < info['min_ts']:
+                info['min_ts'] = stamp
+            if info['max_ts'] is None or stamp > info['max_ts']:
+                info['max_ts'] = stamp
+            info['rows'] += 1
+            if material_index is not None and material_index < len(row):
+                material = row[material_index]
+                info['materials'][material] = info['materials'].get(material, 0) + 1
+
+        self.partition_dir.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for name, part_rows in grouped.items():
+            path = self._partition_path(name)
+            is_new = not path.exists()
+            with open(path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if is_new:
+                    writer.writerow(header)
+                writer.writerows(part_rows)
+            metadata['partitions'][name]['bytes'] = path.stat().st_size
+            written += len(part_rows)
+        return written
+
+    def rebuild(self, granularity: Optional[str] = None) -> int:
+        """Bouw alle partities opnieuw op uit de master.
+
+        Parameters:
+        ----------
+        granularity : str, optional
+            Nieuwe granulariteit ('day' of 'month')
+
+        Returns:
+        -------
+        int
+            Aantal gepartitioneerde rijen
+        """
+        if granularity is not None:
+            if granularity not in GRANULARITY_FORMATS:
+                raise ValueError(f"Onbekende granulariteit: {granularity}")
+            self.granularity = granularity
+        with self._locked():
+            if self.partition_dir.exists():
+                shutil.rmtree(self.partition_dir)
+            self._metadata = self._empty_metadata()
+            self._write_metadata()
+            return self._sync_locked()
+
+    # === QUERIES ===
+
+    def partitions_for(self, start: TimeBound = None, end: TimeBound = None) -> List[str]:
+        """Partitie namen waarvan [min_ts, max_ts] de periode overlapt (pruning)."""
+        start_dt = _to_bound(start)
+        end_dt = _to_bound(end, end=True)
+        start_text = format_timestamp(start_dt) if start_dt else None
+        end_text = format_timestamp(end_dt) if end_dt else None
+
+        selected = []
+        for name, info in sorted(self.partitions.items()):
+            if start_text and info['max_ts'] < start_text:
+                continue
+            if end_text and info['min_ts'] > end_text:
+                continue
+            selected.append(name)
+        return selected
+
+    @traced('loading.partition_query')
+    def query(self, start: TimeBound = None, end: TimeBound = None,
+              columns: Optional[Sequence[str]] = None,
+              materials: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Lees alleen de rijen binnen [start, end] uit de overlappende partities.
+
+        Parameters:
+        ----------
+        start : datetime | date | str, optional
+            Begin (inclusief); None = vanaf het begin
+        end : datetime | date | str, optional
+            Eind (inclusief, een datum omvat de hele dag); None = tot nu
+        columns : Sequence[str], optional
+            Alleen deze kolommen inlezen ('timestamp' wordt altijd meegenomen)
+        materials : Sequence[str], optional
+            Alleen deze materialen; partities zonder een van deze
+            materialen (volgens de metadata) worden niet gelezen
+
+        Returns:
+        -------
+        pd.DataFrame
+            Getypeerd frame (schema register), chronologisch
+        """
+        names = self.partitions_for(start, end)
+        if materials is not None:
+            wanted = set(materials)
+            partitions = self.partitions
+            names = [n for n in names if wanted & set(partitions[n]['materials'])]
+        usecols = None
+        if columns is not None:
+            usecols = list(dict.fromkeys(['timestamp', *columns]))
+            if materials is not None and 'material' not in usecols:
+                usecols.append('material')
+
+        frames = [read_csv_typed(self._partition_path(name), usecols=usecols) for name in names]
+        if not frames:
+            empty = empty_master_frame()
+            return empty[usecols] if usecols else empty
+
+        df = apply_schema(pd.concat(frames, ignore_index=True))
+
+        start_dt = _to_bound(start)
+        end_dt = _to_bound(end, end=True)
+        mask = pd.Series(True, index=df.index)
+        if start_dt is not None:
+            mask &= df['timestamp'] >= start_dt
+        if end_dt is not None:
+            mask &= df['timestamp'] <= end_dt
+        if materials is not None:
+            mask &= df['material'].isin(list(materials))
+        return df[mask].sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+    def material_counts(self, start: TimeBound = None, end: TimeBound = None) -> Dict[str, int]:
+        """Aantal rijen per materiaal over hele overlappende partities (uit metadata).
+
+        Snel maar grof: randpartities tellen volledig mee. Gebruik query()
+        voor exacte aantallen binnen de periode.
+        """
+        totals: Dict[str, int] = {}
+        partitions = self.partitions
+        for name in self.partitions_for(start, end):
+            for material, count in partitions[name]['materials'].items():
+                totals[material] = totals.get(material, 0) + count
+        return totals
+
+    def stats(self) -> Dict[str, Any]:
+        """Overzicht van de store."""
+        partitions = self.partitions
+        return {
+            'granularity': self.granularity,
+            'partitions': len(partitions),
+            'rows': sum(info['rows'] for info in partitions.values()),
+            'skipped_rows': self._load_metadata()['skipped_rows'],
+            'first': min((info['min_ts'] for info in partitions.values()), default=None),
+            'last': max((info['max_ts'] for info in partitions.values()), default=None),
+        }
+
+
+__all__ = ['PartitionedStore', 'GRANULARITY_FORMATS']
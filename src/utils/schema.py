@@ -0,0 +1,332 @@
+"""
+Schema Registry - H2D Price Calculator
+======================================
+
+Eén centrale definitie van alle CSV layouts en hun canonieke dtypes.
+
+Voorheen stond de master header lijst drie keer in DataManager en nog
+eens in ProductManager, werden flags als 'True'/'False' strings
+vergeleken en moest elke reader format='mixed' gebruiken omdat
+timestamps zowel 'T' als spatie als scheiding hadden. Alle readers en
+writers gaan nu via dit module:
+
+Layouts:
+-------
+- MASTER_COLUMNS       master_calculations.csv en calc_*.csv (19 kolommen)
+- LOG_COLUMNS          calculation_log.csv compact (met config_version)
+- LEGACY_LOG_COLUMNS   oude/join-view layout van de log (32 kolommen)
+- CONFIG_COLUMNS       de 14 config kolommen (zie config_snapshots)
+
+Canonieke dtypes:
+----------------
+- timestamp                 → datetime64 (ISO 8601, spatie als scheiding)
+- material                  → category (weinig unieke waarden)
+- day_of_week, month        → geordende category
+- flags                     → bool
+- gewicht, uren, marge      → float32 (1 decimaal precisie volstaat)
+- geldbedragen              → float64 (sommen over veel rijen)
+- hour_of_day / year        → int8 / int16
+
+Gebruik:
+-------
+    >>> df = read_master(path)                 # geoptimaliseerd frame
+    >>> row = build_master_row(enhanced_data)  # dict voor DictWriter
+    >>> format_timestamp(datetime.now())
+    '2025-01-14 09:30:12.123456'
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .instrumentation import traced
+
+
+# === KOLOM LAYOUTS ===
+
+MASTER_COLUMNS: List[str] = [
+    'timestamp', 'weight', 'material', 'material_cost', 'variable_cost',
+    'total_cost', 'sell_price', 'margin_pct', 'profit_amount',
+    'multicolor', 'abrasive', 'rush', 'day_of_week', 'hour_of_day',
+    'month', 'year', 'product_name', 'product_id', 'is_product'
+]
+
+# Config dict sleutel (GUI) → kolomnaam in de log
+CONFIG_KEY_TO_COLUMN: Dict[str, str] = {
+    'printer_power': 'printer_power_kw',
+    'energy_price': 'energy_price',
+    'labour_cost': 'labour_cost',
+    'monitoring_pct': 'monitoring_pct',
+    'maintenance_cost': 'maintenance_cost',
+    'overhead_year': 'overhead_year',
+    'annual_hours': 'annual_hours',
+    'markup_material': 'markup_material',
+    'markup_variable': 'markup_variable',
+    'spoed_surcharge': 'spoed_surcharge',
+    'abrasive_surcharge': 'abrasive_surcharge',
+    'color_fee_min': 'color_fee_min',
+    'color_fee_max': 'color_fee_max',
+    'auto_time_per_gram': 'auto_time_per_gram',
+}
+
+CONFIG_COLUMNS: List[str] = list(CONFIG_KEY_TO_COLUMN.values())
+
+LEGACY_LOG_COLUMNS: List[str] = [
+    'timestamp', 'date', 'time', 'day_of_week', 'hour_of_day',
+    'weight_g', 'material', 'print_hours',
+    'material_cost', 'variable_cost', 'total_cost', 'sell_price',
+    'margin_pct', 'profit_amount',
+    'multicolor', 'abrasive', 'rush',
+] + CONFIG_COLUMNS + ['auto_hours_used']
+
+LOG_COLUMNS: List[str] = [c for c in LEGACY_LOG_COLUMNS if c not in CONFIG_COLUMNS] + ['config_version']
+
+
+# === DTYPES ===
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+
+WEEKDAY_DTYPE = pd.CategoricalDtype(WEEKDAYS, ordered=True)
+MONTH_DTYPE = pd.CategoricalDtype(MONTHS, ordered=True)
+
+BOOL_COLUMNS = ['multicolor', 'abrasive', 'rush', 'is_product', 'auto_hours_used']
+DATETIME_COLUMNS = ['timestamp']
+
+# Dtypes die read_csv direct kan toepassen (geen NaN problemen)
+READ_DTYPES: Dict[str, Any] = {
+    'material': 'category',
+    'day_of_week': WEEKDAY_DTYPE,
+    'month': MONTH_DTYPE,
+    'weight': 'float32',
+    'weight_g': 'float32',
+    'print_hours': 'float32',
+    'margin_pct': 'float32',
+    'material_cost': 'float64',
+    'variable_cost': 'float64',
+    'total_cost': 'float64',
+    'sell_price': 'float64',
+    'profit_amount': 'float64',
+    'product_name': 'object',
+    'product_id': 'object',
+}
+
+# Integer kolommen: alleen downcasten als er geen lege waarden zijn
+INT_COLUMNS: Dict[str, str] = {
+    'hour_of_day': 'int8',
+    'year': 'int16',
+    'config_version': 'int32',
+}
+
+_TRUE_STRINGS = {'true', '1', 'yes', 'ja'}
+
+
+# === WRITERS ===
+
+def format_timestamp(moment: datetime) -> str:
+    """Canonieke timestamp string voor alle CSV's (spatie, geen 'T')."""
+    return moment.isoformat(sep=' ')
+
+
+def build_master_row(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Bouw één master/calc rij (MASTER_COLUMNS) uit verrijkte berekening data.
+
+    Parameters:
+    ----------
+    data : Dict[str, Any]
+        Berekening met export_timestamp, day_of_week, flags, etc.
+
+    Returns:
+    -------
+    Dict[str, Any]
+        Rij voor csv.DictWriter(fieldnames=MASTER_COLUMNS)
+    """
+    return {
+        'timestamp': data.get('export_timestamp', ''),
+        'weight': data.get('weight', 0),
+        'material': data.get('material', ''),
+        'material_cost': round(data.get('material_cost', 0), 2),
+        'variable_cost': round(data.get('variable_cost', 0), 2),
+        'total_cost': round(data.get('total_cost', 0), 2),
+        'sell_price': round(data.get('sell_price', 0), 2),
+        'margin_pct': round(data.get('margin_pct', 0), 1),
+        'profit_amount': round(data.get('sell_price', 0) - data.get('total_cost', 0), 2),
+        'multicolor': bool(data.get('multicolor', False)),
+        'abrasive': bool(data.get('abrasive', False)),
+        'rush': bool(data.get('rush', False)),
+        'day_of_week': data.get('day_of_week', ''),
+        'hour_of_day': data.get('hour_of_day', 0),
+        'month': data.get('month', ''),
+        'year': data.get('year', 0),
+        'product_name': data.get('product_name', ''),
+        'product_id': data.get('product_id', ''),
+        'is_product': bool(data.get('is_product', False)),
+    }
+
+
+# === PARSERS ===
+
+def parse_bool(value: Any) -> bool:
+    """Zet een CSV flag ('True', 'False', '', 1, ...) om naar bool."""
+    if isinstance(value, bool):
+        return value
+    if value is None:
+        return False
+    return str(value).strip().lower() in _TRUE_STRINGS
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse één timestamp ongeacht 'T' of spatie en fracties."""
+    return datetime.fromisoformat(str(value).strip().replace('T', ' '))
+
+
+def to_bool_series(series: pd.Series) -> pd.Series:
+    """Vectoriseerde bool conversie; lege waarden worden False."""
+    if series.dtype == bool:
+        return series
+    return series.astype(str).str.strip().str.lower().isin(_TRUE_STRINGS)
+
+
+def to_datetime_series(series: pd.Series) -> pd.Series:
+    """ISO 8601 parse (snel pad); alleen bij afwijkende data format='mixed'."""
+    try:
+        return pd.to_datetime(series, format='ISO8601')
+    except (ValueError, TypeError):
+        return pd.to_datetime(series, format='mixed', errors='coerce')
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Breng een frame naar de canonieke dtypes (in place waar mogelijk).
+
+    Werkt voor elke layout: alleen aanwezige kolommen worden omgezet.
+    """
+    for column in DATETIME_COLUMNS:
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = to_datetime_series(df[column])
+
+    for column in BOOL_COLUMNS:
+        if column in df.columns:
+            df[column] = to_bool_series(df[column])
+
+    for column, dtype in READ_DTYPES.items():
+        if column in df.columns and df[column].dtype != dtype:
+            try:
+                df[column] = df[column].astype(dtype)
+            except (ValueError, TypeError):
+                if dtype in ('float32', 'float64'):
+                    df[column] = pd.to_numeric(df[column], errors='coerce').astype(dtype)
+
+    for column, dtype in INT_COLUMNS.items():
+        if column in df.columns and not df[column].isna().any():
+            try:
+                df[column] = df[column].astype(dtype)
+            except (ValueError, TypeError):
+                pass
+
+    return df
+
+
+# === LOADERS ===
+
+def read_csv_typed(path: Union[str, Path], usecols: Optional[Sequence[str]] = None,
+                   **kwargs) -> pd.DataFrame:
+    """Lees een CSV direct in canonieke dtypes.
+
+    De dtypes worden al tijdens het parsen toegepast (geen tussenstap
+    via object kolommen). Bij onverwachte data valt de loader terug op
+    een gewone read_csv gevolgd door apply_schema.
+
+    Parameters:
+    ----------
+    path : Path
+        CSV bestand
+    usecols : Sequence[str], optional
+        Alleen deze kolommen inlezen
+
+    Returns:
+    -------
+    pd.DataFrame
+        Geheugen-geoptimaliseerd frame
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.readline().strip().split(',')
+    wanted = set(usecols) if usecols is not None else set(header)
+    dtypes = {c: d for c, d in READ_DTYPES.items() if c in header and c in wanted}
+
+    try:
+        df = pd.read_csv(path, dtype=dtypes, usecols=usecols, **kwargs)
+    except (ValueError, TypeError):
+        df = pd.read_csv(path, usecols=usecols, **kwargs)
+    return apply_schema(df)
+
+
+def read_csv_filtered(path: Union[str, Path], row_filter: Callable[[pd.DataFrame], pd.DataFrame],
+                      usecols: Optional[Sequence[str]] = None,
+                      chunksize: int = 100_000) -> pd.DataFrame:
+    """Lees een CSV in chunks en houd per chunk alleen de gefilterde rijen.
+
+    Het geheugengebruik wordt begrensd door de chunkgrootte en het
+    resultaat, niet door de grootte van het bestand.
+
+    Parameters:
+    ----------
+    path : Path
+        CSV bestand
+    row_filter : Callable
+        Krijgt een getypeerde chunk en geeft de te bewaren rijen terug
+    usecols : Sequence[str], optional
+        Alleen deze kolommen inlezen (ontbrekende kolommen worden genegeerd)
+    chunksize : int
+        Rijen per chunk
+
+    Returns:
+    -------
+    pd.DataFrame
+        Getypeerd frame met alle rijen die het filter doorlaten
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.readline().strip().split(',')
+    if usecols is not None:
+        usecols = [c for c in header if c in set(usecols)]
+    wanted = set(usecols) if usecols is not None else set(header)
+    dtypes = {c: d for c, d in READ_DTYPES.items() if c in wanted}
+
+    def _read(dtype):
+        reader = pd.read_csv(path, dtype=dtype, usecols=usecols, chunksize=chunksize)
+        return [row_filter(apply_schema(chunk)) for chunk in reader]
+
+    try:
+        frames = _read(dtypes)
+    except (ValueError, TypeError):
+        frames = _read(None)
+
+    if not frames:
+        return apply_schema(pd.DataFrame(columns=usecols if usecols is not None else header))
+    # Categories kunnen per chunk verschillen: opnieuw typeren na concat
+    return apply_schema(pd.concat(frames, ignore_index=True))
+
+
+@traced('loading.read_master')
+def read_master(path: Union[str, Path], usecols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Lees master_calculations.csv (of een calc_*.csv) getypeerd."""
+    return read_csv_typed(path, usecols=usecols)
+
+
+def empty_master_frame() -> pd.DataFrame:
+    """Lege master DataFrame met de juiste kolommen en dtypes."""
+    return apply_schema(pd.DataFrame(columns=MASTER_COLUMNS))
+
+
+__all__ = [
+    'MASTER_COLUMNS', 'LOG_COLUMNS', 'LEGACY_LOG_COLUMNS', 'CONFIG_COLUMNS',
+    'CONFIG_KEY_TO_COLUMN', 'BOOL_COLUMNS', 'READ_DTYPES', 'WEEKDAYS', 'MONTHS',
+    'format_timestamp', 'build_master_row', 'parse_bool', 'parse_timestamp',
+    'to_bool_series', 'to_datetime_series', 'apply_schema',
+    'read_csv_typed', 'read_csv_filtered', 'read_master', 'empty_master_frame',
+]
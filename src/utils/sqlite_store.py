@@ -0,0 +1,628 @@
+"""
+SQLite Store - H2D Price Calculator
+===================================
+
+Optionele SQLite opslag voor berekeningen, de calculation log,
+producten en onderhoudsstatus.
+
+De standaard opslag blijft CSV/JSON (master_calculations.csv,
+calculation_log.csv, nozzle_maintenance.json). Met de instelling
+'storage_backend': 'sqlite' in user_settings.json gebruiken
+DataManager, ProductManager en MaintenanceWarningSystem dit module:
+
+exports/
+└── h2d_data.db
+    ├── calculations        # MASTER_COLUMNS (producten: is_product = 1), append-only
+    ├── product_changes     # product wijzigingen: put (volledige rij) / del (tombstone)
+    ├── calculation_log     # LOG_COLUMNS (config via config_versions.csv)
+    └── maintenance_state   # key → JSON (bijv. nozzle_maintenance)
+
+Opzet:
+-----
+- WAL journal mode: lezers (analyses) blokkeren de schrijver niet
+- Vaste, geparametriseerde SQL strings: sqlite3 cachet de prepared
+  statements per connectie
+- Batches via executemany binnen één transactie
+- Primary key uit de id service (ids.py): sorteerbaar, uniek over processen
+- Indexen op timestamp, (material, timestamp) en product_id
+- Filters en aggregaties worden in SQL uitgevoerd (pushdown), zodat
+  analyses alleen het resultaat inlezen
+- calculations blijft append-only, net als master_calculations.csv: een
+  product update of delete is een record in product_changes (zoals de
+  product_log van de CSV backend), zodat de historiek voor de analyses
+  in beide backends gelijk is
+
+Timestamps worden als canonieke tekst opgeslagen (format_timestamp);
+die sorteert chronologisch, dus range filters gebruiken de index.
+
+Gebruik:
+-------
+    >>> store = SQLiteStore(Path("exports/h2d_data.db"))
+    >>> store.insert_calculations([build_master_row(data)])
+    >>> df = store.query_calculations(start=week_start, materials=['PLA-CF'])
+    >>> store.aggregate('material', {'count': ('count', '*'), 'avg_margin': ('avg', 'margin_pct')})
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import csv
+import json
+import sqlite3
+import threading
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .config_snapshots import is_legacy_log, migrate_calculation_log
+from .ids import new_id, new_ids
+from .instrumentation import debug, traced
+from .schema import (
+    BOOL_COLUMNS, LOG_COLUMNS, MASTER_COLUMNS,
+    apply_schema, format_timestamp, parse_bool, parse_timestamp
+)
+
+try:
+    from ..config.user_config import get_config_value
+except ImportError:
+    get_config_value = None
+
+
+# Bestandsnaam van de database in de exports map
+DB_FILENAME = "h2d_data.db"
+
+# Rijen per executemany batch
+INSERT_BATCH_ROWS = 10_000
+
+_SQL_TYPES = {
+    'timestamp': 'TEXT NOT NULL',
+    'material': 'TEXT',
+    'day_of_week': 'TEXT',
+    'month': 'TEXT',
+    'date': 'TEXT',
+    'time': 'TEXT',
+    'product_name': 'TEXT',
+    'product_id': 'TEXT',
+    'hour_of_day': 'INTEGER',
+    'year': 'INTEGER',
+    'config_version': 'INTEGER',
+}
+
+
+def _column_type(column: str) -> str:
+    if column in _SQL_TYPES:
+        return _SQL_TYPES[column]
+    if column in BOOL_COLUMNS:
+        return 'INTEGER'
+    return 'REAL'
+
+
+def _create_table_sql(table: str, columns: Sequence[str], key: str = "id INTEGER PRIMARY KEY") -> str:
+    body = ',\n    '.join(f"{c} {_column_type(c)}" for c in columns)
+    return f"CREATE TABLE IF NOT EXISTS {table} (\n    {key},\n    {body}\n)"
+
+
+SCHEMA_SQL = [
+    _create_table_sql('calculations', MASTER_COLUMNS),
+    "CREATE INDEX IF NOT EXISTS idx_calculations_timestamp ON calculations(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_calculations_material ON calculations(material, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_calculations_product_id ON calculations(product_id)",
+    _create_table_sql('calculation_log', LOG_COLUMNS),
+    _create_table_sql('product_changes', MASTER_COLUMNS, key="seq INTEGER PRIMARY KEY,\n    op TEXT NOT NULL"),
+    "CREATE INDEX IF NOT EXISTS idx_product_changes_product_id ON product_changes(product_id, seq)",
+    "CREATE INDEX IF NOT EXISTS idx_calculation_log_timestamp ON calculation_log(timestamp)",
+    """CREATE TABLE IF NOT EXISTS maintenance_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+)""",
+]
+
+# Prepared statements (vaste SQL, alleen parameters wisselen). De primary
+# key komt uit de id service: sorteerbaar en uniek over processen heen
+INSERT_CALCULATION_SQL = (
+    f"INSERT INTO calculations (id, {', '.join(MASTER_COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' for _ in MASTER_COLUMNS)})"
+)
+INSERT_LOG_SQL = (
+    f"INSERT INTO calculation_log (id, {', '.join(LOG_COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' for _ in LOG_COLUMNS)})"
+)
+# Product wijzigingen: alleen appends, de hoogste seq per product_id wint
+PUT_PRODUCT_SQL = (
+    f"INSERT INTO product_changes (seq, op, {', '.join(MASTER_COLUMNS)}) "
+    f"VALUES (?, 'put', {', '.join('?' for _ in MASTER_COLUMNS)})"
+)
+DELETE_PRODUCT_SQL = "INSERT INTO product_changes (seq, op, timestamp, product_id) VALUES (?, 'del', ?, ?)"
+LATEST_PRODUCT_CHANGES_SQL = (
+    "SELECT * FROM product_changes WHERE seq IN "
+    "(SELECT MAX(seq) FROM product_changes GROUP BY product_id)"
+)
+UPSERT_STATE_SQL = (
+    "INSERT INTO maintenance_state (key, value, updated_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at"
+)
+
+# Toegestane aggregatie functies voor aggregate()
+AGGREGATES = {'count': 'COUNT({})', 'nunique': 'COUNT(DISTINCT {})', 'sum': 'SUM({})',
+              'avg': 'AVG({})', 'min': 'MIN({})', 'max': 'MAX({})'}
+
+
+def get_storage_backend() -> str:
+    """Gekozen opslag uit user_settings.json: 'csv' (standaard) of 'sqlite'."""
+    if get_config_value is None:
+        return 'csv'
+    try:
+        backend = str(get_config_value('storage_backend', 'csv')).lower()
+    except (OSError, ValueError):
+        return 'csv'
+    return backend if backend in ('csv', 'sqlite') else 'csv'
+
+
+def _normalise_value(column: str, value: Any) -> Any:
+    """CSV/Python waarde → SQLite waarde (bool als 0/1, lege strings als NULL)."""
+    if column in BOOL_COLUMNS:
+        return int(parse_bool(value))
+    if column == 'timestamp':
+        if isinstance(value, datetime):
+            return format_timestamp(value)
+        try:
+            return format_timestamp(parse_timestamp(value))
+        except ValueError:
+            return str(value)
+    if value == '' or value is None:
+        return None
+    return value
+
+
+def _bound(value: Any, end: bool = False) -> Optional[str]:
+    """Query grens → canonieke timestamp tekst; een datum als eind omvat de hele dag."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return format_timestamp(value)
+    if isinstance(value, date):
+        return format_timestamp(datetime.combine(value, time.max if end else time.min))
+    return format_timestamp(parse_timestamp(value))
+
+
+class SQLiteStore:
+    """SQLite (WAL) opslag met batch inserts en SQL pushdown.
+
+    Parameters:
+    ----------
+    db_path : Path
+        Pad naar het database bestand (wordt aangemaakt indien nodig)
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # sqlite3 connecties zijn thread-gebonden: één per thread
+        self._local = threading.local()
+        self._init_schema()
+
+    # === CONNECTIE ===
+
+    def connection(self) -> sqlite3.Connection:
+        """Connectie voor de huidige thread (WAL, prepared statement cache)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Sluit de connectie van de huidige thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _init_schema(self) -> None:
+        conn = self.connection()
+        with conn:
+            for statement in SCHEMA_SQL:
+                conn.execute(statement)
+
+    # === SCHRIJVEN ===
+
+    def insert_calculations(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Voeg master rijen toe in batches, elke batch in één transactie.
+
+        Parameters:
+        ----------
+        rows : Iterable[Dict[str, Any]]
+            Rijen met MASTER_COLUMNS als keys (zie build_master_row)
+
+        Returns:
+        -------
+        int
+            Aantal ingevoegde rijen
+        """
+        return self._insert_many(INSERT_CALCULATION_SQL, MASTER_COLUMNS, rows)
+
+    def insert_log_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Voeg calculation_log rijen (LOG_COLUMNS) toe in batches."""
+        return self._insert_many(INSERT_LOG_SQL, LOG_COLUMNS, rows)
+
+    def _insert_many(self, sql: str, columns: Sequence[str],
+                     rows: Iterable[Dict[str, Any]]) -> int:
+        conn = self.connection()
+        total = 0
+        batch: List[Tuple] = []
+
+        def flush() -> None:
+            # Ids per batch in één keer reserveren (bestaande 'id' wint)
+            ids = iter(new_ids(sum(1 for values in batch if values[0] is None)))
+            params = [(values[0] if values[0] is not None else next(ids),) + values[1:]
+                      for values in batch]
+            with conn:
+                conn.executemany(sql, params)
+
+        for row in rows:
+            row_id = row.get('id') or None
+            batch.append((row_id,) + tuple(_normalise_value(c, row.get(c)) for c in columns))
+            if len(batch) >= INSERT_BATCH_ROWS:
+                flush()
+                total += len(batch)
+                batch = []
+        if batch:
+            flush()
+            total += len(batch)
+        return total
+
+    def insert_calculation_with_log(self, master_row: Dict[str, Any],
+                                    log_row: Dict[str, Any],
+                                    row_id: Optional[int] = None) -> int:
+        """Schrijf master en log rij atomair in één transactie.
+
+        Beide rijen krijgen hetzelfde id (default: nieuw id uit de id service).
+
+        Returns:
+        -------
+        int
+            Het gebruikte id
+        """
+        row_id = row_id if row_id is not None else new_id()
+        conn = self.connection()
+        with conn:
+            conn.execute(INSERT_LOG_SQL,
+                         (row_id,) + tuple(_normalise_value(c, log_row.get(c)) for c in LOG_COLUMNS))
+            conn.execute(INSERT_CALCULATION_SQL,
+                         (row_id,) + tuple(_normalise_value(c, master_row.get(c)) for c in MASTER_COLUMNS))
+        return row_id
+
+    def update_product(self, row: Dict[str, Any]) -> int:
+        """Leg een nieuwe versie van een product vast in product_changes.
+
+        De rij in calculations blijft ongewijzigd (historiek voor de
+        analyses); ProductManager speelt de wijzigingen af bij het laden.
+
+        Returns:
+        -------
+        int
+            Sequentienummer van de wijziging
+        """
+        seq = new_id()
+        params = (seq,) + tuple(_normalise_value(c, row.get(c)) for c in MASTER_COLUMNS)
+        conn = self.connection()
+        with conn:
+            conn.execute(PUT_PRODUCT_SQL, params)
+        return seq
+
+    def delete_product(self, product_id: str) -> int:
+        """Tombstone voor een product in product_changes; geeft de seq terug."""
+        seq = new_id()
+        conn = self.connection()
+        with conn:
+            conn.execute(DELETE_PRODUCT_SQL, (seq, format_timestamp(datetime.now()), product_id))
+        return seq
+
+    def load_product_changes(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Laatste wijziging per product: master rij, of None na een delete."""
+        changes: Dict[str, Optional[Dict[str, Any]]] = {}
+        for row in self.connection().execute(LATEST_PRODUCT_CHANGES_SQL):
+            if row['op'] == 'del':
+                changes[row['product_id']] = None
+            else:
+                changes[row['product_id']] = {c: row[c] for c in MASTER_COLUMNS}
+        return changes
+
+    def import_csv(self, csv_path: Union[str, Path], table: str = 'calculations') -> int:
+        """Importeer een bestaande master of (compacte) log CSV, streaming.
+
+        Parameters:
+        ----------
+        csv_path : Path
+            master_calculations.csv of calculation_log.csv
+        table : str
+            'calculations' of 'calculation_log'
+
+        Returns:
+        -------
+        int
+            Aantal geïmporteerde rijen
+        """
+        csv_path = Path(csv_path)
+        if not csv_path.exists():
+            return 0
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if table == 'calculation_log':
+                return self.insert_log_rows(reader)
+            return self.insert_calculations(reader)
+
+    # === LEZEN ===
+
+    @staticmethod
+    def _where(start: Any = None, end: Any = None,
+               materials: Optional[Sequence[str]] = None,
+               abrasive: Optional[bool] = None,
+               is_product: Optional[bool] = None,
+               product_id: Optional[str] = None) -> Tuple[str, List[Any]]:
+        """Bouw een geparametriseerde WHERE clausule."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        start_text = _bound(start)
+        end_text = _bound(end, end=True)
+        if start_text is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start_text)
+        if end_text is not None:
+            clauses.append("timestamp <= ?")
+            params.append(end_text)
+        if materials:
+            clauses.append(f"material IN ({', '.join('?' for _ in materials)})")
+            params.extend(materials)
+        if abrasive is not None:
+            clauses.append("abrasive = ?")
+            params.append(int(abrasive))
+        if is_product is not None:
+            clauses.append("is_product = ?")
+            params.append(int(is_product))
+        if product_id is not None:
+            clauses.append("product_id = ?")
+            params.append(product_id)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _check_columns(columns: Sequence[str], allowed: Sequence[str]) -> None:
+        unknown = [c for c in columns if c not in allowed]
+        if unknown:
+            raise ValueError(f"Onbekende kolommen: {unknown}")
+
+    @traced('loading.sqlite_query')
+    def query_calculations(self, start: Any = None, end: Any = None,
+                           columns: Optional[Sequence[str]] = None,
+                           materials: Optional[Sequence[str]] = None,
+                           abrasive: Optional[bool] = None,
+                           is_product: Optional[bool] = None) -> pd.DataFrame:
+        """Lees berekeningen met filters en projectie in SQL.
+
+        Parameters:
+        ----------
+        start, end : datetime | date, optional
+            Periode (inclusief; een datum als eind omvat de hele dag)
+        columns : Sequence[str], optional
+            Alleen deze kolommen (default: alle MASTER_COLUMNS)
+        materials : Sequence[str], optional
+            Alleen deze materialen
+        abrasive, is_product : bool, optional
+            Filter op flag
+
+        Returns:
+        -------
+        pd.DataFrame
+            Getypeerd frame (schema register), chronologisch
+        """
+        columns = list(columns) if columns is not None else list(MASTER_COLUMNS)
+        self._check_columns(columns, MASTER_COLUMNS)
+        where, params = self._where(start, end, materials, abrasive, is_product)
+        sql = f"SELECT {', '.join(columns)} FROM calculations{where} ORDER BY timestamp, id"
+        df = pd.read_sql_query(sql, self.connection(), params=params)
+        return apply_schema(df)
+
+    @traced('loading.sqlite_query_after')
+    def query_calculations_after(self, after_id: int = 0,
+                                 columns: Optional[Sequence[str]] = None) -> Tuple[pd.DataFrame, int]:
+        """Lees alleen berekeningen met een id na `after_id` (incrementeel bijwerken).
+
+        De ids zijn sorteerbaar op tijd (utils.ids), dus de hoogste id
+        markeert tot waar een afgeleide structuur bijgewerkt is.
+
+        Parameters:
+        ----------
+        after_id : int
+            Hoogste id van de vorige aanroep (0 = alles)
+        columns : Sequence[str], optional
+            Alleen deze kolommen (default: alle MASTER_COLUMNS)
+
+        Returns:
+        -------
+        Tuple[pd.DataFrame, int]
+            Getypeerd frame en de nieuwe hoogste id
+        """
+        columns = list(columns) if columns is not None else list(MASTER_COLUMNS)
+        self._check_columns(columns, MASTER_COLUMNS)
+        sql = f"SELECT id, {', '.join(columns)} FROM calculations WHERE id > ? ORDER BY id"
+        df = pd.read_sql_query(sql, self.connection(), params=[int(after_id)])
+        last_id = int(df['id'].iloc[-1]) if len(df) else int(after_id)
+        return apply_schema(df.drop(columns=['id'])), last_id
+
+    def iter_calculations(self, **filters) -> Iterable[sqlite3.Row]:
+        """Itereer rijen (sqlite3.Row, dict-achtig) zonder DataFrame."""
+        where, params = self._where(**filters)
+        cursor = self.connection().execute(
+            f"SELECT {', '.join(MASTER_COLUMNS)} FROM calculations{where} ORDER BY timestamp, id",
+            params
+        )
+        yield from cursor
+
+    def head_calculations(self, order_by: Union[str, Sequence[str]], limit: int,
+                          columns: Optional[Sequence[str]] = None,
+                          descending: bool = False, **filters) -> pd.DataFrame:
+        """Eerste `limit` berekeningen in een sortering (ORDER BY ... LIMIT in SQL).
+
+        Parameters:
+        ----------
+        order_by : str | Sequence[str]
+            Sorteerkolom(men); bij gelijke waarden beslist de id (invoegvolgorde)
+        limit : int
+            Maximaal aantal rijen
+        columns : Sequence[str], optional
+            Alleen deze kolommen (default: alle MASTER_COLUMNS)
+        descending : bool
+            Aflopend sorteren (de id blijft oplopend)
+        **filters
+            start, end, materials, abrasive, is_product (zie query_calculations)
+
+        Returns:
+        -------
+        pd.DataFrame
+            Getypeerd frame in de gevraagde volgorde
+        """
+        order = [order_by] if isinstance(order_by, str) else list(order_by)
+        columns = list(columns) if columns is not None else list(MASTER_COLUMNS)
+        self._check_columns(order + columns, MASTER_COLUMNS)
+        direction = " DESC" if descending else ""
+        where, params = self._where(**filters)
+        sql = (f"SELECT {', '.join(columns)} FROM calculations{where} "
+               f"ORDER BY {', '.join(c + direction for c in order)}, id LIMIT ?")
+        df = pd.read_sql_query(sql, self.connection(), params=params + [int(limit)])
+        return apply_schema(df)
+
+    def aggregate(self, group_by: Union[str, Sequence[str], None],
+                  metrics: Dict[str, Tuple[str, str]], **filters) -> pd.DataFrame:
+        """GROUP BY in SQL; alleen het geaggregeerde resultaat wordt ingelezen.
+
+        Parameters:
+        ----------
+        group_by : str | Sequence[str] | None
+            Kolom(men) om op te groeperen (None = één totaalrij)
+        metrics : Dict[str, Tuple[str, str]]
+            Resultaatnaam → (functie, kolom), bijv. {'omzet': ('sum', 'sell_price')};
+            functies: count, nunique, sum, avg, min, max; kolom '*' alleen bij count
+        **filters
+            start, end, materials, abrasive, is_product (zie query_calculations)
+
+        Returns:
+        -------
+        pd.DataFrame
+            Eén rij per groep, group_by kolommen als index
+        """
+        groups = [group_by] if isinstance(group_by, str) else list(group_by or [])
+        self._check_columns(groups, MASTER_COLUMNS)
+
+        select = list(groups)
+        for name, (func, column) in metrics.items():
+            if func not in AGGREGATES or not name.isidentifier():
+                raise ValueError(f"Ongeldige aggregatie: {name} = {func}({column})")
+            if column != '*':
+                self._check_columns([column], MASTER_COLUMNS)
+            elif func != 'count':
+                raise ValueError(f"'*' kan alleen met count: {name}")
+            select.append(f"{AGGREGATES[func].format(column)} AS {name}")
+
+        where, params = self._where(**filters)
+        sql = f"SELECT {', '.join(select)} FROM calculations{where}"
+        if groups:
+            sql += f" GROUP BY {', '.join(groups)}"
+        df = pd.read_sql_query(sql, self.connection(), params=params)
+        return df.set_index(groups) if groups else df
+
+    def count_calculations(self, **filters) -> int:
+        """Aantal berekeningen (optioneel gefilterd)."""
+        where, params = self._where(**filters)
+        return self.connection().execute(
+            f"SELECT COUNT(*) FROM calculations{where}", params
+        ).fetchone()[0]
+
+    def load_log(self) -> pd.DataFrame:
+        """Volledige calculation_log tabel in LOG_COLUMNS layout."""
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(LOG_COLUMNS)} FROM calculation_log ORDER BY timestamp, id",
+            self.connection()
+        )
+        return apply_schema(df)
+
+    def is_empty(self) -> bool:
+        """True als er nog geen berekeningen of log rijen zijn."""
+        conn = self.connection()
+        return (conn.execute("SELECT 1 FROM calculations LIMIT 1").fetchone() is None and
+                conn.execute("SELECT 1 FROM calculation_log LIMIT 1").fetchone() is None)
+
+    # === ONDERHOUDSSTATUS ===
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        """JSON waarde uit maintenance_state (of default)."""
+        row = self.connection().execute(
+            "SELECT value FROM maintenance_state WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row['value']) if row is not None else default
+
+    def set_state(self, key: str, value: Any) -> None:
+        """Sla een JSON-serialiseerbare waarde op (upsert)."""
+        conn = self.connection()
+        with conn:
+            conn.execute(UPSERT_STATE_SQL, (key, json.dumps(value), format_timestamp(datetime.now())))
+
+    def update_state(self, key: str, update: Callable[[Any], Any]) -> Any:
+        """Lees-wijzig-schrijf van een state waarde in één schrijftransactie.
+
+        BEGIN IMMEDIATE neemt de schrijflock vóór het lezen, zodat een
+        ander proces er niet tussen kan schrijven.
+
+        Parameters:
+        ----------
+        key : str
+            State sleutel
+        update : Callable[[Any], Any]
+            Krijgt de huidige waarde (None als afwezig), geeft de nieuwe terug
+
+        Returns:
+        -------
+        Any
+            De opgeslagen nieuwe waarde
+        """
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT value FROM maintenance_state WHERE key = ?", (key,)
+            ).fetchone()
+            value = update(json.loads(row['value']) if row is not None else None)
+            conn.execute(UPSERT_STATE_SQL, (key, json.dumps(value), format_timestamp(datetime.now())))
+        return value
+
+
+def open_default_store(exports_dir: Union[str, Path]) -> SQLiteStore:
+    """Open h2d_data.db in de exports map; eerste keer CSV data importeren.
+
+    Parameters:
+    ----------
+    exports_dir : Path
+        De exports map (bevat producten/ en berekeningen/)
+    """
+    exports_dir = Path(exports_dir)
+    store = SQLiteStore(exports_dir / DB_FILENAME)
+    if store.is_empty():
+        master = exports_dir / "producten" / "master_calculations.csv"
+        log = exports_dir / "berekeningen" / "calculation_log.csv"
+        imported = store.import_csv(master, 'calculations')
+        # Alleen de compacte log heeft config_version; legacy logs eerst migreren
+        if is_legacy_log(log):
+            migrate_calculation_log(log)
+        imported += store.import_csv(log, 'calculation_log')
+        if imported:
+            debug("%d rijen uit CSV geïmporteerd in %s", imported, store.db_path)
+    return store
+
+
+__all__ = ['SQLiteStore', 'DB_FILENAME', 'get_storage_backend', 'open_default_store']
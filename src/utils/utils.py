@@ -35,6 +35,7 @@ Versie: 1.0
 """
 
 import csv
+import functools
 import time
 import warnings
 from typing import Iterable, Dict, Any, Optional, Union, List
@@ -463,6 +464,9 @@ def format_duration(minutes: int) -> str:
 def timer_decorator(func):
     """Decorator voor functie performance timing.
     
+    Print de verstreken tijd en registreert de aanroep ook als span
+    (zie instrumentation.py) als H2D_INSTRUMENT aan staat.
+    
     Example:
     -------
         >>> @timer_decorator
@@ -470,12 +474,16 @@ def timer_decorator(func):
         ...     time.sleep(1)
         ...     return 42
         >>> result = expensive_calculation()
-        expensive_calculation uitvoerd in 1.001s
+        expensive_calculation uitgevoerd in 1.001s
     """
+    from .instrumentation import span
+    
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        elapsed_time = time.time() - start_time
+        start_time = time.perf_counter()
+        with span(f"timer.{func.__qualname__}"):
+            result = func(*args, **kwargs)
+        elapsed_time = time.perf_counter() - start_time
         print(f"{func.__name__} uitgevoerd in {elapsed_time:.3f}s")
         return result
     return wrapper
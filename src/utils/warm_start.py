@@ -0,0 +1,282 @@
+"""
+Warm Start - H2D Price Calculator
+=================================
+
+Binaire snapshots van geparste CSV data, zodat een herstart niet de
+hele historiek opnieuw hoeft te parsen.
+
+Bij elke GUI start las ProductManager de volledige master CSV en las
+elke analyse tab zijn kolommen opnieuw in. De bronbestanden zijn
+append-only, dus een snapshot van het geparste resultaat plus de
+byte offset tot waar het komt volstaat: bij de volgende start wordt
+alleen de staart na die offset geparst.
+
+exports/producten/
+├── master_calculations.csv
+└── .warm_start/
+    ├── master_calculations.products.pkl        # ProductManager
+    └── master_calculations.frame-<hash>.pkl    # getypeerd frame per kolomset
+
+Validatie bij het laden:
+-----------------------
+- header van de bron gelijk aan die van de snapshot
+- bron minstens `offset` bytes groot
+- hash over het begin en het einde van de eerste `offset` bytes gelijk
+  (blake2b over HASH_SAMPLE_BYTES aan beide kanten; vangt migraties,
+  compacties en herschreven bestanden zonder alles te lezen)
+- even groot én zelfde mtime → snapshot is actueel, anders wordt
+  alleen de staart ingelezen
+
+Een snapshot wordt (atomair) geschreven na een volledige load en
+zodra de ingelezen staart SNAPSHOT_REFRESH_ROWS rijen haalt, zodat
+de staart bij een koude start begrensd blijft. Formaat: pickle
+protocol 5 (numpy/pandas buffers zonder extra kopie).
+
+Gebruik:
+-------
+    >>> df = read_csv_warm("exports/producten/master_calculations.csv",
+    ...                    usecols=['timestamp', 'material', 'weight'])
+    >>> cache = WarmStartCache(csv_path, 'products')
+    >>> snapshot = cache.load()          # None → volledig inlezen
+    >>> header, data, end = read_rows(csv_path, snapshot.offset)
+
+Auteur: H2D Systems
+Versie: 1.0
+"""
+
+import hashlib
+import io
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .instrumentation import count, debug, traced
+from .schema import READ_DTYPES, apply_schema
+
+try:
+    from ..config.user_config import get_config_value
+except ImportError:
+    get_config_value = None
+
+
+# Map naast het bronbestand
+SNAPSHOT_DIRNAME = ".warm_start"
+
+# Verhoog bij een wijziging in het snapshot formaat of het schema
+SNAPSHOT_VERSION = 1
+
+PICKLE_PROTOCOL = 5
+
+# Bytes aan begin en einde van het gedekte deel die gehasht worden
+HASH_SAMPLE_BYTES = 64 * 1024
+
+# Nieuwe snapshot zodra de ingelezen staart zoveel rijen heeft
+SNAPSHOT_REFRESH_ROWS = 1_000
+
+
+def warm_start_enabled() -> bool:
+    """Instelling 'warm_start' in user_settings.json (standaard aan)."""
+    if get_config_value is None:
+        return True
+    try:
+        return bool(get_config_value('warm_start', True))
+    except Exception:
+        return True
+
+
+def _sample_hash(path: Path, size: int) -> str:
+    """blake2b over het begin en einde van de eerste `size` bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(min(size, HASH_SAMPLE_BYTES)))
+        if size > HASH_SAMPLE_BYTES:
+            f.seek(max(HASH_SAMPLE_BYTES, size - HASH_SAMPLE_BYTES))
+            digest.update(f.read(size - f.tell()))
+    digest.update(str(size).encode())
+    return digest.hexdigest()
+
+
+def _read_header(path: Path) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.readline().strip().split(',')
+
+
+def read_rows(path: Union[str, Path], offset: int = 0) -> Tuple[List[str], bytes, int]:
+    """Lees de header en de volledige regels vanaf `offset`.
+
+    Een half geschreven laatste regel wordt niet meegenomen; die komt
+    bij de volgende load mee.
+
+    Parameters:
+    ----------
+    path : Path
+        CSV bestand
+    offset : int
+        Byte offset (0 = direct na de header)
+
+    Returns:
+    -------
+    Tuple[List[str], bytes, int]
+        Header, ruwe rijen (zonder header) en de nieuwe offset
+    """
+    with open(path, 'rb') as f:
+        header_line = f.readline()
+        header = header_line.decode('utf-8').strip().split(',')
+        f.seek(max(offset, len(header_line)))
+        data = f.read()
+        start = f.tell() - len(data)
+    complete = data.rfind(b'\n') + 1
+    return header, data[:complete], start + complete
+
+
+@dataclass
+class Snapshot:
+    """Geldige snapshot: payload dekt de bron tot `offset` bytes."""
+    payload: Any
+    offset: int
+    header: List[str]
+    fresh: bool  # bron ongewijzigd sinds de snapshot
+
+
+class WarmStartCache:
+    """Snapshot van één afgeleide structuur van een append-only CSV.
+
+    Parameters:
+    ----------
+    source : Path
+        Het bronbestand (bijv. master_calculations.csv)
+    name : str
+        Naam van de afgeleide structuur (bijv. 'products')
+    """
+
+    def __init__(self, source: Union[str, Path], name: str):
+        self.source = Path(source)
+        self.name = name
+        self.path = self.source.parent / SNAPSHOT_DIRNAME / f"{self.source.stem}.{name}.pkl"
+
+    def load(self) -> Optional[Snapshot]:
+        """Snapshot als die nog bij de bron past, anders None."""
+        if not self.path.exists() or not self.source.exists():
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+            if state.get('version') != SNAPSHOT_VERSION:
+                return None
+
+            stat = self.source.stat()
+            offset = state['offset']
+            if stat.st_size < offset:
+                return None  # ingekort of herschreven
+            if _read_header(self.source) != state['header']:
+                return None
+            if _sample_hash(self.source, offset) != state['hash']:
+                return None
+
+            fresh = stat.st_size == offset and stat.st_mtime_ns == state['mtime_ns']
+            if stat.st_size == offset and not fresh:
+                return None  # zelfde grootte maar aangepast
+            return Snapshot(state['payload'], offset, state['header'], fresh)
+
+        except Exception as e:
+            count('loading.warm_start_invalid')
+            debug("Warm start snapshot %s ongeldig: %s", self.path.name, e)
+            return None
+
+    def save(self, payload: Any, offset: int, header: Sequence[str]) -> None:
+        """Schrijf de snapshot atomair (tmp + replace)."""
+        try:
+            stat = self.source.stat()
+            state = {
+                'version': SNAPSHOT_VERSION,
+                'offset': offset,
+                'header': list(header),
+                # mtime alleen zinvol als de snapshot de hele bron dekt
+                'mtime_ns': stat.st_mtime_ns if stat.st_size == offset else None,
+                'hash': _sample_hash(self.source, offset),
+                'payload': payload,
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=PICKLE_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            debug("Warm start snapshot %s niet geschreven: %s", self.path.name, e)
+
+
+def _parse_frame(data: bytes, header: List[str], usecols: Optional[Sequence[str]]) -> pd.DataFrame:
+    """Parse ruwe rijen (zonder header) in canonieke dtypes."""
+    if not data:
+        df = pd.DataFrame({c: pd.Series(dtype=object) for c in (usecols or header)})
+        return apply_schema(df)
+    wanted = set(usecols) if usecols is not None else set(header)
+    dtypes = {c: d for c, d in READ_DTYPES.items() if c in header and c in wanted}
+    try:
+        df = pd.read_csv(io.BytesIO(data), names=header, header=None, dtype=dtypes, usecols=usecols)
+    except (ValueError, TypeError):
+        df = pd.read_csv(io.BytesIO(data), names=header, header=None, usecols=usecols)
+    return apply_schema(df)
+
+
+def _append_frame(base: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    """Plak de staart aan het frame zonder de categorieën te verliezen."""
+    if tail.empty:
+        return base
+    for column in base.columns:
+        if isinstance(base[column].dtype, pd.CategoricalDtype) and column in tail.columns:
+            categories = base[column].cat.categories.union(
+                tail[column].astype('category').cat.categories)
+            base[column] = base[column].cat.set_categories(categories)
+            tail[column] = tail[column].astype(pd.CategoricalDtype(categories))
+    return pd.concat([base, tail], ignore_index=True)
+
+
+@traced('loading.read_csv_warm')
+def read_csv_warm(path: Union[str, Path], usecols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Getypeerd frame van een append-only CSV, via een warm start snapshot.
+
+    Zelfde resultaat als read_csv_typed(path, usecols); bij een geldige
+    snapshot wordt alleen de nieuwe staart geparst.
+
+    Parameters:
+    ----------
+    path : Path
+        CSV bestand (master_calculations.csv, calculation_log.csv)
+    usecols : Sequence[str], optional
+        Alleen deze kolommen (elke kolomset heeft een eigen snapshot)
+
+    Returns:
+    -------
+    pd.DataFrame
+        Geheugen-geoptimaliseerd frame
+    """
+    path = Path(path)
+    columns = sorted(usecols) if usecols is not None else None
+    key = hashlib.blake2b(repr(columns).encode(), digest_size=6).hexdigest()
+    cache = WarmStartCache(path, f"frame-{key}")
+
+    snapshot = cache.load()
+    if snapshot is not None and snapshot.fresh:
+        return snapshot.payload
+
+    offset = snapshot.offset if snapshot is not None else 0
+    header, data, end = read_rows(path, offset)
+    tail = _parse_frame(data, header, usecols)
+    if snapshot is None:
+        cache.save(tail, end, header)
+        return tail
+
+    df = _append_frame(snapshot.payload, tail)
+    if len(tail) >= SNAPSHOT_REFRESH_ROWS:
+        cache.save(df, end, header)
+    return df
+
+
+__all__ = [
+    'Snapshot', 'WarmStartCache', 'read_rows', 'read_csv_warm', 'warm_start_enabled',
+]